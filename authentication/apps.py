@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AuthenticationConfig(AppConfig):
     name = "authentication"
+
+    def ready(self):
+        # Connexion des signaux (empreinte des droits des tokens JWT)
+        from . import signals  # noqa: F401
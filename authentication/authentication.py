@@ -0,0 +1,198 @@
+"""
+Authentification JWT "sans état" (stateless).
+
+Le JWTAuthentication standard relit la ligne User en base à chaque appel de l'API.
+Ici, l'utilisateur est reconstruit à partir des claims signés du token (id, username,
+is_staff, is_superuser) et de l'empreinte 'membership_version'.
+
+La base n'est consultée que si cette empreinte est périmée : profil modifié ou
+appartenances aux projets changées depuis l'émission du token. L'empreinte courante
+de chaque utilisateur est gardée dans le cache des appartenances et mise à jour par signaux
+(dans le processus qui écrit) : avec plusieurs processus serveur, ce cache doit être partagé,
+ce que vérifie projects.cache_backends.check_shared_caches au démarrage. Sans ce cache
+(SOFTDESK_MEMBERSHIP_CACHE_ALIAS = None), l'empreinte est lue en base à chaque requête.
+L'empreinte est toujours lue sur la base principale : un réplica en retard ne doit pas remettre
+dans le cache partagé l'empreinte d'avant une révocation (voir config/replicas.py).
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User, new_membership_version
+
+# Claim JWT portant l'empreinte des droits
+MEMBERSHIP_VERSION_CLAIM = "membership_version"
+
+
+def _version_cache():
+    # Même cache que les appartenances aux projets (alias configurable, TTL + LRU), ou None.
+    alias = getattr(settings, "SOFTDESK_MEMBERSHIP_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def membership_version_cache_key(user_id):
+    return f"softdesk:membership-version:{user_id}"
+
+
+def get_membership_version(user_id):
+    """
+    Renvoie l'empreinte courante de l'utilisateur (cache, puis base en cas d'absence).
+    """
+    cache = _version_cache()
+    key = membership_version_cache_key(user_id)
+    version = cache.get(key) if cache is not None else None
+    if version is None:
+        versions = User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id).values_list("membership_version", flat=True)
+        version = versions.first()
+        if version is not None and cache is not None:
+            cache.set(key, version)
+    return version
+
+
+async def cache_aget(cache, key):
+    """
+    Lecture d'un cache depuis une vue asynchrone. Un cache en mémoire du processus (locmem)
+    est lu directement : aucune E/S, inutile de passer par un thread comme BaseCache.aget().
+    """
+    if isinstance(cache, LocMemCache):
+        return cache.get(key)
+    return await cache.aget(key)
+
+
+async def cache_aset(cache, key, value, **kwargs):
+    if isinstance(cache, LocMemCache):
+        return cache.set(key, value, **kwargs)
+    return await cache.aset(key, value, **kwargs)
+
+
+async def aget_membership_version(user_id):
+    """
+    Variante asynchrone de get_membership_version().
+    """
+    cache = _version_cache()
+    key = membership_version_cache_key(user_id)
+    version = await cache_aget(cache, key) if cache is not None else None
+    if version is None:
+        versions = User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id).values_list("membership_version", flat=True)
+        version = await versions.afirst()
+        if version is not None and cache is not None:
+            await cache_aset(cache, key, version)
+    return version
+
+
+def remember_membership_version(user_id, version):
+    """
+    Enregistre dans le cache l'empreinte courante de l'utilisateur.
+    """
+    cache = _version_cache()
+    if cache is not None:
+        cache.set(membership_version_cache_key(user_id), version)
+
+
+def forget_membership_version(user_id):
+    """
+    Utilisateur supprimé : ses tokens repassent par la base, qui les refuse.
+    """
+    cache = _version_cache()
+    if cache is not None:
+        cache.delete(membership_version_cache_key(user_id))
+
+
+def bump_membership_version(user_id):
+    """
+    Attribue une nouvelle empreinte à l'utilisateur : ses tokens en circulation
+    repasseront par la base jusqu'à leur renouvellement.
+    """
+    return bump_membership_versions([user_id])
+
+
+def bump_membership_versions(user_ids):
+    """
+    Variante pour un lot d'utilisateurs (opérations en masse) : une seule requête UPDATE.
+    Les utilisateurs reçoivent la même nouvelle empreinte, ce qui suffit à périmer leurs tokens.
+    """
+    user_ids = set(user_ids)
+    version = new_membership_version()
+    User.objects.filter(pk__in=user_ids).update(membership_version=version)
+    cache = _version_cache()
+    if cache is not None:
+        cache.set_many({membership_version_cache_key(user_id): version for user_id in user_ids})
+    return version
+
+
+def add_user_claims(token, user):
+    """
+    Ajoute au token les claims nécessaires pour reconstruire l'utilisateur sans la base.
+    """
+    token["username"] = user.username
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token[MEMBERSHIP_VERSION_CLAIM] = user.membership_version
+    return token
+
+
+class SoftDeskTokenUser(TokenUser):
+    """
+    Utilisateur léger construit à partir du token (aucune requête SQL).
+    L'identifiant est converti en entier pour se comparer aux clés étrangères (author_id, ...).
+    """
+
+    @property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def membership_version(self):
+        return self.token.get(MEMBERSHIP_VERSION_CLAIM)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Authentification JWT qui ne lit l'utilisateur en base que si son empreinte est périmée.
+    """
+
+    def get_user(self, validated_token):
+        token_version = validated_token.get(MEMBERSHIP_VERSION_CLAIM)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+
+        # Token récent (empreinte à jour) : on fait confiance aux claims signés.
+        if token_version is not None and user_id is not None:
+            if get_membership_version(user_id) == token_version:
+                return SoftDeskTokenUser(validated_token)
+
+        # Token ancien ou émis sans empreinte : chemin classique (lecture en base,
+        # vérification du compte actif).
+        return super().get_user(validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        Variante asynchrone de authenticate() pour les vues ASGI (voir projects/async_views.py).
+        Mêmes résultats et mêmes exceptions (InvalidToken, AuthenticationFailed).
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        # Vérification de signature et d'expiration : calcul pur, sans E/S.
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        token_version = validated_token.get(MEMBERSHIP_VERSION_CLAIM)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if token_version is not None and user_id is not None:
+            if await aget_membership_version(user_id) == token_version:
+                return SoftDeskTokenUser(validated_token)
+        return await sync_to_async(super().get_user)(validated_token)
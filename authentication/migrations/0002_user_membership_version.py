@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 06:00
+
+import authentication.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='membership_version',
+            field=models.CharField(default=authentication.models.new_membership_version, editable=False, max_length=32, verbose_name='Version des droits'),
+        ),
+    ]
@@ -1,6 +1,16 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
+
+def new_membership_version():
+    """
+    Génère une nouvelle empreinte aléatoire (voir User.membership_version).
+    """
+    return secrets.token_hex(8)
+
+
 class User(AbstractUser):
     """
     Modèle utilisateur personnalisé.
@@ -18,6 +28,15 @@ class User(AbstractUser):
     # Horodatage automatique : auto_now_add=True enregistre la date uniquement à la création de l'objet
     created_time = models.DateTimeField(auto_now_add=True, verbose_name="Date de création")
 
+    # Empreinte des droits de l'utilisateur, recopiée dans ses tokens JWT.
+    # Elle change à chaque modification du profil ou des appartenances aux projets :
+    # un token qui porte une ancienne empreinte force une relecture de l'utilisateur en base
+    # (voir authentication/authentication.py).
+    membership_version = models.CharField(
+        max_length=32, default=new_membership_version, editable=False,
+        verbose_name="Version des droits"
+    )
+
     def __str__(self):
         """
         Représentation textuelle de l'objet (utilisée dans l'interface d'admin Django et les logs).
@@ -20,5 +20,6 @@ class IsOwnerOrSuperUser(BasePermission):
             
         # 2. Vérification de propriété :
         # On compare l'objet demandé (obj) avec l'utilisateur connecté (request.user).
-        # Cela fonctionne car 'obj' est ici une instance du modèle User.
-        return obj == request.user
\ No newline at end of file
+        # On compare les identifiants : request.user peut être un utilisateur léger
+        # reconstruit depuis le token JWT, et non une instance du modèle User.
+        return obj.pk == request.user.id
\ No newline at end of file
@@ -1,8 +1,13 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
 from authentication.models import User
+from authentication.authentication import add_user_claims
+from projects.metrics import InstrumentedSerializerMixin
 from datetime import date
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     """
     Sérailiseur pour la gestion des utilisateurs (Inscription et Profil).
     Gère la validation de l'âge et le hachage sécurisé du mot de passe.
@@ -57,4 +62,47 @@ class UserSerializer(serializers.ModelSerializer):
         le mot de passe en clair.
         On utilise ici User.objects.create_user() pour assurer le hachage automatique du mot de passe.
         """
-        return User.objects.create_user(**validated_data)
\ No newline at end of file
+        return User.objects.create_user(**validated_data)
+
+
+class SoftDeskTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Login (POST /api/token/) : ajoute aux tokens les claims de l'utilisateur
+    (username, is_staff, is_superuser, empreinte des droits).
+    Ils permettent à StatelessJWTAuthentication de se passer de la base.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class SoftDeskTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Rafraîchissement (POST /api/token/refresh/) : le nouvel access token reçoit
+    les claims ACTUELS de l'utilisateur, et non ceux copiés du refresh token.
+    Même déroulé que TokenRefreshSerializer.validate, dont l'utilisateur (déjà lu pour
+    vérifier le compte) n'est pas accessible : il est lu ici, une seule fois.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        data = {"access": str(add_user_claims(refresh.access_token, user))}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # Application blacklist non installée
+                    pass
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+        return data
@@ -0,0 +1,37 @@
+"""
+Signaux de l'application authentication.
+
+Ils renouvellent l'empreinte 'membership_version' d'un utilisateur dont le profil change
+(ou l'oublient s'il est supprimé), pour que ses tokens JWT ne soient plus acceptés sans
+relecture en base.
+Ils sont connectés au démarrage par AuthenticationConfig.ready().
+"""
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import forget_membership_version, remember_membership_version
+from .models import User, new_membership_version
+
+
+@receiver(pre_save, sender=User)
+def renew_membership_version(sender, instance, update_fields=None, **kwargs):
+    """
+    Toute sauvegarde d'un utilisateur existant génère une nouvelle empreinte.
+    (Sauf sauvegarde partielle qui n'inclut pas le champ, ex: last_login.)
+    """
+    if instance._state.adding:
+        return
+    if update_fields is not None and "membership_version" not in update_fields:
+        return
+    instance.membership_version = new_membership_version()
+
+
+@receiver(post_save, sender=User)
+def cache_membership_version(sender, instance, **kwargs):
+    remember_membership_version(instance.pk, instance.membership_version)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_membership_version(sender, instance, **kwargs):
+    forget_membership_version(instance.pk)
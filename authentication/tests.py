@@ -1,3 +1,98 @@
-from django.test import TestCase
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from projects.models import Project, Contributor
+from .authentication import SoftDeskTokenUser
+from .models import User
+
+
+# Lectures sur la base principale, dont les requêtes sont comptées (voir config/replicas.py).
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    SOFTDESK_READ_REPLICAS=[],
+)
+class StatelessJWTAuthenticationTests(APITestCase):
+    """
+    L'utilisateur est reconstruit depuis le token tant que son empreinte est à jour.
+    """
+
+    def setUp(self):
+        caches["membership"].clear()
+        self.user = User.objects.create_user(username="alice", password="pwd-alice-123")
+
+    def login(self):
+        response = self.client.post("/api/token/", {"username": "alice", "password": "pwd-alice-123"})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def get_as(self, access, url="/api/issues/"):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response, [query["sql"] for query in context.captured_queries]
+
+    def user_queries(self, queries):
+        return [sql for sql in queries if 'FROM "authentication_user"' in sql]
+
+    def test_token_carries_user_claims(self):
+        access = AccessToken(self.login()["access"])
+        self.assertEqual(access["username"], "alice")
+        self.assertFalse(access["is_superuser"])
+        self.assertEqual(access["membership_version"], self.user.membership_version)
+
+    def test_fresh_token_skips_user_lookup(self):
+        _, queries = self.get_as(self.login()["access"])
+        self.assertEqual(self.user_queries(queries), [])
+
+    def test_stale_token_reloads_user(self):
+        access = self.login()["access"]
+        project = Project.objects.create(name="SoftDesk", type="iOS", author=self.user)
+        Contributor.objects.create(user=self.user, project=project)
+        _, queries = self.get_as(access)
+        self.assertEqual(len(self.user_queries(queries)), 1)
+
+    def test_refresh_issues_current_stamp(self):
+        tokens = self.login()
+        self.user.first_name = "Alice"
+        self.user.save()
+        response = self.client.post("/api/token/refresh/", {"refresh": tokens["refresh"]})
+        access = response.data["access"]
+        self.assertEqual(AccessToken(access)["membership_version"], User.objects.get().membership_version)
+        _, queries = self.get_as(access)
+        self.assertEqual(self.user_queries(queries), [])
+
+    def test_refresh_reads_user_once(self):
+        refresh = self.login()["refresh"]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post("/api/token/refresh/", {"refresh": refresh})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.user_queries([query["sql"] for query in context.captured_queries])), 1)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post("/api/token/refresh/", {"refresh": refresh})
+        self.assertEqual(response.status_code, 401)
+
+    def test_deleted_user_token_rejected(self):
+        access = self.login()["access"]
+        self.get_as(access)
+        self.user.delete()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(self.client.get("/api/issues/").status_code, 401)
+
+    def test_token_user_can_create_resources(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login()['access']}")
+        response = self.client.post("/api/projects/", {"name": "Nouveau", "type": "iOS"})
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data["author"], "alice")
+        self.assertTrue(Contributor.objects.filter(user=self.user, project__name="Nouveau").exists())
+
+    def test_token_user_owns_profile(self):
+        access = self.login()["access"]
+        response, _ = self.get_as(access, f"/api/users/{self.user.pk}/")
+        self.assertEqual(response.data["username"], "alice")
+        self.assertIsInstance(response.wsgi_request.user, SoftDeskTokenUser)
@@ -1,11 +1,13 @@
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 
+from projects.metrics import InstrumentedViewMixin
+
 from .models import User
 from .serializers import UserSerializer
 from .permissions import IsOwnerOrSuperUser
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """
     ViewSet pour la gestion des Utilisateurs.
     Gère l'inscription (Create), l'affichage de la liste (List) et la gestion de profil (Retrieve, Update, Destroy).
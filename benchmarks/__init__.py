@@ -0,0 +1,10 @@
+"""
+Benchmarks de l'API SoftDesk.
+
+Chaque module se lance depuis la racine du dépôt, par exemple :
+
+    python -m benchmarks.jwt_auth
+
+Les mesures sont faites sur une base de test temporaire : la base de développement
+(db.sqlite3) n'est jamais modifiée.
+"""
@@ -0,0 +1,171 @@
+"""
+Benchmark : lectures concurrentes sous ASGI, ViewSets synchrones contre vues asynchrones
+(projects/async_views.py).
+
+L'application ASGI (config/asgi.py) est appelée dans le processus, sans serveur HTTP :
+N clients concurrents dans une seule boucle d'événements, comme un worker uvicorn.
+Chaque configuration tourne dans un sous-processus, les routes étant fixées au chargement
+de config/urls.py (SOFTDESK_ASYNC_READS=0 puis 1) ; la même séquence de requêtes est rejouée.
+Le cache des réponses est désactivé par défaut (--response-cache pour l'activer) :
+on mesure les vues elles-mêmes.
+
+    python -m benchmarks.asgi_load --requests 3000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from .response_cache import seed
+from .support import setup_django, test_database
+
+MODES = {"threaded": "0", "async": "1"}
+
+
+def build_plan(rng, users, requests):
+    """
+    Séquence de lectures (token, chemin, paramètres) sur les routes servies par les vues asynchrones.
+    """
+    from authentication.serializers import SoftDeskTokenObtainPairSerializer
+    from projects.models import Project
+
+    plan = []
+    tokens = {}
+    scopes = {}
+    for user in users:
+        # Token émis après les ajouts comme contributeur (empreinte d'appartenance à jour).
+        user.refresh_from_db()
+        tokens[user.pk] = str(SoftDeskTokenObtainPairSerializer.get_token(user).access_token)
+        scopes[user.pk] = list(Project.objects.for_member(user).values_list("pk", flat=True))
+    for _ in range(requests):
+        user = rng.choice(users)
+        project_id = rng.choice(scopes[user.pk])
+        path, query = rng.choice([
+            ("/api/projects/", ""),
+            (f"/api/projects/{project_id}/", ""),
+            ("/api/issues/", f"page={rng.randint(1, 3)}"),
+            ("/api/issues/", f"project={project_id}&priority=HIGH"),
+            ("/api/comments/", ""),
+        ])
+        plan.append((tokens[user.pk], path, query))
+    return plan
+
+
+async def call(application, token, path, query):
+    """
+    Une requête GET envoyée à l'application ASGI ; renvoie le statut.
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "server": ("testserver", 80), "client": ("127.0.0.1", 50000),
+        "headers": [(b"host", b"testserver"), (b"authorization", f"Bearer {token}".encode())],
+    }
+    done = asyncio.Event()
+    status = None
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Django attend une éventuelle déconnexion pendant la requête : pas avant la réponse.
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif not message.get("more_body", False):
+            done.set()
+
+    await application(scope, receive, send)
+    done.set()
+    return status
+
+
+async def replay(application, plan, concurrency):
+    queue = iter(plan)
+    latencies = []
+
+    async def client():
+        for token, path, query in queue:
+            start = time.perf_counter()
+            status = await call(application, token, path, query)
+            latencies.append(time.perf_counter() - start)
+            assert status == 200, (path, query, status)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests_per_second": round(len(plan) / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+def run_mode(requests, concurrency, users, projects, response_cache):
+    """
+    Mesure de la configuration courante (SOFTDESK_ASYNC_READS du processus).
+    """
+    from django.test import override_settings
+
+    from config.asgi import application
+
+    rng = random.Random(42)
+    people = seed(users, projects, issues_per_project=60, comments_per_issue=2)
+    plan = build_plan(rng, people, requests)
+    with override_settings(SOFTDESK_RESPONSE_CACHE_ALIAS="responses" if response_cache else None):
+        # Premier passage (connexions, caches d'appartenance) non mesuré.
+        asyncio.run(replay(application, plan[:concurrency * 2], concurrency))
+        return asyncio.run(replay(application, plan, concurrency))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000, help="Nombre de requêtes rejouées")
+    parser.add_argument("--concurrency", type=int, default=50, help="Nombre de clients concurrents")
+    parser.add_argument("--users", type=int, default=20, help="Nombre d'utilisateurs")
+    parser.add_argument("--projects", type=int, default=30, help="Nombre de projets")
+    parser.add_argument("--response-cache", action="store_true", help="Active le cache des réponses")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        setup_django()
+        with test_database():
+            result = run_mode(args.requests, args.concurrency, args.users, args.projects, args.response_cache)
+        print(json.dumps(result))
+        return
+
+    results = {
+        "requests": args.requests, "concurrency": args.concurrency,
+        "users": args.users, "projects": args.projects, "response_cache": args.response_cache,
+    }
+    for mode, flag in MODES.items():
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.asgi_load", "--mode", mode, *(argv or sys.argv[1:])],
+            env={**os.environ, "SOFTDESK_ASYNC_READS": flag},
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+    results["speedup"] = round(
+        results["async"]["requests_per_second"] / results["threaded"]["requests_per_second"], 3
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
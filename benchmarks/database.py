@@ -0,0 +1,155 @@
+"""
+Benchmark : profils de base de données (config/database.py) sous écritures concurrentes.
+
+Plusieurs threads créent chacun des issues et des commentaires puis les modifient, comme autant
+de requêtes simultanées (transactions, signaux : compteurs, index de recherche, journal...) ;
+puis la moitié des threads écrit pendant que l'autre lit la liste des issues. Mesure les
+écritures et lectures par seconde et les échecs "database is locked".
+
+Chaque profil tourne dans un sous-processus (SOFTDESK_DB_PROFILE) sur une base de test
+temporaire ; sous SQLite, c'est un fichier (le WAL n'existe pas en mémoire).
+
+    python -m benchmarks.database --profiles sqlite-legacy,sqlite --threads 8 --writes 100
+    SOFTDESK_DB_HOST=... python -m benchmarks.database --profiles sqlite,postgresql
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .support import setup_django, test_database
+
+
+def create_issue_with_comment(project, user, n):
+    """
+    Création d'une issue et de son premier commentaire, puis modification de l'issue :
+    une transaction qui lit avant d'écrire (pre_save relit l'état précédent).
+    """
+    from django.db import transaction
+
+    from projects.models import Comment, Issue
+
+    with transaction.atomic():
+        issue = Issue.objects.create(
+            title=f"Issue {n}", description="Description", tag="BUG", priority="HIGH",
+            project=project, author=user, assignee=user,
+        )
+        Comment.objects.create(description="Premier commentaire", author=user, issue=issue)
+    with transaction.atomic():
+        issue = Issue.objects.get(pk=issue.pk)
+        issue.status = "In Progress"
+        issue.save()
+
+
+def read_issue_list(project, user, n):
+    from projects.models import Issue
+
+    issues = Issue.objects.for_member(user).filter(project=project).select_related("project", "author", "assignee")
+    issues.count()
+    list(issues.order_by("-created_time")[:25])
+
+
+def run_threads(workers):
+    """
+    Lance [(fonction, itérations)] en parallèle ; renvoie par fonction (réussites, échecs, durée).
+    """
+    from django.db import OperationalError, connection
+
+    results = [None] * len(workers)
+    barrier = threading.Barrier(len(workers))
+
+    def work(index, func, iterations):
+        done = failed = 0
+        barrier.wait()
+        start = time.perf_counter()
+        for n in range(iterations):
+            try:
+                func(n)
+                done += 1
+            except OperationalError:
+                # "database is locked" : la requête aurait renvoyé une erreur 500.
+                failed += 1
+        results[index] = (func, done, failed, time.perf_counter() - start)
+        connection.close()
+
+    threads = [threading.Thread(target=work, args=(i, *worker)) for i, worker in enumerate(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed, func):
+    rows = [row for row in results if row[0] is func]
+    done = sum(row[1] for row in rows)
+    return {
+        "per_second": round(done / elapsed, 1),
+        "done": done,
+        "locked_errors": sum(row[2] for row in rows),
+    }
+
+
+def run_profile(threads, writes, reads):
+    from authentication.models import User
+    from projects.models import Project
+
+    user = User.objects.create_user(username="bench", password="bench-password-123")
+    project = Project.objects.create(name="Projet", type="back-end", author=user)
+
+    def write(n):
+        create_issue_with_comment(project, user, n)
+
+    def read(n):
+        read_issue_list(project, user, n)
+
+    results, elapsed = run_threads([(write, writes)] * threads)
+    report = {"writes_only": summarize(results, elapsed, write)}
+
+    half = max(1, threads // 2)
+    results, elapsed = run_threads([(write, writes)] * half + [(read, reads)] * half)
+    report["mixed"] = {"writes": summarize(results, elapsed, write), "reads": summarize(results, elapsed, read)}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default="sqlite-legacy,sqlite", help="Profils comparés, séparés par des virgules")
+    parser.add_argument("--threads", type=int, default=8, help="Nombre de threads concurrents")
+    parser.add_argument("--writes", type=int, default=100, help="Issues créées (avec un commentaire) puis modifiées, par thread")
+    parser.add_argument("--reads", type=int, default=200, help="Lectures de liste par thread (phase mixte)")
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        setup_django()
+        from django.db import connection
+
+        with tempfile.TemporaryDirectory() as directory:
+            if connection.vendor == "sqlite":
+                connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "bench.sqlite3")
+            with test_database():
+                report = run_profile(args.threads, args.writes, args.reads)
+        print(json.dumps(report))
+        return
+
+    results = {"threads": args.threads, "writes_per_thread": args.writes, "reads_per_thread": args.reads}
+    forwarded = ["--threads", str(args.threads), "--writes", str(args.writes), "--reads", str(args.reads)]
+    for profile in args.profiles.split(","):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.database", "--run", *forwarded],
+            env={**os.environ, "SOFTDESK_DB_PROFILE": profile},
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[profile] = json.loads(output.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
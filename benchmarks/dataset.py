@@ -0,0 +1,159 @@
+"""
+Générateur de données des benchmarks : utilisateurs, projets, contributeurs, issues et
+commentaires en volumes configurables, écrits par lots (bulk_create).
+
+Chaque lot émet le signal bulk_created, comme l'import en masse (projects/importer.py) :
+compteurs du tableau de bord, index de recherche, journal des changements et empreintes
+d'appartenance sont à jour, comme si les données avaient été créées par l'API.
+Le tirage est déterministe (graine) : deux exécutions produisent les mêmes données.
+
+    from benchmarks.dataset import Volumes, generate
+    dataset = generate(Volumes(users=50, projects=20, issues_per_project=100))
+"""
+
+import random
+from dataclasses import asdict, dataclass, field
+
+PASSWORD = "bench-password-123"
+
+WORDS = (
+    "connexion", "serveur", "formulaire", "export", "affichage", "lenteur", "erreur", "paiement",
+    "notification", "recherche", "tableau", "utilisateur", "mobile", "session", "cache", "import",
+)
+
+
+@dataclass
+class Volumes:
+    users: int = 50
+    projects: int = 20
+    # Membres par projet, auteur compris (borné par le nombre d'utilisateurs)
+    members_per_project: int = 8
+    issues_per_project: int = 100
+    comments_per_issue: int = 5
+    batch_size: int = 2000
+
+
+@dataclass
+class Dataset:
+    """
+    Identifiants des données créées, par utilisateur : de quoi écrire des requêtes valides.
+    """
+
+    volumes: Volumes
+    admin_id: int = None
+    user_ids: list = field(default_factory=list)
+    usernames: dict = field(default_factory=dict)
+    project_names: dict = field(default_factory=dict)
+    # Utilisateur -> projets dont il est membre / auteur
+    member_projects: dict = field(default_factory=dict)
+    authored_projects: dict = field(default_factory=dict)
+    # Projet -> membres
+    project_members: dict = field(default_factory=dict)
+    # Projet -> [(issue, auteur)] ; issue -> projet
+    project_issues: dict = field(default_factory=dict)
+    issue_projects: dict = field(default_factory=dict)
+    # Utilisateur -> commentaires dont il est l'auteur [(commentaire, issue)]
+    authored_comments: dict = field(default_factory=dict)
+
+    def summary(self):
+        return {
+            **asdict(self.volumes),
+            "issues": len(self.issue_projects),
+            "comments": sum(len(comments) for comments in self.authored_comments.values()),
+        }
+
+
+def sentence(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count)).capitalize()
+
+
+def save(model, instances, batch_size):
+    """
+    Écrit un lot et émet bulk_created (données dérivées à jour) ; renvoie les instances créées.
+    """
+    from django.db import transaction
+
+    from projects.signals import bulk_created
+
+    created = []
+    with transaction.atomic():
+        for start in range(0, len(instances), batch_size):
+            batch = model.objects.bulk_create(instances[start:start + batch_size])
+            bulk_created.send(sender=model, instances=batch)
+            created.extend(batch)
+    return created
+
+
+def generate(volumes, seed=42):
+    """
+    Crée les données (dans la base courante) et renvoie leur Dataset.
+    """
+    from django.contrib.auth.hashers import make_password
+
+    from authentication.models import User
+    from projects.models import Comment, Contributor, Issue, Project
+
+    rng = random.Random(seed)
+    dataset = Dataset(volumes=volumes)
+    # Un seul hachage (volontairement lent) pour tous les comptes.
+    password = make_password(PASSWORD)
+
+    users = User.objects.bulk_create(
+        [User(username=f"user{index}", password=password, email=f"user{index}@example.com",
+              can_be_contacted=index % 2 == 0, can_data_be_shared=index % 3 == 0)
+         for index in range(volumes.users)],
+        batch_size=volumes.batch_size,
+    )
+    admin = User.objects.create_user(username="bench-admin", password=PASSWORD, is_staff=True, is_superuser=True)
+    dataset.admin_id = admin.pk
+    dataset.user_ids = [user.pk for user in users]
+    dataset.usernames = {user.pk: user.username for user in [*users, admin]}
+
+    projects = save(Project, [
+        Project(name=f"Projet {index}", description=sentence(rng, 8),
+                type=rng.choice(["back-end", "front-end", "iOS", "Android"]),
+                author_id=dataset.user_ids[index % volumes.users])
+        for index in range(volumes.projects)
+    ], volumes.batch_size)
+
+    dataset.project_names = {project.pk: project.name for project in projects}
+    contributors = []
+    for project in projects:
+        others = [user_id for user_id in dataset.user_ids if user_id != project.author_id]
+        members = [project.author_id, *rng.sample(others, min(len(others), volumes.members_per_project - 1))]
+        dataset.project_members[project.pk] = members
+        dataset.authored_projects.setdefault(project.author_id, []).append(project.pk)
+        for user_id in members:
+            dataset.member_projects.setdefault(user_id, []).append(project.pk)
+            contributors.append(Contributor(user_id=user_id, project_id=project.pk))
+    save(Contributor, contributors, volumes.batch_size)
+
+    issues = save(Issue, [
+        Issue(title=sentence(rng, 4), description=sentence(rng, 12),
+              tag=rng.choice(["BUG", "FEATURE", "TASK"]), priority=rng.choice(["LOW", "MEDIUM", "HIGH"]),
+              status=rng.choice(["To Do", "In Progress", "Finished"]), project_id=project.pk,
+              author_id=rng.choice(dataset.project_members[project.pk]),
+              assignee_id=rng.choice(dataset.project_members[project.pk]))
+        for project in projects for _ in range(volumes.issues_per_project)
+    ], volumes.batch_size)
+    for issue in issues:
+        dataset.project_issues.setdefault(issue.project_id, []).append((issue.pk, issue.author_id))
+        dataset.issue_projects[issue.pk] = issue.project_id
+
+    # Commentaires écrits issue par issue, par lots : la mémoire dépend de batch_size.
+    pending = []
+
+    def flush():
+        for comment in save(Comment, pending, volumes.batch_size):
+            dataset.authored_comments.setdefault(comment.author_id, []).append((comment.pk, comment.issue_id))
+        pending.clear()
+
+    for issue in issues:
+        members = dataset.project_members[issue.project_id]
+        for _ in range(volumes.comments_per_issue):
+            pending.append(Comment(description=sentence(rng, 10), issue_id=issue.pk, project_id=issue.project_id,
+                                   author_id=rng.choice(members)))
+        if len(pending) >= volumes.batch_size:
+            flush()
+    flush()
+    return dataset
@@ -0,0 +1,111 @@
+"""
+Benchmark : connexions inactives au flux d'événements d'un projet (projects/events.py).
+
+Ouvre N connexions SSE sur l'application ASGI (config/asgi.py, appelée dans le processus),
+attend qu'elles soient toutes abonnées, puis crée une issue : mesure le temps de diffusion
+à toutes les connexions, la mémoire par connexion et le nombre de threads du processus.
+
+    python -m benchmarks.event_stream --connections 5000
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import threading
+import time
+
+from .support import setup_django, test_database
+
+
+async def open_stream(application, path, token, received, closing):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "server": ("testserver", 80), "client": ("127.0.0.1", 50000),
+        "headers": [(b"host", b"testserver"), (b"authorization", f"Bearer {token}".encode())],
+    }
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await closing.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and b"issue.created" in message.get("body", b""):
+            received.append(time.perf_counter())
+
+    await application(scope, receive, send)
+
+
+async def measure(application, broker, project, token, connections):
+    from asgiref.sync import sync_to_async
+
+    from projects.models import Issue
+
+    received = []
+    closing = asyncio.Event()
+    path = f"/api/projects/{project.pk}/events/"
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    tasks = [
+        asyncio.create_task(open_stream(application, path, token, received, closing))
+        for _ in range(connections)
+    ]
+    while broker.subscriber_count(project.pk) < connections:
+        await asyncio.sleep(0.01)
+    opened = time.perf_counter() - start
+    threads = threading.active_count()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    published = time.perf_counter()
+    await sync_to_async(Issue.objects.create)(
+        title="Nouvelle issue", description="", tag="BUG", priority="LOW",
+        project=project, author=project.author, assignee=project.author,
+    )
+    while len(received) < connections:
+        await asyncio.sleep(0.001)
+    fan_out = [moment - published for moment in received]
+
+    closing.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "connections": connections,
+        "open_seconds": round(opened, 2),
+        "threads": threads,
+        # ru_maxrss est en kilo-octets sous Linux.
+        "kb_per_connection": round((rss_after - rss_before) / connections, 1),
+        "fan_out_first_ms": round(min(fan_out) * 1000, 2),
+        "fan_out_last_ms": round(max(fan_out) * 1000, 2),
+        "subscribers_after_close": broker.subscriber_count(project.pk),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=2000, help="Nombre de connexions ouvertes")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        from authentication.models import User
+        from authentication.serializers import SoftDeskTokenObtainPairSerializer
+        from config.asgi import application
+        from projects import events
+        from projects.models import Project
+
+        user = User.objects.create_user(username="bench", password="bench-password-123")
+        project = Project.objects.create(name="Projet", type="back-end", author=user)
+        user.refresh_from_db()
+        token = str(SoftDeskTokenObtainPairSerializer.get_token(user).access_token)
+        result = asyncio.run(measure(application, events.get_broker(), project, token, args.connections))
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark : requêtes/seconde sur GET /api/issues/ selon la classe d'authentification JWT.
+
+- avant : rest_framework_simplejwt JWTAuthentication (lecture du User à chaque appel)
+- après : StatelessJWTAuthentication (utilisateur reconstruit depuis le token)
+
+Cache des réponses désactivé : chaque appel refait le travail de la vue, et le nombre de
+requêtes SQL mesure bien l'authentification.
+
+    python -m benchmarks.jwt_auth --requests 2000
+"""
+
+import argparse
+import json
+
+from .support import setup_django, test_database, measure_throughput
+
+
+def run(requests, issues):
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from authentication.authentication import StatelessJWTAuthentication
+    from authentication.models import User
+    from authentication.serializers import SoftDeskTokenObtainPairSerializer
+    from projects.models import Project, Contributor, Issue
+    from projects.views import IssueViewSet
+
+    user = User.objects.create_user(username="bench", password="bench-password-123")
+    project = Project.objects.create(name="Bench", type="back-end", author=user)
+    Contributor.objects.create(user=user, project=project)
+    Issue.objects.bulk_create(
+        Issue(title=f"Issue {i}", description="...", tag="BUG", priority="LOW",
+              project=project, author=user, assignee=user)
+        for i in range(issues)
+    )
+    # Comme lors d'un vrai login, le token est émis à partir de l'état courant de l'utilisateur
+    # (l'ajout comme contributeur a renouvelé son empreinte).
+    user.refresh_from_db()
+    access = SoftDeskTokenObtainPairSerializer.get_token(user).access_token
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def call():
+        response = client.get("/api/issues/")
+        assert response.status_code == 200, response.status_code
+
+    results = {}
+    original = IssueViewSet.authentication_classes
+    try:
+        with override_settings(SOFTDESK_RESPONSE_CACHE_ALIAS=None):
+            for label, authentication_class in (
+                ("before", JWTAuthentication),
+                ("after", StatelessJWTAuthentication),
+            ):
+                IssueViewSet.authentication_classes = [authentication_class]
+                call()  # échauffement (caches)
+                with CaptureQueriesContext(connection) as context:
+                    call()
+                # Lu immédiatement : le journal des requêtes est vidé à chaque nouvelle requête HTTP.
+                queries = len(context.captured_queries)
+                results[label] = {
+                    "authentication": f"{authentication_class.__module__}.{authentication_class.__name__}",
+                    "requests_per_second": round(measure_throughput(call, requests), 1),
+                    "queries_per_request": queries,
+                }
+    finally:
+        IssueViewSet.authentication_classes = original
+
+    results["speedup"] = round(
+        results["after"]["requests_per_second"] / results["before"]["requests_per_second"], 3
+    )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Nombre de requêtes par mesure")
+    parser.add_argument("--issues", type=int, default=10, help="Nombre d'issues en base")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(args.requests, args.issues), indent=2))
+
+
+if __name__ == "__main__":
+    main()
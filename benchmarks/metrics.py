@@ -0,0 +1,77 @@
+"""
+Benchmark : coût des mesures par point d'entrée (projects/metrics.py).
+
+Rejoue la même séquence de lectures (celle de benchmarks/response_cache.py, cache des réponses
+désactivé pour que chaque requête aille en base et sérialise) avec et sans MetricsMiddleware,
+en alternant les passes pour lisser le bruit. Affiche aussi le résumé des mesures collectées.
+
+    python -m benchmarks.metrics --requests 3000 --rounds 3
+"""
+
+import argparse
+import json
+import random
+
+from .response_cache import build_plan, replay, seed
+from .support import setup_django, test_database
+
+
+def clients_for(people, authorization):
+    from rest_framework.test import APIClient
+
+    clients = {}
+    for user in people:
+        # Un client neuf charge la chaîne de middlewares avec les réglages courants.
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=authorization[user.pk])
+        clients[user.pk] = client
+    return clients
+
+
+def run(requests, rounds, users, projects):
+    from django.test import override_settings
+
+    from authentication.serializers import SoftDeskTokenObtainPairSerializer
+    from projects import metrics
+
+    people = seed(users, projects, issues_per_project=60, comments_per_issue=5)
+    authorization = {}
+    for user in people:
+        user.refresh_from_db()
+        authorization[user.pk] = f"Bearer {SoftDeskTokenObtainPairSerializer.get_token(user).access_token}"
+    plan = build_plan(random.Random(42), people, requests, write_ratio=0)
+
+    best = {}
+    with override_settings(SOFTDESK_RESPONSE_CACHE_ALIAS=None):
+        for _ in range(rounds):
+            for label, enabled in (("without_metrics", False), ("with_metrics", True)):
+                metrics.reset()
+                with override_settings(SOFTDESK_METRICS=enabled):
+                    throughput = replay(plan, clients_for(people, authorization))
+                best[label] = max(best.get(label, 0), throughput)
+
+    results = {"requests": requests, "rounds": rounds, "users": users, "projects": projects}
+    for label, throughput in best.items():
+        results[label] = {"requests_per_second": round(throughput, 1), "ms_per_request": round(1000 / throughput, 3)}
+    results["overhead_ms_per_request"] = round(
+        results["with_metrics"]["ms_per_request"] - results["without_metrics"]["ms_per_request"], 3
+    )
+    results["summary"] = metrics.summary()["endpoints"]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000, help="Nombre de requêtes rejouées par passe")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes par configuration (la meilleure est retenue)")
+    parser.add_argument("--users", type=int, default=20, help="Nombre d'utilisateurs")
+    parser.add_argument("--projects", type=int, default=30, help="Nombre de projets")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(args.requests, args.rounds, args.users, args.projects), indent=2))
+
+
+if __name__ == "__main__":
+    main()
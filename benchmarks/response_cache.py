@@ -0,0 +1,143 @@
+"""
+Benchmark : débit en lecture avec et sans le cache des réponses (projects/response_cache.py).
+
+Mélange réaliste, majoritairement en lecture : plusieurs utilisateurs parcourent les issues
+de leurs projets (liste paginée, filtres, détail, commentaires d'une issue), et une petite
+part des requêtes écrit (modification d'une issue, nouveau commentaire), ce qui périme
+une partie du cache. La même séquence de requêtes est rejouée dans les deux configurations.
+
+    python -m benchmarks.response_cache --requests 5000 --write-ratio 0.05
+"""
+
+import argparse
+import json
+import random
+import time
+
+from .support import setup_django, test_database
+
+
+def seed(users, projects, issues_per_project, comments_per_issue):
+    from authentication.models import User
+    from projects.models import Project, Contributor, Issue, Comment
+
+    people = [
+        User.objects.create_user(username=f"user{i}", password="bench-password-123") for i in range(users)
+    ]
+    created = []
+    for i in range(projects):
+        author = people[i % users]
+        project = Project.objects.create(name=f"Projet {i}", type="back-end", author=author)
+        Contributor.objects.create(user=author, project=project)
+        # Chaque projet réunit une poignée d'utilisateurs.
+        for member in people:
+            if member is not author and (member.pk + i) % 3 == 0:
+                Contributor.objects.create(user=member, project=project)
+        created.append(project)
+
+    issues = Issue.objects.bulk_create(
+        Issue(title=f"Issue {i}", description="Description", tag="BUG", priority=("LOW", "MEDIUM", "HIGH")[i % 3],
+              project=project, author=project.author, assignee=project.author)
+        for project in created for i in range(issues_per_project)
+    )
+    Comment.objects.bulk_create(
+        Comment(description=f"Commentaire {i}", author=issue.author, issue=issue, project_id=issue.project_id)
+        for issue in issues for i in range(comments_per_issue)
+    )
+    return people
+
+
+def build_plan(rng, users, requests, write_ratio):
+    """
+    Séquence de requêtes (utilisateur, méthode, URL, données), identique pour chaque configuration.
+    """
+    from projects.models import Issue
+
+    plan = []
+    scopes = {
+        user.pk: list(Issue.objects.for_member(user).values_list("pk", "project_id")[:200])
+        for user in users
+    }
+    for _ in range(requests):
+        user = rng.choice(users)
+        # Popularité inégale (loi de Zipf approchée) : quelques issues concentrent les lectures.
+        scope = scopes[user.pk]
+        issue_id, project_id = scope[min(int(rng.paretovariate(1.2)) - 1, len(scope) - 1)]
+        if rng.random() < write_ratio:
+            if rng.random() < 0.5:
+                plan.append((user, "post", "/api/comments/", {"description": "Vu", "issue": issue_id}))
+            else:
+                plan.append((user, "patch", f"/api/issues/{issue_id}/",
+                             {"status": rng.choice(["To Do", "In Progress", "Finished"])}))
+            continue
+        plan.append((user, "get", rng.choice([
+            f"/api/issues/?page={rng.randint(1, 3)}",
+            f"/api/issues/?project={project_id}&priority=HIGH",
+            f"/api/issues/{issue_id}/",
+            f"/api/projects/{project_id}/",
+            f"/api/projects/{project_id}/issues/{issue_id}/comments/",
+            "/api/projects/",
+        ]), None))
+    return plan
+
+
+def replay(plan, clients):
+    start = time.perf_counter()
+    for user, method, url, data in plan:
+        response = getattr(clients[user.pk], method)(url, data, format="json")
+        # Les écritures refusées (issue d'un autre auteur) font partie du mélange.
+        assert response.status_code < 500, (url, response.status_code)
+    elapsed = time.perf_counter() - start
+    return len(plan) / elapsed if elapsed else float("inf")
+
+
+def run(requests, write_ratio, users, projects):
+    from django.core.cache import caches
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+
+    from authentication.serializers import SoftDeskTokenObtainPairSerializer
+    from projects import response_cache
+
+    rng = random.Random(42)
+    people = seed(users, projects, issues_per_project=60, comments_per_issue=5)
+    clients = {}
+    for user in people:
+        # Token émis après les ajouts comme contributeur (empreinte d'appartenance à jour).
+        user.refresh_from_db()
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {SoftDeskTokenObtainPairSerializer.get_token(user).access_token}"
+        )
+        clients[user.pk] = client
+    plan = build_plan(rng, people, requests, write_ratio)
+
+    results = {"requests": requests, "write_ratio": write_ratio, "users": users, "projects": projects}
+    for label, alias in (("without_cache", None), ("with_cache", "responses")):
+        with override_settings(SOFTDESK_RESPONSE_CACHE_ALIAS=alias):
+            caches["responses"].clear()
+            response_cache.reset_stats()
+            results[label] = {"requests_per_second": round(replay(plan, clients), 1)}
+            if alias:
+                results[label].update(response_cache.get_stats())
+    results["speedup"] = round(
+        results["with_cache"]["requests_per_second"] / results["without_cache"]["requests_per_second"], 3
+    )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000, help="Nombre de requêtes rejouées")
+    parser.add_argument("--write-ratio", type=float, default=0.05, help="Part des requêtes en écriture")
+    parser.add_argument("--users", type=int, default=20, help="Nombre d'utilisateurs")
+    parser.add_argument("--projects", type=int, default=30, help="Nombre de projets")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(args.requests, args.write_ratio, args.users, args.projects), indent=2))
+
+
+if __name__ == "__main__":
+    main()
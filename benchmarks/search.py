@@ -0,0 +1,110 @@
+"""
+Benchmark : latence de la recherche plein texte (index FTS5) selon le volume de commentaires.
+
+Les commentaires sont générés à partir d'un vocabulaire de mots de fréquences variées :
+on mesure un terme rare, un terme courant, une recherche par préfixe et deux termes combinés,
+pour un utilisateur membre de quelques projets parmi beaucoup.
+
+    python -m benchmarks.search --comments 1000000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from .support import setup_django, test_database
+
+VOCABULARY = [f"mot{i}" for i in range(5000)]
+QUERIES = {
+    "terme_rare": ["mot4999"],
+    "terme_courant": ["mot1"],
+    "prefixe": ["mot12*"],
+    "deux_termes": ["mot1", "mot2"],
+}
+
+
+def random_text(rng, words=20):
+    # Loi de Zipf approchée : les premiers mots du vocabulaire sont les plus fréquents.
+    return " ".join(VOCABULARY[min(int(rng.paretovariate(1.0)) - 1, len(VOCABULARY) - 1)] for _ in range(words))
+
+
+def seed(comments, projects, issues_per_project, rng):
+    from authentication.models import User
+    from projects.models import Project, Contributor, Issue, Comment
+
+    user = User.objects.create_user(username="bench", password="bench-password-123")
+    other = User.objects.create_user(username="other", password="other-password-123")
+    created = Project.objects.bulk_create(
+        Project(name=f"Projet {i}", type="back-end", author=other) for i in range(projects)
+    )
+    # L'utilisateur mesuré n'est membre que de quelques projets.
+    Contributor.objects.bulk_create(Contributor(user=user, project=project) for project in created[:5])
+
+    issues = Issue.objects.bulk_create(
+        (
+            Issue(title=random_text(rng, 6), description=random_text(rng), tag="BUG", priority="LOW",
+                  project=project, author=other)
+            for project in created for _ in range(issues_per_project)
+        ),
+        batch_size=2000,
+    )
+    batch = []
+    for i in range(comments):
+        issue = issues[i % len(issues)]
+        batch.append(Comment(description=random_text(rng), author=other, issue=issue, project_id=issue.project_id))
+        if len(batch) == 5000:
+            Comment.objects.bulk_create(batch)
+            batch = []
+    Comment.objects.bulk_create(batch)
+    return user
+
+
+def run(comments, projects, iterations):
+    from projects.models import Project
+    from projects.search import get_backend
+
+    rng = random.Random(42)
+    start = time.perf_counter()
+    user = seed(comments, projects, 20, rng)
+    backend = get_backend()
+    backend.rebuild()
+    results = {
+        "backend": type(backend).__name__,
+        "comments": comments,
+        "projects": projects,
+        "seed_and_index_seconds": round(time.perf_counter() - start, 1),
+        "queries": {},
+    }
+
+    project_ids = list(Project.objects.for_member(user).values_list("pk", flat=True))
+    for label, terms in QUERIES.items():
+        timings = []
+        for _ in range(iterations):
+            began = time.perf_counter()
+            hits = backend.search(terms, project_ids, limit=11)
+            timings.append((time.perf_counter() - began) * 1000)
+        timings.sort()
+        results["queries"][label] = {
+            "results": len(hits),
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comments", type=int, default=100000, help="Nombre de commentaires en base")
+    parser.add_argument("--projects", type=int, default=200, help="Nombre de projets")
+    parser.add_argument("--iterations", type=int, default=50, help="Mesures par requête")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(args.comments, args.projects, args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark : débit de sérialisation (lignes/s) des sérialiseurs DRF et de leurs versions
+précompilées (projects/compiled.py), rendu JSON compris (JSONRenderer / FastJSONRenderer).
+
+Pour chaque sérialiseur, les mêmes lignes sont lues puis rendues :
+- drf : instances de modèle (select_related), Serializer(many=True).data, JSONRenderer ;
+- compiled : lignes de values_list(), CompiledSerializer, FastJSONRenderer.
+Chaque phase (lecture, sérialisation, rendu) est chronométrée séparément ; la meilleure de
+--rounds passes est retenue. Les octets produits sont comparés (identiques attendus).
+ProjectRetrieveSerializer est mesuré objet par objet, comme un détail.
+
+    python -m benchmarks.serialization --rows 2000 --rounds 5
+"""
+
+import argparse
+import json
+import time
+
+from .support import setup_django, test_database
+
+
+class CompiledView:
+    """
+    Vue minimale vue par FastJSONRenderer (données précompilées).
+    """
+
+    compiled_payload = True
+
+
+def timed(func, rounds):
+    """
+    Renvoie (résultat, meilleure durée) de `rounds` appels.
+    """
+    best, result = None, None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def cases():
+    from projects.models import Comment, Contributor, Issue, Project
+    from projects.serializers import (
+        CommentSerializer, ContributorSerializer, IssueSerializer, ProjectListSerializer, ProjectRetrieveSerializer,
+    )
+
+    # (sérialiseur, jointures des instances DRF, objet par objet) ; le précompilé lit values_list().
+    return [
+        (ProjectListSerializer, Project, (), False),
+        (ProjectRetrieveSerializer, Project, ("author",), True),
+        (ContributorSerializer, Contributor, ("user", "project"), False),
+        (IssueSerializer, Issue, ("project", "author", "assignee"), False),
+        (CommentSerializer, Comment, ("author",), False),
+    ]
+
+
+def measure(serializer_class, model, related, per_object, rows, rounds):
+    from rest_framework.renderers import JSONRenderer
+
+    from projects.compiled import get_compiled
+    from projects.renderers import FastJSONRenderer
+
+    context = {"request": None}
+    compiled = get_compiled(serializer_class, context)
+    drf_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    queryset = model.objects.order_by("pk")
+
+    instances, fetch_drf = timed(lambda: list(queryset.select_related(*related)[:rows]), rounds)
+    if per_object:
+        data, serialize_drf = timed(
+            lambda: [serializer_class(instance, context=context).data for instance in instances], rounds
+        )
+        fetch_compiled = fetch_drf
+        compiled_data, serialize_compiled = timed(
+            lambda: [compiled.serialize_instance(instance, context) for instance in instances], rounds
+        )
+    else:
+        data, serialize_drf = timed(lambda: serializer_class(instances, many=True, context=context).data, rounds)
+        compiled_rows, fetch_compiled = timed(lambda: list(compiled.values(queryset)[:rows]), rounds)
+        compiled_data, serialize_compiled = timed(lambda: compiled.serialize_rows(compiled_rows, context), rounds)
+
+    content, render_drf = timed(lambda: drf_renderer.render(data), rounds)
+    compiled_content, render_compiled = timed(
+        lambda: fast_renderer.render(compiled_data, renderer_context={"view": CompiledView()}), rounds
+    )
+
+    count = len(instances)
+
+    def phases(fetch, serialize, render):
+        total = fetch + serialize + render
+        return {
+            "fetch_ms": round(fetch * 1000, 2),
+            "serialize_ms": round(serialize * 1000, 2),
+            "render_ms": round(render * 1000, 2),
+            "serialize_rows_per_second": round(count / serialize),
+            "rows_per_second": round(count / total),
+        }
+
+    drf = phases(fetch_drf, serialize_drf, render_drf)
+    fast = phases(fetch_compiled, serialize_compiled, render_compiled)
+    return {
+        "serializer": serializer_class.__name__,
+        "rows": count,
+        "identical_output": content == compiled_content,
+        "drf": drf,
+        "compiled": fast,
+        "serialize_speedup": round(fast["serialize_rows_per_second"] / drf["serialize_rows_per_second"], 2),
+        "speedup": round(fast["rows_per_second"] / drf["rows_per_second"], 2),
+    }
+
+
+def run(rows, rounds):
+    from benchmarks.dataset import Volumes, generate
+
+    # `rows` lignes (au moins) de chaque type.
+    generate(Volumes(users=max(50, rows // 10), projects=rows, members_per_project=2,
+                     issues_per_project=1, comments_per_issue=1))
+    return [measure(*case, rows=rows, rounds=rounds) for case in cases()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="Lignes sérialisées par mesure")
+    parser.add_argument("--rounds", type=int, default=5, help="Passes par mesure (la meilleure est retenue)")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(args.rows, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,660 @@
+"""
+Benchmark de l'API complète : un mélange réaliste de requêtes sur toutes les routes de
+config/urls.py (lectures, écritures, opérations en masse, recherche, synchronisation, export,
+tokens), rejoué sur des données générées (benchmarks/dataset.py).
+
+Cibles, chacune dans un sous-processus sur une base de test neuve (même séquence de requêtes) :
+- inprocess : gestionnaire WSGI de Django appelé dans le processus (client de test), un client
+  à la fois : le coût propre de chaque requête, sans réseau ;
+- wsgi : serveur WSGI local à threads (celui de runserver), --concurrency clients HTTP ;
+- asgi : serveur uvicorn local (paquet facultatif), lectures asynchrones activées.
+
+Résultat JSON par cible : débit, latences p50/p95/p99 (globales et par scénario), requêtes SQL
+par requête et par point d'entrée (relevées par projects/metrics.py), erreurs. Deux résultats se
+comparent avec des seuils de régression ; le code de sortie vaut 1 en cas de régression.
+
+    python -m benchmarks.suite --targets inprocess,wsgi --output main.json
+    python -m benchmarks.suite --baseline main.json --output branche.json
+    python -m benchmarks.suite --compare main.json branche.json --max-latency-increase 0.2
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .dataset import PASSWORD, WORDS, Volumes, generate
+from .support import setup_django, test_database
+
+TARGETS = ("inprocess", "wsgi", "asgi")
+HOST = "testserver"
+
+# Scénarios et poids relatifs : une majorité de lectures, quelques écritures.
+MIX = (
+    ("api_root", 1),
+    ("projects_list", 8),
+    ("projects_retrieve", 5),
+    ("projects_stats", 2),
+    ("projects_export", 1),
+    ("projects_create", 1),
+    ("projects_update", 1),
+    ("contributors_list", 2),
+    ("contributors_create", 1),
+    ("project_contributors_list", 2),
+    ("issues_list", 10),
+    ("issues_filter", 6),
+    ("issues_retrieve", 8),
+    ("issues_create", 2),
+    ("issues_update", 2),
+    ("issues_bulk_update", 1),
+    ("project_issues_list", 5),
+    ("project_issues_retrieve", 3),
+    ("comments_list", 4),
+    ("comments_retrieve", 4),
+    ("comments_create", 3),
+    ("comments_update", 1),
+    ("comments_destroy", 1),
+    ("comments_bulk_create", 1),
+    ("issue_comments_list", 8),
+    ("search", 3),
+    ("changes", 3),
+    ("users_retrieve", 2),
+    ("users_update", 1),
+    ("users_list", 1),
+    ("token_obtain", 1),
+    ("token_refresh", 1),
+)
+
+
+class RequestMix:
+    """
+    Construit une séquence de requêtes valides à partir d'un Dataset ; chaque entrée est
+    {"scenario", "method", "path", "body", "user"} (user : pseudo, None pour une requête anonyme).
+    """
+
+    def __init__(self, dataset, rng, refresh_tokens):
+        self.dataset = dataset
+        self.rng = rng
+        self.refresh_tokens = refresh_tokens
+        self.counter = 0
+        self.users = [user_id for user_id in dataset.user_ids if dataset.member_projects.get(user_id)]
+        self.authored_issues = {}
+        for project_issues in dataset.project_issues.values():
+            for issue_id, author_id in project_issues:
+                self.authored_issues.setdefault(author_id, []).append(issue_id)
+        # Un commentaire sur dix est réservé aux suppressions (jamais relu ni modifié ensuite).
+        self.kept_comments, self.disposable_comments = {}, {}
+        self.project_comments = {}
+        for author_id, comments in dataset.authored_comments.items():
+            for index, (comment_id, issue_id) in enumerate(comments):
+                pool = self.disposable_comments if index % 10 == 9 else self.kept_comments
+                pool.setdefault(author_id, []).append(comment_id)
+                if index % 10 != 9:
+                    self.project_comments.setdefault(dataset.issue_projects[issue_id], []).append(
+                        (comment_id, issue_id)
+                    )
+        # Ajouts de contributeurs possibles, chacun tiré une seule fois
+        self.candidates = {
+            project_id: [user_id for user_id in dataset.user_ids if user_id not in set(members)]
+            for project_id, members in dataset.project_members.items()
+        }
+
+    def build(self, requests):
+        names = [name for name, _ in MIX]
+        weights = [weight for _, weight in MIX]
+        plan = []
+        while len(plan) < requests:
+            name = self.rng.choices(names, weights)[0]
+            user_id = self.rng.choice(self.users)
+            request = getattr(self, name)(user_id)
+            if request is None:
+                # Scénario impossible pour cet utilisateur (aucune issue écrite...) : nouveau tirage.
+                continue
+            method, path, body, *rest = request
+            user = rest[0] if rest else self.dataset.usernames[user_id]
+            plan.append({"scenario": name, "method": method, "path": path, "body": body, "user": user})
+        return plan
+
+    # -- Tirages --
+
+    def project(self, user_id):
+        return self.rng.choice(self.dataset.member_projects[user_id])
+
+    def issue(self, user_id):
+        issue_id, _ = self.rng.choice(self.dataset.project_issues[self.project(user_id)])
+        return issue_id
+
+    def unique(self):
+        self.counter += 1
+        return self.counter
+
+    # -- Scénarios : (méthode, chemin, corps[, utilisateur]) ou None --
+
+    def api_root(self, user_id):
+        return "GET", "/api/", None
+
+    def projects_list(self, user_id):
+        return "GET", "/api/projects/", None
+
+    def projects_retrieve(self, user_id):
+        return "GET", f"/api/projects/{self.project(user_id)}/", None
+
+    def projects_stats(self, user_id):
+        return "GET", f"/api/projects/{self.project(user_id)}/stats/", None
+
+    def projects_export(self, user_id):
+        return "GET", f"/api/projects/{self.project(user_id)}/export/", None
+
+    def projects_create(self, user_id):
+        body = {"name": f"Projet bench {self.unique()}", "description": "Nouveau projet", "type": "back-end"}
+        return "POST", "/api/projects/", body
+
+    def projects_update(self, user_id):
+        projects = self.dataset.authored_projects.get(user_id)
+        if not projects:
+            return None
+        body = {"description": f"Description {self.unique()}"}
+        return "PATCH", f"/api/projects/{self.rng.choice(projects)}/", body
+
+    def contributors_list(self, user_id):
+        return "GET", "/api/contributors/", None
+
+    def contributors_create(self, user_id):
+        projects = [project_id for project_id in self.dataset.authored_projects.get(user_id, ())
+                    if self.candidates[project_id]]
+        if not projects:
+            return None
+        project_id = self.rng.choice(projects)
+        candidate = self.candidates[project_id].pop(self.rng.randrange(len(self.candidates[project_id])))
+        body = {"user": self.dataset.usernames[candidate], "project": self.dataset.project_names[project_id]}
+        return "POST", "/api/contributors/", body
+
+    def project_contributors_list(self, user_id):
+        return "GET", f"/api/projects/{self.project(user_id)}/contributors/", None
+
+    def issues_list(self, user_id):
+        return "GET", f"/api/issues/?page={self.rng.randint(1, 3)}", None
+
+    def issues_filter(self, user_id):
+        priority = self.rng.choice(["LOW", "MEDIUM", "HIGH"])
+        return "GET", f"/api/issues/?project={self.project(user_id)}&priority={priority}", None
+
+    def issues_retrieve(self, user_id):
+        return "GET", f"/api/issues/{self.issue(user_id)}/", None
+
+    def issues_create(self, user_id):
+        project_id = self.project(user_id)
+        body = {
+            "title": f"Issue {self.unique()}", "description": "Nouvelle issue", "tag": "BUG", "priority": "HIGH",
+            "project": self.dataset.project_names[project_id],
+            "assignee": self.dataset.usernames[self.rng.choice(self.dataset.project_members[project_id])],
+        }
+        return "POST", "/api/issues/", body
+
+    def issues_update(self, user_id):
+        issues = self.authored_issues.get(user_id)
+        if not issues:
+            return None
+        body = {"status": self.rng.choice(["To Do", "In Progress", "Finished"])}
+        return "PATCH", f"/api/issues/{self.rng.choice(issues)}/", body
+
+    def issues_bulk_update(self, user_id):
+        issues = self.authored_issues.get(user_id)
+        if not issues:
+            return None
+        priority = self.rng.choice(["LOW", "MEDIUM", "HIGH"])
+        body = [{"id": issue_id, "priority": priority} for issue_id in self.rng.sample(issues, min(5, len(issues)))]
+        return "PATCH", "/api/issues/bulk/", body
+
+    def project_issues_list(self, user_id):
+        return "GET", f"/api/projects/{self.project(user_id)}/issues/", None
+
+    def project_issues_retrieve(self, user_id):
+        issue_id = self.issue(user_id)
+        return "GET", f"/api/projects/{self.dataset.issue_projects[issue_id]}/issues/{issue_id}/", None
+
+    def comments_list(self, user_id):
+        return "GET", "/api/comments/", None
+
+    def comments_retrieve(self, user_id):
+        comments = self.project_comments.get(self.project(user_id))
+        if not comments:
+            return None
+        comment_id, _ = self.rng.choice(comments)
+        return "GET", f"/api/comments/{comment_id}/", None
+
+    def comments_create(self, user_id):
+        body = {"description": f"Commentaire {self.unique()}", "issue": self.issue(user_id)}
+        return "POST", "/api/comments/", body
+
+    def comments_update(self, user_id):
+        comments = self.kept_comments.get(user_id)
+        if not comments:
+            return None
+        return "PATCH", f"/api/comments/{self.rng.choice(comments)}/", {"description": f"Modifié {self.unique()}"}
+
+    def comments_destroy(self, user_id):
+        comments = self.disposable_comments.get(user_id)
+        if not comments:
+            return None
+        return "DELETE", f"/api/comments/{comments.pop()}/", None
+
+    def comments_bulk_create(self, user_id):
+        body = [{"description": f"Commentaire {self.unique()}", "issue": self.issue(user_id)} for _ in range(5)]
+        return "POST", "/api/comments/bulk/", body
+
+    def issue_comments_list(self, user_id):
+        issue_id = self.issue(user_id)
+        return "GET", f"/api/projects/{self.dataset.issue_projects[issue_id]}/issues/{issue_id}/comments/", None
+
+    def search(self, user_id):
+        return "GET", f"/api/search/?q={self.rng.choice(WORDS)}", None
+
+    def changes(self, user_id):
+        return "GET", "/api/changes/?since=0&limit=100", None
+
+    def users_retrieve(self, user_id):
+        return "GET", f"/api/users/{user_id}/", None
+
+    def users_update(self, user_id):
+        return "PATCH", f"/api/users/{user_id}/", {"first_name": f"Prénom {self.unique()}"}
+
+    def users_list(self, user_id):
+        return "GET", "/api/users/", None, self.dataset.usernames[self.dataset.admin_id]
+
+    def token_obtain(self, user_id):
+        return "POST", "/api/token/", {"username": self.dataset.usernames[user_id], "password": PASSWORD}, None
+
+    def token_refresh(self, user_id):
+        return "POST", "/api/token/refresh/", {"refresh": self.refresh_tokens[self.dataset.usernames[user_id]]}, None
+
+
+def mint_tokens(dataset):
+    """
+    Tokens d'accès et de rafraîchissement de chaque utilisateur, émis après la génération
+    des données (empreintes d'appartenance à jour).
+    """
+    from authentication.models import User
+    from authentication.serializers import SoftDeskTokenObtainPairSerializer
+
+    access, refresh = {}, {}
+    for user in User.objects.filter(pk__in=dataset.usernames):
+        token = SoftDeskTokenObtainPairSerializer.get_token(user)
+        access[user.username] = str(token.access_token)
+        refresh[user.username] = str(token)
+    return access, refresh
+
+
+# -- Transports --
+
+class InProcessTransport:
+    """
+    Client de test de Django : requête traitée par le gestionnaire WSGI, sans réseau.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def send(self, method, path, body, authorization):
+        from django.test import Client
+
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = Client(raise_request_exception=False)
+        extra = {"HTTP_AUTHORIZATION": authorization} if authorization else {}
+        data = json.dumps(body) if body is not None else ""
+        response = client.generic(method, path, data, content_type="application/json", **extra)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        response.close()
+        return response.status_code
+
+
+class HTTPTransport:
+    """
+    Client HTTP/1.1 (une connexion persistante par thread) vers un serveur local.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.local = threading.local()
+
+    def send(self, method, path, body, authorization):
+        headers = {"Host": HOST, "Content-Type": "application/json"}
+        if authorization:
+            headers["Authorization"] = authorization
+        data = json.dumps(body).encode() if body is not None else None
+        for attempt in range(2):
+            connection = getattr(self.local, "connection", None)
+            if connection is None:
+                connection = self.local.connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+            try:
+                connection.request(method, path, body=data, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                return response.status
+            except (ConnectionError, http.client.RemoteDisconnected):
+                # Connexion fermée par le serveur entre deux requêtes : nouvelle connexion.
+                connection.close()
+                self.local.connection = None
+                if attempt:
+                    raise
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class WSGIServer:
+    """
+    Serveur WSGI à threads de runserver, dans un thread du processus.
+    """
+
+    def __enter__(self):
+        from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+        from config.wsgi import application
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadedWSGIServer(("127.0.0.1", 0), QuietHandler, allow_reuse_address=False)
+        self.server.request_queue_size = 128
+        self.server.set_app(application)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return HTTPTransport(self.server.server_address[1])
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+class ASGIServer:
+    """
+    Serveur uvicorn (paquet facultatif), dans un thread du processus.
+    """
+
+    def __enter__(self):
+        try:
+            import uvicorn
+        except ImportError as exc:
+            raise SystemExit("La cible asgi nécessite le paquet 'uvicorn'.") from exc
+
+        from config.asgi import application
+
+        port = free_port()
+        self.server = uvicorn.Server(
+            uvicorn.Config(application, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return HTTPTransport(port)
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+class InProcess:
+    def __enter__(self):
+        return InProcessTransport()
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+SERVERS = {"inprocess": InProcess, "wsgi": WSGIServer, "asgi": ASGIServer}
+
+
+# -- Rejeu et mesures --
+
+def replay(transport, plan, tokens, concurrency):
+    """
+    Rejoue la séquence (répartie entre `concurrency` clients) ; renvoie [(scénario, statut, durée)]
+    et la durée totale.
+    """
+    results = [None] * len(plan)
+
+    def client(offset):
+        for index in range(offset, len(plan), concurrency):
+            entry = plan[index]
+            authorization = f"Bearer {tokens[entry['user']]}" if entry["user"] else None
+            start = time.perf_counter()
+            status = transport.send(entry["method"], entry["path"], entry["body"], authorization)
+            results[index] = (entry["scenario"], status, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def latency_summary(latencies):
+    latencies = sorted(latencies)
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = quantiles[49], quantiles[94], quantiles[98]
+    else:
+        p50 = p95 = p99 = latencies[0]
+    return {
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+
+def summarize(results, elapsed):
+    from projects import metrics
+
+    by_scenario = {}
+    for scenario, status, latency in results:
+        by_scenario.setdefault(scenario, []).append((status, latency))
+    scenarios = {
+        scenario: {
+            "requests": len(rows),
+            "errors": sum(status >= 400 for status, _ in rows),
+            **latency_summary([latency for _, latency in rows]),
+        }
+        for scenario, rows in sorted(by_scenario.items())
+    }
+    snapshot = metrics.snapshot()
+    endpoints = {
+        name: {
+            "requests": stats.count,
+            "queries_per_request": round(stats.queries_sum / stats.count, 2),
+            "db_ms_per_request": round(stats.db_time / stats.count * 1000, 3),
+        }
+        for name, stats in sorted(snapshot.items())
+    }
+    handled = sum(stats.count for stats in snapshot.values())
+    return {
+        "requests": len(results),
+        "errors": sum(row["errors"] for row in scenarios.values()),
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_second": round(len(results) / elapsed, 1),
+        **latency_summary([latency for _, _, latency in results]),
+        "queries_per_request": round(sum(stats.queries_sum for stats in snapshot.values()) / handled, 2) if handled else 0,
+        "scenarios": scenarios,
+        "endpoints": endpoints,
+    }
+
+
+def run_target(target, args):
+    """
+    Mesure d'une cible (dans le sous-processus) : données, séquence, préchauffage, rejeu.
+    """
+    from django.test import override_settings
+
+    from projects import metrics
+
+    volumes = Volumes(users=args.users, projects=args.projects, members_per_project=args.members,
+                      issues_per_project=args.issues, comments_per_issue=args.comments)
+    dataset = generate(volumes, seed=args.seed)
+    tokens, refresh_tokens = mint_tokens(dataset)
+    plan = RequestMix(dataset, random.Random(args.seed), refresh_tokens).build(args.requests)
+    # Préchauffage (connexions, caches d'appartenance, code chargé) : lectures seules, non mesurées.
+    warmup = [entry for entry in plan if entry["method"] == "GET"][:args.warmup]
+    concurrency = 1 if target == "inprocess" else args.concurrency
+
+    response_cache = "responses" if args.response_cache else None
+    with override_settings(SOFTDESK_RESPONSE_CACHE_ALIAS=response_cache), SERVERS[target]() as transport:
+        replay(transport, warmup, tokens, concurrency)
+        metrics.reset()
+        results, elapsed = replay(transport, plan, tokens, concurrency)
+    return {"concurrency": concurrency, "dataset": dataset.summary(), **summarize(results, elapsed)}
+
+
+# -- Comparaison --
+
+def compare(baseline, current, max_latency_increase, max_throughput_drop, max_query_increase,
+            min_requests=20, min_latency_delta_ms=1.0):
+    """
+    Régressions de `current` par rapport à `baseline`, pour les cibles présentes dans les deux :
+    débit, latences p95/p99 (globales, puis par scénario assez fréquent), requêtes SQL par point
+    d'entrée et erreurs. Une hausse de latence n'est retenue qu'au-delà de min_latency_delta_ms.
+    """
+    regressions = []
+
+    def check(target, metric, name, before, after, worse):
+        if worse:
+            regressions.append({
+                "target": target, "metric": metric, "name": name, "baseline": before, "current": after,
+                "change": round((after - before) / before, 3) if before else None,
+            })
+
+    def slower(before, after):
+        return after > before * (1 + max_latency_increase) and after - before > min_latency_delta_ms
+
+    for target in sorted(set(baseline["targets"]) & set(current["targets"])):
+        old, new = baseline["targets"][target], current["targets"][target]
+        check(target, "requests_per_second", "overall", old["requests_per_second"], new["requests_per_second"],
+              new["requests_per_second"] < old["requests_per_second"] * (1 - max_throughput_drop))
+        check(target, "errors", "overall", old["errors"], new["errors"], new["errors"] > old["errors"])
+        for metric in ("p95_ms", "p99_ms"):
+            check(target, metric, "overall", old[metric], new[metric], slower(old[metric], new[metric]))
+        for name, scenario in new["scenarios"].items():
+            previous = old["scenarios"].get(name)
+            if previous and min(previous["requests"], scenario["requests"]) >= min_requests:
+                check(target, "p95_ms", name, previous["p95_ms"], scenario["p95_ms"],
+                      slower(previous["p95_ms"], scenario["p95_ms"]))
+        for name, endpoint in new["endpoints"].items():
+            previous = old["endpoints"].get(name)
+            if previous:
+                check(target, "queries_per_request", name, previous["queries_per_request"],
+                      endpoint["queries_per_request"],
+                      endpoint["queries_per_request"] > previous["queries_per_request"] + max_query_increase)
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default="inprocess,wsgi", help=f"Cibles, séparées par des virgules ({', '.join(TARGETS)})")
+    parser.add_argument("--requests", type=int, default=2000, help="Nombre de requêtes rejouées par cible")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clients concurrents (cibles wsgi et asgi)")
+    parser.add_argument("--warmup", type=int, default=200, help="Lectures de préchauffage, non mesurées")
+    parser.add_argument("--users", type=int, default=50, help="Nombre d'utilisateurs")
+    parser.add_argument("--projects", type=int, default=20, help="Nombre de projets")
+    parser.add_argument("--members", type=int, default=8, help="Membres par projet, auteur compris")
+    parser.add_argument("--issues", type=int, default=100, help="Issues par projet")
+    parser.add_argument("--comments", type=int, default=5, help="Commentaires par issue")
+    parser.add_argument("--seed", type=int, default=42, help="Graine des données et de la séquence")
+    parser.add_argument("--response-cache", action="store_true", help="Active le cache des réponses")
+    parser.add_argument("--output", help="Fichier JSON du résultat (sinon : sortie standard)")
+    parser.add_argument("--baseline", help="Résultat de référence : compare le nouveau résultat à celui-ci")
+    parser.add_argument("--compare", nargs=2, metavar=("REFERENCE", "RESULTAT"), help="Compare deux résultats sans rien mesurer")
+    parser.add_argument("--max-latency-increase", type=float, default=0.15, help="Hausse relative tolérée des latences p95/p99")
+    parser.add_argument("--max-throughput-drop", type=float, default=0.10, help="Baisse relative tolérée du débit")
+    parser.add_argument("--max-query-increase", type=float, default=0.5, help="Hausse tolérée des requêtes SQL par requête")
+    parser.add_argument("--run", choices=TARGETS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    thresholds = (args.max_latency_increase, args.max_throughput_drop, args.max_query_increase)
+
+    if args.run:
+        setup_django()
+        from django.db import connection
+
+        with tempfile.TemporaryDirectory() as directory:
+            # Base de test dans un fichier : partagée par les threads du serveur.
+            if connection.vendor == "sqlite":
+                connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "bench.sqlite3")
+            with test_database():
+                result = run_target(args.run, args)
+        print(json.dumps(result))
+        return
+
+    if args.compare:
+        reports = []
+        for name in args.compare:
+            with open(name, encoding="utf-8") as file:
+                reports.append(json.load(file))
+        regressions = compare(*reports, *thresholds)
+        print(json.dumps({"regressions": regressions}, indent=2))
+        sys.exit(1 if regressions else 0)
+
+    targets = [target for target in args.targets.split(",") if target]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"cibles inconnues : {', '.join(sorted(unknown))}")
+    report = {
+        "meta": {
+            "revision": git_revision(), "python": sys.version.split()[0], "requests": args.requests,
+            "concurrency": args.concurrency, "seed": args.seed, "response_cache": args.response_cache,
+        },
+        "targets": {},
+    }
+    forwarded = list(argv if argv is not None else sys.argv[1:])
+    for target in targets:
+        process = subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", *forwarded, "--run", target],
+            env={**os.environ, "SOFTDESK_ASYNC_READS": "1" if target == "asgi" else "0", "SOFTDESK_METRICS": "1"},
+            capture_output=True, text=True,
+        )
+        if process.returncode:
+            sys.exit(f"Cible {target} : {(process.stderr.strip().splitlines() or ['échec'])[-1]}")
+        report["targets"][target] = json.loads(process.stdout.strip().splitlines()[-1])
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(json.load(file), report, *thresholds)
+        # Sans --output, le résultat occupe déjà la sortie standard.
+        print(json.dumps({"regressions": regressions}, indent=2), file=sys.stdout if args.output else sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Outils communs aux benchmarks : initialisation de Django et base de test temporaire.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database(verbosity=0):
+    """
+    Crée une base de test (migrations comprises) et la détruit à la fin du bloc.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    # DEBUG désactivé : pas de journalisation des requêtes SQL qui fausserait les mesures.
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def measure_throughput(func, iterations):
+    """
+    Exécute 'func' 'iterations' fois et renvoie le nombre d'appels par seconde.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed if elapsed else float("inf")
@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Lectures servies par les vues asynchrones (voir projects/async_views.py).
+os.environ.setdefault("SOFTDESK_ASYNC_READS", "1")
 
-application = get_asgi_application()
+# Comme get_asgi_application(), avec le gestionnaire qui sert aussi les flux d'événements
+# sans thread par connexion (voir projects/async_views.py).
+django.setup(set_prefix=False)
+
+from projects.async_views import EventStreamASGIHandler  # noqa: E402
+
+application = EventStreamASGIHandler()
@@ -0,0 +1,115 @@
+"""
+Profils de base de données, choisis par variables d'environnement (voir settings.DATABASES).
+
+    SOFTDESK_DB_PROFILE = sqlite (défaut) | sqlite-legacy | postgresql
+
+- sqlite : fichier SQLite réglé pour des écritures concurrentes.
+    - journal WAL : les lectures ne bloquent plus les écritures (et inversement) ;
+    - synchronous=NORMAL : en WAL, pas de fsync à chaque commit (durable au point de contrôle ;
+      une coupure de courant peut perdre les dernières transactions, jamais corrompre la base) ;
+    - mmap_size : lectures par projection mémoire, sans copie dans le cache de pages ;
+    - délai d'attente du verrou (busy timeout) : une écriture attend son tour au lieu d'échouer ;
+    - transactions IMMEDIATE : le verrou d'écriture est pris dès BEGIN. En mode DEFERRED,
+      une transaction qui lit puis écrit peut échouer aussitôt ("database is locked"),
+      sans attendre le délai, si une autre écriture a commencé entre-temps ;
+    - connexions persistantes (CONN_MAX_AGE) : les pragmas ne sont exécutés qu'à l'ouverture.
+- sqlite-legacy : réglages par défaut de Django (comparaison, voir benchmarks/database.py).
+- postgresql : pool de connexions natif de Django (paquet psycopg[pool]) ; chaque requête
+  emprunte une connexion ouverte au lieu d'en établir une.
+
+Variables (toutes facultatives) :
+    SOFTDESK_DB_NAME            fichier SQLite (défaut : db.sqlite3) ou nom de la base PostgreSQL
+    SOFTDESK_DB_CONN_MAX_AGE    durée de vie d'une connexion SQLite persistante, en secondes (60)
+    SOFTDESK_DB_BUSY_TIMEOUT    attente maximale du verrou d'écriture SQLite, en secondes (20)
+    SOFTDESK_DB_MMAP_SIZE       taille de la projection mémoire SQLite, en octets (256 Mio)
+    SOFTDESK_DB_HOST / _PORT / _USER / _PASSWORD    connexion PostgreSQL
+    SOFTDESK_DB_POOL_MIN / _MAX / _TIMEOUT          pool PostgreSQL (2 / 20 / 10 s)
+    SOFTDESK_DB_REPLICAS        réplicas en lecture, séparés par des virgules : fichiers SQLite
+                                ou hôtes PostgreSQL (voir replica_databases et config/replicas.py)
+"""
+
+import os
+
+PROFILES = ("sqlite", "sqlite-legacy", "postgresql")
+
+
+def _int(env, name, default):
+    return int(env.get(name, default))
+
+
+def sqlite_database(env, base_dir):
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": env.get("SOFTDESK_DB_NAME", base_dir / "db.sqlite3"),
+        "CONN_MAX_AGE": _int(env, "SOFTDESK_DB_CONN_MAX_AGE", 60),
+        "OPTIONS": {
+            "timeout": _int(env, "SOFTDESK_DB_BUSY_TIMEOUT", 20),
+            "transaction_mode": "IMMEDIATE",
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                f"PRAGMA mmap_size={_int(env, 'SOFTDESK_DB_MMAP_SIZE', 256 * 1024 * 1024)};"
+            ),
+        },
+    }
+
+
+def sqlite_legacy_database(env, base_dir):
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": env.get("SOFTDESK_DB_NAME", base_dir / "db.sqlite3"),
+    }
+
+
+def postgresql_database(env, base_dir):
+    return {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env.get("SOFTDESK_DB_NAME", "softdesk"),
+        "USER": env.get("SOFTDESK_DB_USER", "softdesk"),
+        "PASSWORD": env.get("SOFTDESK_DB_PASSWORD", ""),
+        "HOST": env.get("SOFTDESK_DB_HOST", "localhost"),
+        "PORT": env.get("SOFTDESK_DB_PORT", "5432"),
+        # Avec le pool, la connexion est rendue au pool à la fin de chaque requête (CONN_MAX_AGE = 0).
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {
+            "pool": {
+                "min_size": _int(env, "SOFTDESK_DB_POOL_MIN", 2),
+                "max_size": _int(env, "SOFTDESK_DB_POOL_MAX", 20),
+                "timeout": _int(env, "SOFTDESK_DB_POOL_TIMEOUT", 10),
+            },
+        },
+    }
+
+
+def database_settings(base_dir, env=None):
+    """
+    Réglage DATABASES["default"] du profil SOFTDESK_DB_PROFILE.
+    """
+    env = os.environ if env is None else env
+    profile = env.get("SOFTDESK_DB_PROFILE", "sqlite")
+    builders = {
+        "sqlite": sqlite_database,
+        "sqlite-legacy": sqlite_legacy_database,
+        "postgresql": postgresql_database,
+    }
+    if profile not in builders:
+        raise ValueError(f"SOFTDESK_DB_PROFILE inconnu : {profile!r} (profils : {', '.join(PROFILES)}).")
+    return builders[profile](env, base_dir)
+
+
+def replica_databases(base_dir, env=None):
+    """
+    Réplicas en lecture (SOFTDESK_DB_REPLICAS) : alias replica1, replica2... du même profil que
+    la base principale. Sous SQLite, chaque entrée est un fichier (copie de la base principale,
+    voir la commande sync_sqlite_replicas) ; sous PostgreSQL, l'hôte d'un serveur répliqué.
+    """
+    env = os.environ if env is None else env
+    names = [name.strip() for name in env.get("SOFTDESK_DB_REPLICAS", "").split(",") if name.strip()]
+    key = "SOFTDESK_DB_HOST" if env.get("SOFTDESK_DB_PROFILE") == "postgresql" else "SOFTDESK_DB_NAME"
+    replicas = {}
+    for index, name in enumerate(names, start=1):
+        replica = database_settings(base_dir, {**env, key: name})
+        # Tests : un réplica est la base de test principale (aucune base à créer).
+        replica["TEST"] = {"MIRROR": "default"}
+        replicas[f"replica{index}"] = replica
+    return replicas
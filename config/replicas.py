@@ -0,0 +1,156 @@
+"""
+Lectures sur réplicas : routeur de base de données et épinglage par requête.
+
+Les requêtes GET, HEAD et OPTIONS des ViewSets des applications SOFTDESK_READ_REPLICA_APPS
+(projects, authentication), et des vues asynchrones qui servent leurs lectures, lisent sur un
+réplica de SOFTDESK_READ_REPLICAS (voir config/database.py), tiré au hasard une fois par
+requête : toutes ses lectures voient le même état de la base. Tout le reste (écritures, tokens, admin, commandes, tâches hors requête)
+utilise la base principale.
+
+Épinglage sur la base principale, pour lire ce qui vient d'être écrit malgré le retard de
+réplication :
+- dans une requête, dès sa première écriture ;
+- après une requête qui a écrit, pour les requêtes du même client pendant
+  SOFTDESK_REPLICA_STICKY_SECONDS (un client qui crée une issue la retrouve dans la liste).
+  Le client est reconnu par l'empreinte de son en-tête Authorization (à défaut, son adresse IP),
+  mémorisée dans le cache SOFTDESK_REPLICA_PIN_CACHE_ALIAS.
+
+L'état de la requête est porté par une ContextVar : il suit la requête dans les vues
+asynchrones et les threads de sync_to_async. Le corps d'une réponse en flux (export),
+produit après le middleware, est lu sur la base principale.
+"""
+
+import hashlib
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.viewsets import ViewSetMixin
+
+PRIMARY = "default"
+PIN_KEY_PREFIX = "softdesk-primary-pin"
+
+_routing = ContextVar("softdesk_routing", default=None)
+
+
+class RequestRouting:
+    """
+    Base des lectures de la requête en cours : son réplica (None : base principale),
+    jusqu'à sa première écriture.
+    """
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+    @property
+    def read_alias(self):
+        if self.wrote or self.replica is None:
+            return PRIMARY
+        return self.replica
+
+
+class ReplicaRouter:
+    """
+    Routeur de DATABASE_ROUTERS : lectures selon la requête en cours, écritures sur la base principale.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        return routing.read_alias if routing else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing:
+            routing.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Un réplica contient les mêmes données que la base principale.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Les réplicas reçoivent le schéma par la réplication (ou sync_sqlite_replicas).
+        return db == PRIMARY
+
+
+def reading_replica():
+    """
+    Vrai si les lectures de la requête en cours vont à un réplica.
+    """
+    routing = _routing.get()
+    return routing is not None and routing.read_alias != PRIMARY
+
+
+def pin_key(request):
+    client = request.headers.get("Authorization") or request.META.get("REMOTE_ADDR", "")
+    return f"{PIN_KEY_PREFIX}:{hashlib.sha1(client.encode()).hexdigest()}"
+
+
+def pin_cache():
+    return caches[settings.SOFTDESK_REPLICA_PIN_CACHE_ALIAS]
+
+
+def reads_from_replica(request, view_func):
+    """
+    Lecture d'un ViewSet concerné, par un client qui n'a pas écrit récemment.
+    La vue est reconnue par view_func.cls : la classe du ViewSet, y compris pour les vues
+    asynchrones des lectures, qui la reprennent de la route qu'elles servent (voir
+    AsyncReadView.as_view dans projects/async_views.py).
+    """
+    view_class = getattr(view_func, "cls", None)
+    return (
+        request.method in SAFE_METHODS
+        and view_class is not None
+        and issubclass(view_class, ViewSetMixin)
+        and view_class.__module__.partition(".")[0] in settings.SOFTDESK_READ_REPLICA_APPS
+        and not pin_cache().get(pin_key(request))
+    )
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Porte l'état de routage de chaque requête (en tête de MIDDLEWARE, synchrone et asynchrone).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        routing = RequestRouting()
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote and settings.SOFTDESK_READ_REPLICAS:
+            pin_cache().set(pin_key(request), True, settings.SOFTDESK_REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        routing = RequestRouting()
+        token = _routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote and settings.SOFTDESK_READ_REPLICAS:
+            await pin_cache().aset(pin_key(request), True, settings.SOFTDESK_REPLICA_STICKY_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routing = _routing.get()
+        if routing and settings.SOFTDESK_READ_REPLICAS and reads_from_replica(request, view_func):
+            routing.replica = random.choice(settings.SOFTDESK_READ_REPLICAS)
+        return None
@@ -6,10 +6,13 @@ Contient les réglages pour la sécurité (JWT), la base de données,
 les applications installées et le Green IT (Pagination).
 """
 
+import os
 from pathlib import Path
 # Nécessaire pour définir la durée de vie du Token
 from datetime import timedelta 
 
+from .database import database_settings, replica_databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +46,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Mesures par point d'entrée : latence, SQL, sérialisation, permissions (voir projects/metrics.py)
+    "projects.metrics.MetricsMiddleware",
+    # En tête : choisit la base des lectures de toute la requête (voir config/replicas.py)
+    "config.replicas.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -73,13 +80,113 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 
 # Database
-# Utilisation de SQLite pour le développement (léger, fichier unique)
+# Profil choisi par SOFTDESK_DB_PROFILE (voir config/database.py) : SQLite réglé pour les
+# écritures concurrentes (WAL, busy timeout, connexions persistantes) par défaut, ou PostgreSQL
+# avec pool de connexions.
+# Réplicas en lecture éventuels : SOFTDESK_DB_REPLICAS (alias replica1, replica2...).
 DATABASES = {
+    "default": database_settings(BASE_DIR),
+    **replica_databases(BASE_DIR),
+}
+
+# Lectures (GET, HEAD, OPTIONS) des ViewSets de ces applications servies par un réplica ;
+# épinglage sur la base principale pendant SOFTDESK_REPLICA_STICKY_SECONDS après une écriture
+# du même client, mémorisée dans le cache SOFTDESK_REPLICA_PIN_CACHE_ALIAS : celui des
+# appartenances, partagé entre processus avec plusieurs workers (vérifié au démarrage, voir
+# projects/cache_backends.py). Voir config/replicas.py.
+DATABASE_ROUTERS = ["config.replicas.ReplicaRouter"]
+SOFTDESK_READ_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+SOFTDESK_READ_REPLICA_APPS = ("projects", "authentication")
+SOFTDESK_REPLICA_STICKY_SECONDS = int(os.environ.get("SOFTDESK_DB_REPLICA_STICKY_SECONDS", 5))
+SOFTDESK_REPLICA_PIN_CACHE_ALIAS = "membership"
+
+
+# Type de clé primaire par défaut (aligné sur le comportement de Django 6)
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Nombre de processus serveur (gunicorn -w, uvicorn --workers), lu dans WEB_CONCURRENCY comme
+# gunicorn et uvicorn. Au-delà d'un, les caches invalidés par signaux doivent être partagés entre
+# processus : c'est vérifié au démarrage (voir projects/cache_backends.py).
+SOFTDESK_WORKERS = int(os.environ.get("WEB_CONCURRENCY", 1))
+
+
+# Cache
+# - "default" : cache local généraliste.
+# - "membership" : appartenances (utilisateur, projet) utilisées par les permissions,
+#   empreintes des droits comparées à celles des tokens JWT et épinglage des clients sur la
+#   base principale après une écriture (voir config/replicas.py).
+#   Expiration après 5 minutes, éviction LRU au-delà de MAX_ENTRIES entrées. Invalidé par
+#   signaux dans le processus qui écrit : mémoire locale avec un seul processus, fichiers
+#   (partagés entre les processus de la machine) au-delà.
+# - "responses" : réponses rendues des listes et détails (voir projects/response_cache.py).
+#   Éviction LRU bornée en entrées et en octets. Les jetons d'invalidation y sont rangés avec
+#   les réponses : mémoire locale avec un seul processus, fichiers au-delà (comme "membership").
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "membership": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "softdesk-membership",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    "responses": {
+        "BACKEND": "projects.cache_backends.LRULocMemCache",
+        "LOCATION": "softdesk-responses",
+        "TIMEOUT": 600,
+        "OPTIONS": {"MAX_ENTRIES": 5000, "MAX_BYTES": 64 * 1024 * 1024},
+    },
 }
+if SOFTDESK_WORKERS > 1:
+    CACHES["membership"].update({
+        "BACKEND": "projects.cache_backends.LRUFileBasedCache",
+        "LOCATION": BASE_DIR / "cache" / "membership",
+    })
+    CACHES["responses"].update({
+        "BACKEND": "projects.cache_backends.LRUFileBasedCache",
+        "LOCATION": BASE_DIR / "cache" / "responses",
+    })
+
+# Alias du cache des appartenances et des empreintes des tokens (voir authentication/authentication.py).
+# None : mémo par requête pour les rôles, empreinte lue en base à chaque requête.
+SOFTDESK_MEMBERSHIP_CACHE_ALIAS = "membership"
+
+# Alias du cache des réponses rendues (None pour le désactiver)
+SOFTDESK_RESPONSE_CACHE_ALIAS = "responses"
+
+# Lectures asynchrones (voir projects/async_views.py). Activées par défaut sous ASGI
+# (config/asgi.py) ; sous WSGI, chaque vue asynchrone coûterait une boucle d'événements.
+SOFTDESK_ASYNC_READS = os.environ.get("SOFTDESK_ASYNC_READS", "0") == "1"
+
+# Flux d'événements des projets (voir projects/events.py) : courtier (RedisEventBroker pour
+# plusieurs workers, avec SOFTDESK_EVENTS_REDIS_URL), file par connexion et battement de cœur (s).
+SOFTDESK_EVENTS_BACKEND = "projects.events.LocalEventBroker"
+SOFTDESK_EVENTS_QUEUE_SIZE = 100
+SOFTDESK_EVENTS_HEARTBEAT = 15
+
+# Nombre maximal d'éléments par requête sur les routes /bulk/ (voir projects/bulk.py)
+SOFTDESK_BULK_MAX_ITEMS = 5000
+
+# Taille des paquets lus en base lors de l'export d'un projet (voir projects/export.py)
+SOFTDESK_EXPORT_CHUNK_SIZE = 2000
+
+# Moteur de recherche plein texte (voir projects/search.py).
+# None : FTS5 sous SQLite, recherche sans index (LIKE) sur les autres bases.
+SOFTDESK_SEARCH_BACKEND = None
+
+# Lectures (list / retrieve) rendues par les sérialiseurs précompilés (voir projects/compiled.py) :
+# SOFTDESK_COMPILED_READS=0 revient au rendu champ par champ de DRF.
+SOFTDESK_COMPILED_READS = os.environ.get("SOFTDESK_COMPILED_READS", "1") == "1"
+
+
+# Mesures des requêtes (voir projects/metrics.py) : SOFTDESK_METRICS=0 les désactive.
+# Une requête SQL exécutée au moins SOFTDESK_METRICS_DUPLICATE_THRESHOLD fois dans une même
+# requête HTTP est signalée (N+1). Jeton attendu par /metrics (sans jeton : accès local seulement).
+SOFTDESK_METRICS = os.environ.get("SOFTDESK_METRICS", "1") == "1"
+SOFTDESK_METRICS_DUPLICATE_THRESHOLD = 5
+SOFTDESK_METRICS_TOKEN = os.environ.get("SOFTDESK_METRICS_TOKEN")
 
 
 # Password validation
@@ -118,13 +225,24 @@ AUTH_USER_MODEL = "authentication.User"
 REST_FRAMEWORK = {
     # GREEN IT :
     # On active la pagination par défaut pour éviter de charger des milliers de lignes inutilement.
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # Pagination par numéro de page par défaut, ou par curseur (keyset) sur demande :
+    # ?pagination=keyset (voir projects/pagination.py).
+    "DEFAULT_PAGINATION_CLASS": "projects.pagination.SoftDeskPagination",
     "PAGE_SIZE": 10, # Limite fixée à 10 éléments par page
     
     # SÉCURITÉ OWASP :
     # On force l'utilisation de JWT (JSON Web Token) pour l'authentification.
+    # Variante "sans état" : l'utilisateur est reconstruit depuis les claims signés du token,
+    # sans requête SQL tant que ses droits n'ont pas changé (voir authentication/authentication.py).
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "authentication.authentication.StatelessJWTAuthentication",
+    ),
+
+    # Rendu JSON identique à celui de DRF, plus rapide pour les lectures précompilées
+    # (voir projects/renderers.py).
+    "DEFAULT_RENDERER_CLASSES": (
+        "projects.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
 }
 
@@ -138,4 +256,8 @@ SIMPLE_JWT = {
     # Algorithme de signature cryptographique robuste
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
+    # Tokens enrichis des claims utilisés par l'authentification sans état
+    'TOKEN_OBTAIN_SERIALIZER': 'authentication.serializers.SoftDeskTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.serializers.SoftDeskTokenRefreshSerializer',
+    'TOKEN_USER_CLASS': 'authentication.authentication.SoftDeskTokenUser',
 }
\ No newline at end of file
@@ -1,8 +1,23 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
 from authentication.views import UserViewSet
-from projects.views import ProjectViewSet, ContributorViewSet, IssueViewSet, CommentViewSet
+from projects.views import (
+    ProjectViewSet,
+    ContributorViewSet,
+    IssueViewSet,
+    CommentViewSet,
+    SearchViewSet,
+    ChangeViewSet,
+    ProjectContributorViewSet,
+    ProjectIssueViewSet,
+    IssueCommentViewSet,
+    ResponseCacheStatsView,
+    MetricsSummaryView,
+    PrometheusMetricsView,
+)
+from projects.async_views import ProjectEventStreamView
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -20,6 +35,28 @@ router.register("projects", ProjectViewSet, basename="project")
 router.register("contributors", ContributorViewSet, basename="contributor")
 router.register("issues", IssueViewSet, basename="issue")
 router.register("comments", CommentViewSet, basename="comment")
+router.register("search", SearchViewSet, basename="search")
+router.register("changes", ChangeViewSet, basename="change")
+
+# Routes imbriquées sous un projet : le projet (et l'issue) sont lus une seule fois par requête
+# (voir projects/nested.py). Routeur séparé : elles n'apparaissent pas à la racine de l'API.
+nested_router = routers.SimpleRouter()
+nested_router.register(
+    r"projects/(?P<project_pk>\d+)/contributors", ProjectContributorViewSet, basename="project-contributor"
+)
+nested_router.register(
+    r"projects/(?P<project_pk>\d+)/issues", ProjectIssueViewSet, basename="project-issue"
+)
+nested_router.register(
+    r"projects/(?P<project_pk>\d+)/issues/(?P<issue_pk>\d+)/comments", IssueCommentViewSet,
+    basename="project-issue-comment",
+)
+
+api_urls = router.urls + nested_router.urls
+if settings.SOFTDESK_ASYNC_READS:
+    # Sous ASGI, les lectures fréquentes sont servies par des vues asynchrones, prioritaires
+    # sur les mêmes chemins (voir projects/async_views.py).
+    api_urls = [path("", include("projects.async_urls"))] + api_urls
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -30,6 +67,16 @@ urlpatterns = [
     # URL pour rafraîchir le token
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     
+    # Compteurs du cache des réponses (administrateurs)
+    path("api/cache/stats/", ResponseCacheStatsView.as_view(), name="response-cache-stats"),
+
+    # Mesures par point d'entrée : format Prometheus (collecteur) et résumé (administrateurs)
+    path("metrics", PrometheusMetricsView.as_view(), name="metrics"),
+    path("api/metrics/", MetricsSummaryView.as_view(), name="metrics-summary"),
+
+    # Flux d'événements d'un projet (Server-Sent Events, servi sous ASGI)
+    path("api/projects/<int:pk>/events/", ProjectEventStreamView.as_view(), name="project-events"),
+
     # On inclut toutes les URLs générées par le routeur
-    path("api/", include(router.urls))
+    path("api/", include(api_urls))
 ]
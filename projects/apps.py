@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class ProjectsConfig(AppConfig):
     name = "projects"
+
+    def ready(self):
+        # Plusieurs processus : les caches des droits doivent être partagés (voir cache_backends.py)
+        from .cache_backends import check_shared_caches
+        check_shared_caches()
+        # Connexion des signaux (invalidation des caches d'appartenance)
+        from . import signals  # noqa: F401
+        # Chronométrage du SQL sur chaque nouvelle connexion (voir metrics.py)
+        from . import metrics  # noqa: F401
@@ -0,0 +1,15 @@
+"""
+Routes des lectures asynchrones (voir async_views.py), placées avant celles du routeur
+quand SOFTDESK_ASYNC_READS est actif (voir config/urls.py). Mêmes chemins que le routeur.
+"""
+
+from django.urls import path
+
+from .async_views import AsyncCommentListView, AsyncIssueListView, AsyncProjectDetailView, AsyncProjectListView
+
+urlpatterns = [
+    path("projects/", AsyncProjectListView.as_view(), name="async-project-list"),
+    path("projects/<int:pk>/", AsyncProjectDetailView.as_view(), name="async-project-detail"),
+    path("issues/", AsyncIssueListView.as_view(), name="async-issue-list"),
+    path("comments/", AsyncCommentListView.as_view(), name="async-comment-list"),
+]
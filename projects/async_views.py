@@ -0,0 +1,458 @@
+"""
+Vues asynchrones (ASGI) des lectures les plus fréquentes :
+
+    GET /api/projects/        GET /api/projects/{id}/
+    GET /api/issues/          GET /api/comments/
+
+Sous ASGI, une vue DRF synchrone est exécutée en entier dans le thread de la base
+(sync_to_async) : les requêtes concurrentes y passent une par une, authentification,
+sérialisation et rendu compris. Ces vues s'exécutent dans la boucle d'événements :
+- authentification JWT asynchrone (empreinte lue dans le cache en mémoire, sans thread) ;
+- vérification d'appartenance asynchrone (membership.aget_role) ;
+- ORM asynchrone (afirst, acount, itération async) : seules les requêtes SQL
+  passent par le thread de la base.
+
+La sortie est celle des ViewSets : mêmes sérialiseurs (précompilés, voir compiled.py),
+pagination par page, ETag (voir conditional.py), cache des réponses (voir response_cache.py,
+clés partagées) et mesures (voir metrics.py : même point d'entrée, "IssueViewSet.list"...).
+Tout le reste est délégué au ViewSet synchrone, qui produit la réponse de référence :
+autres méthodes, API navigable, pagination par curseur et erreurs (token absent ou invalide,
+404, filtre invalide).
+
+Routes activées par SOFTDESK_ASYNC_READS (voir config/urls.py et config/asgi.py).
+
+Flux d'événements d'un projet (ProjectEventStreamView, voir events.py) : une connexion
+ouverte ne coûte qu'une coroutine en attente sur sa file, sans thread (voir EventStreamASGIHandler).
+"""
+
+import asyncio
+import math
+import re
+from abc import ABC, abstractmethod
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.core.exceptions import RequestAborted
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from authentication.authentication import StatelessJWTAuthentication
+from . import conditional, events, membership, metrics, response_cache, sparse
+from .compiled import get_compiled
+from .filters import IssueFilterBackend, IssueOrderingFilter
+from .models import Project, Issue, Comment
+from .pagination import PAGE_MODE, SoftDeskPagination
+from .renderers import FastJSONRenderer
+from .serializers import (
+    CommentSerializer, IssueListSerializer, IssueSerializer, ProjectListSerializer, ProjectRetrieveSerializer,
+)
+from .views import CommentViewSet, IssueViewSet, ProjectViewSet
+
+JSON_MEDIA_TYPE = "application/json"
+JSON_FORMAT = "json"
+
+
+class Delegate(Exception):
+    """
+    La requête sort du chemin rapide : le ViewSet synchrone la traite.
+    """
+
+
+class AsyncReadView(ABC, View):
+    """
+    Lecture asynchrone d'une route d'un ViewSet ; les autres méthodes lui sont déléguées.
+    """
+
+    viewset = None
+    basename = None
+    # Actions du ViewSet sur cette route (comme celles déclarées par le routeur)
+    actions = None
+    read_action = None
+    serializer_class = None
+    # Vue synchrone de référence (construite par as_view)
+    sync_view = None
+
+    authenticator = StatelessJWTAuthentication()
+    renderer = FastJSONRenderer()
+    # Données produites par un sérialiseur précompilé (voir compiled.py et renderers.py)
+    compiled_payload = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        detail = cls.read_action == "retrieve"
+        # Mêmes paramètres que ceux passés par le routeur (nom de la route, titre de l'API navigable).
+        sync_view = cls.viewset.as_view(
+            cls.actions, basename=cls.basename, detail=detail, suffix="Instance" if detail else "List"
+        )
+        view = super().as_view(sync_view=sync_view, **initkwargs)
+        # Introspection DRF (fil d'Ariane de l'API navigable, schéma) : la route est celle du ViewSet.
+        view.cls, view.initkwargs, view.actions = sync_view.cls, sync_view.initkwargs, sync_view.actions
+        # Comme les vues DRF : la protection CSRF ne concerne que l'authentification par session.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method == "GET" and self.wants_json(request):
+            try:
+                return await self.get(request, *args, **kwargs)
+            except Delegate:
+                pass
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    @staticmethod
+    def wants_json(request):
+        if api_settings.URL_FORMAT_OVERRIDE in request.GET:
+            return False
+        accept = request.headers.get("Accept", "*/*")
+        return all(
+            media_type.split(";")[0].strip() in ("*/*", "application/*", JSON_MEDIA_TYPE)
+            for media_type in accept.split(",")
+        )
+
+    async def get(self, request, *args, **kwargs):
+        drf_request = Request(request)
+        drf_request.user = await self.authenticate(request)
+        cache = response_cache.get_cache()
+        if cache is None:
+            return await self.read(drf_request, **kwargs)
+
+        key = response_cache.make_key(
+            self.viewset.__name__, self.read_action, drf_request.user, request.path,
+            drf_request.query_params, JSON_FORMAT, JSON_MEDIA_TYPE,
+        )
+        entry = await response_cache.acall(cache, response_cache.lookup, key)
+        if entry is not None:
+            return response_cache.cached_response(request, entry)
+
+        clock = await response_cache.acall(cache, response_cache.read_clock)
+        response = await self.read(drf_request, **kwargs)
+        if response.status_code == 200:
+            dependencies = await self.get_dependencies(drf_request)
+            await response_cache.acall(cache, response_cache.store, key, clock, dependencies, response)
+        response["X-Cache"] = "MISS"
+        return response
+
+    async def authenticate(self, request):
+        try:
+            result = await self.authenticator.aauthenticate(request)
+        except APIException:
+            raise Delegate
+        if result is None:
+            raise Delegate
+        return result[0]
+
+    @abstractmethod
+    async def read(self, drf_request, **kwargs):
+        """
+        Réponse de la lecture ; lève Delegate pour rendre la main au ViewSet.
+        """
+
+    @abstractmethod
+    async def get_dependencies(self, drf_request):
+        """
+        Dépendances de la réponse mise en cache (voir response_cache.store).
+        """
+
+    def get_serializer_class(self, drf_request):
+        return self.serializer_class
+
+    def get_serializer_context(self, drf_request):
+        context = {"request": drf_request, "view": self}
+        try:
+            selection = sparse.select(self.get_serializer_class(drf_request), drf_request.query_params)
+        except APIException:
+            # Champ inconnu : l'erreur de référence est celle du ViewSet.
+            raise Delegate
+        if selection is not None:
+            context[sparse.CONTEXT_KEY] = selection
+        return context
+
+    def get_compiled_serializer(self, drf_request):
+        return get_compiled(self.get_serializer_class(drf_request), self.get_serializer_context(drf_request))
+
+    def serialize(self, drf_request, data, many=False):
+        """
+        Avec un sérialiseur précompilé, une liste est faite des lignes de compiled.values().
+        """
+        context = self.get_serializer_context(drf_request)
+        compiled = self.get_compiled_serializer(drf_request)
+        if compiled is None:
+            return self.get_serializer_class(drf_request)(data, context=context, many=many).data
+        self.compiled_payload = True
+        if many:
+            return compiled.serialize_rows(data, context)
+        return compiled.serialize_instance(data, context)
+
+    def render(self, data):
+        content = self.renderer.render(data, JSON_MEDIA_TYPE, {"view": self})
+        response = HttpResponse(content, content_type=JSON_MEDIA_TYPE)
+        # En-têtes ajoutés par DRF aux réponses des ViewSets
+        response["Allow"] = ", ".join(
+            method.upper() for method in self.http_method_names
+            if method in self.actions or method in ("head", "options")
+        )
+        response["Vary"] = "Accept"
+        return response
+
+
+class AsyncListView(AsyncReadView):
+    """
+    Liste paginée par numéro de page (pagination par défaut de l'API).
+    L'ETag est celui de la page (voir conditional.py) : total et lignes déjà lus.
+    """
+
+    actions = {"get": "list", "post": "create"}
+    read_action = "list"
+    page_size = api_settings.PAGE_SIZE
+    page_query_param = "page"
+
+    @abstractmethod
+    def get_queryset(self, drf_request):
+        """
+        Objets visibles par l'utilisateur, avant pagination.
+        """
+
+    def get_page_number(self, drf_request):
+        params = drf_request.query_params
+        # Curseur, ou mode explicite (keyset, ou inconnu : erreur 400 du ViewSet)
+        if params.get(SoftDeskPagination.mode_query_param, PAGE_MODE) != PAGE_MODE or "cursor" in params:
+            raise Delegate
+        try:
+            number = int(params.get(self.page_query_param, 1))
+        except ValueError:
+            raise Delegate
+        if number < 1:
+            raise Delegate
+        return number
+
+    async def read(self, drf_request, **kwargs):
+        number = self.get_page_number(drf_request)
+        queryset = self.get_queryset(drf_request)
+        count = await queryset.acount()
+        last_page = max(1, math.ceil(count / self.page_size))
+        if number > last_page:
+            raise Delegate
+        if not queryset.ordered:
+            queryset = queryset.order_by("pk")
+        offset = (number - 1) * self.page_size
+        page = slice(offset, offset + self.page_size)
+
+        url = drf_request.build_absolute_uri()
+        if number < last_page:
+            next_link = replace_query_param(url, self.page_query_param, number + 1)
+        else:
+            next_link = None
+        if number == 1:
+            previous_link = None
+        elif number == 2:
+            previous_link = remove_query_param(url, self.page_query_param)
+        else:
+            previous_link = replace_query_param(url, self.page_query_param, number - 1)
+        payload = {"count": count, "next": next_link, "previous": previous_link}
+
+        if conditional.is_conditional(drf_request._request):
+            validators = queryset.values_list(*conditional.PAGE_COLUMNS, named=True)[page]
+            etag = conditional.list_etag(
+                self.viewset.__name__, drf_request, JSON_FORMAT, payload, [row async for row in validators]
+            )
+            response = conditional.not_modified(drf_request._request, etag)
+            if response is not None:
+                return response
+
+        compiled = self.get_compiled_serializer(drf_request)
+        if compiled is not None:
+            queryset = compiled.values(queryset)
+        rows = [row async for row in queryset[page]]
+        etag = conditional.list_etag(self.viewset.__name__, drf_request, JSON_FORMAT, payload, rows)
+
+        response = self.render({**payload, "results": self.serialize(drf_request, rows, many=True)})
+        conditional.set_validators(response, etag)
+        response["Vary"] = "Authorization, Accept"
+        return response
+
+    async def get_dependencies(self, drf_request):
+        project_ids = [pk async for pk in response_cache.member_project_ids(drf_request.user)]
+        return response_cache.member_projects_dependencies(self.get_queryset(drf_request).model, project_ids)
+
+
+class AsyncProjectListView(AsyncListView):
+    viewset = ProjectViewSet
+    basename = "project"
+    serializer_class = ProjectListSerializer
+
+    def get_queryset(self, drf_request):
+        return Project.objects.all()
+
+    async def get_dependencies(self, drf_request):
+        return {"projects"}
+
+
+class AsyncIssueListView(AsyncListView):
+    viewset = IssueViewSet
+    basename = "issue"
+    serializer_class = IssueSerializer
+
+    def get_serializer_class(self, drf_request):
+        if sparse.wants_compact(drf_request.query_params):
+            return IssueListSerializer
+        return self.serializer_class
+
+    def get_queryset(self, drf_request):
+        queryset = Issue.objects.for_member(drf_request.user).select_related("project", "author", "assignee")
+        try:
+            queryset = IssueFilterBackend().filter_queryset(drf_request, queryset, self)
+            return IssueOrderingFilter().filter_queryset(drf_request, queryset, self)
+        except APIException:
+            raise Delegate
+
+
+class AsyncCommentListView(AsyncListView):
+    viewset = CommentViewSet
+    basename = "comment"
+    serializer_class = CommentSerializer
+
+    def get_queryset(self, drf_request):
+        return Comment.objects.for_member(drf_request.user).select_related("author")
+
+
+class AsyncProjectDetailView(AsyncReadView):
+    """
+    Détail d'un projet : appartenance vérifiée par le mémo / cache des rôles,
+    puis une seule requête (projet + auteur).
+    """
+
+    viewset = ProjectViewSet
+    basename = "project"
+    actions = {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"}
+    read_action = "retrieve"
+    serializer_class = ProjectRetrieveSerializer
+
+    async def read(self, drf_request, pk):
+        project_id = int(pk)
+        role = await metrics.acall_timed(
+            "permission", membership.aget_role, drf_request, drf_request.user.id, project_id
+        )
+        if role == membership.ROLE_NONE:
+            raise Delegate
+
+        if conditional.is_conditional(drf_request._request):
+            updated_time = await (
+                Project.objects.filter(pk=project_id).values_list("updated_time", flat=True).afirst()
+            )
+            if updated_time is not None:
+                response = conditional.not_modified(
+                    drf_request._request,
+                    conditional.object_etag(self.viewset.__name__, project_id, updated_time, JSON_FORMAT),
+                    updated_time,
+                )
+                if response is not None:
+                    return response
+
+        project = await Project.objects.select_related("author").filter(pk=project_id).afirst()
+        if project is None:
+            raise Delegate
+        self.object = project
+        response = self.render(self.serialize(drf_request, project))
+        conditional.set_validators(
+            response,
+            conditional.object_etag(self.viewset.__name__, project.pk, project.updated_time, JSON_FORMAT),
+            project.updated_time,
+        )
+        response["Vary"] = "Authorization, Accept"
+        return response
+
+    async def get_dependencies(self, drf_request):
+        return response_cache.object_dependencies(self.object)
+
+
+class ProjectEventStreamView(View):
+    """
+    GET /api/projects/{id}/events/ : flux text/event-stream des écritures du projet
+    (issues, commentaires, contributeurs), réservé à ses membres.
+    """
+
+    http_method_names = ["get"]
+    authenticator = StatelessJWTAuthentication()
+    renderer = JSONRenderer()
+
+    def error(self, request, exc):
+        response = HttpResponse(
+            self.renderer.render({"detail": exc.detail}, JSON_MEDIA_TYPE),
+            status=exc.status_code, content_type=JSON_MEDIA_TYPE,
+        )
+        if exc.status_code == 401:
+            response["WWW-Authenticate"] = self.authenticator.authenticate_header(request)
+        return response
+
+    async def get(self, request, pk):
+        try:
+            result = await self.authenticator.aauthenticate(request)
+            if result is None:
+                raise NotAuthenticated()
+        except APIException as exc:
+            return self.error(request, exc)
+        user = result[0]
+
+        # Comme pour le détail du projet : un non-membre ne voit pas le projet.
+        if await membership.aget_role(request, user.id, pk) == membership.ROLE_NONE:
+            return self.error(request, NotFound())
+
+        response = StreamingHttpResponse(events.stream(pk, user.id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Pas de mise en tampon par un proxy nginx : chaque événement part immédiatement.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class EventStreamASGIHandler(ASGIHandler):
+    """
+    Gestionnaire ASGI de l'application (config/asgi.py).
+
+    Django exécute chaque requête ASGI dans un contexte (ThreadSensitiveContext) qui réserve
+    un thread au code synchrone de la requête tant qu'elle dure : un thread par flux ouvert.
+    Les flux d'événements sont donc servis hors de ce contexte, directement par la vue (sans
+    middleware ni signaux request_started / request_finished) ; leur seul code synchrone,
+    la requête du rôle, passe par le thread partagé de sync_to_async.
+    """
+
+    stream_path = re.compile(r"^/api/projects/(?P<pk>\d+)/events/$")
+
+    def __init__(self):
+        super().__init__()
+        self.stream_view = ProjectEventStreamView.as_view()
+
+    async def __call__(self, scope, receive, send):
+        match = scope["type"] == "http" and self.stream_path.match(
+            scope["path"].removeprefix(scope.get("root_path", ""))
+        )
+        if not match:
+            return await super().__call__(scope, receive, send)
+        await self.handle_stream(scope, receive, send, int(match["pk"]))
+
+    async def handle_stream(self, scope, receive, send, pk):
+        try:
+            body_file = await self.read_body(receive)
+        except RequestAborted:
+            return
+        request, error_response = self.create_request(scope, body_file)
+        if request is None:
+            await self.send_response(error_response, send)
+            body_file.close()
+            return
+        response = await self.stream_view(request, pk=pk)
+
+        # Comme ASGIHandler.handle() : la déconnexion du client annule l'envoi (et désabonne le flux).
+        tasks = [
+            asyncio.create_task(self.listen_for_disconnect(receive)),
+            asyncio.create_task(self.send_response(response, send)),
+        ]
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        body_file.close()
@@ -0,0 +1,504 @@
+"""
+Opérations en masse (création / modification / suppression) sur les issues,
+les commentaires et les contributeurs.
+
+Principes :
+- Validation vectorisée : les champs simples de chaque élément sont validés par un sérialiseur
+  sans accès à la base ; les relations (noms de projets, pseudos, identifiants) sont résolues
+  pour tout le lot en UNE requête par type, et l'appartenance aux projets est vérifiée
+  par recherche dans un ensemble en mémoire.
+- Tout ou rien : si un élément est invalide, rien n'est écrit et la réponse détaille
+  les erreurs de chaque élément fautif (par sa position dans la liste).
+- Écriture groupée : bulk_create / bulk_update / delete() dans une seule transaction, et un
+  signal par lot (bulk_created, bulk_updated, bulk_deleted, voir signals.py).
+"""
+
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.response import Response
+
+from authentication.models import User
+from . import membership
+from .models import Project, Contributor, Issue, Comment
+from .serializers import IssueBulkSerializer, CommentBulkSerializer, ContributorBulkSerializer
+from .signals import begin_grouped_deletion, bulk_created, bulk_updated, end_grouped_deletion
+
+# Taille des lots SQL (bulk_create / bulk_update)
+BATCH_SIZE = 500
+
+
+class BulkHandler(ABC):
+    """
+    Socle commun : contrôle de la charge utile, validation élément par élément,
+    collecte des erreurs et réponse.
+    """
+
+    model = None
+    serializer_class = None
+    # Champ identifiant les objets existants dans les modifications / suppressions
+    lookup_field = "id"
+    # Nom affiché dans les messages d'erreur
+    verbose_name = "objet"
+
+    def __init__(self, request):
+        self.request = request
+        self.user_id = request.user.id
+        self.errors = {}
+
+    # -- Outils --
+
+    @property
+    def max_items(self):
+        return getattr(settings, "SOFTDESK_BULK_MAX_ITEMS", 5000)
+
+    def add_error(self, index, field, message):
+        self.errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+    def check_payload(self, items):
+        """
+        La charge utile doit être une liste non vide, de taille raisonnable.
+        """
+        if not isinstance(items, list) or not items:
+            raise serializers.ValidationError({"detail": "Une liste non vide est attendue."})
+        if len(items) > self.max_items:
+            raise serializers.ValidationError(
+                {"detail": f"Au plus {self.max_items} éléments par requête."}
+            )
+
+    def validate_items(self, items, partial=False):
+        """
+        Valide les champs simples de chaque élément, sans requête SQL.
+        Renvoie la liste des (position, données validées) des éléments valides.
+        """
+        # Un seul sérialiseur pour tout le lot : les champs ne sont construits qu'une fois.
+        child = self.serializer_class(partial=partial)
+        valid = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                self.add_error(index, "detail", "Un objet JSON est attendu.")
+                continue
+            try:
+                valid.append((index, child.run_validation(item)))
+            except serializers.ValidationError as exc:
+                for field, messages in exc.detail.items():
+                    for message in messages:
+                        self.add_error(index, field, str(message))
+        return valid
+
+    def load_targets(self, identifiers, queryset):
+        """
+        Charge en une requête les objets visés par une modification/suppression.
+        Renvoie {position dans la liste: objet} ; les identifiants manquants, invalides,
+        en double ou introuvables sont signalés comme erreurs.
+        """
+        field = self.model._meta.get_field(self.lookup_field)
+        positions = {}
+        for index, identifier in enumerate(identifiers):
+            if identifier is None:
+                self.add_error(index, self.lookup_field, "Ce champ est obligatoire.")
+                continue
+            try:
+                value = field.to_python(identifier)
+            except DjangoValidationError:
+                self.add_error(index, self.lookup_field, "Identifiant invalide.")
+                continue
+            if value in positions:
+                self.add_error(index, self.lookup_field, "Identifiant en double.")
+                continue
+            positions[value] = index
+
+        found = {
+            getattr(obj, self.lookup_field): obj
+            for obj in queryset.filter(**{f"{self.lookup_field}__in": list(positions)})
+        }
+        targets = {}
+        for value, index in positions.items():
+            if value in found:
+                targets[index] = found[value]
+            else:
+                self.add_error(index, self.lookup_field, f"{self.verbose_name.capitalize()} introuvable.")
+        return targets
+
+    def check_author(self, index, obj):
+        """
+        Même règle que IsAuthorOrReadOnly : seul l'auteur peut modifier ou supprimer.
+        """
+        if obj.author_id != self.user_id:
+            self.add_error(index, "detail", "Vous n'êtes pas l'auteur de cet élément.")
+            return False
+        return True
+
+    def error_response(self):
+        errors = [{"index": index, "errors": self.errors[index]} for index in sorted(self.errors)]
+        return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    # -- Résolution des relations (une requête par type) --
+
+    def resolve_usernames(self, usernames):
+        usernames = {name for name in usernames if name}
+        if not usernames:
+            return {}
+        return dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+
+    def resolve_member_projects(self, names):
+        """
+        {nom: (id, author_id)} des projets nommés dont l'utilisateur est membre.
+        """
+        names = {name for name in names if name}
+        if not names:
+            return {}
+        rows = (
+            Project.objects.for_member(self.request.user)
+            .filter(name__in=names)
+            .values_list("name", "id", "author_id")
+        )
+        return {name: (project_id, author_id) for name, project_id, author_id in rows}
+
+    def load_memberships(self, project_ids):
+        """
+        Ensemble des couples (user_id, project_id) membres des projets donnés.
+        """
+        return membership.member_pairs(project_ids)
+
+    # -- Opérations (à implémenter selon le modèle) --
+
+    @abstractmethod
+    def create(self, items):
+        """
+        Création en masse ; renvoie la réponse HTTP.
+        """
+
+    @abstractmethod
+    def update(self, items):
+        """
+        Modification en masse ; renvoie la réponse HTTP.
+        """
+
+    def delete(self, items):
+        """
+        Suppression en masse à partir d'une liste d'identifiants.
+        """
+        self.check_payload(items)
+        targets = self.load_targets(items, self.get_delete_queryset())
+        for index, obj in targets.items():
+            self.check_delete_permission(index, obj)
+        if self.errors:
+            return self.error_response()
+
+        with transaction.atomic():
+            # Les objets supprimés (cascade comprise) sont signalés en un lot par modèle (bulk_deleted).
+            queryset = self.model.objects.filter(pk__in=[obj.pk for obj in targets.values()])
+            begin_grouped_deletion(queryset)
+            queryset.delete()
+            end_grouped_deletion(queryset)
+        return Response({"count": len(targets)})
+
+    def get_delete_queryset(self):
+        return self.model.objects.for_member(self.request.user)
+
+    def check_delete_permission(self, index, obj):
+        return self.check_author(index, obj)
+
+    # -- Écriture --
+
+    def save_created(self, instances):
+        with transaction.atomic():
+            created = self.model.objects.bulk_create(instances, batch_size=BATCH_SIZE)
+            bulk_created.send(sender=self.model, instances=created)
+        return created
+
+    def save_updated(self, instances, fields, originals):
+        if instances and fields:
+            # bulk_update() n'applique pas auto_now : on date la modification nous-mêmes
+            # (updated_time sert aux ETag, voir conditional.py).
+            now = timezone.now()
+            for instance in instances:
+                instance.updated_time = now
+            with transaction.atomic():
+                self.model.objects.bulk_update(
+                    instances, sorted(fields | {"updated_time"}), batch_size=BATCH_SIZE
+                )
+                bulk_updated.send(
+                    sender=self.model, instances=instances, fields=set(fields), originals=originals
+                )
+        return Response({"count": len(instances)})
+
+    def apply_changes(self, instance, values, fields, originals):
+        """
+        Affecte les nouvelles valeurs et mémorise les anciennes (pour les signaux).
+        """
+        for field, value in values.items():
+            old = getattr(instance, field)
+            if old != value:
+                originals.setdefault(instance.pk, {})[field] = old
+                setattr(instance, field, value)
+                fields.add(field)
+
+
+class IssueBulkHandler(BulkHandler):
+    model = Issue
+    serializer_class = IssueBulkSerializer
+    verbose_name = "issue"
+
+    def resolve_relations(self, rows):
+        """
+        Résout noms de projets et pseudos de tout le lot, puis l'appartenance des assignés.
+        """
+        projects = self.resolve_member_projects(data.get("project") for _, data in rows)
+        users = self.resolve_usernames(data.get("assignee") for _, data in rows)
+        return projects, users
+
+    def check_relations(self, index, data, projects, users, current_project_id=None):
+        """
+        Convertit project/assignee en identifiants. Renvoie (project_id, assignee_id).
+        """
+        project_id = current_project_id
+        if "project" in data:
+            if data["project"] not in projects:
+                self.add_error(index, "project", f"Projet '{data['project']}' introuvable.")
+                return None, None
+            project_id = projects[data["project"]][0]
+
+        assignee_id = None
+        if data.get("assignee"):
+            assignee_id = users.get(data["assignee"])
+            if assignee_id is None:
+                self.add_error(index, "assignee", f"Utilisateur '{data['assignee']}' introuvable.")
+        return project_id, assignee_id
+
+    def check_assignees(self, checks, memberships):
+        """
+        Règle de IssueSerializer.validate : l'assigné doit être membre du projet.
+        Vérification par recherche dans l'ensemble des appartenances (aucune requête).
+        """
+        for index, assignee_id, project_id, username in checks:
+            if (assignee_id, project_id) not in memberships:
+                self.add_error(index, "assignee", f"L'utilisateur '{username}' ne fait pas partie du projet.")
+
+    def create(self, items):
+        self.check_payload(items)
+        rows = self.validate_items(items)
+        projects, users = self.resolve_relations(rows)
+
+        instances, checks = [], []
+        for index, data in rows:
+            project_id, assignee_id = self.check_relations(index, data, projects, users)
+            if project_id is None:
+                continue
+            if assignee_id is not None:
+                checks.append((index, assignee_id, project_id, data["assignee"]))
+            values = {key: value for key, value in data.items() if key not in ("project", "assignee")}
+            instances.append(Issue(
+                project_id=project_id, author_id=self.user_id, assignee_id=assignee_id, **values
+            ))
+
+        self.check_assignees(checks, self.load_memberships(project_id for _, _, project_id, _ in checks))
+        if self.errors:
+            return self.error_response()
+
+        created = self.save_created(instances)
+        return Response(
+            {"count": len(created), "ids": [issue.pk for issue in created]},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def update(self, items):
+        self.check_payload(items)
+        identifiers = [item.get(self.lookup_field) if isinstance(item, dict) else None for item in items]
+        targets = self.load_targets(identifiers, Issue.objects.for_member(self.request.user))
+        rows = self.validate_items(items, partial=True)
+        projects, users = self.resolve_relations(rows)
+
+        pending, checks = [], []
+        for index, data in rows:
+            issue = targets.get(index)
+            if issue is None or not self.check_author(index, issue):
+                continue
+            project_id, assignee_id = self.check_relations(index, data, projects, users, issue.project_id)
+            if project_id is None:
+                continue
+            if assignee_id is not None:
+                checks.append((index, assignee_id, project_id, data["assignee"]))
+            values = {key: value for key, value in data.items() if key not in ("project", "assignee")}
+            values["project_id"] = project_id
+            if "assignee" in data:
+                values["assignee_id"] = assignee_id
+            pending.append((issue, values))
+
+        self.check_assignees(checks, self.load_memberships(project_id for _, _, project_id, _ in checks))
+        if self.errors:
+            return self.error_response()
+
+        fields, originals = set(), {}
+        for issue, values in pending:
+            self.apply_changes(issue, values, fields, originals)
+        return self.save_updated([issue for issue, _ in pending], fields, originals)
+
+
+class CommentBulkHandler(BulkHandler):
+    model = Comment
+    serializer_class = CommentBulkSerializer
+    lookup_field = "uuid"
+    verbose_name = "commentaire"
+
+    def resolve_issues(self, rows):
+        """
+        Issues visées qui appartiennent aux projets de l'utilisateur : {id: id du projet}.
+        """
+        wanted = {data["issue"] for _, data in rows if "issue" in data}
+        if not wanted:
+            return {}
+        return dict(
+            Issue.objects.for_member(self.request.user).filter(pk__in=wanted).values_list("id", "project_id")
+        )
+
+    def check_issue(self, index, data, issues):
+        if "issue" in data and data["issue"] not in issues:
+            self.add_error(index, "issue", "Issue introuvable.")
+            return False
+        return True
+
+    def create(self, items):
+        self.check_payload(items)
+        rows = self.validate_items(items)
+        issues = self.resolve_issues(rows)
+
+        instances = []
+        for index, data in rows:
+            if self.check_issue(index, data, issues):
+                instances.append(Comment(
+                    description=data["description"], issue_id=data["issue"],
+                    project_id=issues[data["issue"]], author_id=self.user_id,
+                ))
+        if self.errors:
+            return self.error_response()
+
+        created = self.save_created(instances)
+        return Response(
+            {"count": len(created), "ids": [str(comment.uuid) for comment in created]},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def update(self, items):
+        self.check_payload(items)
+        identifiers = [item.get(self.lookup_field) if isinstance(item, dict) else None for item in items]
+        targets = self.load_targets(identifiers, Comment.objects.for_member(self.request.user))
+        rows = self.validate_items(items, partial=True)
+        issues = self.resolve_issues(rows)
+
+        pending = []
+        for index, data in rows:
+            comment = targets.get(index)
+            if comment is None or not self.check_author(index, comment):
+                continue
+            if not self.check_issue(index, data, issues):
+                continue
+            values = {"description": data["description"]} if "description" in data else {}
+            if "issue" in data:
+                # Le commentaire suit son issue dans son projet.
+                values["issue_id"] = data["issue"]
+                values["project_id"] = issues[data["issue"]]
+            pending.append((comment, values))
+        if self.errors:
+            return self.error_response()
+
+        fields, originals = set(), {}
+        for comment, values in pending:
+            self.apply_changes(comment, values, fields, originals)
+        return self.save_updated([comment for comment, _ in pending], fields, originals)
+
+
+class ContributorBulkHandler(BulkHandler):
+    """
+    Ajout / retrait en masse de membres. Mêmes règles que IsProjectAuthor :
+    seul l'auteur d'un projet peut en gérer les membres.
+    Une ligne Contributor n'a pas de champ modifiable propre : pas de modification en masse.
+    """
+
+    model = Contributor
+    serializer_class = ContributorBulkSerializer
+    verbose_name = "contributeur"
+
+    def create(self, items):
+        self.check_payload(items)
+        rows = self.validate_items(items)
+
+        names = {data["project"] for _, data in rows}
+        projects = {
+            name: (project_id, author_id)
+            for name, project_id, author_id in Project.objects.filter(name__in=names).values_list("name", "id", "author_id")
+        }
+        users = self.resolve_usernames(data["user"] for _, data in rows)
+        existing = set(
+            Contributor.objects.filter(project_id__in=[project_id for project_id, _ in projects.values()])
+            .values_list("user_id", "project_id")
+        )
+
+        instances, seen = [], set()
+        for index, data in rows:
+            project = projects.get(data["project"])
+            user_id = users.get(data["user"])
+            if project is None:
+                self.add_error(index, "project", f"Projet '{data['project']}' introuvable.")
+                continue
+            if project[1] != self.user_id:
+                self.add_error(index, "project", "Seul l'auteur du projet peut ajouter des contributeurs.")
+                continue
+            if user_id is None:
+                self.add_error(index, "user", f"Utilisateur '{data['user']}' introuvable.")
+                continue
+            pair = (user_id, project[0])
+            # Le couple existe déjà en base ou plus haut dans le lot
+            if pair in seen or pair in existing:
+                self.add_error(index, "user", "Cet utilisateur est déjà contributeur du projet.")
+                continue
+            seen.add(pair)
+            instances.append(Contributor(user_id=user_id, project_id=project[0]))
+
+        if self.errors:
+            return self.error_response()
+
+        created = self.save_created(instances)
+        return Response(
+            {"count": len(created), "ids": [contributor.pk for contributor in created]},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def update(self, items):
+        raise MethodNotAllowed("PATCH")
+
+    def get_delete_queryset(self):
+        return Contributor.objects.for_member(self.request.user).select_related("project")
+
+    def check_delete_permission(self, index, obj):
+        if obj.project.author_id != self.user_id:
+            self.add_error(index, "detail", "Seul l'auteur du projet peut retirer des contributeurs.")
+            return False
+        return True
+
+
+class BulkActionsMixin:
+    """
+    Ajoute à un ViewSet la route /bulk/ :
+    - POST : création d'une liste d'éléments.
+    - PATCH : modification d'une liste d'éléments (chacun porte son identifiant).
+    - DELETE : suppression d'une liste d'identifiants.
+    """
+
+    bulk_handler_class = None
+
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="bulk")
+    def bulk(self, request):
+        handler = self.bulk_handler_class(request)
+        if request.method == "POST":
+            return handler.create(request.data)
+        if request.method == "PATCH":
+            return handler.update(request.data)
+        return handler.delete(request.data)
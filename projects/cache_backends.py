@@ -0,0 +1,218 @@
+"""
+Backends de cache bornés, pour le cache des réponses (voir response_cache.py), et vérification
+au démarrage des caches partagés (check_shared_caches).
+
+Les backends fournis par Django ne limitent que le nombre d'entrées, et le cache fichier
+évince au hasard. Ceux-ci ajoutent :
+- une éviction LRU (l'entrée lue le moins récemment part en premier), une entrée à la fois ;
+- un plafond en octets (OPTIONS["MAX_BYTES"]) en plus du nombre d'entrées (MAX_ENTRIES) ;
+  une valeur plus grosse que le plafond n'est pas stockée ;
+- un compteur d'évictions, lu par stats().
+
+    "BACKEND": "projects.cache_backends.LRULocMemCache",
+    "OPTIONS": {"MAX_ENTRIES": 5000, "MAX_BYTES": 64 * 1024 * 1024},
+"""
+
+import os
+import tempfile
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.move import file_move_safe
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Réglages désignant un cache qui doit être partagé entre les processus : invalidé par signaux,
+# ou lu par la requête suivante du même client (épinglage sur la base principale, voir config/replicas.py).
+SHARED_CACHE_SETTINGS = (
+    "SOFTDESK_MEMBERSHIP_CACHE_ALIAS", "SOFTDESK_RESPONSE_CACHE_ALIAS", "SOFTDESK_REPLICA_PIN_CACHE_ALIAS",
+)
+
+# État partagé par les instances d'un même cache (une instance par thread), comme locmem.
+_sizes = {}
+_evictions = {}
+_counter_lock = Lock()
+
+
+def _max_bytes(params):
+    return int(params.get("OPTIONS", {}).get("MAX_BYTES", DEFAULT_MAX_BYTES))
+
+
+class LRULocMemCache(LocMemCache):
+    """
+    Cache mémoire local (par processus) à éviction LRU, borné en entrées et en octets.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._name = name
+        self._max_bytes = _max_bytes(params)
+        # Taille (en octets) de chaque valeur sérialisée, et total courant.
+        self._sizes = _sizes.setdefault(name, {"total": 0, "keys": {}})
+        _evictions.setdefault(name, 0)
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        size = len(value)
+        if size > self._max_bytes:
+            self._delete(key)
+            return
+        # Remplacement : l'ancienne valeur ne compte plus dans le total.
+        self._delete(key)
+        evicted = 0
+        while self._cache and (
+            len(self._cache) >= self._max_entries or self._sizes["total"] + size > self._max_bytes
+        ):
+            # La plus récemment utilisée est en tête (voir LocMemCache.get) : on retire la fin.
+            oldest, _ = self._cache.popitem()
+            self._expire_info.pop(oldest, None)
+            self._sizes["total"] -= self._sizes["keys"].pop(oldest, 0)
+            evicted += 1
+        if evicted:
+            _evictions[self._name] += evicted
+        super()._set(key, value, timeout)
+        self._sizes["keys"][key] = size
+        self._sizes["total"] += size
+
+    def _cull(self):
+        # L'éviction est faite par _set, une entrée à la fois.
+        pass
+
+    def _delete(self, key):
+        deleted = super()._delete(key)
+        if deleted:
+            self._sizes["total"] -= self._sizes["keys"].pop(key, 0)
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._expire_info.clear()
+            self._sizes["keys"].clear()
+            self._sizes["total"] = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "bytes": self._sizes["total"],
+                "max_entries": self._max_entries,
+                "max_bytes": self._max_bytes,
+                "evictions": _evictions[self._name],
+            }
+
+
+class LRUFileBasedCache(FileBasedCache):
+    """
+    Cache fichier (partagé entre les processus d'une même machine) à éviction LRU,
+    borné en entrées et en octets. La date de modification d'un fichier sert de date
+    de dernier usage : elle est rafraîchie à chaque lecture réussie.
+    Le compteur d'évictions est celui du processus courant.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._max_bytes = _max_bytes(params)
+        _evictions.setdefault(self._dir, 0)
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, default, version)
+        if value is not default:
+            try:
+                os.utime(self._key_to_file(key, version))
+            except FileNotFoundError:
+                pass
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._createdir()
+        fname = self._key_to_file(key, version)
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        renamed = False
+        try:
+            with open(fd, "wb") as f:
+                self._write_content(f, timeout, value)
+            size = os.path.getsize(tmp_path)
+            if size > self._max_bytes:
+                self._delete(fname)
+                return
+            # Place faite après écriture : on connaît la taille exacte de la nouvelle entrée.
+            self._cull(incoming=size, replacing=fname)
+            file_move_safe(tmp_path, fname, allow_overwrite=True)
+            renamed = True
+        finally:
+            if not renamed:
+                os.remove(tmp_path)
+
+    def _cull(self, incoming=0, replacing=None):
+        entries = []
+        for fname in self._list_cache_files():
+            if fname == replacing:
+                continue
+            try:
+                stat = os.stat(fname)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, fname))
+        total = sum(size for _, size, _ in entries) + incoming
+        if len(entries) < self._max_entries and total <= self._max_bytes:
+            return
+        # Les moins récemment utilisées d'abord.
+        entries.sort()
+        remaining = len(entries)
+        evicted = 0
+        for _, size, fname in entries:
+            if remaining < self._max_entries and total <= self._max_bytes:
+                break
+            # Un autre processus a pu la supprimer entre-temps : la place est libérée quand même.
+            if self._delete(fname):
+                evicted += 1
+            remaining -= 1
+            total -= size
+        with _counter_lock:
+            _evictions[self._dir] += evicted
+
+    def stats(self):
+        sizes = []
+        for fname in self._list_cache_files():
+            try:
+                sizes.append(os.path.getsize(fname))
+            except FileNotFoundError:
+                pass
+        return {
+            "entries": len(sizes),
+            "bytes": sum(sizes),
+            "max_entries": self._max_entries,
+            "max_bytes": self._max_bytes,
+            "evictions": _evictions[self._dir],
+        }
+
+
+def is_process_local(cache):
+    """
+    Vrai pour un cache propre au processus (locmem) : une invalidation n'atteint pas les autres.
+    """
+    return isinstance(cache, LocMemCache)
+
+
+def check_shared_caches():
+    """
+    Avec plusieurs processus serveur (SOFTDESK_WORKERS), un cache invalidé par signaux doit
+    être partagé : sinon, les autres processus gardent des droits révoqués, ou servent des
+    réponses périmées, jusqu'à expiration. De même pour l'épinglage sur la base principale :
+    sans lui, la requête suivante du client peut lire un réplica en retard.
+    Appelée au démarrage (voir apps.py).
+    """
+    if getattr(settings, "SOFTDESK_WORKERS", 1) <= 1:
+        return
+    for name in SHARED_CACHE_SETTINGS:
+        alias = getattr(settings, name, None)
+        if alias and is_process_local(caches[alias]):
+            raise ImproperlyConfigured(
+                f"{name} = {alias!r} : cache propre au processus, alors que SOFTDESK_WORKERS = "
+                f"{settings.SOFTDESK_WORKERS}. Configurez un cache partagé (LRUFileBasedCache, Redis...)."
+            )
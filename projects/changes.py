@@ -0,0 +1,143 @@
+"""
+Synchronisation incrémentale des issues et commentaires : GET /api/changes/?since=<seq>
+
+Chaque écriture sur une issue ou un commentaire ajoute une ligne au journal (modèle Change),
+dans la même transaction que l'écriture (signaux, voir signals.py) ; une suppression ajoute
+une ligne "tombstone". Une issue déplacée laisse une tombstone (et celles de ses commentaires)
+dans l'ancien projet et réapparaît, avec ses commentaires, dans le nouveau (tombstone d'abord :
+un membre des deux projets garde l'objet). Renommer un projet journalise ses issues, qui
+affichent son nom.
+
+Lecture : les lignes des projets de l'utilisateur dont seq > since, par l'index (project, seq),
+au plus 'limit' lignes. Plusieurs écritures d'un même objet se résument à la dernière :
+l'objet actuel (sérialisé comme par l'API) ou sa tombstone. Le coût dépend du nombre de
+modifications depuis 'since', pas de la taille des projets.
+
+    {"since": 40, "last_seq": 42, "has_more": false,
+     "issues": [...], "comments": [...], "deleted": {"issues": [12], "comments": ["<uuid>"]}}
+
+Le client conserve last_seq et le renvoie comme since ; tant que has_more est vrai, il relance
+aussitôt. since=0 rapatrie tout (le journal contient une écriture par objet existant).
+Un utilisateur qui rejoint un projet doit refaire une synchronisation complète (since=0) :
+les lignes antérieures du projet ne sont pas au-delà de son since.
+
+Ordre : seq est attribué à l'insertion. Sous SQLite, les transactions d'écriture sont
+sérialisées : l'ordre des seq est celui des commits. Sur une base à écritures concurrentes,
+une transaction plus longue peut valider un seq inférieur à un seq déjà lu.
+"""
+
+import threading
+
+from .models import Project, Issue, Comment, Change
+from .serializers import CommentSerializer, IssueSerializer
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 1000
+
+
+# Projets en cours de suppression dans ce thread (entre pre_delete et post_delete du projet).
+_deleting = threading.local()
+
+
+# -- Écriture du journal (appelée par les signaux) --
+
+def begin_project_deletion(project_id):
+    if not hasattr(_deleting, "projects"):
+        _deleting.projects = set()
+    _deleting.projects.add(project_id)
+
+
+def end_project_deletion(project_id):
+    getattr(_deleting, "projects", set()).discard(project_id)
+
+
+def issue_change(issue_id, project_id, deleted=False):
+    return Change(project_id=project_id, kind=Change.ISSUE, object_id=issue_id, deleted=deleted)
+
+
+def comment_change(comment_id, uuid, project_id, deleted=False):
+    return Change(project_id=project_id, kind=Change.COMMENT, object_id=comment_id, uuid=uuid, deleted=deleted)
+
+
+def moved_issue_changes(moves):
+    """
+    Issues déplacées [(id, ancien projet, nouveau projet)] : leurs commentaires quittent
+    l'ancien projet et apparaissent dans le nouveau (une requête pour tous).
+    """
+    moves = {issue_id: (old, new) for issue_id, old, new in moves if old != new}
+    if not moves:
+        return []
+    changes = []
+    comments = Comment.objects.filter(issue_id__in=moves).values_list("pk", "uuid", "issue_id")
+    for comment_id, uuid, issue_id in comments:
+        old_project_id, new_project_id = moves[issue_id]
+        changes.append(comment_change(comment_id, uuid, old_project_id, deleted=True))
+        changes.append(comment_change(comment_id, uuid, new_project_id))
+    return changes
+
+
+def record(changes):
+    deleting = getattr(_deleting, "projects", ())
+    changes = [change for change in changes if change.project_id not in deleting]
+    if len(changes) == 1:
+        changes[0].save(force_insert=True)
+    elif changes:
+        Change.objects.bulk_create(changes)
+
+
+# -- Lecture --
+
+def member_changes(user, since):
+    """
+    Lignes du journal des projets de l'utilisateur au-delà de since, dans l'ordre.
+    """
+    return (
+        Change.objects.filter(project__in=Project.objects.for_member(user).values("pk"), seq__gt=since)
+        .order_by("seq")
+    )
+
+
+def read(user, since, limit=DEFAULT_LIMIT, serializer_context=None):
+    """
+    Modifications des projets de l'utilisateur au-delà de 'since', résumées par objet.
+    Trois requêtes : le journal, puis les issues et les commentaires encore présents.
+    """
+    rows = list(member_changes(user, since).values_list("seq", "kind", "object_id", "uuid", "deleted")[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # Dernière écriture de chaque objet (les lignes sont dans l'ordre des seq).
+    latest = {}
+    for seq, kind, object_id, uuid, deleted in rows:
+        latest[kind, object_id] = (uuid, deleted)
+
+    wanted = {Change.ISSUE: [], Change.COMMENT: []}
+    deleted = {Change.ISSUE: [], Change.COMMENT: []}
+    for (kind, object_id), (uuid, is_deleted) in latest.items():
+        if is_deleted:
+            deleted[kind].append(object_id if kind == Change.ISSUE else str(uuid))
+        else:
+            wanted[kind].append(object_id)
+
+    issues = []
+    if wanted[Change.ISSUE]:
+        issues = list(
+            Issue.objects.for_member(user).filter(pk__in=wanted[Change.ISSUE])
+            .select_related("project", "author", "assignee").order_by("pk")
+        )
+    comments = []
+    if wanted[Change.COMMENT]:
+        comments = list(
+            Comment.objects.for_member(user).filter(pk__in=wanted[Change.COMMENT])
+            .select_related("author").order_by("pk")
+        )
+
+    # Objet écrit puis déplacé hors des projets de l'utilisateur : sa tombstone suit dans le journal.
+    return {
+        "since": since,
+        "last_seq": rows[-1][0] if rows else since,
+        "has_more": has_more,
+        "issues": IssueSerializer(issues, many=True, context=serializer_context).data,
+        "comments": CommentSerializer(comments, many=True, context=serializer_context).data,
+        "deleted": {"issues": deleted[Change.ISSUE], "comments": deleted[Change.COMMENT]},
+    }
@@ -0,0 +1,307 @@
+"""
+Sérialisation précompilée des lectures (list / retrieve) des projets, contributeurs, issues
+et commentaires.
+
+Le rendu d'un ModelSerializer parcourt ses champs ligne par ligne : lecture de l'attribut
+("author.username" traverse deux objets), test de None, puis to_representation (conversion de
+fuseau et strftime de CREATE_TIME), après la construction d'une instance de modèle par ligne.
+Ici, les champs du sérialiseur sont analysés une seule fois :
+- chaque champ devient une colonne lue par values_list() ("author.username" -> author__username,
+  SlugRelatedField -> project__name) : ni instance de modèle, ni select_related ;
+- la conversion est choisie d'avance : aucune pour les textes, entiers et slugs, str pour les
+  UUID ; fuseau et format des dates résolus une fois par lot ;
+- la fonction qui construit le dictionnaire d'une ligne est générée (un littéral de dict).
+
+La sortie est identique, octet pour octet, à celle du sérialiseur (voir les tests).
+Un sérialiseur dont un champ n'est pas reconnu (SerializerMethodField, source="*"...) n'est pas
+compilé : la vue garde le rendu DRF. Les écritures passent toujours par DRF.
+
+Activé par SOFTDESK_COMPILED_READS.
+"""
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from . import conditional, metrics, sparse
+from .pagination import KeysetPagination
+from .serializers import ScopedProjectField
+
+SAFE_READ_METHODS = ("GET", "HEAD")
+
+# Champs dont la valeur lue en base est déjà sa représentation
+IDENTITY_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+# Colonnes lues telles quelles par un ReadOnlyField ("author.username")
+PLAIN_COLUMNS = {
+    "CharField", "TextField", "SlugField", "EmailField", "BooleanField",
+    "AutoField", "BigAutoField", "IntegerField", "BigIntegerField", "PositiveIntegerField",
+    "PositiveSmallIntegerField", "SmallIntegerField",
+}
+
+# Sérialiseur compilé (ou None) par (classe, clés du contexte)
+_compiled = {}
+
+
+class Unsupported(Exception):
+    """
+    Champ sans équivalent compilé : le sérialiseur garde le rendu DRF.
+    """
+
+
+def walk(instance, attrs):
+    for attr in attrs:
+        if instance is None:
+            return None
+        instance = getattr(instance, attr)
+    return instance
+
+
+def attribute_getter(attrs):
+    return lambda instance: walk(instance, attrs)
+
+
+def slug_getter(attrs, slug_attrs):
+    return lambda instance: walk(walk(instance, attrs), slug_attrs)
+
+
+def pk_getter(attrs):
+    def get(instance):
+        parent = walk(instance, attrs[:-1])
+        return None if parent is None else parent.serializable_value(attrs[-1])
+    return get
+
+
+def check_path(model, attrs):
+    """
+    Renvoie le champ de modèle désigné par la source. Une relation nulle au milieu d'une source
+    pointée ("author.username") fait omettre la clé par DRF (SkipField) : seules les relations
+    non nulles sont compilées.
+    """
+    for attr in attrs[:-1]:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise Unsupported(attr)
+        if not field.is_relation or field.many_to_many or field.one_to_many or field.null:
+            raise Unsupported(attr)
+        model = field.related_model
+    try:
+        return model._meta.get_field(attrs[-1])
+    except FieldDoesNotExist:
+        raise Unsupported(attrs[-1])
+
+
+def datetime_binder(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() == ISO_8601:
+        return lambda context: field.to_representation
+
+    def bind(context):
+        # Comme DateTimeField.enforce_timezone : fuseau du champ ou fuseau courant.
+        field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        if field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            if getattr(value, "tzinfo", None) is None:
+                return field.to_representation(value)
+            return value.astimezone(field_timezone).strftime(output_format)
+        return convert
+    return bind
+
+
+def compile_field(model, field):
+    """
+    Renvoie (colonne, lecture sur une instance, liaison du convertisseur ou None).
+    Une liaison reçoit le contexte du lot et renvoie la fonction de conversion.
+    """
+    attrs = field.source_attrs
+    if field.source == "*" or not attrs:
+        raise Unsupported(field.field_name)
+    column = "__".join(attrs)
+
+    if isinstance(field, serializers.SlugRelatedField):
+        check_path(model, attrs)
+        slug_attrs = field.slug_field.split(".")
+        return f"{column}__{'__'.join(slug_attrs)}", slug_getter(attrs, slug_attrs), None
+
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        if field.pk_field is not None:
+            raise Unsupported(field.field_name)
+        check_path(model, attrs)
+        return column, pk_getter(attrs), None
+
+    if isinstance(field, serializers.RelatedField):
+        raise Unsupported(field.field_name)
+    model_field = check_path(model, attrs)
+    getter = attribute_getter(attrs)
+
+    if isinstance(field, serializers.DateTimeField):
+        return column, getter, datetime_binder(field)
+    if isinstance(field, serializers.UUIDField):
+        if field.uuid_format == "hex_verbose":
+            return column, getter, lambda context: str
+        return column, getter, lambda context: field.to_representation
+    if isinstance(field, serializers.ChoiceField):
+        # Choix dont la clé est déjà le texte affiché ("To Do", "HIGH") : valeur inchangée.
+        if all(key == value for key, value in field.choice_strings_to_values.items()):
+            return column, getter, None
+        return column, getter, lambda context: field.to_representation
+    if isinstance(field, serializers.ReadOnlyField):
+        # Valeur brute : seuls les textes, entiers et booléens sont déjà leur représentation JSON.
+        if model_field.get_internal_type() not in PLAIN_COLUMNS:
+            raise Unsupported(field.field_name)
+        return column, getter, None
+    if isinstance(field, IDENTITY_FIELDS):
+        return column, getter, None
+    raise Unsupported(field.field_name)
+
+
+def generate_builder(entries):
+    """
+    Génère la fonction qui construit le dictionnaire d'une ligne, par exemple :
+
+        def factory(convert_2):
+            def build(row):
+                return {"id": row[0], "name": row[1], "created_time": None if row[2] is None else convert_2(row[2])}
+            return build
+
+    entries : (nom, index de colonne ou None pour une constante, a un convertisseur).
+    """
+    arguments, items = [], []
+    for slot, (name, index, converted) in enumerate(entries):
+        if index is None:
+            arguments.append(f"constant_{slot}")
+            items.append(f"{name!r}: constant_{slot}")
+        elif converted:
+            arguments.append(f"convert_{slot}")
+            items.append(f"{name!r}: None if row[{index}] is None else convert_{slot}(row[{index}])")
+        else:
+            items.append(f"{name!r}: row[{index}]")
+    source = (
+        f"def factory({', '.join(arguments)}):\n"
+        f"    def build(row):\n"
+        f"        return {{{', '.join(items)}}}\n"
+        f"    return build\n"
+    )
+    namespace = {}
+    exec(compile(source, "<compiled serializer>", "exec"), namespace)
+    return namespace["factory"]
+
+
+class CompiledSerializer:
+    """
+    Rendu en lecture seule d'un sérialiseur : depuis les lignes de values() (listes) ou depuis
+    une instance déjà chargée (détail, via les mêmes lectures précalculées).
+    """
+
+    def __init__(self, serializer):
+        model = serializer.Meta.model
+        columns, getters, entries, binders = [], [], [], []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, ScopedProjectField):
+                # Projet de l'URL (route imbriquée) : le même pour tout le lot.
+                entries.append((name, None, False))
+                binders.append(lambda context: context["project"].name)
+                continue
+            column, getter, binder = compile_field(model, field)
+            if column not in columns:
+                columns.append(column)
+                getters.append(getter)
+            entries.append((name, columns.index(column), binder is not None))
+            if binder is not None:
+                binders.append(binder)
+        self.getters = getters
+        # Lues en fin de ligne : position de la pagination par curseur et validateur des listes
+        # (voir conditional.py), quand le modèle les a.
+        model_columns = {field.name for field in model._meta.concrete_fields}
+        self.columns = columns + [
+            column for column in dict.fromkeys(KeysetPagination.ordering + conditional.PAGE_COLUMNS)
+            if column not in columns and column in model_columns
+        ]
+        self.binders = binders
+        self.factory = generate_builder(entries)
+
+    def values(self, queryset):
+        # Lignes nommées : la pagination par curseur lit row.created_time et row.id,
+        # le validateur des listes row.updated_time.
+        return queryset.values_list(*self.columns, named=True)
+
+    def builder(self, context):
+        return self.factory(*(bind(context) for bind in self.binders))
+
+    def serialize_rows(self, rows, context):
+        return metrics.call_timed("serializer", self._serialize_rows, rows, context)
+
+    def serialize_instance(self, instance, context):
+        return metrics.call_timed("serializer", self._serialize_instance, instance, context)
+
+    def _serialize_rows(self, rows, context):
+        return list(map(self.builder(context), rows))
+
+    def _serialize_instance(self, instance, context):
+        return self.builder(context)([get(instance) for get in self.getters])
+
+
+def get_compiled(serializer_class, context):
+    """
+    Sérialiseur compilé de serializer_class, ou None (désactivé ou champ non reconnu).
+    Les champs dépendent du contexte (routes imbriquées, champs retenus par ?fields=, voir
+    sparse.py) : un sérialiseur compilé par jeu de clés et par sélection.
+    """
+    if not settings.SOFTDESK_COMPILED_READS:
+        return None
+    key = (serializer_class, frozenset(context), context.get(sparse.CONTEXT_KEY))
+    try:
+        return _compiled[key]
+    except KeyError:
+        pass
+    try:
+        compiled = CompiledSerializer(serializer_class(context=context))
+    except Unsupported:
+        compiled = None
+    _compiled[key] = compiled
+    return compiled
+
+
+class CompiledReadMixin:
+    """
+    Mixin de ViewSet : list et retrieve rendus par le sérialiseur compilé, s'il existe.
+    À placer après les mixins de cache et de requêtes conditionnelles, qui l'enveloppent.
+    """
+
+    # Données produites par le sérialiseur compilé : lues par FastJSONRenderer (voir renderers.py).
+    compiled_payload = False
+
+    def get_compiled_serializer(self):
+        if self.request.method not in SAFE_READ_METHODS:
+            return None
+        return get_compiled(self.get_serializer_class(), self.get_serializer_context())
+
+    def get_object_data(self, instance):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return self.get_serializer(instance).data
+        self.compiled_payload = True
+        return compiled.serialize_instance(instance, self.get_serializer_context())
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = compiled.values(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+        self.compiled_payload = True
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.serialize_rows(page, context))
+        return Response(compiled.serialize_rows(rows, context))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.get_object_data(self.get_object()))
@@ -0,0 +1,138 @@
+"""
+Requêtes conditionnelles (ETag / Last-Modified) pour les lectures de projets, issues et commentaires.
+
+- Détail : le validateur est le couple (id, updated_time) de l'objet. Si le client envoie
+  If-None-Match / If-Modified-Since, on lit d'abord ce seul couple (par clé primaire) :
+  s'il correspond, réponse 304 sans charger l'objet ni lancer le sérialiseur.
+- Liste : le validateur est celui de la page rendue, les couples (id, updated_time) de ses lignes
+  et ses métadonnées (count, next, previous), calculé depuis les lignes déjà lues : aucune requête
+  de plus pour une réponse 200, et aucun COUNT(*) en pagination par curseur avec ?count=false.
+  Si le client envoie If-None-Match, la page est d'abord lue sur ces seules colonnes : si elle
+  correspond, réponse 304 sans lire les autres colonnes ni lancer le sérialiseur. Une suppression
+  ou un ajout modifie le total ou les lignes de la page : les listes n'ont pas de Last-Modified,
+  seul l'ETag fait foi.
+
+Les ETag sont "faibles" (W/) : ils identifient une représentation équivalente, pas des octets.
+Ils dépendent aussi de l'utilisateur, de l'URL complète (filtres, page) et du format de rendu.
+Limite : un changement de pseudo (auteur, assigné) n'est pas vu par ces validateurs.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+CONDITIONAL_HEADERS = ("HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE")
+# Colonnes d'une ligne de liste lues par le validateur (created_time : position du curseur)
+PAGE_COLUMNS = ("id", "created_time", "updated_time")
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def http_timestamp(moment):
+    """
+    Les dates HTTP sont à la seconde : If-Modified-Since seul ne distingue pas deux écritures
+    dans la même seconde (If-None-Match, prioritaire, les distingue).
+    """
+    return int(moment.timestamp()) if moment is not None else None
+
+
+def is_conditional(request):
+    return any(header in request.META for header in CONDITIONAL_HEADERS)
+
+
+def not_modified(http_request, etag, last_modified=None):
+    """
+    Renvoie la réponse 304 si les en-têtes conditionnels du client correspondent, sinon None.
+    """
+    response = get_conditional_response(http_request, etag=etag, last_modified=http_timestamp(last_modified))
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(http_timestamp(last_modified))
+    # Réponse propre à l'utilisateur, à revalider à chaque usage (via If-None-Match).
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Authorization"])
+
+
+def list_etag(view_name, request, renderer_format, payload, rows):
+    """
+    payload : métadonnées de la page (count absent avec ?count=false), rows : ses lignes.
+    """
+    validators = ",".join(f"{row.id}:{row.updated_time.isoformat()}" for row in rows)
+    return make_etag(
+        view_name, request.user.id, request.get_full_path(), renderer_format,
+        payload.get("count"), payload.get("next"), payload.get("previous"), validators,
+    )
+
+
+def object_etag(view_name, pk, updated_time, renderer_format):
+    return make_etag(view_name, pk, updated_time.isoformat(), renderer_format)
+
+
+class ConditionalGetMixin:
+    """
+    Mixin de ViewSet : ETag / Last-Modified sur retrieve et list, 304 si le client est à jour.
+    Le modèle doit avoir un champ updated_time (auto_now). Le détail est rendu par
+    get_object_data (voir compiled.CompiledReadMixin).
+    """
+
+    # Lignes de la dernière page lue (instances ou lignes nommées de values_list)
+    page_rows = None
+
+    def object_etag(self, request, pk, updated_time):
+        return object_etag(self.__class__.__name__, pk, updated_time, request.accepted_renderer.format)
+
+    def list_etag(self, request, rows):
+        payload = self.get_paginated_response([]).data
+        return list_etag(self.__class__.__name__, request, request.accepted_renderer.format, payload, rows)
+
+    def paginate_queryset(self, queryset):
+        self.page_rows = super().paginate_queryset(queryset)
+        return self.page_rows
+
+    def retrieve(self, request, *args, **kwargs):
+        if is_conditional(request):
+            # Le queryset est déjà restreint aux projets de l'utilisateur : en lecture, les
+            # permissions objet ne peuvent rien refuser de plus. Une seule requête, par clé primaire.
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            row = (
+                self.filter_queryset(self.get_queryset())
+                .filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+                .values_list("pk", "updated_time")
+                .first()
+            )
+            if row is not None:
+                response = not_modified(request._request, self.object_etag(request, *row), row[1])
+                if response is not None:
+                    return response
+
+        instance = self.get_object()
+        response = Response(self.get_object_data(instance))
+        set_validators(
+            response, self.object_etag(request, instance.pk, instance.updated_time), instance.updated_time
+        )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if is_conditional(request):
+            queryset = self.filter_queryset(self.get_queryset()).values_list(*PAGE_COLUMNS, named=True)
+            rows = self.paginate_queryset(queryset)
+            if rows is not None:
+                response = not_modified(request._request, self.list_etag(request, rows))
+                if response is not None:
+                    return response
+
+        response = super().list(request, *args, **kwargs)
+        if self.page_rows is not None:
+            set_validators(response, self.list_etag(request, self.page_rows))
+        return response
@@ -0,0 +1,241 @@
+"""
+Flux d'événements d'un projet (Server-Sent Events), à la place de la relecture périodique des listes.
+
+Les signaux (voir signals.py) publient un événement court après le commit de chaque écriture
+sur une issue, un commentaire ou un contributeur du projet :
+
+    event: issue.updated
+    data: {"model": "issue", "action": "updated", "id": 12, "project": 3}
+
+Le client relit ce qui l'intéresse ; l'événement ne transporte que des identifiants.
+
+Diffusion : un courtier (SOFTDESK_EVENTS_BACKEND) remet chaque événement aux abonnés du projet.
+- LocalEventBroker (défaut) : abonnés du processus courant, sans dépendance.
+- RedisEventBroker : PUBLISH / PSUBSCRIBE Redis, pour plusieurs workers (paquet redis requis) ;
+  un seul thread d'écoute par processus, qui alimente le courtier local.
+
+Un abonné est une file asyncio bornée (SOFTDESK_EVENTS_QUEUE_SIZE) lue par la boucle
+d'événements : aucun thread par connexion. Contre-pression : un client trop lent dont la file
+déborde reçoit l'événement "overflow" puis la connexion est fermée ; il doit relire ses listes.
+Un commentaire SSE est envoyé toutes les SOFTDESK_EVENTS_HEARTBEAT secondes sans événement
+(les proxys ferment les connexions muettes, et une connexion coupée est ainsi détectée).
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+# Fin de flux : file débordée (contre-pression).
+OVERFLOW = object()
+
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_HEARTBEAT = 15
+# Délai de reconnexion suggéré au client (directive SSE "retry", en millisecondes).
+RETRY_MS = 3000
+
+
+def make_event(model, action, pk, project_id, **extra):
+    return {"model": model, "action": action, "id": pk, "project": project_id, **extra}
+
+
+def event_name(event):
+    return f"{event['model']}.{event['action']}"
+
+
+def ends_stream(event, user_id):
+    """
+    Événements après lesquels le flux est fermé : projet supprimé, abonné retiré du projet.
+    """
+    if event["model"] == "project":
+        return event["action"] == DELETED
+    return event["model"] == "contributor" and event["action"] == DELETED and event.get("user") == user_id
+
+
+def format_event(event):
+    return f"event: {event_name(event)}\ndata: {json.dumps(event)}\n\n"
+
+
+class Subscription:
+    """
+    Abonnement d'une connexion aux événements d'un projet. Créé dans la boucle d'événements
+    de la connexion : les événements y sont remis par call_soon_threadsafe.
+    """
+
+    def __init__(self, project_id, max_size):
+        self.project_id = project_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_size)
+
+    def push(self, event):
+        # Appelé dans la boucle de l'abonné.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Client trop lent : on vide sa file, il ne recevra plus que la fin du flux.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalEventBroker:
+    """
+    Courtier en mémoire : remet les événements aux abonnés du processus courant.
+    publish() peut être appelé depuis n'importe quel thread (signaux, vues synchrones).
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, project_id, max_size=None):
+        subscription = Subscription(project_id, max_size or get_queue_size())
+        with self._lock:
+            self._subscriptions[project_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.project_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.project_id]
+
+    def subscriber_count(self, project_id=None):
+        with self._lock:
+            if project_id is not None:
+                return len(self._subscriptions.get(project_id, ()))
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, project_id, event):
+        self.deliver(project_id, event)
+
+    def deliver(self, project_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(project_id, ()))
+        # Un seul réveil par boucle d'événements, quel que soit le nombre d'abonnés.
+        by_loop = defaultdict(list)
+        for subscription in subscriptions:
+            by_loop[subscription.loop].append(subscription)
+        for loop, targets in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_push_all, targets, event)
+            except RuntimeError:
+                # Boucle fermée : ses abonnés sont partis.
+                pass
+
+
+def _push_all(subscriptions, event):
+    for subscription in subscriptions:
+        subscription.push(event)
+
+
+class RedisEventBroker(LocalEventBroker):
+    """
+    Diffusion entre processus par Redis (SOFTDESK_EVENTS_REDIS_URL). Chaque processus écoute
+    tous les canaux des projets dans un thread et remet les événements à ses abonnés locaux.
+    """
+
+    channel_prefix = "softdesk:events:"
+
+    def __init__(self):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured("RedisEventBroker nécessite le paquet 'redis'.") from exc
+        url = getattr(settings, "SOFTDESK_EVENTS_REDIS_URL", "redis://localhost:6379/0")
+        self._client = redis.Redis.from_url(url)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def publish(self, project_id, event):
+        self._client.publish(f"{self.channel_prefix}{project_id}", json.dumps(event))
+
+    def subscribe(self, project_id, max_size=None):
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="softdesk-events", daemon=True)
+                self._listener.start()
+        return super().subscribe(project_id, max_size)
+
+    def _listen(self):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f"{self.channel_prefix}*")
+        for message in pubsub.listen():
+            project_id = int(message["channel"].rsplit(b":", 1)[1])
+            self.deliver(project_id, json.loads(message["data"]))
+
+
+@lru_cache(maxsize=None)
+def _load_broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    return _load_broker(getattr(settings, "SOFTDESK_EVENTS_BACKEND", "projects.events.LocalEventBroker"))
+
+
+def get_queue_size():
+    return getattr(settings, "SOFTDESK_EVENTS_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)
+
+
+def get_heartbeat():
+    return getattr(settings, "SOFTDESK_EVENTS_HEARTBEAT", DEFAULT_HEARTBEAT)
+
+
+def publish(events):
+    """
+    Publie des événements [(id du projet, événement)] après le commit de la transaction en cours :
+    un abonné ne doit pas relire une écriture annulée, ni la manquer parce qu'elle n'est pas encore visible.
+    """
+    events = list(events)
+
+    def send():
+        broker = get_broker()
+        for project_id, event in events:
+            broker.publish(project_id, event)
+
+    if events:
+        transaction.on_commit(send)
+
+
+async def stream(project_id, user_id):
+    """
+    Corps de la réponse text/event-stream : événements du projet et battements de cœur,
+    jusqu'à la déconnexion du client (la tâche est alors annulée), un débordement de la file
+    ou un événement de fin (voir ends_stream).
+    """
+    broker = get_broker()
+    subscription = broker.subscribe(project_id)
+    heartbeat = get_heartbeat()
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat)
+            except TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if event is OVERFLOW:
+                yield "event: overflow\ndata: {}\n\n"
+                return
+            yield format_event(event)
+            if ends_stream(event, user_id):
+                return
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,158 @@
+"""
+Export complet d'un projet (Projet -> Contributeurs -> Issues -> Commentaires) en flux continu.
+
+- Les lignes sont lues avec values() : pas d'instanciation de modèles.
+- iterator(chunk_size=...) lit la base par paquets (curseur côté serveur quand le backend
+  le permet) : la mémoire reste constante quelle que soit la taille du projet.
+- Chaque enregistrement est envoyé dès qu'il est lu (StreamingHttpResponse) :
+  le premier octet part immédiatement.
+- Sous ASGI, le flux est un itérateur asynchrone : Django lirait un itérateur synchrone
+  en entier (sync_to_async(list)) avant d'envoyer le premier octet. Les lignes sont produites
+  par paquets de SOFTDESK_EXPORT_CHUNK_SIZE dans le thread de la base, puis envoyées.
+
+Formats :
+- "ndjson" : un objet JSON par ligne, avec une clé "record" (project, contributor, issue, comment).
+- "csv" : une ligne par enregistrement, colonnes communes à tous les types (cases vides sinon).
+"""
+
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .models import Contributor, Issue, Comment
+
+NDJSON = "ndjson"
+CSV = "csv"
+EXPORT_FORMATS = {
+    NDJSON: "application/x-ndjson",
+    CSV: "text/csv",
+}
+
+# Colonnes du format CSV (union des champs de tous les types d'enregistrements)
+CSV_COLUMNS = [
+    "record", "id", "name", "type", "project", "user", "issue", "title", "description",
+    "tag", "priority", "status", "author", "assignee", "created_time",
+]
+
+
+def get_chunk_size():
+    return getattr(settings, "SOFTDESK_EXPORT_CHUNK_SIZE", 2000)
+
+
+def _renamed(rows, record, renames):
+    """
+    Ajoute le type d'enregistrement et renomme les chemins ORM (ex: author__username -> author).
+    """
+    for row in rows:
+        out = {"record": record}
+        for key, value in row.items():
+            out[renames.get(key, key)] = value
+        yield out
+
+
+def export_records(project):
+    """
+    Génère les enregistrements (dictionnaires) du projet, dans l'ordre de dépendance :
+    projet, contributeurs, issues puis commentaires. Les références se font par nom/pseudo
+    (comme dans l'API) et par identifiant pour issue <- commentaire.
+    """
+    chunk_size = get_chunk_size()
+
+    yield {
+        "record": "project",
+        "id": project.pk,
+        "name": project.name,
+        "description": project.description,
+        "type": project.type,
+        "author": project.author.username,
+        "created_time": project.created_time,
+    }
+
+    contributors = (
+        Contributor.objects.filter(project_id=project.pk)
+        .order_by("id")
+        .values("id", "user__username", "created_time")
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in _renamed(contributors, "contributor", {"user__username": "user"}):
+        row["project"] = project.name
+        yield row
+
+    issues = (
+        Issue.objects.filter(project_id=project.pk)
+        .order_by("id")
+        .values(
+            "id", "title", "description", "tag", "priority", "status",
+            "author__username", "assignee__username", "created_time",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    renames = {"author__username": "author", "assignee__username": "assignee"}
+    for row in _renamed(issues, "issue", renames):
+        row["project"] = project.name
+        yield row
+
+    comments = (
+        Comment.objects.filter(project_id=project.pk)
+        .order_by("id")
+        .values("uuid", "description", "issue_id", "author__username", "created_time")
+        .iterator(chunk_size=chunk_size)
+    )
+    renames = {"uuid": "id", "issue_id": "issue", "author__username": "author"}
+    yield from _renamed(comments, "comment", renames)
+
+
+def _ndjson_lines(records):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for record in records:
+        yield encoder.encode(record) + "\n"
+
+
+class _Echo:
+    """
+    Pseudo-fichier pour csv.writer : renvoie la ligne écrite au lieu de la stocker.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(records):
+    writer = csv.DictWriter(_Echo(), fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    yield writer.writeheader()
+    for record in records:
+        row = {key: ("" if value is None else value) for key, value in record.items()}
+        if "created_time" in row and row["created_time"]:
+            row["created_time"] = row["created_time"].isoformat()
+        yield writer.writerow(row)
+
+
+async def _async_chunks(lines):
+    """
+    Itérateur asynchrone sur les lignes, par paquets (une requête SQL au plus par paquet).
+    Le générateur synchrone est toujours repris dans le même thread (sync_to_async, thread_sensitive) :
+    celui de la connexion à la base qui l'a ouvert.
+    """
+    chunk_size = get_chunk_size()
+    read_chunk = sync_to_async(lambda: "".join(islice(lines, chunk_size)))
+    while chunk := await read_chunk():
+        yield chunk
+
+
+def export_response(project, export_format, asynchronous=False):
+    """
+    Construit la réponse HTTP en flux continu pour le format demandé.
+    asynchronous : requête servie sous ASGI (flux asynchrone, voir plus haut).
+    """
+    records = export_records(project)
+    lines = _csv_lines(records) if export_format == CSV else _ndjson_lines(records)
+    if asynchronous:
+        lines = _async_chunks(lines)
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+    response["Content-Disposition"] = f'attachment; filename="project-{project.pk}.{export_format}"'
+    return response
@@ -0,0 +1,139 @@
+"""
+Filtres et tri de la liste des issues (GET /api/issues/).
+
+    ?project=3 (ou nom)            ?status=To Do,In Progress     ?priority=HIGH     ?tag=BUG
+    ?assignee=bob|me|none          ?author=alice|me
+    ?created_after=2024-01-01      ?created_before=2024-02-01T12:00
+    ?ordering=-priority,created_time
+
+Chaque combinaison courante est servie par un index composite de Issue.Meta
+(projet en tête : les vues "tableau" sont toujours celles d'un projet).
+"""
+
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from .models import Issue
+
+
+def _choice_values(choices):
+    return [value for value, _ in choices]
+
+
+class IssueFilterBackend(BaseFilterBackend):
+    """
+    Filtres de la liste des issues. Une valeur invalide renvoie une erreur 400 explicite
+    (plutôt qu'une liste vide silencieuse).
+    """
+
+    # Paramètre -> valeurs autorisées (plusieurs valeurs séparées par des virgules)
+    choice_filters = {
+        "status": _choice_values(Issue.STATUS_CHOICES),
+        "priority": _choice_values(Issue.PRIORITY_CHOICES),
+        "tag": _choice_values(Issue.TAG_CHOICES),
+    }
+    # Paramètre -> champ utilisateur (pseudo, "me" pour soi-même, "none" si facultatif)
+    user_filters = {"assignee": "assignee", "author": "author"}
+    nullable_user_filters = {"assignee"}
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        errors = {}
+        conditions = Q()
+
+        project = params.get("project")
+        if project:
+            conditions &= Q(project_id=project) if project.isdigit() else Q(project__name=project)
+
+        for param, allowed in self.choice_filters.items():
+            if param not in params:
+                continue
+            values = [value.strip() for value in params[param].split(",") if value.strip()]
+            invalid = [value for value in values if value not in allowed]
+            if invalid or not values:
+                errors[param] = f"Valeurs possibles : {', '.join(allowed)}."
+                continue
+            conditions &= Q(**{param: values[0]}) if len(values) == 1 else Q(**{f"{param}__in": values})
+
+        for param, field in self.user_filters.items():
+            username = params.get(param)
+            if not username:
+                continue
+            if username == "me":
+                conditions &= Q(**{f"{field}_id": request.user.id})
+            elif username == "none" and param in self.nullable_user_filters:
+                conditions &= Q(**{f"{field}__isnull": True})
+            else:
+                conditions &= Q(**{f"{field}__username": username})
+
+        for param, lookup in (("created_after", "gte"), ("created_before", "lt")):
+            if param not in params:
+                continue
+            moment = self.parse_moment(params[param])
+            if moment is None:
+                errors[param] = "Date invalide (format AAAA-MM-JJ ou AAAA-MM-JJTHH:MM)."
+                continue
+            conditions &= Q(**{f"created_time__{lookup}": moment})
+
+        if errors:
+            raise ValidationError(errors)
+        return queryset.filter(conditions)
+
+    @staticmethod
+    def parse_moment(value):
+        """
+        Date ou date-heure ISO 8601 ; une date seule désigne minuit (fuseau du projet).
+        """
+        try:
+            moment = parse_datetime(value)
+            if moment is None:
+                day = parse_date(value)
+                if day is None:
+                    return None
+                moment = datetime.combine(day, time.min)
+        except ValueError:
+            return None
+        if settings.USE_TZ and timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+
+class IssueOrderingFilter(OrderingFilter):
+    """
+    Tri de la liste des issues (?ordering=-priority,created_time).
+    La priorité et le statut sont triés dans leur ordre métier (LOW < MEDIUM < HIGH,
+    To Do < In Progress < Finished) et non par ordre alphabétique.
+    L'identifiant départage toujours les ex-aequo : l'ordre est stable d'une page à l'autre.
+    """
+
+    ordering_fields = ["created_time", "title", "priority", "status"]
+    ranked_fields = {
+        "priority": _choice_values(Issue.PRIORITY_CHOICES),
+        "status": _choice_values(Issue.STATUS_CHOICES),
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+
+        resolved = []
+        for term in ordering:
+            descending = term.startswith("-")
+            field = term.lstrip("-")
+            if field in self.ranked_fields:
+                alias = f"{field}_rank"
+                queryset = queryset.alias(**{alias: Case(
+                    *[When(**{field: value}, then=Value(rank))
+                      for rank, value in enumerate(self.ranked_fields[field])],
+                    output_field=IntegerField(),
+                )})
+                field = alias
+            resolved.append(f"-{field}" if descending else field)
+        return queryset.order_by(*resolved, "id")
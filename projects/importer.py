@@ -0,0 +1,424 @@
+"""
+Import en flux continu d'un fichier NDJSON (utilisateurs, projets, contributeurs, issues,
+commentaires), utilisé par la commande `manage.py import_ndjson`.
+
+Le format est celui de l'export (voir export.py), complété par des enregistrements "user" :
+
+    {"record": "user", "username": "alice", "email": "...", "password": "..."}
+    {"record": "project", "name": "SoftDesk", "type": "back-end", "author": "alice"}
+    {"record": "contributor", "project": "SoftDesk", "user": "bob"}
+    {"record": "issue", "id": 12, "project": "SoftDesk", "title": "...", "author": "alice", ...}
+    {"record": "comment", "issue": 12, "description": "...", "author": "bob"}
+
+Principes :
+- Lecture ligne par ligne : la mémoire dépend de la taille des lots, pas du fichier.
+- Écriture par lots (bulk_create) de taille configurable, une transaction par lot.
+- Correspondances en mémoire pseudo -> id, nom de projet -> id, id d'issue source -> id créé :
+  aucune requête par ligne (les noms inconnus d'un lot sont résolus en une requête).
+- Mots de passe : hachage parallèle dans un pool de processus (le hachage est volontairement
+  lent), ou reprise telle quelle d'un hash Django déjà calculé ("password_hash").
+- Validation de chaque enregistrement avant écriture, comme par l'API : champs du modèle
+  (choix, longueurs, formats) par full_clean sans requête (relations résolues par les
+  correspondances, unicité garantie par la base), et règle d'assignation de IssueSerializer
+  (l'assigné est membre du projet, appartenances lues une fois par lot). Une ligne invalide
+  est signalée dans le rapport et n'est pas écrite.
+- Utilisateurs : mêmes règles que l'inscription par l'API (pseudo et e-mail normalisés comme
+  par create_user, date de naissance aux formats de UserSerializer et âge minimal de 15 ans).
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import TextField
+from rest_framework import serializers
+
+from authentication.models import User
+from authentication.serializers import UserSerializer
+from . import membership
+from .models import Project, Contributor, Issue, Comment
+from .signals import bulk_created
+
+# Ordre de dépendance : un lot n'est écrit qu'après les lots dont il dépend.
+RECORD_TYPES = ("user", "project", "contributor", "issue", "comment")
+
+# Nombre maximal d'erreurs détaillées conservées pour le rapport
+MAX_REPORTED_ERRORS = 20
+
+
+def _init_hash_worker():
+    """
+    Initialise Django dans les processus du pool (nécessaire en mode "spawn" : macOS, Windows).
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+
+
+class ImportStats:
+    """
+    Compteurs de l'import : lignes lues, objets créés/ignorés par type, durée.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.lines = 0
+        self.created = dict.fromkeys(RECORD_TYPES, 0)
+        self.skipped = 0
+        self.errors = []
+
+    def error(self, line_number, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"ligne {line_number} : {message}")
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def throughput(self):
+        elapsed = self.elapsed or 1e-9
+        return {
+            "lines_per_second": round(self.lines / elapsed, 1),
+            "objects_per_second": round(sum(self.created.values()) / elapsed, 1),
+        }
+
+
+class NDJSONImporter:
+    """
+    Importe des enregistrements NDJSON par lots.
+
+    - chunk_size : nombre d'enregistrements d'un même type écrits par bulk_create.
+    - hash_workers : nombre de processus de hachage des mots de passe (0 = séquentiel).
+    """
+
+    def __init__(self, chunk_size=1000, hash_workers=None):
+        self.chunk_size = chunk_size
+        self.hash_workers = os.cpu_count() if hash_workers is None else hash_workers
+        self.stats = ImportStats()
+        self.buffers = {record_type: [] for record_type in RECORD_TYPES}
+        # Correspondances en mémoire (remplies au fil des lots)
+        self.user_ids = {}
+        self.project_ids = {}
+        self.issue_ids = {}
+        # Projet de chaque issue importée (les commentaires portent le projet de leur issue)
+        self.issue_projects = {}
+        self._executor = None
+        # Règles de validation de l'inscription (voir clean_user)
+        self.user_serializer = UserSerializer()
+
+    # -- Entrée --
+
+    def run(self, lines):
+        """
+        Importe un itérable de lignes NDJSON et renvoie les statistiques.
+        """
+        try:
+            for line_number, line in enumerate(lines, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                self.stats.lines += 1
+                try:
+                    record = json.loads(line)
+                    record_type = record["record"]
+                    if record_type not in self.buffers:
+                        raise ValueError(f"type d'enregistrement inconnu '{record_type}'")
+                except (ValueError, KeyError, TypeError) as exc:
+                    self.stats.error(line_number, f"enregistrement invalide ({exc})")
+                    continue
+                self.add(record_type, line_number, record)
+            self.flush_all()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+        return self.stats
+
+    def add(self, record_type, line_number, record):
+        buffer = self.buffers[record_type]
+        buffer.append((line_number, record))
+        if len(buffer) >= self.chunk_size:
+            self.flush(record_type)
+
+    def flush_all(self):
+        for record_type in RECORD_TYPES:
+            self.flush(record_type)
+
+    def flush(self, record_type):
+        """
+        Écrit le lot d'un type, après avoir écrit les lots des types dont il dépend.
+        """
+        for dependency in RECORD_TYPES[:RECORD_TYPES.index(record_type)]:
+            if self.buffers[dependency]:
+                self.flush(dependency)
+        buffer = self.buffers[record_type]
+        if not buffer:
+            return
+        self.buffers[record_type] = []
+        getattr(self, f"import_{record_type}s")(buffer)
+
+    # -- Résolution des références (une requête par lot pour les noms inconnus) --
+
+    def resolve_users(self, usernames):
+        missing = {name for name in usernames if name and name not in self.user_ids}
+        if missing:
+            self.user_ids.update(
+                User.objects.filter(username__in=missing).values_list("username", "id")
+            )
+
+    def resolve_projects(self, names):
+        missing = {name for name in names if name and name not in self.project_ids}
+        if missing:
+            self.project_ids.update(
+                Project.objects.filter(name__in=missing).values_list("name", "id")
+            )
+
+    def is_valid(self, line_number, instance, exclude):
+        """
+        Valide les champs de l'objet (hors relations `exclude`) ; signale l'erreur sinon.
+        """
+        errors = {}
+        try:
+            instance.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+        except ValidationError as exc:
+            errors = exc.message_dict
+        # Comme les sérialiseurs de l'API : la longueur d'un TextField est bornée (max_length),
+        # ce que full_clean ne vérifie pas.
+        for field in instance._meta.concrete_fields:
+            value = getattr(instance, field.attname)
+            if (
+                isinstance(field, TextField) and field.max_length
+                and isinstance(value, str) and len(value) > field.max_length
+            ):
+                errors.setdefault(field.name, []).append(f"au plus {field.max_length} caractères.")
+        if not errors:
+            return True
+        details = "; ".join(f"{field} : {' '.join(messages)}" for field, messages in errors.items())
+        self.stats.error(line_number, f"{instance._meta.model_name} invalide ({details})")
+        return False
+
+    def save(self, model, record_type, instances):
+        if not instances:
+            return []
+        with transaction.atomic():
+            created = model.objects.bulk_create(instances, batch_size=self.chunk_size)
+            bulk_created.send(sender=model, instances=created)
+        self.stats.created[record_type] += len(created)
+        return created
+
+    # -- Mots de passe --
+
+    def hash_passwords(self, passwords):
+        """
+        Hache une liste de mots de passe en clair, en parallèle si possible.
+        """
+        if self.hash_workers <= 1 or len(passwords) < 2:
+            return [make_password(password) for password in passwords]
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.hash_workers, initializer=_init_hash_worker
+            )
+        chunksize = max(1, len(passwords) // (self.hash_workers * 4))
+        return list(self._executor.map(make_password, passwords, chunksize=chunksize))
+
+    # -- Import par type --
+
+    def clean_user(self, record):
+        """
+        Règles de l'inscription par l'API : e-mail normalisé comme par create_user, formats
+        de date et âge minimal de UserSerializer (serializers.ValidationError si refusée).
+        """
+        birth_date = record.get("birth_date") or None
+        if birth_date is not None:
+            birth_date = self.user_serializer.validate_birth_date(
+                self.user_serializer.fields["birth_date"].run_validation(birth_date)
+            )
+        return {
+            **record,
+            "email": User.objects.normalize_email(record.get("email", "")),
+            "birth_date": birth_date,
+        }
+
+    def import_users(self, buffer):
+        # Pseudo normalisé comme par create_user, avant la recherche des doublons.
+        buffer = [
+            (line_number, {**record, "username": User.normalize_username(record.get("username") or "")})
+            for line_number, record in buffer
+        ]
+        self.resolve_users(record["username"] for _, record in buffer)
+
+        rows, plain = [], []
+        for line_number, record in buffer:
+            username = record["username"]
+            if not username:
+                self.stats.error(line_number, "utilisateur sans 'username'")
+                continue
+            if username in self.user_ids:
+                # Utilisateur déjà présent (en base ou plus haut dans le fichier) : on le réutilise.
+                continue
+            try:
+                record = self.clean_user(record)
+            except serializers.ValidationError as exc:
+                self.stats.error(
+                    line_number, f"utilisateur '{username}' invalide (birth_date : {' '.join(exc.detail)})"
+                )
+                continue
+            password_hash = record.get("password_hash")
+            if password_hash:
+                try:
+                    identify_hasher(password_hash)
+                except ValueError:
+                    self.stats.error(line_number, f"hash de mot de passe non reconnu pour '{username}'")
+                    continue
+            # Réservé pendant le lot pour ignorer les doublons du fichier
+            self.user_ids[username] = None
+            rows.append((line_number, record, password_hash))
+            if not password_hash:
+                plain.append(record.get("password"))
+
+        # Les mots de passe absents donnent un mot de passe inutilisable (make_password(None)).
+        hashed = iter(self.hash_passwords(plain))
+        users = []
+        for line_number, record, password_hash in rows:
+            user = User(
+                username=record["username"],
+                password=password_hash or next(hashed),
+                email=record.get("email", ""),
+                first_name=record.get("first_name", ""),
+                last_name=record.get("last_name", ""),
+                birth_date=record.get("birth_date"),
+                can_be_contacted=record.get("can_be_contacted", False),
+                can_data_be_shared=record.get("can_data_be_shared", False),
+            )
+            if self.is_valid(line_number, user, exclude=["password"]):
+                users.append(user)
+            else:
+                del self.user_ids[user.username]
+        for user in self.save(User, "user", users):
+            self.user_ids[user.username] = user.pk
+
+    def import_projects(self, buffer):
+        self.resolve_projects(record.get("name") for _, record in buffer)
+        self.resolve_users(record.get("author") for _, record in buffer)
+
+        projects = []
+        for line_number, record in buffer:
+            name, author_id = record.get("name"), self.user_ids.get(record.get("author"))
+            if not name or name in self.project_ids:
+                # Projet sans nom, ou déjà présent : on réutilise l'existant.
+                if not name:
+                    self.stats.error(line_number, "projet sans 'name'")
+                continue
+            if author_id is None:
+                self.stats.error(line_number, f"auteur inconnu '{record.get('author')}'")
+                continue
+            project = Project(
+                name=name, description=record.get("description", ""),
+                type=record.get("type", ""), author_id=author_id,
+            )
+            if not self.is_valid(line_number, project, exclude=["author"]):
+                continue
+            self.project_ids[name] = None
+            projects.append(project)
+
+        created = self.save(Project, "project", projects)
+        for project in created:
+            self.project_ids[project.name] = project.pk
+        # Comme ProjectViewSet.perform_create : l'auteur est contributeur de son projet
+        # (projet tout juste créé : aucun contributeur existant).
+        self.save(Contributor, "contributor", [
+            Contributor(user_id=project.author_id, project_id=project.pk) for project in created
+        ])
+
+    def import_contributors(self, buffer):
+        self.resolve_projects(record.get("project") for _, record in buffer)
+        self.resolve_users(record.get("user") for _, record in buffer)
+
+        pairs = []
+        for line_number, record in buffer:
+            project_id = self.project_ids.get(record.get("project"))
+            user_id = self.user_ids.get(record.get("user"))
+            if project_id is None or user_id is None:
+                self.stats.error(line_number, "contributeur : projet ou utilisateur inconnu")
+                continue
+            pairs.append((user_id, project_id))
+
+        # Les doublons (en base, dont l'auteur déjà ajouté, ou plus haut dans le lot) sont écartés
+        # avant l'écriture : seuls les contributeurs réellement créés sont comptés et signalés.
+        existing = set(
+            Contributor.objects.filter(
+                user_id__in={user_id for user_id, _ in pairs},
+                project_id__in={project_id for _, project_id in pairs},
+            ).values_list("user_id", "project_id")
+        )
+        contributors = []
+        for user_id, project_id in pairs:
+            if (user_id, project_id) not in existing:
+                existing.add((user_id, project_id))
+                contributors.append(Contributor(user_id=user_id, project_id=project_id))
+        self.save(Contributor, "contributor", contributors)
+
+    def import_issues(self, buffer):
+        self.resolve_projects(record.get("project") for _, record in buffer)
+        self.resolve_users(
+            name for _, record in buffer for name in (record.get("author"), record.get("assignee"))
+        )
+
+        members = membership.member_pairs(
+            self.project_ids.get(record.get("project")) for _, record in buffer if record.get("assignee")
+        )
+
+        issues, sources = [], []
+        for line_number, record in buffer:
+            project_id = self.project_ids.get(record.get("project"))
+            author_id = self.user_ids.get(record.get("author"))
+            if project_id is None or author_id is None:
+                self.stats.error(line_number, "issue : projet ou auteur inconnu")
+                continue
+            assignee, assignee_id = record.get("assignee"), None
+            if assignee:
+                assignee_id = self.user_ids.get(assignee)
+                # Règle de IssueSerializer.validate : l'assigné est membre du projet.
+                if (assignee_id, project_id) not in members:
+                    self.stats.error(
+                        line_number, f"issue : l'utilisateur '{assignee}' ne fait pas partie du projet"
+                    )
+                    continue
+            issue = Issue(
+                title=record.get("title", ""), description=record.get("description", ""),
+                tag=record.get("tag", "TASK"), priority=record.get("priority", "LOW"),
+                status=record.get("status") or "To Do", project_id=project_id,
+                author_id=author_id, assignee_id=assignee_id,
+            )
+            if not self.is_valid(line_number, issue, exclude=["project", "author", "assignee"]):
+                continue
+            issues.append(issue)
+            sources.append(record.get("id"))
+
+        for source_id, issue in zip(sources, self.save(Issue, "issue", issues)):
+            if source_id is not None:
+                self.issue_ids[source_id] = issue.pk
+                self.issue_projects[issue.pk] = issue.project_id
+
+    def import_comments(self, buffer):
+        self.resolve_users(record.get("author") for _, record in buffer)
+
+        comments = []
+        for line_number, record in buffer:
+            issue_id = self.issue_ids.get(record.get("issue"))
+            author_id = self.user_ids.get(record.get("author"))
+            if issue_id is None or author_id is None:
+                self.stats.error(line_number, "commentaire : issue ou auteur inconnu")
+                continue
+            comment = Comment(
+                description=record.get("description", ""), issue_id=issue_id,
+                project_id=self.issue_projects[issue_id], author_id=author_id,
+            )
+            if self.is_valid(line_number, comment, exclude=["issue", "project", "author"]):
+                comments.append(comment)
+        self.save(Comment, "comment", comments)
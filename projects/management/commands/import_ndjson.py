@@ -0,0 +1,74 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.importer import NDJSONImporter
+
+
+class Command(BaseCommand):
+    """
+    Import en masse d'un fichier NDJSON (format de l'export, voir projects/importer.py).
+
+    Exemples :
+        python manage.py import_ndjson data.ndjson
+        python manage.py import_ndjson - --chunk-size 5000 < data.ndjson
+        python manage.py import_ndjson data.ndjson --hash-workers 0
+    """
+
+    help = (
+        "Importe des utilisateurs, projets, contributeurs, issues et commentaires depuis un fichier NDJSON. "
+        "Les utilisateurs suivent les règles de l'inscription (pseudo et e-mail normalisés, âge minimal de 15 ans)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Fichier NDJSON à importer ('-' pour l'entrée standard).")
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Nombre d'enregistrements d'un même type écrits par lot (défaut : 1000).",
+        )
+        parser.add_argument(
+            "--hash-workers", type=int, default=None,
+            help="Processus de hachage des mots de passe (défaut : nombre de CPU, 0 = séquentiel).",
+        )
+        parser.add_argument(
+            "--json", action="store_true",
+            help="Affiche le rapport au format JSON.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size doit être strictement positif.")
+
+        importer = NDJSONImporter(
+            chunk_size=options["chunk_size"], hash_workers=options["hash_workers"]
+        )
+        if options["path"] == "-":
+            stats = importer.run(sys.stdin)
+        else:
+            try:
+                with open(options["path"], encoding="utf-8") as source:
+                    stats = importer.run(source)
+            except OSError as exc:
+                raise CommandError(f"Impossible de lire '{options['path']}' : {exc}")
+
+        report = {
+            "lines": stats.lines,
+            "created": stats.created,
+            "skipped": stats.skipped,
+            "elapsed_seconds": round(stats.elapsed, 3),
+            **stats.throughput(),
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(report))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"{stats.lines} lignes lues en {report['elapsed_seconds']} s "
+                f"({report['lines_per_second']} lignes/s, {report['objects_per_second']} objets/s)."
+            ))
+            for record_type, count in stats.created.items():
+                self.stdout.write(f"  {record_type:<12} {count:>8} créé(s)")
+            if stats.skipped:
+                self.stdout.write(self.style.WARNING(f"  {stats.skipped} enregistrement(s) ignoré(s) :"))
+        for message in stats.errors:
+            self.stderr.write(f"  {message}")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from projects import stats
+
+
+class Command(BaseCommand):
+    """
+    Recalcule les compteurs du tableau de bord depuis les tables sources (voir projects/stats.py).
+    À lancer si des données ont été modifiées sans passer par les modèles (SQL brut, QuerySet.update).
+
+    Exemples :
+        python manage.py rebuild_project_stats
+        python manage.py rebuild_project_stats --project 3 --project 7
+    """
+
+    help = "Recalcule les compteurs dénormalisés des projets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project", type=int, action="append", dest="projects",
+            help="Identifiant d'un projet à recalculer (répétable, tous par défaut).",
+        )
+
+    def handle(self, *args, **options):
+        count = stats.rebuild(options["projects"])
+        self.stdout.write(self.style.SUCCESS(f"Compteurs recalculés pour {count} projet(s)."))
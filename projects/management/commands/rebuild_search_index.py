@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from projects.search import get_backend
+
+
+class Command(BaseCommand):
+    """
+    Reconstruit l'index de recherche depuis les issues et commentaires (voir projects/search.py).
+    À lancer si des données ont été modifiées sans passer par les modèles (SQL brut, QuerySet.update).
+    """
+
+    help = "Reconstruit l'index de recherche plein texte."
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Index reconstruit ({type(backend).__name__})."))
@@ -0,0 +1,91 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects import replay
+
+
+class Command(BaseCommand):
+    """
+    Rejeu d'un trafic enregistré (JSONL : method, path, body, user, timestamp ; voir
+    projects/replay.py). Les écritures sont réelles : rejouer sur une copie de la base.
+
+    Exemples :
+        python manage.py replay_traffic trafic.jsonl --concurrency 16
+        python manage.py replay_traffic trafic.jsonl --mode asyncio --concurrency 50
+        python manage.py replay_traffic trafic.jsonl --speed 10 --json
+    """
+
+    help = "Rejoue des requêtes enregistrées et mesure temps et erreurs par point d'entrée."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Fichier JSONL des requêtes enregistrées.")
+        parser.add_argument(
+            "--concurrency", type=int, default=8,
+            help="Nombre de clients simultanés (défaut : 8).",
+        )
+        parser.add_argument(
+            "--mode", choices=replay.MODES, default="threads",
+            help="Threads (gestionnaire WSGI) ou asyncio (gestionnaire ASGI) (défaut : threads).",
+        )
+        parser.add_argument(
+            "--speed", type=float, default=None,
+            help="Rejoue à l'échelle du temps d'origine, accéléré d'autant (ex. 10 : dix fois plus vite).",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=None,
+            help="Ne rejoue que les N premières requêtes.",
+        )
+        parser.add_argument(
+            "--json", action="store_true",
+            help="Affiche le rapport au format JSON.",
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency doit être strictement positif.")
+        if options["speed"] is not None and options["speed"] <= 0:
+            raise CommandError("--speed doit être strictement positif.")
+        try:
+            with open(options["path"], encoding="utf-8") as source:
+                records = replay.load(source)
+        except OSError as exc:
+            raise CommandError(f"Impossible de lire '{options['path']}' : {exc}")
+        except ValueError as exc:
+            raise CommandError(f"Fichier invalide, {exc}")
+        records = records[:options["limit"]]
+        if not records:
+            raise CommandError("Aucune requête à rejouer.")
+
+        try:
+            tokens = replay.mint_tokens(record["user"] for record in records)
+            replayer = replay.Replayer(
+                records, tokens, concurrency=options["concurrency"], mode=options["mode"],
+                speed=options["speed"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc).capitalize())
+        report = replayer.run().report()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['requests']} requêtes en {report['elapsed_seconds']} s "
+            f"({report['requests_per_second']} req/s), p50 {report['p50_ms']} ms, "
+            f"p95 {report['p95_ms']} ms, p99 {report['p99_ms']} ms, {report['errors']} erreur(s)."
+        ))
+        if "start_delay" in report:
+            delay = report["start_delay"]
+            self.stdout.write(f"  Attente avant traitement : p95 {delay['p95_ms']} ms, max {delay['max_ms']} ms")
+        for endpoint in report["endpoints"]:
+            line = (
+                f"  {endpoint['endpoint']:<36} {endpoint['requests']:>7} req "
+                f"p50 {endpoint['p50_ms']:>9} ms  p95 {endpoint['p95_ms']:>9} ms  p99 {endpoint['p99_ms']:>9} ms"
+            )
+            if endpoint["errors"]:
+                errors = ", ".join(f"{status}: {count}" for status, count in endpoint["statuses"].items()
+                                   if int(status) >= 400)
+                self.stdout.write(self.style.WARNING(f"{line}  erreurs {errors}"))
+            else:
+                self.stdout.write(line)
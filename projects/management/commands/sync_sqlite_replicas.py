@@ -0,0 +1,33 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    """
+    Copie la base SQLite principale dans les fichiers des réplicas (SOFTDESK_DB_REPLICAS,
+    voir config/replicas.py) : deux fichiers SQLite simulent en local une base répliquée.
+    La copie (API de sauvegarde de SQLite) est cohérente même pendant des écritures ;
+    relancer la commande simule le rattrapage du retard de réplication.
+    """
+
+    help = "Copie la base SQLite principale dans les réplicas en lecture."
+
+    def handle(self, *args, **options):
+        if not settings.SOFTDESK_READ_REPLICAS:
+            raise CommandError("Aucun réplica configuré (variable SOFTDESK_DB_REPLICAS).")
+        primary = connections["default"].settings_dict
+        if primary["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("Commande réservée au profil SQLite.")
+        with sqlite3.connect(primary["NAME"]) as source:
+            for alias in settings.SOFTDESK_READ_REPLICAS:
+                replica = connections[alias]
+                replica.close()
+                target = sqlite3.connect(replica.settings_dict["NAME"])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(self.style.SUCCESS(f"{alias} : {replica.settings_dict['NAME']}"))
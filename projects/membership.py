@@ -0,0 +1,256 @@
+"""
+Cache des appartenances (utilisateur, projet) utilisé par les permissions.
+
+Deux niveaux :
+- Un mémo attaché à la requête HTTP : une même requête ne refait jamais la même vérification.
+- Un cache partagé entre les requêtes (framework de cache Django, alias configurable),
+  avec expiration (TIMEOUT) et éviction LRU.
+
+Le cache partagé est invalidé par les signaux de projects/signals.py lorsqu'un Contributor
+est créé/supprimé ou que l'auteur (ou le nom) d'un projet change. L'invalidation est faite
+dans le processus qui écrit : avec plusieurs processus serveur, le cache doit être commun
+à tous (fichiers, Redis...), ce que vérifie cache_backends.check_shared_caches au démarrage.
+
+Les lectures qui alimentent le cache partagé se font sur la base principale, même pendant
+une requête servie par un réplica (voir config/replicas.py) : un réplica en retard y remettrait
+un rôle révoqué pour toute la durée du TIMEOUT, dans tous les processus.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Exists, OuterRef
+
+from authentication.authentication import cache_aget, cache_aset
+
+# Rôles possibles d'un utilisateur sur un projet
+ROLE_AUTHOR = "author"
+ROLE_CONTRIBUTOR = "contributor"
+ROLE_NONE = ""
+
+# Attribut utilisé pour stocker le mémo sur l'objet HttpRequest
+REQUEST_MEMO_ATTR = "_softdesk_membership_memo"
+
+
+def _shared_cache():
+    """
+    Renvoie le cache partagé, ou None s'il est désactivé (SOFTDESK_MEMBERSHIP_CACHE_ALIAS = None).
+    """
+    alias = getattr(settings, "SOFTDESK_MEMBERSHIP_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def _request_memo(request):
+    """
+    Renvoie le dictionnaire de mémoïsation de la requête (ou un dictionnaire jetable).
+    On le range sur le HttpRequest Django sous-jacent, partagé par tous les appels d'une requête DRF.
+    """
+    if request is None:
+        return {}
+    http_request = getattr(request, "_request", request)
+    memo = getattr(http_request, REQUEST_MEMO_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(http_request, REQUEST_MEMO_ATTR, memo)
+    return memo
+
+
+def role_cache_key(user_id, project_id):
+    return f"softdesk:membership:{user_id}:{project_id}"
+
+
+def project_name_cache_key(name):
+    return f"softdesk:project-name:{name}"
+
+
+def _role_query(user_id, project_id):
+    """
+    Rôle en base de données, en une seule requête (auteur + EXISTS sur Contributor).
+    """
+    # Import local : ce module est importé par les permissions et les signaux.
+    from .models import Project, Contributor
+
+    return (
+        Project.objects.using(DEFAULT_DB_ALIAS).filter(pk=project_id)
+        .annotate(
+            is_contributor=Exists(
+                Contributor.objects.filter(project=OuterRef("pk"), user_id=user_id)
+            )
+        )
+        .values_list("author_id", "is_contributor")
+    )
+
+
+def _role_from_row(row, user_id):
+    if row is None:
+        return ROLE_NONE
+    author_id, is_contributor = row
+    if author_id == user_id:
+        return ROLE_AUTHOR
+    return ROLE_CONTRIBUTOR if is_contributor else ROLE_NONE
+
+
+def _fetch_role(user_id, project_id):
+    return _role_from_row(_role_query(user_id, project_id).first(), user_id)
+
+
+def get_role(request, user_id, project_id):
+    """
+    Renvoie le rôle de l'utilisateur sur le projet : ROLE_AUTHOR, ROLE_CONTRIBUTOR ou ROLE_NONE.
+    Ordre de recherche : mémo de la requête -> cache partagé -> base de données.
+    """
+    memo = _request_memo(request)
+    memo_key = ("role", user_id, project_id)
+    if memo_key in memo:
+        return memo[memo_key]
+
+    cache = _shared_cache()
+    key = role_cache_key(user_id, project_id)
+    role = cache.get(key) if cache is not None else None
+
+    if role is None:
+        role = _fetch_role(user_id, project_id)
+        if cache is not None:
+            cache.set(key, role)
+
+    memo[memo_key] = role
+    return role
+
+
+async def aget_role(request, user_id, project_id):
+    """
+    Variante asynchrone de get_role() pour les vues ASGI (voir async_views.py) :
+    même mémo, même cache partagé, requête par l'ORM asynchrone.
+    """
+    memo = _request_memo(request)
+    memo_key = ("role", user_id, project_id)
+    if memo_key in memo:
+        return memo[memo_key]
+
+    cache = _shared_cache()
+    key = role_cache_key(user_id, project_id)
+    role = await cache_aget(cache, key) if cache is not None else None
+
+    if role is None:
+        role = _role_from_row(await _role_query(user_id, project_id).afirst(), user_id)
+        if cache is not None:
+            await cache_aset(cache, key, role)
+
+    memo[memo_key] = role
+    return role
+
+
+def is_member(request, user_id, project_id):
+    """
+    Vrai si l'utilisateur est contributeur ou auteur du projet.
+    """
+    return get_role(request, user_id, project_id) != ROLE_NONE
+
+
+def is_author(request, user_id, project_id):
+    return get_role(request, user_id, project_id) == ROLE_AUTHOR
+
+
+def get_project_id(request, name):
+    """
+    Résout le nom (unique) d'un projet en identifiant, avec le même mémo/cache que les rôles.
+    Renvoie None si le projet n'existe pas.
+    """
+    from .models import Project
+
+    memo = _request_memo(request)
+    memo_key = ("project", name)
+    if memo_key in memo:
+        return memo[memo_key]
+
+    cache = _shared_cache()
+    key = project_name_cache_key(name)
+    project_id = cache.get(key) if cache is not None else None
+
+    if project_id is None:
+        project_ids = Project.objects.using(DEFAULT_DB_ALIAS).filter(name=name).values_list("id", flat=True)
+        project_id = project_ids.first()
+        # On ne met pas en cache les projets inexistants : ils peuvent être créés à tout moment.
+        if cache is not None and project_id is not None:
+            cache.set(key, project_id)
+
+    memo[memo_key] = project_id
+    return project_id
+
+
+def get_scoped_project(request, project_id):
+    """
+    Charge le projet d'une route imbriquée (/api/projects/{id}/...) et le rôle de l'utilisateur,
+    en une seule requête. Le rôle est mémorisé comme par get_role() : les permissions et la
+    validation qui le redemandent pendant la requête ne refont aucune requête.
+    Renvoie None si le projet n'existe pas ou si l'utilisateur n'en est pas membre.
+    """
+    from .models import Project, Contributor
+
+    user_id = request.user.id
+    memo = _request_memo(request)
+    memo_key = ("scoped-project", project_id)
+    if memo_key in memo:
+        return memo[memo_key]
+
+    project = (
+        Project.objects.using(DEFAULT_DB_ALIAS).filter(pk=project_id)
+        .select_related("author")
+        .annotate(
+            is_contributor=Exists(
+                Contributor.objects.filter(project=OuterRef("pk"), user_id=user_id)
+            )
+        )
+        .first()
+    )
+    if project is None:
+        role = ROLE_NONE
+    elif project.author_id == user_id:
+        role = ROLE_AUTHOR
+    else:
+        role = ROLE_CONTRIBUTOR if project.is_contributor else ROLE_NONE
+
+    if project is not None:
+        memo[("role", user_id, project.pk)] = role
+        cache = _shared_cache()
+        if cache is not None:
+            cache.set(role_cache_key(user_id, project.pk), role)
+
+    project = project if role != ROLE_NONE else None
+    memo[memo_key] = project
+    return project
+
+
+def member_pairs(project_ids):
+    """
+    Ensemble des couples (user_id, project_id) membres des projets donnés, en deux requêtes
+    (opérations en masse et import : règle d'assignation vérifiée sans requête par ligne).
+    """
+    from .models import Project, Contributor
+
+    project_ids = set(project_ids)
+    if not project_ids:
+        return set()
+    pairs = set(
+        Contributor.objects.filter(project_id__in=project_ids).values_list("user_id", "project_id")
+    )
+    # L'auteur d'un projet en est membre même sans ligne Contributor.
+    pairs.update(
+        Project.objects.filter(pk__in=project_ids).values_list("author_id", "id")
+    )
+    return pairs
+
+
+def invalidate(user_id, project_id):
+    """
+    Supprime du cache partagé le rôle d'un utilisateur sur un projet.
+    """
+    cache = _shared_cache()
+    if cache is not None:
+        cache.delete(role_cache_key(user_id, project_id))
+
+
+def invalidate_project_name(name):
+    cache = _shared_cache()
+    if cache is not None:
+        cache.delete(project_name_cache_key(name))
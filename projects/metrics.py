@@ -0,0 +1,407 @@
+"""
+Instrumentation des requêtes : latence, requêtes SQL, temps base / sérialisation / permissions.
+
+Par point d'entrée ("ProjectViewSet.list", "IssueViewSet.create", "TokenObtainPairView.post"...) :
+- histogrammes de la latence et du nombre de requêtes SQL ;
+- cumuls du temps passé en base, dans les sérialiseurs et dans les permissions ;
+- réponses par classe de statut (2xx, 4xx...) ;
+- requêtes N+1 : une même requête SQL (même texte, paramètres exclus) exécutée au moins
+  SOFTDESK_METRICS_DUPLICATE_THRESHOLD fois dans une requête HTTP. Les formes répétées
+  sont conservées (au plus MAX_SHAPES par point d'entrée).
+
+Collecte :
+- MetricsMiddleware (en tête de MIDDLEWARE) mesure la requête et nomme son point d'entrée ;
+- execute_wrapper, installé sur chaque connexion à son ouverture, compte et chronomètre le SQL ;
+- InstrumentedViewMixin (permissions des ViewSets) et InstrumentedSerializerMixin
+  (to_representation, is_valid) chronomètrent le reste. Un appel imbriqué dans un appel
+  déjà chronométré (sérialiseur imbriqué) n'est pas compté deux fois ; le temps d'un
+  sérialiseur inclut les requêtes qu'il déclenche.
+- les vues asynchrones (async_views.py) sont nommées comme la route du ViewSet qu'elles
+  servent ; leurs sérialiseurs précompilés et leur vérification d'appartenance sont
+  chronométrés de la même façon.
+L'état de la requête est une ContextVar : il suit les vues asynchrones et sync_to_async.
+
+Mémoire bornée : des compteurs de taille fixe par point d'entrée, au plus MAX_ENDPOINTS
+points d'entrée (les suivants sont regroupés sous "other"). Données du processus courant,
+exposées par GET /metrics (format Prometheus) et GET /api/metrics/ (résumé, administrateurs).
+Coût : deux lectures d'horloge et une ContextVar par requête SQL et par objet sérialisé
+(voir benchmarks/metrics.py). SOFTDESK_METRICS = False retire le middleware.
+"""
+
+import math
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Bornes supérieures des histogrammes (Prometheus : "le"), la dernière classe est +Inf.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+MAX_ENDPOINTS = 200
+MAX_SHAPES = 20
+MAX_SHAPE_LENGTH = 500
+OTHER = "other"
+UNMATCHED = "unmatched"
+
+TIMED_KINDS = ("serializer", "permission")
+
+_current = ContextVar("softdesk_metrics", default=None)
+_lock = Lock()
+_endpoints = {}
+
+
+class RequestMetrics:
+    """
+    Mesures de la requête en cours.
+    """
+
+    __slots__ = ("endpoint", "queries", "db_time", "times", "shapes", "timing")
+
+    def __init__(self):
+        self.endpoint = UNMATCHED
+        self.queries = 0
+        self.db_time = 0.0
+        self.times = dict.fromkeys(TIMED_KINDS, 0.0)
+        self.shapes = Counter()
+        # Vrai pendant un appel chronométré (les appels imbriqués ne sont pas recomptés)
+        self.timing = False
+
+
+class EndpointStats:
+    """
+    Cumuls d'un point d'entrée (taille fixe, hors formes SQL répétées bornées à MAX_SHAPES).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.query_buckets = [0] * (len(QUERY_BUCKETS) + 1)
+        self.queries_sum = 0
+        self.db_time = 0.0
+        self.times = dict.fromkeys(TIMED_KINDS, 0.0)
+        self.statuses = Counter()
+        self.duplicate_requests = 0
+        # Forme SQL -> [requêtes HTTP concernées, répétitions maximales dans une requête]
+        self.duplicates = {}
+
+    def add(self, request_metrics, latency, status, duplicates):
+        self.count += 1
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.latency_sum += latency
+        self.query_buckets[bisect_left(QUERY_BUCKETS, request_metrics.queries)] += 1
+        self.queries_sum += request_metrics.queries
+        self.db_time += request_metrics.db_time
+        for kind, value in request_metrics.times.items():
+            self.times[kind] += value
+        self.statuses[f"{status // 100}xx"] += 1
+        if duplicates:
+            self.duplicate_requests += 1
+        for shape, repeats in duplicates:
+            entry = self.duplicates.get(shape)
+            if entry is None:
+                if len(self.duplicates) >= MAX_SHAPES:
+                    continue
+                entry = self.duplicates[shape] = [0, 0]
+            entry[0] += 1
+            entry[1] = max(entry[1], repeats)
+
+
+# -- Collecte --
+
+def current():
+    return _current.get()
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    request_metrics = _current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.db_time += perf_counter() - start
+        request_metrics.queries += 1
+        request_metrics.shapes[sql] += 1
+
+
+@receiver(connection_created)
+def install_execute_wrapper(sender, connection, **kwargs):
+    # Une fois par objet connexion (il survit aux reconnexions).
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+def call_timed(kind, func, *args, **kwargs):
+    """
+    Appelle func en ajoutant sa durée au temps `kind` de la requête en cours.
+    """
+    request_metrics = _current.get()
+    if request_metrics is None or request_metrics.timing:
+        return func(*args, **kwargs)
+    request_metrics.timing = True
+    start = perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        request_metrics.times[kind] += perf_counter() - start
+        request_metrics.timing = False
+
+
+async def acall_timed(kind, func, *args, **kwargs):
+    """
+    Variante de call_timed() pour une coroutine (vues asynchrones, voir async_views.py).
+    """
+    request_metrics = _current.get()
+    if request_metrics is None or request_metrics.timing:
+        return await func(*args, **kwargs)
+    request_metrics.timing = True
+    start = perf_counter()
+    try:
+        return await func(*args, **kwargs)
+    finally:
+        request_metrics.times[kind] += perf_counter() - start
+        request_metrics.timing = False
+
+
+class InstrumentedSerializerMixin:
+    """
+    Mixin de sérialiseur : temps de sérialisation et de validation.
+    """
+
+    def to_representation(self, instance):
+        return call_timed("serializer", super().to_representation, instance)
+
+    def is_valid(self, *args, **kwargs):
+        return call_timed("serializer", super().is_valid, *args, **kwargs)
+
+
+class InstrumentedViewMixin:
+    """
+    Mixin de vue DRF : temps des vérifications de permissions.
+    """
+
+    def check_permissions(self, request):
+        call_timed("permission", super().check_permissions, request)
+
+    def check_object_permissions(self, request, obj):
+        call_timed("permission", super().check_object_permissions, request, obj)
+
+
+def endpoint_name(method, view_func):
+    """
+    "<Vue>.<action>" pour une vue DRF, nom de la fonction pour une vue Django.
+    """
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return getattr(view_func, "__name__", OTHER)
+    method = method.lower()
+    actions = getattr(view_func, "actions", None) or {}
+    return f"{view_class.__name__}.{actions.get(method, method)}"
+
+
+def record(request_metrics, latency, status):
+    threshold = settings.SOFTDESK_METRICS_DUPLICATE_THRESHOLD
+    duplicates = [
+        (sql[:MAX_SHAPE_LENGTH], repeats)
+        for sql, repeats in request_metrics.shapes.items() if repeats >= threshold
+    ]
+    with _lock:
+        stats = _endpoints.get(request_metrics.endpoint)
+        if stats is None:
+            name = request_metrics.endpoint if len(_endpoints) < MAX_ENDPOINTS else OTHER
+            stats = _endpoints.setdefault(name, EndpointStats())
+        stats.add(request_metrics, latency, status, duplicates)
+
+
+class MetricsMiddleware:
+    """
+    Mesure chaque requête (en tête de MIDDLEWARE, synchrone et asynchrone).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SOFTDESK_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request_metrics = RequestMetrics()
+        token = _current.set(request_metrics)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        record(request_metrics, perf_counter() - start, response.status_code)
+        return response
+
+    async def __acall__(self, request):
+        request_metrics = RequestMetrics()
+        token = _current.set(request_metrics)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        record(request_metrics, perf_counter() - start, response.status_code)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request_metrics = _current.get()
+        if request_metrics is not None:
+            request_metrics.endpoint = endpoint_name(request.method, view_func)
+        return None
+
+
+# -- Lecture --
+
+def reset():
+    with _lock:
+        _endpoints.clear()
+
+
+def snapshot():
+    """
+    Copie cohérente des cumuls : {point d'entrée: EndpointStats}.
+    """
+    with _lock:
+        copies = {}
+        for name, stats in _endpoints.items():
+            copy = EndpointStats()
+            copy.__dict__.update({
+                key: (value.copy() if hasattr(value, "copy") else value) for key, value in stats.__dict__.items()
+            })
+            copy.duplicates = {shape: list(entry) for shape, entry in stats.duplicates.items()}
+            copies[name] = copy
+        return copies
+
+
+def quantile(q, bounds, buckets):
+    """
+    Quantile estimé depuis un histogramme (interpolation linéaire dans la classe, comme
+    histogram_quantile de Prometheus) ; la dernière borne finie pour la classe +Inf.
+    """
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(buckets):
+        if count and seen + count >= rank:
+            if index == len(bounds):
+                return bounds[-1]
+            lower = bounds[index - 1] if index else 0
+            return lower + (bounds[index] - lower) * (rank - seen) / count
+        seen += count
+    return bounds[-1]
+
+
+def summary():
+    """
+    Résumé par point d'entrée, du plus coûteux (temps total) au moins coûteux.
+    """
+    endpoints = []
+    for name, stats in snapshot().items():
+        count = stats.count
+
+        def milliseconds(seconds):
+            return round(seconds * 1000, 3)
+
+        latency = {
+            f"p{round(q * 100)}_ms": milliseconds(quantile(q, LATENCY_BUCKETS, stats.latency_buckets))
+            for q in (0.5, 0.95, 0.99)
+        }
+        endpoints.append({
+            "endpoint": name,
+            "requests": count,
+            "statuses": dict(stats.statuses),
+            "mean_ms": milliseconds(stats.latency_sum / count),
+            **latency,
+            "total_ms": milliseconds(stats.latency_sum),
+            "queries_per_request": round(stats.queries_sum / count, 2),
+            "db_ms_per_request": milliseconds(stats.db_time / count),
+            "serializer_ms_per_request": milliseconds(stats.times["serializer"] / count),
+            "permission_ms_per_request": milliseconds(stats.times["permission"] / count),
+            "duplicate_query_requests": stats.duplicate_requests,
+            "duplicate_queries": [
+                {"sql": shape, "requests": requests, "max_repeats": repeats}
+                for shape, (requests, repeats) in sorted(
+                    stats.duplicates.items(), key=lambda item: item[1][0], reverse=True
+                )
+            ],
+        })
+    endpoints.sort(key=lambda endpoint: endpoint["total_ms"], reverse=True)
+    return {"duplicate_threshold": settings.SOFTDESK_METRICS_DUPLICATE_THRESHOLD, "endpoints": endpoints}
+
+
+def _label(value):
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_bound(bound):
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
+def prometheus_text():
+    """
+    Exposition au format texte de Prometheus (version 0.0.4).
+    """
+    endpoints = sorted(snapshot().items())
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def histogram(name, bounds, attribute, total_attribute):
+        for endpoint, stats in endpoints:
+            label = f'endpoint="{_label(endpoint)}"'
+            cumulative = 0
+            for bound, count in zip((*bounds, math.inf), getattr(stats, attribute)):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label},le="{_format_bound(bound)}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{label}}} {getattr(stats, total_attribute)}")
+            lines.append(f"{name}_count{{{label}}} {stats.count}")
+
+    family("softdesk_requests_total", "counter", "Requêtes HTTP par point d'entrée et classe de statut.")
+    for endpoint, stats in endpoints:
+        for status, count in sorted(stats.statuses.items()):
+            lines.append(f'softdesk_requests_total{{endpoint="{_label(endpoint)}",status="{status}"}} {count}')
+
+    family("softdesk_request_duration_seconds", "histogram", "Latence des requêtes HTTP.")
+    histogram("softdesk_request_duration_seconds", LATENCY_BUCKETS, "latency_buckets", "latency_sum")
+
+    family("softdesk_db_queries", "histogram", "Requêtes SQL par requête HTTP.")
+    histogram("softdesk_db_queries", QUERY_BUCKETS, "query_buckets", "queries_sum")
+
+    totals = [
+        ("softdesk_db_duration_seconds_total", "Temps passé en base.", lambda stats: stats.db_time),
+        ("softdesk_serializer_duration_seconds_total", "Temps de sérialisation et de validation.",
+         lambda stats: stats.times["serializer"]),
+        ("softdesk_permission_duration_seconds_total", "Temps des vérifications de permissions.",
+         lambda stats: stats.times["permission"]),
+        ("softdesk_duplicate_query_requests_total", "Requêtes HTTP avec une requête SQL répétée (N+1).",
+         lambda stats: stats.duplicate_requests),
+    ]
+    for name, help_text, value in totals:
+        family(name, "counter", help_text)
+        for endpoint, stats in endpoints:
+            lines.append(f'{name}{{endpoint="{_label(endpoint)}"}} {value(stats)}')
+    return "\n".join(lines) + "\n"
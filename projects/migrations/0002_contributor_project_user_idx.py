@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 05:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contributor',
+            index=models.Index(fields=['project', 'user'], name='contributor_project_user_idx'),
+        ),
+    ]
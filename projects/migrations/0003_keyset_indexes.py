@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-18 05:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_contributor_project_user_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_time', 'id'], name='comment_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['issue', 'created_time', 'id'], name='comment_issue_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contributor',
+            index=models.Index(fields=['created_time', 'id'], name='contributor_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['created_time', 'id'], name='issue_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'created_time', 'id'], name='issue_project_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created_time', 'id'], name='project_keyset_idx'),
+        ),
+    ]
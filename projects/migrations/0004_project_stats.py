@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_stats(apps, schema_editor):
+    from projects.stats import rebuild
+
+    rebuild(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStats',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='projects.project')),
+                ('issues_todo', models.IntegerField(default=0)),
+                ('issues_in_progress', models.IntegerField(default=0)),
+                ('issues_finished', models.IntegerField(default=0)),
+                ('priority_low', models.IntegerField(default=0)),
+                ('priority_medium', models.IntegerField(default=0)),
+                ('priority_high', models.IntegerField(default=0)),
+                ('tag_bug', models.IntegerField(default=0)),
+                ('tag_feature', models.IntegerField(default=0)),
+                ('tag_task', models.IntegerField(default=0)),
+                ('comments', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Statistiques du projet',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectAssigneeStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issues_todo', models.IntegerField(default=0)),
+                ('issues_in_progress', models.IntegerField(default=0)),
+                ('issues_finished', models.IntegerField(default=0)),
+                ('assignee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignee_stats', to='projects.project')),
+            ],
+            options={
+                'verbose_name': "Charge d'un assigné",
+                'unique_together': {('project', 'assignee')},
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
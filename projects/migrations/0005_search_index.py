@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # Index FTS5 : uniquement sous SQLite (les autres bases utilisent un autre moteur, voir search.py).
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    from projects.search import SQLiteFTS5Backend
+
+    with schema_editor.connection.cursor() as cursor:
+        SQLiteFTS5Backend.create_schema(cursor)
+        SQLiteFTS5Backend.populate(cursor)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    from projects.search import SQLiteFTS5Backend
+
+    with schema_editor.connection.cursor() as cursor:
+        SQLiteFTS5Backend.drop_schema(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_project_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:21
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def initialize_updated_time(apps, schema_editor):
+    # Les lignes existantes n'ont jamais été modifiées depuis leur création (à notre connaissance).
+    for model_name in ("Project", "Issue", "Comment"):
+        apps.get_model("projects", model_name).objects.update(updated_time=F("created_time"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_issue_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='updated_time',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='updated_time',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='updated_time',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date de modification'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['issue', 'updated_time'], name='comment_issue_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'updated_time'], name='issue_project_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['updated_time'], name='project_updated_idx'),
+        ),
+        migrations.RunPython(initialize_updated_time, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:46
+
+from itertools import islice
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def log_existing_rows(apps, schema_editor):
+    # Le journal démarre avec une écriture par issue et commentaire existants :
+    # une synchronisation depuis 0 rapatrie tout. Par paquets, sans tout charger en mémoire.
+    Change = apps.get_model("projects", "Change")
+    Issue = apps.get_model("projects", "Issue")
+    Comment = apps.get_model("projects", "Comment")
+    issues = Issue.objects.order_by("created_time", "pk").values_list("pk", "project_id")
+    for batch in batched(issues.iterator(chunk_size=BATCH_SIZE), BATCH_SIZE):
+        Change.objects.bulk_create(
+            [Change(project_id=project_id, kind="issue", object_id=pk) for pk, project_id in batch]
+        )
+    comments = Comment.objects.order_by("created_time", "pk").values_list("pk", "uuid", "issue__project_id")
+    for batch in batched(comments.iterator(chunk_size=BATCH_SIZE), BATCH_SIZE):
+        Change.objects.bulk_create([
+            Change(project_id=project_id, kind="comment", object_id=pk, uuid=uuid)
+            for pk, uuid, project_id in batch
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_updated_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('issue', 'Issue'), ('comment', 'Commentaire')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('uuid', models.UUIDField(blank=True, null=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('project', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'Modification',
+                'indexes': [models.Index(fields=['project', 'seq'], name='change_project_seq_idx')],
+            },
+        ),
+        migrations.RunPython(log_existing_rows, migrations.RunPython.noop),
+    ]
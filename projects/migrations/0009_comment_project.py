@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_issue_project(apps, schema_editor):
+    # Une seule requête UPDATE : chaque commentaire reçoit le projet de son issue.
+    Issue = apps.get_model("projects", "Issue")
+    Comment = apps.get_model("projects", "Comment")
+    Comment.objects.update(
+        project_id=Subquery(Issue.objects.filter(pk=OuterRef("issue_id")).values("project_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_change_log'),
+    ]
+
+    operations = [
+        # Colonne ajoutée vide, remplie, puis rendue obligatoire.
+        migrations.AddField(
+            model_name='comment',
+            name='project',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='projects.project'),
+        ),
+        migrations.RunPython(copy_issue_project, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='comment',
+            name='project',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='projects.project'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['project', 'created_time', 'id'], name='comment_project_keyset_idx'),
+        ),
+    ]
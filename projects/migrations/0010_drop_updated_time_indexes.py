@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_comment_project'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_issue_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='issue',
+            name='issue_project_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='project',
+            name='project_updated_idx',
+        ),
+    ]
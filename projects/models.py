@@ -2,6 +2,8 @@ from django.db import models
 from django.conf import settings
 import uuid
 
+from .querysets import ProjectQuerySet, ContributorQuerySet, IssueQuerySet, CommentQuerySet
+
 
 class Project(models.Model):
     """
@@ -34,6 +36,18 @@ class Project(models.Model):
     
     # auto_now_add=True fige la date lors de la création initiale (non modifiable par la suite).
     created_time = models.DateTimeField(auto_now_add=True, verbose_name="Date de création")
+    # auto_now=True : mise à jour à chaque save(). Sert de validateur HTTP (ETag / Last-Modified,
+    # voir conditional.py) : un client qui relit un objet inchangé reçoit une 304 sans corps.
+    updated_time = models.DateTimeField(auto_now=True, verbose_name="Date de modification")
+
+    # Manager exposant Project.objects.for_member(user) (voir querysets.py)
+    objects = ProjectQuerySet.as_manager()
+
+    class Meta:
+        # Index de pagination par curseur (keyset) : ORDER BY created_time, id
+        indexes = [
+            models.Index(fields=['created_time', 'id'], name='project_keyset_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -60,10 +74,20 @@ class Contributor(models.Model):
     
     created_time = models.DateTimeField(auto_now_add=True, verbose_name="Date d'ajout")
 
+    objects = ContributorQuerySet.as_manager()
+
     class Meta:
         # Contrainte d'unicité composée :
         # Empêche d'ajouter le même utilisateur deux fois au même projet.
+        # Elle crée aussi l'index (user, project) qui sert à retrouver les projets d'un utilisateur.
         unique_together = ('user', 'project')
+        # Index inverse (project, user) : retrouver les membres d'un projet
+        # ou vérifier une appartenance en partant du projet.
+        indexes = [
+            models.Index(fields=['project', 'user'], name='contributor_project_user_idx'),
+            # Index de pagination par curseur (keyset)
+            models.Index(fields=['created_time', 'id'], name='contributor_keyset_idx'),
+        ]
         verbose_name = "Contributeur"
 
     def __str__(self):
@@ -106,6 +130,23 @@ class Issue(models.Model):
     )
     
     created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    objects = IssueQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Index de pagination par curseur (keyset) : globale et par projet
+            # (le second sert aussi les filtres created_after / created_before d'un projet)
+            models.Index(fields=['created_time', 'id'], name='issue_keyset_idx'),
+            models.Index(fields=['project', 'created_time', 'id'], name='issue_project_keyset_idx'),
+            # Filtres de la liste (voir filters.py) : vues "tableau" d'un projet
+            models.Index(fields=['project', 'status', 'priority'], name='issue_project_status_idx'),
+            models.Index(fields=['project', 'assignee', 'status'], name='issue_project_assignee_idx'),
+            models.Index(fields=['project', 'tag', 'status'], name='issue_project_tag_idx'),
+            # "Mes issues ouvertes", tous projets confondus
+            models.Index(fields=['assignee', 'status'], name='issue_assignee_status_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -126,8 +167,121 @@ class Comment(models.Model):
     # -- Relations --
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='comments')
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='comments')
+    # Projet de l'issue, dénormalisé (maintenu par les signaux, voir signals.py) : appartenance,
+    # listes et comptages par projet sans jointure sur Issue.
+    # Pas d'index seul sur project : l'index (project, created_time, id) le couvre.
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='comments', editable=False, db_index=False
+    )
     
     created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        # Index de pagination par curseur (keyset) : globale, par issue et par projet
+        indexes = [
+            models.Index(fields=['created_time', 'id'], name='comment_keyset_idx'),
+            models.Index(fields=['issue', 'created_time', 'id'], name='comment_issue_keyset_idx'),
+            models.Index(fields=['project', 'created_time', 'id'], name='comment_project_keyset_idx'),
+        ]
+
+    def __str__(self):
+        return f"Commentaire de {self.author} sur {self.issue}"
+
+
+class ProjectStats(models.Model):
+    """
+    Compteurs dénormalisés d'un projet (tableau de bord : GET /api/projects/{id}/stats/).
+    Ils sont tenus à jour par les signaux (voir stats.py) : la lecture du tableau de bord
+    est une lecture par clé primaire, sans COUNT sur les issues ni les commentaires.
+    (IntegerField et non PositiveIntegerField : un décrément ne doit jamais faire échouer
+    une suppression si un compteur a dérivé ; rebuild_project_stats le corrige.)
+    """
+
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+
+    # Issues par statut
+    issues_todo = models.IntegerField(default=0)
+    issues_in_progress = models.IntegerField(default=0)
+    issues_finished = models.IntegerField(default=0)
+
+    # Issues par priorité
+    priority_low = models.IntegerField(default=0)
+    priority_medium = models.IntegerField(default=0)
+    priority_high = models.IntegerField(default=0)
+
+    # Issues par balise
+    tag_bug = models.IntegerField(default=0)
+    tag_feature = models.IntegerField(default=0)
+    tag_task = models.IntegerField(default=0)
+
+    comments = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Statistiques du projet"
+
+    @property
+    def issues_open(self):
+        return self.issues_todo + self.issues_in_progress
+
+    @property
+    def issues_total(self):
+        return self.issues_open + self.issues_finished
+
+    def __str__(self):
+        return f"Statistiques de {self.project_id}"
+
+
+class ProjectAssigneeStats(models.Model):
+    """
+    Charge de travail d'un assigné sur un projet : nombre de ses issues par statut.
+    """
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='assignee_stats')
+    assignee = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+
+    issues_todo = models.IntegerField(default=0)
+    issues_in_progress = models.IntegerField(default=0)
+    issues_finished = models.IntegerField(default=0)
+
+    class Meta:
+        # Une ligne par couple (projet, assigné) ; l'index sert la lecture du tableau de bord.
+        unique_together = ('project', 'assignee')
+        verbose_name = "Charge d'un assigné"
+
+    @property
+    def issues_open(self):
+        return self.issues_todo + self.issues_in_progress
+
+
+class Change(models.Model):
+    """
+    Journal des modifications des issues et commentaires (synchronisation incrémentale :
+    GET /api/changes/?since=<seq>, voir changes.py). Une ligne par écriture, écrite par les
+    signaux dans la même transaction ; une suppression laisse une ligne "tombstone".
+    """
+
+    ISSUE = 'issue'
+    COMMENT = 'comment'
+    KIND_CHOICES = [(ISSUE, 'Issue'), (COMMENT, 'Commentaire')]
+
+    # Numéro de séquence croissant : le client reprend après le dernier reçu.
+    seq = models.BigAutoField(primary_key=True)
+    # Pas d'index seul sur project : l'index (project, seq) le couvre.
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='changes', db_index=False)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    # Identifiant exposé par l'API pour un commentaire (les tombstones ne peuvent plus le relire).
+    uuid = models.UUIDField(null=True, blank=True)
+    deleted = models.BooleanField(default=False)
+
+    class Meta:
+        # "Les modifications de mes projets depuis seq" : un parcours d'index par projet.
+        indexes = [models.Index(fields=['project', 'seq'], name='change_project_seq_idx')]
+        verbose_name = "Modification"
 
     def __str__(self):
-        return f"Commentaire de {self.author} sur {self.issue}"
\ No newline at end of file
+        action = "suppression" if self.deleted else "écriture"
+        return f"{self.seq} : {action} {self.kind} {self.object_id}"
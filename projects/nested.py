@@ -0,0 +1,95 @@
+"""
+Routes imbriquées sous un projet (voir config/urls.py) :
+
+    /api/projects/{project_pk}/contributors/
+    /api/projects/{project_pk}/issues/
+    /api/projects/{project_pk}/issues/{issue_pk}/comments/
+
+Le projet (et l'issue parente) sont lus une seule fois par requête, avec le rôle de
+l'utilisateur (membership.get_scoped_project). Ils sont ensuite partagés :
+- par le ViewSet : querysets filtrés par identifiant, sans sous-requête d'appartenance ;
+- par le sérialiseur (contexte "project" / "issue") : pas de résolution du nom du projet ;
+- par les permissions : le rôle est déjà dans le mémo de la requête.
+Un non-membre obtient une 404 sur toute la branche.
+"""
+
+from django.db.models import Value
+from rest_framework.exceptions import NotFound
+
+from . import membership
+from .models import Issue
+
+
+class ProjectScopedMixin:
+    """
+    Mixin des ViewSets imbriqués sous /api/projects/{project_pk}/.
+    """
+
+    project_url_kwarg = "project_pk"
+    # Actions des routes "à plat" non exposées sous un projet
+    # (les opérations en masse désignent elles-mêmes leurs projets).
+    excluded_nested_actions = {"bulk"}
+
+    @classmethod
+    def get_extra_actions(cls):
+        return [
+            action for action in super().get_extra_actions()
+            if action.__name__ not in cls.excluded_nested_actions
+        ]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Résolu avant tout traitement : 404 immédiate pour un non-membre.
+        self.get_project()
+
+    def get_project(self):
+        if not hasattr(self, "_project"):
+            project = membership.get_scoped_project(self.request, int(self.kwargs[self.project_url_kwarg]))
+            if project is None:
+                raise NotFound("Projet introuvable.")
+            self._project = project
+        return self._project
+
+    def scope_queryset(self, queryset):
+        """
+        Restreint au projet de l'URL. L'appartenance est déjà prouvée : l'annotation
+        dispense IsProjectContributor de toute vérification.
+        """
+        return queryset.filter(project_id=self.get_project().pk).annotate(is_project_member=Value(True))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["project"] = self.get_project()
+        return context
+
+
+class IssueScopedMixin(ProjectScopedMixin):
+    """
+    Mixin des ViewSets imbriqués sous /api/projects/{project_pk}/issues/{issue_pk}/.
+    """
+
+    issue_url_kwarg = "issue_pk"
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.get_issue()
+
+    def get_issue(self):
+        if not hasattr(self, "_issue"):
+            issue = Issue.objects.filter(
+                pk=int(self.kwargs[self.issue_url_kwarg]), project_id=self.get_project().pk
+            ).first()
+            if issue is None:
+                raise NotFound("Issue introuvable.")
+            # L'issue partage le projet déjà chargé (pas de requête si on lit issue.project).
+            issue.project = self.get_project()
+            self._issue = issue
+        return self._issue
+
+    def scope_queryset(self, queryset):
+        return queryset.filter(issue_id=self.get_issue().pk).annotate(is_project_member=Value(True))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["issue"] = self.get_issue()
+        return context
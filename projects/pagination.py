@@ -0,0 +1,260 @@
+"""
+Pagination de l'API.
+
+Deux modes sont disponibles :
+- "page" : pagination classique par numéro de page (?page=N), avec COUNT(*) et OFFSET.
+- "keyset" : pagination par curseur sur le couple (created_time, id). Chaque page est lue
+  via l'index (created_time, id) à partir de la dernière ligne vue : le coût d'une page ne
+  dépend plus de sa position (page 1 ou page 10 000, même requête).
+
+Le mode se choisit par requête (?pagination=keyset|page, ou simple présence d'un ?cursor=) ;
+"page" par défaut. L'ordre du curseur est fixe : un autre tri demandé (?ordering=, voir
+filters.py) est refusé (400) en mode "keyset", plutôt que remplacé en silence.
+"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+PAGE_MODE = "page"
+KEYSET_MODE = "keyset"
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par curseur (keyset) sur (created_time, id), en ordre croissant.
+
+    Paramètres de requête :
+    - cursor : position opaque renvoyée dans 'next' / 'previous'.
+    - page_size : taille de page (plafonnée par max_page_size).
+    - count=false : ne pas calculer le total (évite un COUNT(*) sur toute la table).
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+    ordering = ("created_time", "id")
+    invalid_cursor_message = "Curseur invalide."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = self.get_count(queryset, request)
+
+        position, reverse = self.decode_cursor(request)
+        time_field, id_field = self.ordering
+
+        if position is not None:
+            created_time, pk = position
+            # created_time >= t est exploitable par l'index ; le OR départage les ex-aequo par id.
+            if reverse:
+                queryset = queryset.filter(
+                    Q(**{f"{time_field}__lte": created_time})
+                    & (Q(**{f"{time_field}__lt": created_time}) | Q(**{f"{id_field}__lt": pk}))
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{time_field}__gte": created_time})
+                    & (Q(**{f"{time_field}__gt": created_time}) | Q(**{f"{id_field}__gt": pk}))
+                )
+
+        if reverse:
+            queryset = queryset.order_by(f"-{time_field}", f"-{id_field}")
+        else:
+            queryset = queryset.order_by(time_field, id_field)
+
+        # On lit une ligne de plus pour savoir s'il existe une page suivante (sans COUNT).
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_count(self, queryset, request):
+        """
+        Total des lignes, sauf si le client y renonce (?count=false).
+        """
+        if request.query_params.get(self.count_query_param, "").lower() in ("false", "0", "no"):
+            return None
+        return queryset.count()
+
+    # -- Curseur --
+
+    def decode_cursor(self, request):
+        """
+        Renvoie ((created_time, id), reverse) ou (None, False) en l'absence de curseur.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            raw = urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            direction, created_time, pk = raw.split("|")
+            return (datetime.fromisoformat(created_time), int(pk)), direction == "p"
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        time_field, id_field = self.ordering
+        raw = "|".join([
+            "p" if reverse else "n",
+            getattr(row, time_field).isoformat(),
+            str(getattr(row, id_field)),
+        ])
+        encoded = urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = {}
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["next"] = self.get_next_link()
+        payload["previous"] = self.get_previous_link()
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer"},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class RankedPagination(KeysetPagination):
+    """
+    Pagination par curseur de résultats classés par pertinence (recherche, voir search.py) :
+    la position est le couple (score, rowid) du dernier résultat, en avant uniquement.
+    Les résultats ne sont pas des querysets : la page est lue par une fonction fetch(after, limit).
+    """
+
+    def paginate_results(self, fetch, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        self.has_previous = False
+
+        rows = fetch(self.decode_cursor(request), self.page_size + 1)
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            rank, rowid = raw.split("|")
+            # float.hex : le score est restitué exactement (égalité stricte dans la requête)
+            return float.fromhex(rank), int(rowid)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        raw = f"{float(row.rank).hex()}|{row.rowid}"
+        encoded = urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+
+class SoftDeskPagination(BasePagination):
+    """
+    Pagination par défaut de l'API (voir REST_FRAMEWORK dans settings.py).
+    Délègue à PageNumberPagination ou à KeysetPagination selon le mode choisi.
+    """
+
+    mode_query_param = "pagination"
+    page_class = PageNumberPagination
+    keyset_class = KeysetPagination
+
+    def get_mode(self, request, view):
+        """
+        Mode demandé (?pagination=page|keyset) ; un mode inconnu est refusé (400)
+        plutôt que remplacé silencieusement par la pagination par numéro de page.
+        """
+        requested = request.query_params.get(self.mode_query_param)
+        if requested is not None:
+            if requested not in (PAGE_MODE, KEYSET_MODE):
+                raise ValidationError({
+                    self.mode_query_param: f"Mode de pagination inconnu : choisir '{PAGE_MODE}' ou '{KEYSET_MODE}'."
+                })
+            return requested
+        if self.keyset_class.cursor_query_param in request.query_params:
+            return KEYSET_MODE
+        return PAGE_MODE
+
+    def check_ordering(self, request, view):
+        """
+        Tri demandé à un ViewSet qui le permet (?ordering=) : seul l'ordre du curseur est possible.
+        """
+        param = api_settings.ORDERING_PARAM
+        ordering = [term.strip() for term in request.query_params.get(param, "").split(",") if term.strip()]
+        if not ordering or ordering == [self.keyset_class.ordering[0]]:
+            return
+        if any(issubclass(backend, OrderingFilter) for backend in getattr(view, "filter_backends", ())):
+            raise ValidationError({
+                param: f"Pagination par curseur : seul le tri '{self.keyset_class.ordering[0]}' est possible."
+            })
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.get_mode(request, view) == KEYSET_MODE:
+            self.check_ordering(request, view)
+            self.delegate = self.keyset_class()
+        else:
+            self.delegate = self.page_class()
+            # Ordre stable pour OFFSET (évite les doublons/omissions entre deux pages).
+            if not queryset.ordered:
+                queryset = queryset.order_by("pk")
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_class().get_paginated_response_schema(schema)
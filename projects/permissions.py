@@ -1,5 +1,6 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from projects.models import Project
+from projects import membership
 
 
 class IsAuthorOrReadOnly(BasePermission):
@@ -17,14 +18,15 @@ class IsAuthorOrReadOnly(BasePermission):
             return True
         
         # 2. Sinon (modification/suppression), on vérifie que l'utilisateur est bien l'auteur.
-        return obj.author == request.user
+        # On compare les identifiants : pas besoin de charger l'objet User de l'auteur.
+        return obj.author_id == request.user.id
 
 
 class IsProjectContributor(BasePermission):
     """
     Permission vérifiant l'appartenance à un projet.
     
-    Cette classe remonte la hiérarchie des objets (Commentaire -> Issue -> Projet)
+    Cette classe remonte au projet de l'objet (Issue et Commentaire portent son identifiant)
     pour s'assurer que l'utilisateur a le droit de voir ou d'interagir avec la ressource.
     
     Règles :
@@ -33,31 +35,28 @@ class IsProjectContributor(BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        # 1. Identification du projet parent selon le type d'objet actuel
+        # 0. Raccourci : l'objet provient d'un queryset filtré par appartenance
+        # (voir MembershipQuerySet.for_member). L'appartenance est déjà prouvée par la requête SQL.
+        if getattr(obj, "is_project_member", False):
+            return True
+
+        # 1. Identification du projet parent selon le type d'objet actuel.
+        # On ne manipule que des identifiants : pas de chargement du projet lui-même.
         if isinstance(obj, Project):
             # L'objet est le projet lui-même
-            project = obj
-        elif hasattr(obj, "project"):
-            # L'objet est une Issue (liée directement à un projet)
-            project = obj.project
-        elif hasattr(obj, "issue"):
-            # L'objet est un Commentaire (lié à une issue, elle-même liée à un projet)
-            project = obj.issue.project
+            project_id = obj.pk
+        elif hasattr(obj, "project_id"):
+            # L'objet est une Issue ou un Commentaire (projet dénormalisé, sans passer par l'issue)
+            project_id = obj.project_id
         else:
             # Sécurité : Si on ne peut pas relier l'objet à un projet, on bloque par défaut.
             return False
 
-        # 2. Vérification des droits d'accès
-        
-        # Vérifie si l'utilisateur est présent dans la table de liaison 'contributors'
-        # (Nécessite related_name='contributors' dans le modèle Contributor)
-        is_contributor = project.contributors.filter(user=request.user).exists()
-
-        # Vérifie si l'utilisateur est le créateur du projet (qui a implicitement tous les droits)
-        is_author = project.author == request.user
-
-        # L'accès est validé si l'une des deux conditions est vraie
-        return is_contributor or is_author
+        # 2. Vérification des droits d'accès :
+        # L'utilisateur doit être contributeur OU auteur du projet (qui a implicitement tous les droits).
+        # Le résultat est mémorisé pour la requête et mis en cache entre les requêtes
+        # (voir projects/membership.py), invalidé par signaux quand les membres changent.
+        return membership.is_member(request, request.user.id, project_id)
 
 
 class IsProjectAuthor(BasePermission):
@@ -74,24 +73,32 @@ class IsProjectAuthor(BasePermission):
         Vérification globale pour l'ajout (POST).
         Comme l'objet Contributor n'existe pas encore, on doit analyser les données envoyées (request.data).
         """
+        if getattr(view, "action", None) == "bulk":
+            # Opérations en masse : la règle est appliquée élément par élément (voir bulk.py).
+            return True
+
         if request.method == "POST":
+            # Route imbriquée (/api/projects/{id}/contributors/) : le projet vient de l'URL,
+            # déjà chargé avec le rôle de l'utilisateur (voir nested.py).
+            if hasattr(view, "get_project"):
+                return membership.is_author(request, request.user.id, view.get_project().pk)
+
             # 1. Récupération du nom du projet ciblé dans le corps de la requête
             project_name = request.data.get("project")
 
             if not project_name:
                 return False  # Rejet immédiat si le projet n'est pas spécifié
 
-            try:
-                # 2. Recherche du projet en base de données via son nom (Slug)
-                project = Project.objects.get(name=project_name)
+            # 2. Recherche de l'identifiant du projet via son nom (Slug), mise en cache
+            project_id = membership.get_project_id(request, project_name)
 
-                # 3. Vérification : L'utilisateur connecté est-il le propriétaire de ce projet ?
-                return project.author == request.user
-
-            except Project.DoesNotExist:
+            if project_id is None:
                 # Le projet indiqué n'existe pas, on refuse l'accès
                 return False
 
+            # 3. Vérification : L'utilisateur connecté est-il le propriétaire de ce projet ?
+            return membership.is_author(request, request.user.id, project_id)
+
         # Pour les autres méthodes (GET, DELETE, etc.), on laisse passer cette étape.
         # La vérification se fera au niveau de l'objet (has_object_permission).
         return True
@@ -103,7 +110,8 @@ class IsProjectAuthor(BasePermission):
         if request.method == "DELETE":
             # 'obj' correspond ici à l'instance de Contributor (le lien utilisateur-projet).
             # On vérifie que celui qui demande la suppression est bien l'auteur du projet concerné.
-            return obj.project.author == request.user
+            # Le rôle est lu dans le mémo de la requête / le cache (aucune requête en route imbriquée).
+            return membership.is_author(request, request.user.id, obj.project_id)
 
         # Les autres méthodes (comme GET) sont gérées par d'autres permissions (ex: IsProjectContributor).
         return True
\ No newline at end of file
@@ -0,0 +1,57 @@
+from django.db import models
+from django.db.models import Q, Value
+
+
+class MembershipQuerySet(models.QuerySet):
+    """
+    QuerySet de base qui restreint les résultats aux projets dont l'utilisateur est membre.
+
+    Un utilisateur est membre d'un projet s'il en est l'auteur OU s'il figure dans la table
+    Contributor. Chaque sous-classe indique par 'project_path' comment rejoindre le projet
+    depuis son modèle ("" pour le projet lui-même, "project", ...).
+    """
+
+    project_path = "project"
+
+    def _project_lookup(self, field):
+        # Construit le nom de lookup vers un champ du projet (ex: "project__author_id").
+        if not self.project_path:
+            return field
+        return f"{self.project_path}__{field}"
+
+    def for_member(self, user):
+        """
+        Filtre le queryset sur les projets de l'utilisateur, en une seule requête SQL.
+
+        - Les appartenances sont lues via une sous-requête sur Contributor, servie par
+          l'index (user, project) : pas de jointure multiple, donc pas de doublons.
+        - L'annotation 'is_project_member' indique aux permissions que l'appartenance est
+          déjà prouvée par la requête : aucune vérification supplémentaire n'est nécessaire.
+        """
+        # Import local : les modèles importent ce module pour déclarer leurs managers.
+        from .models import Contributor
+
+        memberships = Contributor.objects.filter(user_id=user.id).values("project_id")
+        project_id = self._project_lookup("id") if self.project_path else "pk"
+
+        return self.filter(
+            Q(**{self._project_lookup("author_id"): user.id})
+            | Q(**{f"{project_id}__in": memberships})
+        ).annotate(is_project_member=Value(True))
+
+
+class ProjectQuerySet(MembershipQuerySet):
+    project_path = ""
+
+
+class ContributorQuerySet(MembershipQuerySet):
+    project_path = "project"
+
+
+class IssueQuerySet(MembershipQuerySet):
+    project_path = "project"
+
+
+class CommentQuerySet(MembershipQuerySet):
+    # Projet dénormalisé sur le commentaire : pas de jointure sur Issue.
+    project_path = "project"
@@ -0,0 +1,40 @@
+"""
+Rendu JSON de l'API.
+
+FastJSONRenderer écrit avec orjson (voir requirements.txt) les données des lectures
+précompilées (voir compiled.py). Elles ne contiennent que des textes, entiers, booléens et None,
+qu'orjson écrit exactement comme le JSONRenderer de DRF : séparateurs compacts, UTF-8 sans
+échappement, U+2028 et U+2029 échappés. Tout le reste (erreurs, flottants, sortie indentée
+de l'API navigable) passe par le JSONRenderer de DRF.
+"""
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+# Échappés par DRF : la sortie reste un sous-ensemble strict de JavaScript.
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer de DRF, avec orjson pour les données des lectures précompilées.
+    """
+
+    def use_orjson(self, accepted_media_type, renderer_context):
+        return (
+            getattr(renderer_context.get("view"), "compiled_payload", False)
+            and self.compact and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if data is None or not self.use_orjson(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(data)
+        except orjson.JSONEncodeError:
+            # Entier hors 64 bits, texte non encodable... : DRF décide (valeur ou erreur).
+            return super().render(data, accepted_media_type, renderer_context)
+        return content.replace(LINE_SEPARATOR, b"\\u2028").replace(PARAGRAPH_SEPARATOR, b"\\u2029")
@@ -0,0 +1,304 @@
+"""
+Rejeu de trafic enregistré, utilisé par la commande `manage.py replay_traffic`.
+
+Entrée JSONL, une requête par ligne :
+
+    {"method": "GET", "path": "/api/issues/?page=2", "user": "alice", "timestamp": 1718000000.25}
+    {"method": "POST", "path": "/api/comments/", "body": {"issue": 12, "description": "..."}, "user": "bob"}
+
+- "user" : pseudo (absent ou null : requête anonyme). Chaque utilisateur reçoit un token
+  d'accès émis avant le rejeu (SoftDeskTokenObtainPairSerializer) : l'authentification
+  par mot de passe ne fausse pas les mesures.
+- "timestamp" (secondes epoch ou date ISO 8601) : utilisé par le mode à l'échelle du temps.
+
+Les requêtes sont traitées dans le processus, par le gestionnaire de Django (client de test),
+sur la base configurée : les écritures sont réelles, rejouer sur une copie de la base.
+- threads : --concurrency threads, chacun sa connexion à la base (comme un serveur WSGI) ;
+- asyncio : --concurrency coroutines et le gestionnaire ASGI (vues synchrones dans le thread
+  de sync_to_async, comme sous uvicorn).
+Par défaut, chaque client enchaîne ses requêtes au plus vite (boucle fermée). Avec speed,
+chaque requête part à sa date d'origine divisée par speed (boucle ouverte) : les rafales du
+trafic réel sont reproduites et l'attente avant traitement est mesurée.
+
+Temps et erreurs sont regroupés par point d'entrée, nommé comme dans projects/metrics.py
+("IssueViewSet.list").
+"""
+
+import asyncio
+import json
+import queue
+import statistics
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from time import perf_counter, sleep
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import Resolver404, resolve
+
+from authentication.models import User
+from authentication.serializers import SoftDeskTokenObtainPairSerializer
+from . import metrics
+
+MODES = ("threads", "asyncio")
+METHODS = {"GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"}
+
+# Tokens émis pour le rejeu : valables toute sa durée (outil hors production)
+TOKEN_LIFETIME = timedelta(hours=12)
+
+
+def parse_timestamp(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(value).timestamp()
+
+
+def load(lines):
+    """
+    Lit les enregistrements ; une ligne invalide lève ValueError (avec son numéro).
+    """
+    records = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            method = record["method"].upper()
+            path = record["path"]
+            if method not in METHODS or not path.startswith("/"):
+                raise ValueError("méthode ou chemin invalide")
+            timestamp = record.get("timestamp")
+            records.append({
+                "method": method,
+                "path": path,
+                "body": record.get("body"),
+                "user": record.get("user"),
+                "timestamp": None if timestamp is None else parse_timestamp(timestamp),
+            })
+        except (KeyError, TypeError, ValueError, AttributeError) as exc:
+            raise ValueError(f"ligne {line_number} : {exc!r}") from exc
+    return records
+
+
+def mint_tokens(usernames):
+    """
+    Token d'accès de chaque utilisateur cité ; un pseudo inconnu lève ValueError.
+    """
+    usernames = set(filter(None, usernames))
+    users = {user.username: user for user in User.objects.filter(username__in=usernames)}
+    missing = sorted(usernames - users.keys())
+    if missing:
+        raise ValueError(f"utilisateurs inconnus : {', '.join(missing[:10])}")
+    tokens = {}
+    for username, user in users.items():
+        access = SoftDeskTokenObtainPairSerializer.get_token(user).access_token
+        access.set_exp(lifetime=TOKEN_LIFETIME)
+        tokens[username] = str(access)
+    return tokens
+
+
+def consume(content):
+    for _ in content:
+        pass
+
+
+def schedule(records, speed):
+    """
+    Date de départ de chaque requête, en secondes depuis le début du rejeu (None : au plus vite).
+    """
+    if not speed:
+        return [None] * len(records)
+    if any(record["timestamp"] is None for record in records):
+        raise ValueError("le mode à l'échelle du temps exige un 'timestamp' sur chaque ligne")
+    start = min(record["timestamp"] for record in records)
+    return [(record["timestamp"] - start) / speed for record in records]
+
+
+class ReplayStats:
+    """
+    Durées et statuts par point d'entrée ; attente avant traitement (mode à l'échelle du temps).
+    """
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self.latencies = {}
+        self.statuses = {}
+        self.delays = []
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def endpoint(self, method, path):
+        key = (method, urlsplit(path).path)
+        name = self._endpoints.get(key)
+        if name is None:
+            try:
+                name = metrics.endpoint_name(method, resolve(key[1]).func)
+            except Resolver404:
+                name = metrics.UNMATCHED
+            self._endpoints[key] = name
+        return name
+
+    def add(self, record, status, latency, delay):
+        endpoint = self.endpoint(record["method"], record["path"])
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(latency)
+            self.statuses.setdefault(endpoint, Counter())[status] += 1
+            if delay is not None:
+                self.delays.append(delay)
+
+    @staticmethod
+    def summarize(values):
+        values = sorted(values)
+        if len(values) > 1:
+            quantiles = statistics.quantiles(values, n=100, method="inclusive")
+            p50, p95, p99 = quantiles[49], quantiles[94], quantiles[98]
+        else:
+            p50 = p95 = p99 = values[0]
+        return {
+            "mean_ms": round(statistics.fmean(values) * 1000, 3),
+            "p50_ms": round(p50 * 1000, 3),
+            "p95_ms": round(p95 * 1000, 3),
+            "p99_ms": round(p99 * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+        }
+
+    def report(self):
+        requests = sum(len(latencies) for latencies in self.latencies.values())
+        endpoints = []
+        for name, latencies in self.latencies.items():
+            statuses = self.statuses[name]
+            endpoints.append({
+                "endpoint": name,
+                "requests": len(latencies),
+                "errors": sum(count for status, count in statuses.items() if status >= 400),
+                "statuses": {str(status): count for status, count in sorted(statuses.items())},
+                "total_ms": round(sum(latencies) * 1000, 3),
+                **self.summarize(latencies),
+            })
+        endpoints.sort(key=lambda endpoint: endpoint["total_ms"], reverse=True)
+        report = {
+            "requests": requests,
+            "errors": sum(endpoint["errors"] for endpoint in endpoints),
+            "elapsed_seconds": round(self.elapsed, 3),
+            "requests_per_second": round(requests / self.elapsed, 1) if self.elapsed else None,
+        }
+        if requests:
+            report.update(self.summarize([latency for latencies in self.latencies.values() for latency in latencies]))
+        if self.delays:
+            report["start_delay"] = self.summarize(self.delays)
+        report["endpoints"] = endpoints
+        return report
+
+
+class Replayer:
+    """
+    Rejoue des enregistrements (voir load) avec `concurrency` clients, en threads ou en asyncio.
+    """
+
+    def __init__(self, records, tokens, concurrency=8, mode="threads", speed=None):
+        if mode not in MODES:
+            raise ValueError(f"mode inconnu : {mode!r}")
+        self.records = records
+        self.tokens = tokens
+        self.concurrency = max(1, concurrency)
+        self.mode = mode
+        self.offsets = schedule(records, speed)
+        self.stats = ReplayStats()
+
+    def request_arguments(self, record):
+        headers = {}
+        if record["user"]:
+            headers["Authorization"] = f"Bearer {self.tokens[record['user']]}"
+        data = json.dumps(record["body"]) if record["body"] is not None else ""
+        return (record["method"], record["path"], data), {"content_type": "application/json", "headers": headers}
+
+    @staticmethod
+    def is_event_stream(response):
+        # Flux sans fin (Server-Sent Events) : seul l'établissement est mesuré.
+        return response.get("Content-Type", "").startswith("text/event-stream")
+
+    def run(self):
+        start = perf_counter()
+        # Les clients de test envoient "Host: testserver" (comme setup_test_environment).
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            if self.mode == "asyncio":
+                asyncio.run(self.run_async())
+            else:
+                self.run_threads()
+        self.stats.elapsed = perf_counter() - start
+        return self.stats
+
+    # -- Threads --
+
+    def run_threads(self):
+        pending = queue.Queue()
+
+        def work():
+            client = Client(raise_request_exception=False)
+            try:
+                while (item := pending.get()) is not None:
+                    self.send(client, *item)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=work) for _ in range(self.concurrency)]
+        for worker in workers:
+            worker.start()
+        origin = perf_counter()
+        for record, offset in zip(self.records, self.offsets):
+            if offset is not None:
+                wait = origin + offset - perf_counter()
+                if wait > 0:
+                    sleep(wait)
+            pending.put((record, None if offset is None else origin + offset))
+        for _ in workers:
+            pending.put(None)
+        for worker in workers:
+            worker.join()
+
+    def send(self, client, record, due):
+        started = perf_counter()
+        args, kwargs = self.request_arguments(record)
+        response = client.generic(*args, **kwargs)
+        if response.streaming and not self.is_event_stream(response):
+            consume(response.streaming_content)
+        response.close()
+        self.stats.add(record, response.status_code, perf_counter() - started, None if due is None else started - due)
+
+    # -- asyncio --
+
+    async def run_async(self):
+        pending = asyncio.Queue()
+        client = AsyncClient(raise_request_exception=False)
+
+        async def work():
+            while (item := await pending.get()) is not None:
+                await self.asend(client, *item)
+
+        workers = [asyncio.create_task(work()) for _ in range(self.concurrency)]
+        loop = asyncio.get_running_loop()
+        origin = loop.time()
+        for record, offset in zip(self.records, self.offsets):
+            if offset is not None:
+                await asyncio.sleep(max(0.0, origin + offset - loop.time()))
+            pending.put_nowait((record, None if offset is None else perf_counter()))
+        for _ in workers:
+            pending.put_nowait(None)
+        await asyncio.gather(*workers)
+
+    async def asend(self, client, record, due):
+        started = perf_counter()
+        args, kwargs = self.request_arguments(record)
+        response = await client.generic(*args, **kwargs)
+        if response.streaming and not self.is_event_stream(response):
+            if response.is_async:
+                async for _ in response.streaming_content:
+                    pass
+            else:
+                # Générateur synchrone (export) : consommé dans le thread des vues, qui lit la base.
+                await sync_to_async(consume)(response.streaming_content)
+        self.stats.add(record, response.status_code, perf_counter() - started, None if due is None else started - due)
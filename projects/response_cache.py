@@ -0,0 +1,335 @@
+"""
+Cache des réponses rendues (liste et détail) des ViewSets de projects.
+
+Clé d'une entrée : (vue, action, utilisateur + empreinte de ses appartenances, chemin,
+paramètres de requête triés, format de rendu). La page et les filtres font partie des
+paramètres ; l'empreinte d'appartenance (User.membership_version) change dès que
+l'utilisateur rejoint ou quitte un projet : un cache ne survit jamais à un changement de droits.
+
+Invalidation par étiquettes : chaque entrée mémorise le jeton courant des étiquettes dont
+elle dépend ; une écriture (signaux post_save / post_delete et opérations en masse) remplace
+les jetons des étiquettes touchées, ce qui périme toutes les entrées qui en dépendent.
+
+    projects                     liste des projets
+    project:<id>                 tout ce qui est dans le projet (listes d'un projet)
+    issue:<id>                   une issue et ses commentaires (liste imbriquée)
+    object:<modèle>:<id>         détail d'un objet
+    issues, comments, ...        famille entière (listes "à plat" d'un membre de très nombreux projets)
+
+Course lecture / écriture : une horloge (jeton remplacé à chaque écriture, avant les
+étiquettes) est lue au début du calcul et relue avant l'enregistrement ; si elle a changé,
+la réponse est servie mais pas mise en cache. Les jetons sont remplacés après le commit.
+
+Lectures sur réplica (voir config/replicas.py) : un réplica peut ne pas encore contenir une
+écriture récente. Une réponse lue sur un réplica moins de SOFTDESK_REPLICA_STICKY_SECONDS
+après la dernière écriture (date portée par le jeton de l'horloge) n'est pas mise en cache.
+
+Le backend est celui de l'alias SOFTDESK_RESPONSE_CACHE_ALIAS (None : cache désactivé) ;
+voir cache_backends.py pour les backends LRU bornés (mémoire locale ou fichiers). Les jetons
+sont remplacés dans le processus qui écrit : avec plusieurs processus serveur, le cache doit
+être partagé (vérifié au démarrage, voir cache_backends.check_shared_caches).
+"""
+
+import hashlib
+import time
+import uuid
+from collections import Counter
+from threading import Lock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from config import replicas
+from .models import Project, Contributor, Issue, Comment
+
+KEY_PREFIX = "softdesk:responses"
+CLOCK_TAG = "clock"
+# Au-delà, une liste "à plat" dépend de l'étiquette de famille plutôt que de chaque projet.
+MAX_SCOPE_TAGS = 64
+# En-têtes de la réponse conservés avec le contenu.
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Vary", "Allow")
+
+FAMILY_TAGS = {Project: "projects", Contributor: "contributors", Issue: "issues", Comment: "comments"}
+
+_counters = Counter()
+_counters_lock = Lock()
+
+
+def get_cache():
+    alias = getattr(settings, "SOFTDESK_RESPONSE_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def _count(name, value=1):
+    with _counters_lock:
+        _counters[name] += value
+
+
+def get_stats():
+    """
+    Compteurs du processus courant (succès, échecs, entrées périmées, enregistrements...)
+    et, si le backend les fournit, occupation et évictions.
+    """
+    with _counters_lock:
+        counters = {name: _counters[name] for name in ("hits", "misses", "stale", "stores", "skipped")}
+    lookups = counters["hits"] + counters["misses"]
+    counters["hit_ratio"] = round(counters["hits"] / lookups, 4) if lookups else None
+    cache = get_cache()
+    counters["enabled"] = cache is not None
+    if cache is not None and hasattr(cache, "stats"):
+        counters.update(cache.stats())
+    return counters
+
+
+def reset_stats():
+    with _counters_lock:
+        _counters.clear()
+
+
+def tag_key(tag):
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def _new_token():
+    # Date de création (en millisecondes) et partie aléatoire.
+    return f"{int(time.time() * 1000):x}-{uuid.uuid4().hex[:8]}"
+
+
+def token_age(token):
+    return time.time() - int(token.partition("-")[0], 16) / 1000
+
+
+def current_tokens(cache, tags):
+    """
+    Jetons courants des étiquettes ; une étiquette inconnue (jamais touchée, ou évincée)
+    reçoit un jeton, sans écraser celui qu'une écriture concurrente aurait posé.
+    """
+    keys = {tag_key(tag): tag for tag in tags}
+    found = cache.get_many(keys)
+    missing = keys.keys() - found.keys()
+    if missing:
+        for key in missing:
+            cache.add(key, _new_token())
+        found.update(cache.get_many(missing))
+    return {keys[key]: token for key, token in found.items()}
+
+
+def invalidate(tags):
+    """
+    Périme les entrées dépendant de ces étiquettes, après le commit de la transaction en cours.
+    L'horloge est remplacée en premier (voir la course lecture / écriture ci-dessus).
+    """
+    tags = set(tags)
+
+    def bump():
+        cache = get_cache()
+        if cache is None:
+            return
+        cache.set_many({tag_key(tag): _new_token() for tag in [CLOCK_TAG, *sorted(tags)]}, timeout=None)
+
+    if tags:
+        transaction.on_commit(bump)
+
+
+# -- Étiquettes touchées par une écriture --
+
+def project_tags(project_id):
+    return {"projects", f"project:{project_id}", f"object:project:{project_id}"}
+
+
+def contributor_tags(contributor):
+    return {"contributors", f"project:{contributor.project_id}", f"object:contributor:{contributor.pk}"}
+
+
+def issue_tags(issue_id, project_id):
+    return {"issues", f"project:{project_id}", f"issue:{issue_id}", f"object:issue:{issue_id}"}
+
+
+def comment_tags(comment, project_id):
+    return {"comments", f"project:{project_id}", f"issue:{comment.issue_id}", f"object:comment:{comment.pk}"}
+
+
+# -- Étiquettes dont dépend une réponse --
+
+def object_dependencies(obj):
+    """
+    Détail d'un objet : l'objet lui-même, et le projet dont il affiche le nom.
+    """
+    if isinstance(obj, Project):
+        return {f"object:project:{obj.pk}"}
+    if isinstance(obj, Contributor):
+        return {f"object:contributor:{obj.pk}", f"object:project:{obj.project_id}"}
+    if isinstance(obj, Issue):
+        return {f"object:issue:{obj.pk}", f"object:project:{obj.project_id}"}
+    return {f"object:comment:{obj.pk}"}
+
+
+def member_projects_dependencies(model, project_ids):
+    """
+    Liste "à plat" (tous les projets de l'utilisateur) : une étiquette par projet,
+    ou celle de la famille au-delà de MAX_SCOPE_TAGS projets.
+    Aucun projet : la liste change dès que l'utilisateur en rejoint un, et donc de clé.
+    """
+    if len(project_ids) > MAX_SCOPE_TAGS:
+        return {FAMILY_TAGS[model]}
+    return {f"project:{project_id}" for project_id in project_ids}
+
+
+def member_project_ids(user):
+    return Project.objects.for_member(user).values_list("pk", flat=True)[:MAX_SCOPE_TAGS + 1]
+
+
+def list_dependencies(model, user):
+    if model is Project:
+        return {"projects"}
+    return member_projects_dependencies(model, list(member_project_ids(user)))
+
+
+def make_key(view_name, action, user, path, params, renderer_format, media_type):
+    parts = (
+        view_name, action, user.id, getattr(user, "membership_version", ""), path,
+        sorted((name, value) for name, values in params.lists() for value in values),
+        renderer_format, media_type,
+    )
+    return f"{KEY_PREFIX}:{hashlib.sha1(repr(parts).encode()).hexdigest()}"
+
+
+def lookup(cache, key):
+    """
+    Renvoie l'entrée si elle est encore valide, sinon None (et la supprime si elle est périmée).
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        if current_tokens(cache, entry["tags"]) == entry["tags"]:
+            _count("hits")
+            return entry
+        _count("stale")
+        cache.delete(key)
+    _count("misses")
+    return None
+
+
+def read_clock(cache):
+    return current_tokens(cache, [CLOCK_TAG])[CLOCK_TAG]
+
+
+def store(cache, key, clock, dependencies, response):
+    """
+    Enregistre une réponse rendue, sauf si une écriture a eu lieu depuis read_clock().
+    """
+    tags = current_tokens(cache, dependencies)
+    if read_clock(cache) != clock:
+        # Une écriture a eu lieu pendant le calcul : la réponse peut être déjà périmée.
+        _count("skipped")
+        return
+    if replicas.reading_replica() and token_age(clock) < settings.SOFTDESK_REPLICA_STICKY_SECONDS:
+        # Lue sur un réplica juste après une écriture : la réponse peut ne pas la contenir.
+        _count("skipped")
+        return
+    cache.set(key, {
+        "tags": tags,
+        "status": response.status_code,
+        "content": response.content,
+        "headers": {name: response[name] for name in STORED_HEADERS if response.has_header(name)},
+    })
+    _count("stores")
+
+
+def cached_response(http_request, entry):
+    """
+    Réponse servie depuis une entrée du cache (304 si le client a déjà cette version).
+    """
+    headers = entry["headers"]
+    if "ETag" in headers:
+        not_modified = get_conditional_response(
+            http_request, etag=headers["ETag"],
+            last_modified=parse_http_date_safe(headers.get("Last-Modified", "")),
+        )
+        if not_modified is not None:
+            for name in ("ETag", "Last-Modified", "Cache-Control", "Vary"):
+                if name in headers:
+                    not_modified[name] = headers[name]
+            not_modified["X-Cache"] = "HIT"
+            return not_modified
+    response = HttpResponse(entry["content"], status=entry["status"])
+    for name, value in headers.items():
+        response[name] = value
+    response["X-Cache"] = "HIT"
+    return response
+
+
+async def acall(cache, func, *args):
+    """
+    Appel d'une des fonctions ci-dessus depuis une vue asynchrone : directement pour un cache
+    en mémoire du processus (aucune E/S), dans un thread pour les autres backends (fichiers).
+    """
+    if isinstance(cache, LocMemCache):
+        return func(cache, *args)
+    return await sync_to_async(func)(cache, *args)
+
+
+class CachedResponseMixin:
+    """
+    Mixin de ViewSet : sert list et retrieve depuis le cache des réponses rendues.
+    Seules les réponses 200 d'un GET (hors API navigable) sont mises en cache.
+    """
+
+    def get_cache_key(self, request):
+        return make_key(
+            self.__class__.__name__, self.action, request.user, request.path, request.query_params,
+            request.accepted_renderer.format, request.accepted_media_type,
+        )
+
+    def get_list_dependencies(self):
+        if hasattr(self, "get_issue"):
+            return {f"issue:{self.get_issue().pk}"}
+        if hasattr(self, "get_project"):
+            return {f"project:{self.get_project().pk}"}
+        return list_dependencies(self.get_queryset().model, self.request.user)
+
+    def get_object(self):
+        obj = super().get_object()
+        dependencies = object_dependencies(obj)
+        # Route imbriquée : l'URL désigne aussi le parent (une issue déplacée ne répond plus ici).
+        if hasattr(self, "get_project"):
+            dependencies.add(f"object:project:{self.get_project().pk}")
+        if hasattr(self, "get_issue"):
+            dependencies.add(f"object:issue:{self.get_issue().pk}")
+        self._cache_dependencies = dependencies
+        return obj
+
+    def _is_cacheable(self, request):
+        return request.method == "GET" and request.accepted_renderer.format != "api"
+
+    def _cached(self, request, compute):
+        cache = get_cache()
+        if cache is None or not self._is_cacheable(request):
+            return compute()
+
+        key = self.get_cache_key(request)
+        entry = lookup(cache, key)
+        if entry is not None:
+            return cached_response(request._request, entry)
+
+        clock = read_clock(cache)
+        response = compute()
+        if response.status_code == 200:
+            if self.action == "list":
+                self._cache_dependencies = self.get_list_dependencies()
+            response.add_post_render_callback(
+                lambda rendered: store(cache, key, clock, self._cache_dependencies, rendered)
+            )
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(request, lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(request, lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs))
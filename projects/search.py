@@ -0,0 +1,360 @@
+"""
+Recherche plein texte dans les issues (titre, description) et les commentaires.
+
+Le moteur est interchangeable (réglage SOFTDESK_SEARCH_BACKEND) :
+- SQLiteFTS5Backend (défaut sous SQLite) : index inversé FTS5, classement bm25 (le titre pèse
+  plus que le texte), surlignage et extraits calculés par SQLite.
+- DatabaseSearchBackend : repli pour les autres bases, sans index (recherche par LIKE).
+
+L'index est mis à jour de façon incrémentale par les signaux (voir signals.py), dans la même
+transaction que l'écriture du modèle.
+
+Chaque document a un identifiant entier (rowid) déduit de son objet :
+issue -> 2 * id, commentaire -> 2 * id + 1. Mise à jour et suppression se font donc sans lecture.
+
+Cloisonnement : chaque document porte un jeton "p<id du projet>" dans une colonne indexée.
+Le filtre par projets de l'utilisateur fait partie de la requête MATCH : FTS5 croise les listes
+de documents des termes et des projets dans l'index, au lieu de filtrer les résultats un à un.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+
+ISSUE = "issue"
+COMMENT = "comment"
+KINDS = (ISSUE, COMMENT)
+
+# Balises de surlignage des termes trouvés. 'title' et 'snippet' sont du HTML : le texte saisi
+# est échappé, seules ces balises sont ajoutées.
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+# Marqueurs posés par le moteur autour des termes, remplacés par les balises après échappement
+# (caractères de contrôle STX / ETX : présents dans un texte saisi, ils ne donneraient qu'une balise <mark>)
+MARK_START = "\x02"
+MARK_END = "\x03"
+
+# Nombre maximal de termes retenus dans une recherche
+MAX_TERMS = 16
+
+
+def marked_to_html(text):
+    """
+    Texte surligné par le moteur (MARK_START / MARK_END) -> HTML : texte échappé, balises <mark>.
+    """
+    if not text:
+        return ""
+    return escape(text).replace(MARK_START, HIGHLIGHT_START).replace(MARK_END, HIGHLIGHT_END)
+
+
+def issue_rowid(issue_id):
+    return 2 * issue_id
+
+
+def comment_rowid(comment_id):
+    return 2 * comment_id + 1
+
+
+def parse_terms(query):
+    """
+    Découpe la saisie en termes. Un '*' final demande une recherche par préfixe (ex: "conn*").
+    Les opérateurs FTS5 ne sont pas interprétés : chaque terme est cité.
+    """
+    return re.findall(r"\w+\*?", query or "")[:MAX_TERMS]
+
+
+class SearchHit:
+    """
+    Un résultat de recherche : un document de l'index, avec son score et ses extraits surlignés.
+    """
+
+    def __init__(self, rowid, rank, kind, ref, issue_id, project_id, title, snippet):
+        self.rowid = rowid
+        self.rank = rank
+        self.kind = kind
+        self.ref = ref
+        self.issue_id = issue_id
+        self.project_id = project_id
+        self.title = title
+        self.snippet = snippet
+
+
+class SearchBackend(ABC):
+    """
+    Interface d'un moteur de recherche.
+    """
+
+    @abstractmethod
+    def index_issues(self, issues):
+        """
+        Indexe (ou réindexe) les issues données.
+        """
+
+    @abstractmethod
+    def index_comments(self, comments):
+        """
+        Indexe (ou réindexe) les commentaires donnés.
+        """
+
+    @abstractmethod
+    def remove_issues(self, issue_ids):
+        """
+        Retire de l'index les issues données.
+        """
+
+    @abstractmethod
+    def remove_comments(self, comment_ids):
+        """
+        Retire de l'index les commentaires donnés.
+        """
+
+    @abstractmethod
+    def move_issue_comments(self, issue_id, project_id):
+        """
+        Les commentaires d'une issue qui change de projet suivent l'issue.
+        """
+
+    @abstractmethod
+    def rebuild(self):
+        """
+        Reconstruit tout l'index depuis la base.
+        """
+
+    @abstractmethod
+    def search(self, terms, project_ids, kind=None, after=None, limit=10):
+        """
+        Renvoie au plus `limit` SearchHit, triés par pertinence puis par rowid.
+        `after` est la position (rank, rowid) du dernier résultat de la page précédente.
+        """
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """
+    Index FTS5 dans la base SQLite par défaut (table virtuelle créée par migration).
+    """
+
+    table = "projects_search_index"
+    # Poids bm25 par colonne : titre, texte, jetons de projet (ignorés pour le score)
+    rank_weights = (10.0, 1.0, 0.0)
+    snippet_tokens = 16
+
+    @classmethod
+    def create_schema(cls, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {cls.table} USING fts5("
+            "title, body, scope, kind UNINDEXED, ref UNINDEXED, issue_id UNINDEXED, "
+            "project_id UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        weights = ", ".join(str(weight) for weight in cls.rank_weights)
+        cursor.execute(f"INSERT INTO {cls.table}({cls.table}, rank) VALUES ('rank', 'bm25({weights})')")
+
+    @classmethod
+    def drop_schema(cls, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {cls.table}")
+
+    @staticmethod
+    def uuid_sql(column):
+        """
+        SQLite stocke les UUID en 32 caractères hexadécimaux : on les remet au format de l'API.
+        """
+        parts = [(1, 8), (9, 4), (13, 4), (17, 4), (21, 12)]
+        return " || '-' || ".join(f"substr({column}, {start}, {length})" for start, length in parts)
+
+    @classmethod
+    def populate(cls, cursor):
+        """
+        Remplit l'index depuis les tables sources, entièrement en SQL.
+        Le projet d'un commentaire est lu sur son issue : la migration 0005 appelle cette
+        méthode avant l'ajout de la colonne projects_comment.project_id (migration 0009).
+        """
+        cursor.execute(f"DELETE FROM {cls.table}")
+        cursor.execute(
+            f"INSERT INTO {cls.table} (rowid, title, body, scope, kind, ref, issue_id, project_id) "
+            "SELECT 2 * id, title, description, 'p' || project_id, %s, id, id, project_id "
+            "FROM projects_issue",
+            [ISSUE],
+        )
+        cursor.execute(
+            f"INSERT INTO {cls.table} (rowid, title, body, scope, kind, ref, issue_id, project_id) "
+            f"SELECT 2 * c.id + 1, '', c.description, 'p' || i.project_id, %s, {cls.uuid_sql('c.uuid')}, "
+            "c.issue_id, i.project_id FROM projects_comment c JOIN projects_issue i ON i.id = c.issue_id",
+            [COMMENT],
+        )
+
+    def write(self, documents):
+        """
+        Remplace les documents (rowid, title, body, kind, ref, issue_id, project_id).
+        """
+        if not documents:
+            return
+        with connection.cursor() as cursor:
+            self.delete([(document[0],) for document in documents])
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, title, body, scope, kind, ref, issue_id, project_id) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                [
+                    (rowid, title, body, f"p{project_id}", kind, ref, issue_id, project_id)
+                    for rowid, title, body, kind, ref, issue_id, project_id in documents
+                ],
+            )
+
+    def delete(self, rowids):
+        if rowids:
+            with connection.cursor() as cursor:
+                cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", rowids)
+
+    def index_issues(self, issues):
+        self.write([
+            (issue_rowid(issue.pk), issue.title, issue.description, ISSUE, str(issue.pk),
+             issue.pk, issue.project_id)
+            for issue in issues
+        ])
+
+    def index_comments(self, comments):
+        self.write([
+            (comment_rowid(comment.pk), "", comment.description, COMMENT, str(comment.uuid),
+             comment.issue_id, comment.project_id)
+            for comment in comments
+        ])
+
+    def remove_issues(self, issue_ids):
+        self.delete([(issue_rowid(issue_id),) for issue_id in issue_ids])
+
+    def remove_comments(self, comment_ids):
+        self.delete([(comment_rowid(comment_id),) for comment_id in comment_ids])
+
+    def move_issue_comments(self, issue_id, project_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {self.table} SET scope = %s, project_id = %s WHERE rowid IN "
+                "(SELECT 2 * id + 1 FROM projects_comment WHERE issue_id = %s)",
+                [f"p{project_id}", project_id, issue_id],
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            self.populate(cursor)
+
+    def search(self, terms, project_ids, kind=None, after=None, limit=10):
+        if not terms or not project_ids:
+            return []
+        quoted = " ".join(
+            '"{}"{}'.format(term.rstrip("*").replace('"', '""'), "*" if term.endswith("*") else "")
+            for term in terms
+        )
+        scope = " OR ".join(f"p{int(project_id)}" for project_id in project_ids)
+        match = f"{{title body}}: ({quoted}) AND scope: ({scope})"
+
+        sql = (
+            f"SELECT rowid, rank, kind, ref, issue_id, project_id, "
+            f"highlight({self.table}, 0, %s, %s), "
+            f"snippet({self.table}, 1, %s, %s, '…', {self.snippet_tokens}) "
+            f"FROM {self.table} WHERE {self.table} MATCH %s"
+        )
+        params = [MARK_START, MARK_END, MARK_START, MARK_END, match]
+        if kind is not None:
+            sql += " AND kind = %s"
+            params.append(kind)
+        if after is not None:
+            sql += " AND (rank > %s OR (rank = %s AND rowid > %s))"
+            params += [after[0], after[0], after[1]]
+        sql += " ORDER BY rank, rowid LIMIT %s"
+        params.append(limit)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [
+                SearchHit(*row[:6], marked_to_html(row[6]), marked_to_html(row[7]))
+                for row in cursor.fetchall()
+            ]
+
+
+class DatabaseSearchBackend(SearchBackend):
+    """
+    Repli sans index pour les bases sans FTS5 : LIKE sur les tables sources.
+    Tous les résultats ont le même score ; l'ordre est celui des rowid.
+    Coût proportionnel au volume des projets de l'utilisateur : à remplacer par un moteur
+    indexé (ex: recherche plein texte PostgreSQL) en production.
+    """
+
+    def index_issues(self, issues):
+        pass
+
+    def index_comments(self, comments):
+        pass
+
+    def remove_issues(self, issue_ids):
+        pass
+
+    def remove_comments(self, comment_ids):
+        pass
+
+    def move_issue_comments(self, issue_id, project_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    @staticmethod
+    def highlight(text, terms):
+        pattern = "|".join(
+            re.escape(term.rstrip("*")) + (r"\w*" if term.endswith("*") else "") for term in terms
+        )
+        return marked_to_html(re.sub(f"({pattern})", rf"{MARK_START}\1{MARK_END}", text, flags=re.IGNORECASE))
+
+    def search(self, terms, project_ids, kind=None, after=None, limit=10):
+        from django.db.models import Q
+        from .models import Issue, Comment
+
+        if not terms or not project_ids:
+            return []
+        words = [term.rstrip("*") for term in terms]
+        last_rowid = after[1] if after is not None else -1
+        hits = []
+
+        if kind in (None, ISSUE):
+            issues = Issue.objects.filter(project_id__in=project_ids, pk__gt=last_rowid // 2)
+            for word in words:
+                issues = issues.filter(Q(title__icontains=word) | Q(description__icontains=word))
+            for issue in issues.order_by("pk")[:limit]:
+                hits.append(SearchHit(
+                    issue_rowid(issue.pk), 0.0, ISSUE, str(issue.pk), issue.pk, issue.project_id,
+                    self.highlight(issue.title, terms), self.highlight(issue.description, terms),
+                ))
+
+        if kind in (None, COMMENT):
+            comments = Comment.objects.filter(project_id__in=project_ids, pk__gt=(last_rowid - 1) // 2)
+            for word in words:
+                comments = comments.filter(description__icontains=word)
+            for comment in comments.order_by("pk")[:limit]:
+                hits.append(SearchHit(
+                    comment_rowid(comment.pk), 0.0, COMMENT, str(comment.uuid), comment.issue_id,
+                    comment.project_id, "", self.highlight(comment.description, terms),
+                ))
+
+        hits.sort(key=lambda hit: hit.rowid)
+        return hits[:limit]
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    """
+    Moteur configuré (SOFTDESK_SEARCH_BACKEND), sinon FTS5 sous SQLite et le repli ailleurs.
+    """
+    path = getattr(settings, "SOFTDESK_SEARCH_BACKEND", None)
+    if path is None:
+        if connection.vendor == "sqlite":
+            path = "projects.search.SQLiteFTS5Backend"
+        else:
+            path = "projects.search.DatabaseSearchBackend"
+    return _load_backend(path)
@@ -1,13 +1,48 @@
+from django.utils.functional import cached_property
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from authentication.models import User
-from .models import Project, Contributor, Issue, Comment
+from .models import Project, Contributor, Issue, Comment, ProjectStats, ProjectAssigneeStats
+from . import membership, sparse
+from .metrics import InstrumentedSerializerMixin
 
 # Constante pour uniformiser le format des dates dans toute l'API
 # read_only=True : La date est gérée automatiquement par Django (auto_now_add), on ne l'envoie jamais manuellement.
 CREATE_TIME = serializers.DateTimeField(format="%d-%m-%Y %H:%M", read_only=True)
 
 
-class ProjectRetrieveSerializer(serializers.ModelSerializer):
+class ScopedProjectField(serializers.Field):
+    """
+    Projet d'une route imbriquée (/api/projects/{id}/...) : il vient de l'URL, déjà chargé par la vue
+    (voir nested.py). Affiché par son nom, comme le SlugRelatedField des routes à plat ; jamais lu
+    dans le corps de la requête.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(read_only=True, source="*", **kwargs)
+
+    def to_representation(self, instance):
+        return self.context["project"].name
+
+
+class SparseFieldsetMixin:
+    """
+    Champs retenus par ?fields= / ?omit= (voir sparse.py), portés par le contexte.
+    Le filtre s'applique après get_fields (y compris ceux des sous-classes) : les champs écartés
+    ne sont jamais calculés.
+    """
+
+    @cached_property
+    def fields(self):
+        fields = super().fields
+        selection = self.context.get(sparse.CONTEXT_KEY)
+        if selection is not None:
+            for name in [name for name in fields if name not in selection]:
+                del fields[name]
+        return fields
+
+
+class ProjectRetrieveSerializer(SparseFieldsetMixin, InstrumentedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer complet pour l'affichage détaillé, la modification et la suppression d'un projet.
     """
@@ -26,7 +61,7 @@ class ProjectRetrieveSerializer(serializers.ModelSerializer):
         read_only_fields = ["created_time"]
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(SparseFieldsetMixin, InstrumentedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer allégé pour la liste des projets.
     Optimise les performances en ne renvoyant que les infos essentielles.
@@ -37,7 +72,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "type"]
 
 
-class ContributorSerializer(serializers.ModelSerializer):
+class ContributorSerializer(SparseFieldsetMixin, InstrumentedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer pour gérer les membres (Contributeurs) d'un projet.
     Transforme les pseudos (Text) en objets User (Database) et vice-versa.
@@ -64,8 +99,31 @@ class ContributorSerializer(serializers.ModelSerializer):
         fields = ["id", "user", "project", "created_time"]
         read_only_fields = ["created_time"]
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if "project" in self.context:
+            fields["project"] = ScopedProjectField()
+        return fields
+
+    def validate(self, data):
+        """
+        Route imbriquée : le projet ne fait plus partie des champs saisis, la contrainte
+        d'unicité (user, project) n'est donc plus vérifiée par DRF. On la vérifie ici.
+        """
+        project = self.context.get("project")
+        user = data.get("user")
+        if project is not None and user is not None:
+            duplicates = Contributor.objects.filter(project_id=project.pk, user_id=user.pk)
+            if self.instance is not None:
+                duplicates = duplicates.exclude(pk=self.instance.pk)
+            if duplicates.exists():
+                raise serializers.ValidationError(
+                    {"user": f"L'utilisateur '{user.username}' contribue déjà au projet '{project.name}'."}
+                )
+        return data
+
 
-class IssueSerializer(serializers.ModelSerializer):
+class IssueSerializer(SparseFieldsetMixin, InstrumentedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer pour les Problèmes (Issues).
     Contient une validation complexe pour vérifier l'assignation.
@@ -98,6 +156,22 @@ class IssueSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["author", "created_time"]
 
+    def get_fields(self):
+        """
+        On ne peut créer (ou déplacer) une issue que dans un de SES projets :
+        le queryset du champ 'project' est filtré par appartenance, dans la même requête SQL
+        que la résolution du nom du projet.
+        """
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if "project" in self.context:
+            # Route imbriquée : le projet vient de l'URL (appartenance déjà vérifiée).
+            fields["project"] = ScopedProjectField()
+        # En lecture, le queryset n'est jamais interrogé : inutile de le construire.
+        elif request is not None and request.method not in SAFE_METHODS:
+            fields["project"].queryset = Project.objects.for_member(request.user)
+        return fields
+
     def validate(self, data):
         """
         Validation personnalisée (niveau Objet).
@@ -107,21 +181,24 @@ class IssueSerializer(serializers.ModelSerializer):
         project = data.get('project')
         assignee = data.get('assignee')
 
+        # Route imbriquée : le projet est celui de l'URL.
         # Cas particulier du PATCH (mise à jour partielle) :
         # Si le projet n'est pas dans les données envoyées, on récupère celui de l'issue existante.
+        if not project:
+            project = self.context.get("project")
         if self.instance and not project:
             project = self.instance.project
 
         # 2. Si un assigné est défini, on lance l'enquête de sécurité
         if assignee:
-            # Vérif A : Est-ce un contributeur officiel ?
-            is_contributor = Contributor.objects.filter(user=assignee, project=project).exists()
-            
-            # Vérif B : Est-ce l'auteur du projet (le chef) ?
-            is_author = (project.author == assignee)
+            # Est-ce un contributeur officiel ou l'auteur du projet (le chef) ?
+            # La réponse provient du cache des appartenances (voir membership.py).
+            is_project_member = membership.is_member(
+                self.context.get("request"), assignee.id, project.id
+            )
 
             # Si ce n'est ni l'un ni l'autre => ERREUR
-            if not is_contributor and not is_author:
+            if not is_project_member:
                 raise serializers.ValidationError(
                     {"assignee": f"L'utilisateur '{assignee.username}' ne fait pas partie du projet '{project.name}'."}
                 )
@@ -129,7 +206,21 @@ class IssueSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class IssueListSerializer(SparseFieldsetMixin, InstrumentedSerializerMixin, serializers.ModelSerializer):
+    """
+    Serializer allégé pour la liste des issues (tableau de suivi) : ?compact=true.
+    Ni description ni dates : seules les infos affichées sur une carte.
+    """
+
+    assignee = serializers.SlugRelatedField(slug_field="username", read_only=True)
+
+    class Meta:
+        model = Issue
+        fields = ["id", "title", "status", "priority", "assignee"]
+        read_only_fields = fields
+
+
+class CommentSerializer(SparseFieldsetMixin, InstrumentedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer pour les Commentaires.
     """
@@ -143,4 +234,115 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ["uuid", "description", "issue", "author", "created_time"]
-        read_only_fields = ["author", "uuid", "created_time"]
\ No newline at end of file
+        read_only_fields = ["author", "uuid", "created_time"]
+
+    def get_fields(self):
+        """
+        On ne peut commenter que les issues des projets dont on est membre.
+        """
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if "issue" in self.context:
+            # Route imbriquée : l'issue vient de l'URL.
+            fields["issue"] = serializers.PrimaryKeyRelatedField(read_only=True)
+        elif request is not None and request.method not in SAFE_METHODS:
+            fields["issue"].queryset = Issue.objects.for_member(request.user)
+        return fields
+
+
+class AssigneeStatsSerializer(serializers.ModelSerializer):
+    """
+    Charge de travail d'un assigné (tableau de bord d'un projet).
+    """
+
+    assignee = serializers.ReadOnlyField(source="assignee.username")
+    issues_open = serializers.ReadOnlyField()
+
+    class Meta:
+        model = ProjectAssigneeStats
+        fields = ["assignee", "issues_open", "issues_todo", "issues_in_progress", "issues_finished"]
+
+
+class ProjectStatsSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    """
+    Tableau de bord d'un projet, lu depuis les compteurs dénormalisés (voir stats.py).
+    """
+
+    issues_total = serializers.ReadOnlyField()
+    issues_open = serializers.ReadOnlyField()
+    # Les lignes sont fournies par la vue (une seule requête, triée par pseudo).
+    assignees = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProjectStats
+        fields = [
+            "project", "issues_total", "issues_open",
+            "issues_todo", "issues_in_progress", "issues_finished",
+            "priority_low", "priority_medium", "priority_high",
+            "tag_bug", "tag_feature", "tag_task",
+            "comments", "assignees",
+        ]
+
+    def get_assignees(self, obj):
+        return AssigneeStatsSerializer(self.context.get("assignees", []), many=True).data
+
+
+class SearchResultSerializer(InstrumentedSerializerMixin, serializers.Serializer):
+    """
+    Résultat de recherche (voir search.py). 'id' est l'identifiant de l'issue ou l'UUID du commentaire.
+    'title' et 'snippet' sont du HTML (texte échappé, termes trouvés entre balises <mark>).
+    """
+
+    type = serializers.CharField(source="kind")
+    id = serializers.SerializerMethodField()
+    issue = serializers.IntegerField(source="issue_id")
+    project = serializers.IntegerField(source="project_id")
+    title = serializers.CharField()
+    snippet = serializers.CharField()
+    # Score bm25 : plus il est élevé, plus le résultat est pertinent.
+    score = serializers.SerializerMethodField()
+
+    def get_id(self, hit):
+        return int(hit.ref) if hit.kind == "issue" else hit.ref
+
+    def get_score(self, hit):
+        return -hit.rank
+
+
+# -- Opérations en masse (voir bulk.py) --
+# Ces sérialiseurs ne valident que les champs "simples" d'un élément (types, longueurs, choix).
+# Les relations restent des textes/identifiants : elles sont résolues pour TOUT le lot
+# en une requête par type, au lieu d'une requête par élément.
+
+class IssueBulkSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    """
+    Élément d'une création/modification en masse d'issues.
+    """
+
+    project = serializers.CharField(max_length=128)
+    assignee = serializers.CharField(max_length=150, required=False, allow_null=True)
+
+    class Meta:
+        model = Issue
+        fields = ["title", "description", "tag", "priority", "status", "project", "assignee"]
+
+
+class CommentBulkSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    """
+    Élément d'une création/modification en masse de commentaires.
+    """
+
+    issue = serializers.IntegerField()
+
+    class Meta:
+        model = Comment
+        fields = ["description", "issue"]
+
+
+class ContributorBulkSerializer(InstrumentedSerializerMixin, serializers.Serializer):
+    """
+    Élément d'un ajout en masse de contributeurs.
+    """
+
+    user = serializers.CharField(max_length=150)
+    project = serializers.CharField(max_length=128)
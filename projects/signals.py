@@ -0,0 +1,673 @@
+"""
+Signaux de l'application projects.
+
+Ils maintiennent la cohérence des données dérivées des modèles :
+- projet dénormalisé des commentaires (Comment.project) ;
+- caches des appartenances aux projets (membership.py) ;
+- compteurs du tableau de bord des projets (stats.py) ;
+- index de recherche plein texte (search.py) ;
+- cache des réponses rendues (response_cache.py) ;
+- flux d'événements des projets (events.py) ;
+- journal des modifications (changes.py).
+Ils sont connectés au démarrage par ProjectsConfig.ready().
+
+Suppressions : les receveurs de bulk_deleted font le travail pour tout un lot. Un projet ou une
+issue supprimé (avec ses issues, commentaires et contributeurs en cascade) émet un seul
+bulk_deleted par modèle, à la fin de la cascade, au lieu de requêtes par ligne supprimée.
+"""
+
+import copy
+from collections import defaultdict
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import Signal, receiver
+
+from authentication.authentication import bump_membership_version, bump_membership_versions
+from . import changes, events, membership, response_cache, search, stats
+from .models import Project, Contributor, Issue, Comment, ProjectStats
+
+# Signaux émis par les opérations en masse (voir bulk.py) :
+# bulk_create() et bulk_update() ne déclenchent pas post_save.
+# - bulk_created(sender, instances) : instances créées (clés primaires renseignées).
+# - bulk_updated(sender, instances, fields, originals) : instances modifiées, noms des champs
+#   modifiés et anciennes valeurs {pk: {champ: valeur}}.
+# - bulk_deleted(sender, instances) : instances supprimées (issues, commentaires, contributeurs),
+#   émis pour un lot (voir begin_grouped_deletion) ou, à défaut, pour chaque post_delete.
+bulk_created = Signal()
+bulk_updated = Signal()
+bulk_deleted = Signal()
+
+# Attribut de l'origine d'une suppression (instance ou QuerySet sur lequel delete() est appelé)
+# qui accumule les objets supprimés jusqu'à end_grouped_deletion.
+GROUPED_DELETION_ATTR = "_softdesk_deleted"
+# Ordre d'émission de bulk_deleted : les dépendances avant l'objet dont elles dépendent.
+GROUPED_DELETION_MODELS = (Comment, Issue, Contributor)
+
+
+# -- Suppressions groupées --
+# Enregistrés avant les autres receveurs de suppression : le lot est émis avant ceux du projet
+# (notamment end_project_deletion, voir changes.py).
+
+def begin_grouped_deletion(origin):
+    """
+    Les objets supprimés par origin.delete() (cascade comprise) seront signalés en un lot,
+    par end_grouped_deletion(origin).
+    """
+    setattr(origin, GROUPED_DELETION_ATTR, defaultdict(list))
+
+
+def end_grouped_deletion(origin):
+    deleted = origin.__dict__.pop(GROUPED_DELETION_ATTR, {})
+    for model in GROUPED_DELETION_MODELS:
+        if deleted.get(model):
+            bulk_deleted.send(sender=model, instances=deleted[model])
+
+
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Issue)
+@receiver(post_delete, sender=Contributor)
+def group_deleted(sender, instance, origin=None, **kwargs):
+    deleted = getattr(origin, GROUPED_DELETION_ATTR, None)
+    if deleted is None:
+        bulk_deleted.send(sender=sender, instances=[instance])
+    else:
+        # Copie : Django remet la clé primaire à None à la fin de la suppression.
+        deleted[sender].append(copy.copy(instance))
+
+
+@receiver(pre_delete, sender=Project)
+@receiver(pre_delete, sender=Issue)
+def begin_cascade_deletion(sender, instance, origin=None, **kwargs):
+    if origin is instance:
+        begin_grouped_deletion(instance)
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Issue)
+def end_cascade_deletion(sender, instance, origin=None, **kwargs):
+    # L'origine est supprimée en dernier : la cascade est terminée.
+    if origin is instance:
+        end_grouped_deletion(instance)
+
+
+# -- Projet dénormalisé des commentaires (Comment.project) --
+# Enregistrés en premier : les signaux suivants lisent le projet sur le commentaire.
+
+@receiver(pre_save, sender=Comment)
+def sync_comment_project(sender, instance, **kwargs):
+    """
+    Le commentaire prend le projet de son issue. Un commentaire modifié (PUT) peut changer
+    d'issue, donc de projet : on mémorise les anciens (_previous_issue_id, _previous_project_id).
+    """
+    previous = None
+    if not instance._state.adding and instance.pk is not None:
+        previous = Comment.objects.filter(pk=instance.pk).values_list("issue_id", "project_id").first()
+    instance._previous_issue_id, instance._previous_project_id = previous or (None, None)
+
+    if previous is not None and previous[0] == instance.issue_id:
+        instance.project_id = previous[1]
+    elif Comment.issue.is_cached(instance):
+        instance.project_id = instance.issue.project_id
+    else:
+        instance.project_id = Issue.objects.values_list("project_id", flat=True).get(pk=instance.issue_id)
+
+
+@receiver(post_save, sender=Issue)
+def move_issue_comments(sender, instance, **kwargs):
+    """
+    Issue déplacée : ses commentaires la suivent dans son nouveau projet (une requête UPDATE).
+    """
+    previous = getattr(instance, "_previous_state", None)
+    if previous is not None and previous["project_id"] != instance.project_id:
+        Comment.objects.filter(issue_id=instance.pk).update(project_id=instance.project_id)
+
+
+@receiver(bulk_updated, sender=Issue)
+def move_bulk_issue_comments(sender, instances, fields, originals, **kwargs):
+    if "project_id" not in fields:
+        return
+    moved = defaultdict(list)
+    for issue in instances:
+        previous_project_id = originals.get(issue.pk, {}).get("project_id")
+        if previous_project_id is not None and previous_project_id != issue.project_id:
+            moved[issue.project_id].append(issue.pk)
+    for project_id, issue_ids in moved.items():
+        Comment.objects.filter(issue_id__in=issue_ids).update(project_id=project_id)
+
+
+@receiver(pre_save, sender=Contributor)
+def remember_previous_contributor_state(sender, instance, **kwargs):
+    """
+    Une ligne Contributor modifiée (PUT) peut changer d'utilisateur ou de projet :
+    on mémorise l'ancien couple pour l'invalider aussi.
+    """
+    if instance._state.adding or instance.pk is None:
+        instance._previous_state = None
+        return
+    instance._previous_state = (
+        Contributor.objects.filter(pk=instance.pk).values_list("user_id", "project_id").first()
+    )
+
+
+@receiver(post_save, sender=Contributor)
+def invalidate_contributor_membership(sender, instance, **kwargs):
+    """
+    Ajout ou modification d'un contributeur : son rôle sur le projet change.
+    """
+    membership.invalidate(instance.user_id, instance.project_id)
+    previous = getattr(instance, "_previous_state", None)
+    if previous is not None:
+        membership.invalidate(*previous)
+
+    # Les tokens JWT de l'utilisateur portent l'empreinte de ses appartenances : on la renouvelle.
+    bump_membership_version(instance.user_id)
+    if previous is not None and previous[0] != instance.user_id:
+        bump_membership_version(previous[0])
+
+
+@receiver(pre_save, sender=Project)
+def remember_previous_project_state(sender, instance, **kwargs):
+    """
+    Mémorise l'auteur et le nom actuels du projet avant une modification,
+    pour pouvoir invalider les entrées de cache de l'ancien auteur / ancien nom.
+    """
+    if instance._state.adding or instance.pk is None:
+        instance._previous_state = None
+        return
+    instance._previous_state = (
+        Project.objects.filter(pk=instance.pk).values_list("author_id", "name").first()
+    )
+
+
+@receiver(post_save, sender=Project)
+def invalidate_project_membership(sender, instance, created, **kwargs):
+    """
+    Changement d'auteur ou de nom d'un projet : on invalide les rôles et le nom concernés.
+    """
+    previous = getattr(instance, "_previous_state", None)
+    if created or previous is None:
+        return
+    previous_author_id, previous_name = previous
+    if previous_author_id != instance.author_id:
+        membership.invalidate(previous_author_id, instance.pk)
+        membership.invalidate(instance.author_id, instance.pk)
+        bump_membership_version(previous_author_id)
+        bump_membership_version(instance.author_id)
+    if previous_name != instance.name:
+        membership.invalidate_project_name(previous_name)
+        # Les issues affichent le nom de leur projet : leur représentation change,
+        # leurs validateurs HTTP (ETag / Last-Modified, voir conditional.py) doivent changer aussi.
+        Issue.objects.filter(project_id=instance.pk).update(updated_time=instance.updated_time)
+
+
+@receiver(post_delete, sender=Project)
+def invalidate_deleted_project(sender, instance, **kwargs):
+    membership.invalidate(instance.author_id, instance.pk)
+    membership.invalidate_project_name(instance.name)
+
+
+@receiver(bulk_created, sender=Contributor)
+@receiver(bulk_deleted, sender=Contributor)
+def invalidate_bulk_contributors(sender, instances, **kwargs):
+    """
+    Ajout en masse ou retrait de contributeurs : même invalidation que post_save, regroupée.
+    """
+    for contributor in instances:
+        membership.invalidate(contributor.user_id, contributor.project_id)
+    bump_membership_versions(contributor.user_id for contributor in instances)
+
+
+# -- Compteurs du tableau de bord (voir stats.py) --
+
+@receiver(post_save, sender=Project)
+def create_project_stats(sender, instance, created, **kwargs):
+    if created:
+        ProjectStats.objects.create(project=instance)
+
+
+@receiver(bulk_created, sender=Project)
+def create_bulk_project_stats(sender, instances, **kwargs):
+    ProjectStats.objects.bulk_create(
+        [ProjectStats(project_id=project.pk) for project in instances], ignore_conflicts=True
+    )
+
+
+@receiver(pre_save, sender=Issue)
+def remember_previous_issue_state(sender, instance, **kwargs):
+    """
+    Mémorise les champs comptés (projet, assigné, statut, priorité, balise) avant une modification.
+    """
+    if instance._state.adding or instance.pk is None:
+        instance._previous_state = None
+        return
+    previous = Issue.objects.filter(pk=instance.pk).values(*stats.ISSUE_FIELDS).first()
+    instance._previous_state = previous
+
+
+@receiver(post_save, sender=Issue)
+def count_saved_issue(sender, instance, created, **kwargs):
+    delta = stats.CounterDelta()
+    current = stats.issue_state(instance)
+    previous = getattr(instance, "_previous_state", None)
+    if created or previous is None:
+        delta.add_issue(current)
+    else:
+        delta.change_issue(previous, current)
+        if previous["project_id"] != current["project_id"]:
+            # Les commentaires suivent l'issue dans son nouveau projet.
+            moved = stats.issue_comment_counts([instance.pk]).get(instance.pk, 0)
+            delta.add_comments(previous["project_id"], -moved)
+            delta.add_comments(current["project_id"], moved)
+    delta.apply()
+
+
+@receiver(bulk_deleted, sender=Issue)
+def uncount_deleted_issues(sender, instances, **kwargs):
+    # Les commentaires des issues sont décomptés avant elles (cascade, voir GROUPED_DELETION_MODELS).
+    delta = stats.CounterDelta()
+    for issue in instances:
+        delta.add_issue(stats.issue_state(issue), -1)
+    delta.apply()
+
+
+@receiver(bulk_created, sender=Issue)
+def count_bulk_issues(sender, instances, **kwargs):
+    delta = stats.CounterDelta()
+    for issue in instances:
+        delta.add_issue(stats.issue_state(issue))
+    delta.apply()
+
+
+@receiver(bulk_updated, sender=Issue)
+def count_bulk_updated_issues(sender, instances, fields, originals, **kwargs):
+    if not fields.intersection(stats.ISSUE_FIELDS):
+        return
+    delta = stats.CounterDelta()
+    moved = []
+    for issue in instances:
+        current = stats.issue_state(issue)
+        previous = {**current, **{
+            field: value for field, value in originals.get(issue.pk, {}).items()
+            if field in stats.ISSUE_FIELDS
+        }}
+        delta.change_issue(previous, current)
+        if previous["project_id"] != current["project_id"]:
+            moved.append((issue.pk, previous["project_id"], current["project_id"]))
+    if moved:
+        comment_counts = stats.issue_comment_counts([issue_id for issue_id, _, _ in moved])
+        for issue_id, old_project_id, new_project_id in moved:
+            delta.add_comments(old_project_id, -comment_counts.get(issue_id, 0))
+            delta.add_comments(new_project_id, comment_counts.get(issue_id, 0))
+    delta.apply()
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    previous_project_id = getattr(instance, "_previous_project_id", None)
+    if created:
+        stats.shift_comments(instance.project_id, 1)
+    elif previous_project_id is not None and previous_project_id != instance.project_id:
+        stats.shift_comments(previous_project_id, -1)
+        stats.shift_comments(instance.project_id, 1)
+
+
+@receiver(bulk_deleted, sender=Comment)
+def uncount_deleted_comments(sender, instances, **kwargs):
+    delta = stats.CounterDelta()
+    for comment in instances:
+        delta.add_comments(comment.project_id, -1)
+    delta.apply()
+
+
+@receiver(bulk_created, sender=Comment)
+def count_bulk_comments(sender, instances, **kwargs):
+    delta = stats.CounterDelta()
+    for comment in instances:
+        delta.add_comments(comment.project_id, 1)
+    delta.apply()
+
+
+@receiver(bulk_updated, sender=Comment)
+def count_bulk_updated_comments(sender, instances, fields, originals, **kwargs):
+    if "project_id" not in fields:
+        return
+    delta = stats.CounterDelta()
+    for comment in instances:
+        previous_project_id = originals.get(comment.pk, {}).get("project_id")
+        if previous_project_id is not None:
+            delta.add_comments(previous_project_id, -1)
+            delta.add_comments(comment.project_id, 1)
+    delta.apply()
+
+
+# -- Index de recherche (voir search.py) --
+
+SEARCH_ISSUE_FIELDS = {"title", "description", "project_id"}
+SEARCH_COMMENT_FIELDS = {"description", "issue_id", "project_id"}
+
+
+@receiver(post_save, sender=Issue)
+def index_saved_issue(sender, instance, **kwargs):
+    backend = search.get_backend()
+    backend.index_issues([instance])
+    previous = getattr(instance, "_previous_state", None)
+    if previous is not None and previous["project_id"] != instance.project_id:
+        backend.move_issue_comments(instance.pk, instance.project_id)
+
+
+@receiver(bulk_deleted, sender=Issue)
+def unindex_deleted_issues(sender, instances, **kwargs):
+    search.get_backend().remove_issues([issue.pk for issue in instances])
+
+
+@receiver(bulk_created, sender=Issue)
+def index_bulk_issues(sender, instances, **kwargs):
+    search.get_backend().index_issues(instances)
+
+
+@receiver(bulk_updated, sender=Issue)
+def index_bulk_updated_issues(sender, instances, fields, originals, **kwargs):
+    if not fields & SEARCH_ISSUE_FIELDS:
+        return
+    backend = search.get_backend()
+    backend.index_issues(instances)
+    for issue in instances:
+        previous_project_id = originals.get(issue.pk, {}).get("project_id")
+        if previous_project_id is not None and previous_project_id != issue.project_id:
+            backend.move_issue_comments(issue.pk, issue.project_id)
+
+
+@receiver(post_save, sender=Comment)
+def index_saved_comment(sender, instance, **kwargs):
+    search.get_backend().index_comments([instance])
+
+
+@receiver(bulk_deleted, sender=Comment)
+def unindex_deleted_comments(sender, instances, **kwargs):
+    search.get_backend().remove_comments([comment.pk for comment in instances])
+
+
+@receiver(bulk_created, sender=Comment)
+def index_bulk_comments(sender, instances, **kwargs):
+    search.get_backend().index_comments(instances)
+
+
+@receiver(bulk_updated, sender=Comment)
+def index_bulk_updated_comments(sender, instances, fields, **kwargs):
+    if fields & SEARCH_COMMENT_FIELDS:
+        search.get_backend().index_comments(instances)
+
+
+# -- Cache des réponses (voir response_cache.py) --
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def expire_project_responses(sender, instance, **kwargs):
+    response_cache.invalidate(response_cache.project_tags(instance.pk))
+
+
+@receiver(bulk_created, sender=Project)
+def expire_bulk_project_responses(sender, instances, **kwargs):
+    response_cache.invalidate(set().union(*(response_cache.project_tags(project.pk) for project in instances)))
+
+
+@receiver(post_save, sender=Contributor)
+def expire_contributor_responses(sender, instance, **kwargs):
+    response_cache.invalidate(response_cache.contributor_tags(instance))
+
+
+@receiver(bulk_created, sender=Contributor)
+@receiver(bulk_deleted, sender=Contributor)
+def expire_bulk_contributor_responses(sender, instances, **kwargs):
+    response_cache.invalidate(
+        set().union(*(response_cache.contributor_tags(contributor) for contributor in instances))
+    )
+
+
+@receiver(post_save, sender=Issue)
+def expire_issue_responses(sender, instance, **kwargs):
+    tags = response_cache.issue_tags(instance.pk, instance.project_id)
+    previous = getattr(instance, "_previous_state", None)
+    if previous is not None and previous["project_id"] != instance.project_id:
+        tags |= response_cache.issue_tags(instance.pk, previous["project_id"])
+    response_cache.invalidate(tags)
+
+
+@receiver(bulk_created, sender=Issue)
+@receiver(bulk_updated, sender=Issue)
+@receiver(bulk_deleted, sender=Issue)
+def expire_bulk_issue_responses(sender, instances, originals=None, **kwargs):
+    tags = set()
+    for issue in instances:
+        tags |= response_cache.issue_tags(issue.pk, issue.project_id)
+        previous_project_id = (originals or {}).get(issue.pk, {}).get("project_id")
+        if previous_project_id is not None:
+            tags |= response_cache.issue_tags(issue.pk, previous_project_id)
+    response_cache.invalidate(tags)
+
+
+@receiver(post_save, sender=Comment)
+def expire_comment_responses(sender, instance, **kwargs):
+    tags = response_cache.comment_tags(instance, instance.project_id)
+    previous_issue_id = getattr(instance, "_previous_issue_id", None)
+    if previous_issue_id is not None and previous_issue_id != instance.issue_id:
+        tags |= {f"project:{instance._previous_project_id}", f"issue:{previous_issue_id}"}
+    response_cache.invalidate(tags)
+
+
+@receiver(bulk_created, sender=Comment)
+@receiver(bulk_updated, sender=Comment)
+@receiver(bulk_deleted, sender=Comment)
+def expire_bulk_comment_responses(sender, instances, originals=None, **kwargs):
+    tags = set()
+    for comment in instances:
+        tags |= response_cache.comment_tags(comment, comment.project_id)
+        previous = (originals or {}).get(comment.pk, {})
+        if "issue_id" in previous:
+            tags |= {f"project:{previous.get('project_id', comment.project_id)}", f"issue:{previous['issue_id']}"}
+    response_cache.invalidate(tags)
+
+
+# -- Flux d'événements des projets (voir events.py) --
+
+def _saved_action(created):
+    return events.CREATED if created else events.UPDATED
+
+
+@receiver(post_save, sender=Project)
+def publish_project_event(sender, instance, created, **kwargs):
+    if not created:
+        events.publish([(instance.pk, events.make_event("project", events.UPDATED, instance.pk, instance.pk))])
+
+
+@receiver(post_delete, sender=Project)
+def publish_deleted_project_event(sender, instance, **kwargs):
+    events.publish([(instance.pk, events.make_event("project", events.DELETED, instance.pk, instance.pk))])
+
+
+@receiver(post_save, sender=Contributor)
+def publish_contributor_event(sender, instance, created, **kwargs):
+    action = _saved_action(created)
+    published = [(instance.project_id, events.make_event(
+        "contributor", action, instance.pk, instance.project_id, user=instance.user_id
+    ))]
+    previous = getattr(instance, "_previous_state", None)
+    if previous is not None and previous != (instance.user_id, instance.project_id):
+        # L'ancien couple (utilisateur, projet) disparaît.
+        published.append((previous[1], events.make_event(
+            "contributor", events.DELETED, instance.pk, previous[1], user=previous[0]
+        )))
+    events.publish(published)
+
+
+@receiver(bulk_created, sender=Contributor)
+@receiver(bulk_deleted, sender=Contributor)
+def publish_bulk_contributor_events(sender, instances, **kwargs):
+    action = events.CREATED if kwargs["signal"] is bulk_created else events.DELETED
+    events.publish(
+        (contributor.project_id, events.make_event(
+            "contributor", action, contributor.pk, contributor.project_id, user=contributor.user_id
+        ))
+        for contributor in instances
+    )
+
+
+def _issue_events(issue, action, previous_project_id=None):
+    published = [(issue.project_id, events.make_event("issue", action, issue.pk, issue.project_id))]
+    if previous_project_id is not None and previous_project_id != issue.project_id:
+        # Issue déplacée : elle quitte les listes de l'ancien projet.
+        published.append(
+            (previous_project_id, events.make_event("issue", events.DELETED, issue.pk, previous_project_id))
+        )
+    return published
+
+
+@receiver(post_save, sender=Issue)
+def publish_issue_event(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_state", None)
+    events.publish(_issue_events(instance, _saved_action(created), previous and previous["project_id"]))
+
+
+@receiver(bulk_deleted, sender=Issue)
+def publish_deleted_issue_events(sender, instances, **kwargs):
+    events.publish(event for issue in instances for event in _issue_events(issue, events.DELETED))
+
+
+@receiver(bulk_created, sender=Issue)
+def publish_bulk_issue_events(sender, instances, **kwargs):
+    events.publish(event for issue in instances for event in _issue_events(issue, events.CREATED))
+
+
+@receiver(bulk_updated, sender=Issue)
+def publish_bulk_updated_issue_events(sender, instances, originals, **kwargs):
+    events.publish(
+        event for issue in instances
+        for event in _issue_events(issue, events.UPDATED, originals.get(issue.pk, {}).get("project_id"))
+    )
+
+
+def _comment_events(comment, action, previous_issue_id=None, previous_project_id=None):
+    published = [(comment.project_id, events.make_event(
+        "comment", action, comment.pk, comment.project_id, issue=comment.issue_id
+    ))]
+    if previous_issue_id is not None and previous_issue_id != comment.issue_id:
+        # Commentaire déplacé : il quitte l'ancienne issue.
+        previous_project_id = previous_project_id or comment.project_id
+        published.append((previous_project_id, events.make_event(
+            "comment", events.DELETED, comment.pk, previous_project_id, issue=previous_issue_id
+        )))
+    return published
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_event(sender, instance, created, **kwargs):
+    events.publish(_comment_events(
+        instance, _saved_action(created),
+        getattr(instance, "_previous_issue_id", None), getattr(instance, "_previous_project_id", None),
+    ))
+
+
+@receiver(bulk_created, sender=Comment)
+@receiver(bulk_updated, sender=Comment)
+def publish_bulk_comment_events(sender, instances, originals=None, **kwargs):
+    action = events.CREATED if originals is None else events.UPDATED
+    published = []
+    for comment in instances:
+        previous = (originals or {}).get(comment.pk, {})
+        published += _comment_events(comment, action, previous.get("issue_id"), previous.get("project_id"))
+    events.publish(published)
+
+
+@receiver(bulk_deleted, sender=Comment)
+def publish_deleted_comment_events(sender, instances, **kwargs):
+    events.publish(event for comment in instances for event in _comment_events(comment, events.DELETED))
+
+
+# -- Journal des modifications pour la synchronisation incrémentale (voir changes.py) --
+
+@receiver(pre_delete, sender=Project)
+def begin_project_deletion(sender, instance, **kwargs):
+    # Les issues et commentaires supprimés en cascade ne sont pas journalisés :
+    # le journal du projet est supprimé avec lui.
+    changes.begin_project_deletion(instance.pk)
+
+
+@receiver(post_delete, sender=Project)
+def end_project_deletion(sender, instance, **kwargs):
+    changes.end_project_deletion(instance.pk)
+
+
+@receiver(post_save, sender=Issue)
+def log_saved_issue(sender, instance, **kwargs):
+    # Déplacement : la tombstone de l'ancien projet précède l'écriture dans le nouveau
+    # (un membre des deux projets garde l'issue).
+    entries = []
+    previous = getattr(instance, "_previous_state", None)
+    if previous is not None and previous["project_id"] != instance.project_id:
+        entries.append(changes.issue_change(instance.pk, previous["project_id"], deleted=True))
+        entries += changes.moved_issue_changes([(instance.pk, previous["project_id"], instance.project_id)])
+    entries.append(changes.issue_change(instance.pk, instance.project_id))
+    changes.record(entries)
+
+
+@receiver(post_save, sender=Project)
+def log_renamed_project(sender, instance, created, **kwargs):
+    # Les issues affichent le nom de leur projet : leur représentation change.
+    previous = getattr(instance, "_previous_state", None)
+    if created or previous is None or previous[1] == instance.name:
+        return
+    issue_ids = Issue.objects.filter(project_id=instance.pk).values_list("pk", flat=True)
+    changes.record(changes.issue_change(issue_id, instance.pk) for issue_id in issue_ids)
+
+
+@receiver(bulk_deleted, sender=Issue)
+def log_deleted_issues(sender, instances, **kwargs):
+    # Les commentaires des issues sont journalisés avant elles (cascade, voir GROUPED_DELETION_MODELS).
+    changes.record([changes.issue_change(issue.pk, issue.project_id, deleted=True) for issue in instances])
+
+
+@receiver(bulk_created, sender=Issue)
+def log_bulk_issues(sender, instances, **kwargs):
+    changes.record(changes.issue_change(issue.pk, issue.project_id) for issue in instances)
+
+
+@receiver(bulk_updated, sender=Issue)
+def log_bulk_updated_issues(sender, instances, originals, **kwargs):
+    entries = []
+    moves = []
+    for issue in instances:
+        previous_project_id = originals.get(issue.pk, {}).get("project_id")
+        if previous_project_id is not None and previous_project_id != issue.project_id:
+            entries.append(changes.issue_change(issue.pk, previous_project_id, deleted=True))
+            moves.append((issue.pk, previous_project_id, issue.project_id))
+        entries.append(changes.issue_change(issue.pk, issue.project_id))
+    changes.record(changes.moved_issue_changes(moves) + entries)
+
+
+def _comment_changes(comment, previous_project_id=None):
+    entries = []
+    if previous_project_id is not None and previous_project_id != comment.project_id:
+        entries.append(changes.comment_change(comment.pk, comment.uuid, previous_project_id, deleted=True))
+    entries.append(changes.comment_change(comment.pk, comment.uuid, comment.project_id))
+    return entries
+
+
+@receiver(post_save, sender=Comment)
+def log_saved_comment(sender, instance, **kwargs):
+    changes.record(_comment_changes(instance, getattr(instance, "_previous_project_id", None)))
+
+
+@receiver(bulk_deleted, sender=Comment)
+def log_deleted_comments(sender, instances, **kwargs):
+    changes.record([
+        changes.comment_change(comment.pk, comment.uuid, comment.project_id, deleted=True) for comment in instances
+    ])
+
+
+@receiver(bulk_created, sender=Comment)
+@receiver(bulk_updated, sender=Comment)
+def log_bulk_comments(sender, instances, originals=None, **kwargs):
+    changes.record([
+        entry for comment in instances
+        for entry in _comment_changes(comment, (originals or {}).get(comment.pk, {}).get("project_id"))
+    ])
@@ -0,0 +1,134 @@
+"""
+Champs partiels des lectures (sparse fieldsets) :
+
+    GET /api/issues/?fields=id,title,status,priority,assignee
+    GET /api/comments/?omit=description
+
+La sélection est validée contre les champs du sérialiseur (nom inconnu : 400), puis portée par
+le contexte du sérialiseur (clé "fields", voir SparseFieldsetMixin dans serializers.py) :
+les champs écartés ne sont ni calculés ni rendus. Elle réduit aussi le SQL :
+- lectures précompilées (voir compiled.py) : values_list() ne lit que les colonnes retenues ;
+- rendu DRF : les colonnes du modèle qu'aucun champ retenu ne lit sont différées (defer()),
+  par exemple la description (jusqu'à 2 048 caractères) d'une liste ?compact=true.
+
+Seules les lectures (list, retrieve) sont concernées : les écritures valident et renvoient
+toujours tous les champs.
+
+Liste allégée des issues (IssueListSerializer : id, titre, statut, priorité, assigné) :
+GET /api/issues/?compact=true, combinable avec ?fields= / ?omit=.
+"""
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+COMPACT_PARAM = "compact"
+CONTEXT_KEY = "fields"
+SPARSE_ACTIONS = ("list", "retrieve")
+
+# Colonnes jamais différées : position de la pagination par curseur, ETag / Last-Modified.
+KEPT_COLUMNS = {"created_time", "updated_time"}
+
+# Sources des champs ({nom: attributs}) par classe de sérialiseur
+_sources = {}
+
+
+def field_sources(serializer_class):
+    try:
+        return _sources[serializer_class]
+    except KeyError:
+        pass
+    sources = {
+        name: field.source_attrs
+        for name, field in serializer_class(context={}).fields.items()
+        if not field.write_only
+    }
+    _sources[serializer_class] = sources
+    return sources
+
+
+def wants_compact(query_params):
+    return query_params.get(COMPACT_PARAM, "").lower() in ("true", "1", "yes")
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def select(serializer_class, query_params):
+    """
+    Noms des champs retenus (dans l'ordre du sérialiseur), ou None sans ?fields= ni ?omit=.
+    """
+    wanted = query_params.get(FIELDS_PARAM)
+    omitted = query_params.get(OMIT_PARAM)
+    if wanted is None and omitted is None:
+        return None
+
+    available = field_sources(serializer_class)
+    selection = set(available)
+    errors = {}
+    for param, value in ((FIELDS_PARAM, wanted), (OMIT_PARAM, omitted)):
+        if value is None:
+            continue
+        names = parse_names(value)
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            errors[param] = f"Champs inconnus : {', '.join(unknown)}. Champs disponibles : {', '.join(available)}."
+        elif param == FIELDS_PARAM:
+            selection &= set(names)
+        else:
+            selection -= set(names)
+    if errors:
+        raise ValidationError(errors)
+    if not selection:
+        raise ValidationError({FIELDS_PARAM: "Au moins un champ doit être conservé."})
+    return tuple(name for name in available if name in selection)
+
+
+def deferred_columns(model, serializer_class, selection):
+    """
+    Colonnes du modèle qu'aucun champ retenu ne lit. Les clés étrangères restent lues
+    (permissions, cache des réponses), comme les colonnes de KEPT_COLUMNS.
+    """
+    sources = field_sources(serializer_class)
+    used = {sources[name][0] for name in selection if sources[name]}
+    return [
+        field.name for field in model._meta.concrete_fields
+        if not field.primary_key and not field.is_relation
+        and field.name not in KEPT_COLUMNS and field.name not in used
+    ]
+
+
+class SparseFieldsetViewMixin:
+    """
+    Mixin de ViewSet : ?fields= / ?omit= sur list et retrieve. En lecture, les colonnes
+    qu'aucun champ affiché ne lit sont différées, avec ou sans sélection.
+    """
+
+    def is_sparse_read(self):
+        return self.request.method in SAFE_METHODS and self.action in SPARSE_ACTIONS
+
+    def get_sparse_fields(self):
+        if not hasattr(self, "_sparse_fields"):
+            selection = None
+            if self.is_sparse_read():
+                selection = select(self.get_serializer_class(), self.request.query_params)
+            self._sparse_fields = selection
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        selection = self.get_sparse_fields()
+        if selection is not None:
+            context[CONTEXT_KEY] = selection
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.is_sparse_read():
+            return queryset
+        serializer_class = self.get_serializer_class()
+        selection = self.get_sparse_fields() or tuple(field_sources(serializer_class))
+        deferred = deferred_columns(queryset.model, serializer_class, selection)
+        return queryset.defer(*deferred) if deferred else queryset
@@ -0,0 +1,205 @@
+"""
+Compteurs dénormalisés des projets (ProjectStats, ProjectAssigneeStats).
+
+- Mise à jour incrémentale : chaque création / modification / suppression d'issue ou de
+  commentaire produit des deltas, appliqués par des UPDATE ... SET col = col + delta (F()).
+  Pas de lecture-modification-écriture : deux requêtes simultanées ne perdent pas d'incrément.
+- Les deltas d'un même événement (ou d'un lot, voir bulk.py) sont regroupés :
+  au plus un UPDATE par projet et un par couple (projet, assigné).
+- rebuild() recalcule tout depuis les tables sources (commande rebuild_project_stats,
+  migration initiale, ou compteurs manquants).
+"""
+
+from collections import Counter, defaultdict
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+# Colonne de compteur pour chaque valeur de statut / priorité / balise (voir Issue)
+STATUS_COLUMNS = {
+    "To Do": "issues_todo",
+    "In Progress": "issues_in_progress",
+    "Finished": "issues_finished",
+}
+PRIORITY_COLUMNS = {
+    "LOW": "priority_low",
+    "MEDIUM": "priority_medium",
+    "HIGH": "priority_high",
+}
+TAG_COLUMNS = {
+    "BUG": "tag_bug",
+    "FEATURE": "tag_feature",
+    "TASK": "tag_task",
+}
+
+# Champs d'une issue dont dépendent les compteurs
+ISSUE_FIELDS = ("project_id", "assignee_id", "status", "priority", "tag")
+
+
+def issue_state(issue):
+    return {field: getattr(issue, field) for field in ISSUE_FIELDS}
+
+
+class CounterDelta:
+    """
+    Accumule des deltas de compteurs puis les applique en un minimum d'UPDATE.
+    """
+
+    def __init__(self):
+        self.projects = defaultdict(Counter)
+        self.assignees = defaultdict(Counter)
+
+    def add_issue(self, state, sign=1):
+        """
+        Compte (sign=1) ou décompte (sign=-1) une issue décrite par issue_state().
+        """
+        project_id = state["project_id"]
+        columns = self.projects[project_id]
+        for column in (
+            STATUS_COLUMNS.get(state["status"]),
+            PRIORITY_COLUMNS.get(state["priority"]),
+            TAG_COLUMNS.get(state["tag"]),
+        ):
+            if column:
+                columns[column] += sign
+        status_column = STATUS_COLUMNS.get(state["status"])
+        if state["assignee_id"] is not None and status_column:
+            self.assignees[(project_id, state["assignee_id"])][status_column] += sign
+
+    def change_issue(self, previous, current):
+        if previous != current:
+            self.add_issue(previous, -1)
+            self.add_issue(current, 1)
+
+    def add_comments(self, project_id, count):
+        self.projects[project_id]["comments"] += count
+
+    def apply(self):
+        from .models import ProjectStats, ProjectAssigneeStats
+
+        for project_id, columns in self.projects.items():
+            changes = {column: F(column) + delta for column, delta in columns.items() if delta}
+            if changes:
+                ProjectStats.objects.filter(project_id=project_id).update(**changes)
+
+        for (project_id, assignee_id), columns in self.assignees.items():
+            changes = {column: F(column) + delta for column, delta in columns.items() if delta}
+            if not changes:
+                continue
+            rows = ProjectAssigneeStats.objects.filter(project_id=project_id, assignee_id=assignee_id)
+            if not rows.update(**changes) and any(delta > 0 for delta in columns.values()):
+                # Première issue de cet assigné sur ce projet : on crée sa ligne.
+                # (INSERT ... ON CONFLICT DO NOTHING : sûr même si une autre requête la crée en parallèle)
+                ProjectAssigneeStats.objects.bulk_create(
+                    [ProjectAssigneeStats(project_id=project_id, assignee_id=assignee_id)],
+                    ignore_conflicts=True,
+                )
+                rows.update(**changes)
+
+
+def issue_comment_counts(issue_ids):
+    """
+    Nombre de commentaires par issue (utile quand une issue change de projet).
+    """
+    from .models import Comment
+
+    return dict(
+        Comment.objects.filter(issue_id__in=issue_ids)
+        .values("issue_id").annotate(count=Count("id")).values_list("issue_id", "count")
+    )
+
+
+def shift_comments(project_id, delta):
+    """
+    Ajoute `delta` au nombre de commentaires du projet, en une seule requête.
+    """
+    from .models import ProjectStats
+
+    ProjectStats.objects.filter(project_id=project_id).update(comments=F("comments") + delta)
+
+
+def get_stats(project_id):
+    """
+    Renvoie les compteurs du projet, en les recalculant s'ils n'existent pas encore.
+    """
+    from .models import ProjectStats
+
+    stats = ProjectStats.objects.filter(project_id=project_id).first()
+    if stats is None:
+        rebuild([project_id])
+        stats = ProjectStats.objects.get(project_id=project_id)
+    return stats
+
+
+def rebuild(project_ids=None, apps=global_apps):
+    """
+    Recalcule les compteurs des projets donnés (tous par défaut) depuis les tables sources.
+    `apps` permet l'appel depuis une migration (modèles historiques).
+    """
+    Project = apps.get_model("projects", "Project")
+    Issue = apps.get_model("projects", "Issue")
+    Comment = apps.get_model("projects", "Comment")
+    ProjectStats = apps.get_model("projects", "ProjectStats")
+    ProjectAssigneeStats = apps.get_model("projects", "ProjectAssigneeStats")
+
+    # Projet du commentaire : dénormalisé depuis la migration 0009 ; avant (modèles historiques
+    # de la migration 0004), par son issue.
+    comment_project = (
+        "project_id" if any(field.name == "project" for field in Comment._meta.fields) else "issue__project_id"
+    )
+
+    projects = Project.objects.all()
+    issues = Issue.objects.all()
+    comments = Comment.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+        issues = issues.filter(project_id__in=project_ids)
+        comments = comments.filter(**{f"{comment_project}__in": project_ids})
+
+    def counts(columns_by_value, field):
+        return {
+            column: Count("id", filter=Q(**{field: value}))
+            for value, column in columns_by_value.items()
+        }
+
+    totals = {
+        row.pop("project_id"): row
+        for row in issues.order_by().values("project_id").annotate(
+            **counts(STATUS_COLUMNS, "status"),
+            **counts(PRIORITY_COLUMNS, "priority"),
+            **counts(TAG_COLUMNS, "tag"),
+        )
+    }
+    comment_totals = dict(
+        comments.order_by().values(comment_project).annotate(count=Count("id"))
+        .values_list(comment_project, "count")
+    )
+    assignee_rows = (
+        issues.order_by().exclude(assignee_id=None)
+        .values("project_id", "assignee_id")
+        .annotate(**counts(STATUS_COLUMNS, "status"))
+    )
+
+    stale_stats = ProjectStats.objects.all()
+    stale_assignees = ProjectAssigneeStats.objects.all()
+    if project_ids is not None:
+        stale_stats = stale_stats.filter(project_id__in=project_ids)
+        stale_assignees = stale_assignees.filter(project_id__in=project_ids)
+
+    project_ids = list(projects.values_list("pk", flat=True))
+    with transaction.atomic():
+        stale_stats.delete()
+        stale_assignees.delete()
+        ProjectStats.objects.bulk_create([
+            ProjectStats(
+                project_id=project_id,
+                comments=comment_totals.get(project_id, 0),
+                **totals.get(project_id, {}),
+            )
+            for project_id in project_ids
+        ], batch_size=500)
+        ProjectAssigneeStats.objects.bulk_create(
+            [ProjectAssigneeStats(**row) for row in assignee_rows], batch_size=500
+        )
+    return len(project_ids)
@@ -1,3 +1,2090 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection, router
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from authentication.authentication import get_membership_version
+from authentication.models import User
+from authentication.serializers import SoftDeskTokenObtainPairSerializer
+from authentication.views import UserViewSet
+from config import urls as config_urls
+from config.database import database_settings, replica_databases
+from config.replicas import ReplicaRoutingMiddleware
+from .models import Project, Contributor, Issue, Comment, ProjectStats, Change
+from . import changes, events, membership, metrics, response_cache, stats
+from .cache_backends import LRUFileBasedCache, LRULocMemCache, check_shared_caches
+from .compiled import get_compiled
+from .bulk import BulkHandler
+from .async_views import AsyncIssueListView, AsyncProjectDetailView, EventStreamASGIHandler
+from .filters import IssueFilterBackend
+from .importer import NDJSONImporter
+from .search import DatabaseSearchBackend
+from .serializers import (
+    CommentSerializer, ContributorSerializer, IssueSerializer, ProjectListSerializer, ProjectRetrieveSerializer,
+)
+from .signals import bulk_created
+from .views import IssueViewSet
+
+
+# Hachage rapide des mots de passe : les tests n'ont pas besoin de PBKDF2.
+# Cache des réponses désactivé par défaut : les tests mesurent le travail réel de chaque vue
+# (voir ResponseCacheTests). Lectures sur la base principale même si des réplicas sont
+# configurés : les tests comptent ses requêtes (voir ReplicaRoutingTests).
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    SOFTDESK_RESPONSE_CACHE_ALIAS=None,
+    SOFTDESK_READ_REPLICAS=[],
+)
+class SoftDeskTestCase(APITestCase):
+    """
+    Socle commun des tests : un auteur de projet, un contributeur et un projet.
+    """
+
+    def setUp(self):
+        # Les identifiants sont réutilisés d'un test à l'autre : on repart d'un cache vide.
+        caches["membership"].clear()
+        self.author = User.objects.create_user(username="alice", password="pwd-alice-123")
+        self.member = User.objects.create_user(username="bob", password="pwd-bob-123")
+        self.project = Project.objects.create(name="SoftDesk", type="back-end", author=self.author)
+        Contributor.objects.create(user=self.author, project=self.project)
+        Contributor.objects.create(user=self.member, project=self.project)
+        self.client.force_authenticate(self.author)
+
+    def create_issues(self, count, project=None):
+        project = project or self.project
+        return [
+            Issue.objects.create(
+                title=f"Issue {i}",
+                description="Description",
+                tag="BUG",
+                priority="HIGH",
+                project=project,
+                author=self.author,
+                assignee=self.member,
+            )
+            for i in range(count)
+        ]
+
+    def create_comments(self, issue, count):
+        return [
+            Comment.objects.create(description=f"Commentaire {i}", author=self.member, issue=issue)
+            for i in range(count)
+        ]
+
+    def count_queries(self, url):
+        """
+        Exécute un GET et renvoie le nombre de requêtes SQL émises.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context.captured_queries)
+
+
+class QueryCountTests(SoftDeskTestCase):
+    """
+    Le nombre de requêtes SQL d'une liste ou d'une suppression ne doit pas dépendre du nombre
+    de lignes (pas de N+1).
+    """
+
+    def assertConstantQueries(self, url, grow):
+        grow(2)
+        small = self.count_queries(url)
+        grow(8)
+        large = self.count_queries(url)
+        self.assertEqual(small, large)
+
+    def test_project_list(self):
+        def grow(count):
+            for i in range(count):
+                Project.objects.create(name=f"Projet {Project.objects.count()}", type="iOS", author=self.author)
+
+        self.assertConstantQueries("/api/projects/", grow)
+
+    def test_contributor_list(self):
+        def grow(count):
+            for i in range(count):
+                user = User.objects.create_user(username=f"user-{User.objects.count()}", password="x")
+                Contributor.objects.create(user=user, project=self.project)
+
+        self.assertConstantQueries("/api/contributors/", grow)
+
+    def test_issue_list(self):
+        self.assertConstantQueries("/api/issues/", self.create_issues)
+
+    def test_comment_list(self):
+        issue = self.create_issues(1)[0]
+        self.assertConstantQueries("/api/comments/", lambda count: self.create_comments(issue, count))
+
+    def test_issue_retrieve(self):
+        issue = self.create_issues(1)[0]
+        # Une seule requête : jointures + filtrage par appartenance.
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/issues/{issue.pk}/")
+        self.assertEqual(response.data["project"], "SoftDesk")
+        self.assertEqual(response.data["assignee"], "bob")
+
+    def test_comment_retrieve(self):
+        comment = self.create_comments(self.create_issues(1)[0], 1)[0]
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/comments/{comment.pk}/")
+        self.assertEqual(response.data["author"], "bob")
+
+    def test_cascade_deletion(self):
+        def project_with(comments):
+            project = Project.objects.create(name=f"Projet {comments}", type="iOS", author=self.author)
+            Contributor.objects.create(user=self.member, project=project)
+            for issue in self.create_issues(3, project=project):
+                self.create_comments(issue, comments)
+            return project
+
+        # Signaux groupés (bulk_deleted) : compteurs, index, journal et droits en une requête chacun.
+        small, large = project_with(2), project_with(20)
+        with self.assertNumQueries(17):
+            small.delete()
+        with self.assertNumQueries(17):
+            large.delete()
+
+        issue = self.create_issues(1)[0]
+        self.create_comments(issue, 30)
+        with self.assertNumQueries(10):
+            issue.delete()
+        self.assertEqual(ProjectStats.objects.get(project=self.project).comments, 0)
+        self.assertEqual(Change.objects.filter(project=self.project, deleted=True).count(), 31)
+
+
+class MembershipScopeTests(SoftDeskTestCase):
+    """
+    Les listes et détails ne renvoient que les données des projets de l'utilisateur.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.outsider = User.objects.create_user(username="eve", password="pwd-eve-123")
+        self.other_project = Project.objects.create(name="Autre", type="iOS", author=self.outsider)
+        Contributor.objects.create(user=self.outsider, project=self.other_project)
+        self.issue = self.create_issues(1)[0]
+        self.comment = self.create_comments(self.issue, 1)[0]
+
+    def test_lists_are_scoped(self):
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get("/api/issues/").data["count"], 0)
+        self.assertEqual(self.client.get("/api/comments/").data["count"], 0)
+        self.assertEqual(self.client.get("/api/contributors/").data["count"], 1)
+
+    def test_member_sees_project_content(self):
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.client.get("/api/issues/").data["count"], 1)
+        self.assertEqual(self.client.get("/api/comments/").data["count"], 1)
+
+    def test_project_author_without_contributor_row(self):
+        # L'auteur d'un projet y a accès même sans ligne Contributor.
+        project = Project.objects.create(name="Solo", type="iOS", author=self.outsider)
+        self.create_issues(2, project=project)
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get("/api/issues/").data["count"], 2)
+
+    def test_details_are_hidden_from_outsiders(self):
+        self.client.force_authenticate(self.outsider)
+        for url in (
+            f"/api/projects/{self.project.pk}/",
+            f"/api/issues/{self.issue.pk}/",
+            f"/api/comments/{self.comment.pk}/",
+        ):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    def test_cannot_create_issue_in_foreign_project(self):
+        self.client.force_authenticate(self.outsider)
+        response = self.client.post("/api/issues/", {
+            "title": "Intrusion", "description": "...", "tag": "BUG",
+            "priority": "LOW", "project": "SoftDesk",
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("project", response.data)
+
+    def test_contributor_lookup_uses_index(self):
+        plan = Contributor.objects.filter(user=self.member).values("project_id").explain()
+        self.assertIn("INDEX", plan)
+
+
+class MembershipCacheTests(SoftDeskTestCase):
+    """
+    Le rôle (utilisateur, projet) est calculé une fois puis servi par le cache,
+    jusqu'à ce qu'un signal l'invalide.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.newcomer = User.objects.create_user(username="carol", password="pwd-carol-123")
+
+    def test_role_is_cached_across_requests(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(membership.get_role(None, self.member.id, self.project.id), membership.ROLE_CONTRIBUTOR)
+        with self.assertNumQueries(0):
+            self.assertEqual(membership.get_role(None, self.member.id, self.project.id), membership.ROLE_CONTRIBUTOR)
+
+    def test_contributor_signals_invalidate(self):
+        self.assertFalse(membership.is_member(None, self.newcomer.id, self.project.id))
+        contribution = Contributor.objects.create(user=self.newcomer, project=self.project)
+        self.assertTrue(membership.is_member(None, self.newcomer.id, self.project.id))
+        contribution.delete()
+        self.assertFalse(membership.is_member(None, self.newcomer.id, self.project.id))
+
+    def test_author_change_invalidates(self):
+        self.assertTrue(membership.is_author(None, self.author.id, self.project.id))
+        self.project.author = self.newcomer
+        self.project.save()
+        self.assertFalse(membership.is_author(None, self.author.id, self.project.id))
+        self.assertTrue(membership.is_author(None, self.newcomer.id, self.project.id))
+
+    @override_settings(SOFTDESK_READ_REPLICAS=["replica1"])
+    def test_cached_rights_are_read_from_primary(self):
+        """
+        Lecture servie par un réplica (alias inexistant ici : toute requête qui y irait échouerait) :
+        rôles et empreintes mis en cache viennent de la base principale.
+        """
+        caches["membership"].clear()
+        results = []
+
+        def get_response(request):
+            middleware.process_view(request, IssueViewSet.as_view({"get": "list"}), (), {})
+            self.assertEqual(router.db_for_read(Issue), "replica1")
+            results.append(membership.get_role(None, self.member.id, self.project.id))
+            results.append(async_to_sync(membership.aget_role)(None, self.newcomer.id, self.project.id))
+            results.append(membership.get_project_id(None, self.project.name))
+            results.append(get_membership_version(self.member.id))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(RequestFactory().get("/api/issues/", HTTP_AUTHORIZATION="Bearer bob"))
+        self.member.refresh_from_db()
+        self.assertEqual(
+            results,
+            [membership.ROLE_CONTRIBUTOR, membership.ROLE_NONE, self.project.id, self.member.membership_version],
+        )
+
+    def test_several_workers_require_a_shared_cache(self):
+        check_shared_caches()
+        with override_settings(SOFTDESK_WORKERS=2):
+            # Mémoire locale : un worker ne verrait pas les invalidations des autres.
+            with self.assertRaises(ImproperlyConfigured):
+                check_shared_caches()
+            with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+                **settings.CACHES,
+                "membership": {"BACKEND": "projects.cache_backends.LRUFileBasedCache", "LOCATION": location},
+            }):
+                check_shared_caches()
+                # Cache des réponses : ses jetons d'invalidation ne sont remplacés que localement.
+                with override_settings(SOFTDESK_RESPONSE_CACHE_ALIAS="responses"):
+                    with self.assertRaises(ImproperlyConfigured):
+                        check_shared_caches()
+                # Épinglage sur la base principale : la requête suivante peut viser un autre worker.
+                with override_settings(SOFTDESK_REPLICA_PIN_CACHE_ALIAS="default"):
+                    with self.assertRaises(ImproperlyConfigured):
+                        check_shared_caches()
+
+    def test_only_author_can_add_contributors(self):
+        url = "/api/contributors/"
+        payload = {"user": "carol", "project": "SoftDesk"}
+        self.assertEqual(self.client.post(url, payload).status_code, 201)
+        self.client.force_authenticate(self.member)
+        payload = {"user": "alice", "project": "SoftDesk"}
+        self.assertEqual(self.client.post(url, payload).status_code, 403)
+
+
+class KeysetPaginationTests(SoftDeskTestCase):
+    """
+    Pagination par curseur sur (created_time, id).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.issues = self.create_issues(25)
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row["id"] for row in response.data["results"]]
+            url, pages = response.data["next"], pages + 1
+        return ids, pages
+
+    def test_walks_every_row_once_in_order(self):
+        ids, pages = self.walk("/api/issues/?pagination=keyset")
+        self.assertEqual(ids, [issue.pk for issue in self.issues])
+        self.assertEqual(pages, 3)
+
+    def test_previous_link_goes_back(self):
+        first = self.client.get("/api/issues/?pagination=keyset")
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(first.data["previous"])
+
+    def test_count_opt_out(self):
+        response = self.client.get("/api/issues/?pagination=keyset")
+        self.assertEqual(response.data["count"], 25)
+        response = self.client.get("/api/issues/?pagination=keyset&count=false")
+        self.assertNotIn("count", response.data)
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        first = self.client.get("/api/issues/?pagination=keyset&count=false")
+        last = self.client.get(first.data["next"]).data["next"]
+        self.assertEqual(
+            self.count_queries("/api/issues/?pagination=keyset&count=false"),
+            self.count_queries(last),
+        )
+
+    def test_page_mode_is_still_the_default(self):
+        response = self.client.get("/api/issues/?page=3")
+        self.assertEqual(response.data["count"], 25)
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get("/api/issues/?cursor=garbage").status_code, 404)
+
+    def test_unknown_mode_is_rejected(self):
+        response = self.client.get("/api/issues/?pagination=cursor")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("pagination", response.data)
+        self.assertEqual(self.client.get("/api/issues/?pagination=page").status_code, 200)
+
+    def test_ordering_is_rejected_not_replaced(self):
+        response = self.client.get("/api/issues/?pagination=keyset&ordering=-priority")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ordering", response.data)
+        # Tri identique à celui du curseur : accepté.
+        ids, _ = self.walk("/api/issues/?pagination=keyset&ordering=created_time")
+        self.assertEqual(ids, [issue.pk for issue in self.issues])
+        # En mode page, le tri demandé est respecté.
+        response = self.client.get("/api/issues/?ordering=-created_time")
+        self.assertEqual(response.data["results"][0]["id"], self.issues[-1].pk)
+
+    def test_keyset_query_uses_index(self):
+        plan = Comment.objects.order_by("created_time", "id").explain()
+        self.assertIn("comment_keyset_idx", plan)
+
+
+class BulkOperationTests(SoftDeskTestCase):
+    """
+    Routes /bulk/ : validation vectorisée, erreurs par élément, écriture groupée.
+    """
+
+    def issue_payload(self, count, **overrides):
+        item = {"title": "Bug", "description": "...", "tag": "BUG", "priority": "LOW",
+                "project": "SoftDesk", "assignee": "bob"}
+        item.update(overrides)
+        return [dict(item, title=f"Bug {i}") for i in range(count)]
+
+    def post_bulk(self, url, payload, method="post"):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, payload, format="json")
+        return response, [query["sql"] for query in context.captured_queries]
+
+    def reads(self, queries):
+        return len([sql for sql in queries if sql.startswith("SELECT")])
+
+    def test_create_issues_with_constant_queries(self):
+        # La validation (lectures) ne dépend pas de la taille du lot ;
+        # seules les insertions sont découpées en lots par le backend SQL.
+        response, small = self.post_bulk("/api/issues/bulk/", self.issue_payload(5))
+        self.assertEqual(response.status_code, 201, response.data)
+        response, large = self.post_bulk("/api/issues/bulk/", self.issue_payload(200))
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(len(response.data["ids"]), 200)
+        self.assertEqual(self.reads(small), self.reads(large))
+        self.assertEqual(Issue.objects.filter(assignee=self.member).count(), 205)
+
+    def test_create_reports_errors_per_item_and_writes_nothing(self):
+        outsider = User.objects.create_user(username="eve", password="x")
+        payload = self.issue_payload(4)
+        payload[1]["tag"] = "NOPE"
+        payload[2]["project"] = "Inconnu"
+        payload[3]["assignee"] = outsider.username
+        response, _ = self.post_bulk("/api/issues/bulk/", payload)
+        self.assertEqual(response.status_code, 400)
+        errors = {error["index"]: error["errors"] for error in response.data["errors"]}
+        self.assertEqual(set(errors), {1, 2, 3})
+        self.assertIn("tag", errors[1])
+        self.assertIn("project", errors[2])
+        self.assertIn("assignee", errors[3])
+        self.assertFalse(Issue.objects.exists())
+
+    def test_update_and_delete_issues(self):
+        mine = self.create_issues(3)
+        foreign = Issue.objects.create(title="Autre", description="...", tag="BUG", priority="LOW",
+                                       project=self.project, author=self.member)
+        payload = [{"id": issue.pk, "status": "Finished"} for issue in mine]
+        response, _ = self.post_bulk("/api/issues/bulk/", payload, method="patch")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Issue.objects.filter(status="Finished").count(), 3)
+
+        response, _ = self.post_bulk("/api/issues/bulk/", [mine[0].pk, foreign.pk, 999999], method="delete")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+
+        response, _ = self.post_bulk("/api/issues/bulk/", [issue.pk for issue in mine], method="delete")
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(list(Issue.objects.all()), [foreign])
+
+    def test_delete_with_constant_queries(self):
+        def delete(count):
+            issues = self.create_issues(count)
+            for issue in issues:
+                self.create_comments(issue, 3)
+            response, queries = self.post_bulk("/api/issues/bulk/", [issue.pk for issue in issues], method="delete")
+            self.assertEqual(response.data["count"], count)
+            return len(queries)
+
+        # Un signal bulk_deleted par modèle : compteurs, index et journal en une requête chacun.
+        self.assertEqual(delete(2), 14)
+        self.assertEqual(delete(20), 14)
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(ProjectStats.objects.get(project=self.project).comments, 0)
+
+    def test_handlers_must_implement_create_and_update(self):
+        # Socle abstrait : un gestionnaire incomplet échoue dès l'instanciation.
+        class IncompleteHandler(BulkHandler):
+            def create(self, items):
+                return None
+
+        request = RequestFactory().post("/")
+        request.user = self.author
+        with self.assertRaises(TypeError):
+            BulkHandler(request)
+        with self.assertRaises(TypeError):
+            IncompleteHandler(request)
+
+    def test_comments(self):
+        issue = self.create_issues(1)[0]
+        other = Project.objects.create(name="Autre", type="iOS", author=self.member)
+        hidden = Issue.objects.create(title="x", description="...", tag="BUG", priority="LOW",
+                                      project=other, author=self.member)
+        payload = [{"description": "Vu", "issue": issue.pk}, {"description": "Intrus", "issue": hidden.pk}]
+        response, _ = self.post_bulk("/api/comments/bulk/", payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+
+        response, _ = self.post_bulk("/api/comments/bulk/", payload[:1] * 3)
+        self.assertEqual(response.status_code, 201)
+        payload = [{"uuid": uuid, "description": "Corrigé"} for uuid in response.data["ids"]]
+        response, _ = self.post_bulk("/api/comments/bulk/", payload, method="patch")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Comment.objects.filter(description="Corrigé").count(), 3)
+
+    def test_contributors_only_by_project_author(self):
+        carol = User.objects.create_user(username="carol", password="x")
+        dave = User.objects.create_user(username="dave", password="x")
+        self.assertFalse(membership.is_member(None, carol.id, self.project.id))
+
+        self.client.force_authenticate(self.member)
+        payload = [{"user": "carol", "project": "SoftDesk"}]
+        response, _ = self.post_bulk("/api/contributors/bulk/", payload)
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_authenticate(self.author)
+        payload = [{"user": "carol", "project": "SoftDesk"}, {"user": "dave", "project": "SoftDesk"},
+                   {"user": "bob", "project": "SoftDesk"}]
+        response, _ = self.post_bulk("/api/contributors/bulk/", payload)
+        self.assertEqual(response.data["errors"][0]["index"], 2)
+        response, _ = self.post_bulk("/api/contributors/bulk/", payload[:2])
+        self.assertEqual(response.status_code, 201, response.data)
+        # Le cache des appartenances est invalidé malgré bulk_create (signal bulk_created).
+        self.assertTrue(membership.is_member(None, carol.id, self.project.id))
+        self.assertTrue(membership.is_member(None, dave.id, self.project.id))
+
+    def test_payload_must_be_a_list(self):
+        response, _ = self.post_bulk("/api/issues/bulk/", {"title": "x"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportTests(SoftDeskTestCase):
+    """
+    Export en flux continu d'un projet complet.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.issues = self.create_issues(3)
+        for issue in self.issues:
+            self.create_comments(issue, 2)
+
+    def export(self, output):
+        response = self.client.get(f"/api/projects/{self.project.pk}/export/?output={output}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        records = [json.loads(line) for line in self.export("ndjson").splitlines()]
+        kinds = [record["record"] for record in records]
+        self.assertEqual(kinds, ["project"] + ["contributor"] * 2 + ["issue"] * 3 + ["comment"] * 6)
+        self.assertEqual(records[3]["assignee"], "bob")
+        self.assertEqual(records[-1]["issue"], self.issues[-1].pk)
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(self.export("csv"))))
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows[0]["name"], "SoftDesk")
+        self.assertEqual(rows[3]["title"], "Issue 0")
+
+    def test_queries_do_not_grow_with_project_size(self):
+        url = f"/api/projects/{self.project.pk}/export/"
+
+        def consume():
+            with CaptureQueriesContext(connection) as context:
+                b"".join(self.client.get(url).streaming_content)
+            return len(context.captured_queries)
+
+        small = consume()
+        for issue in self.create_issues(20):
+            self.create_comments(issue, 3)
+        self.assertEqual(consume(), small)
+
+    @override_settings(SOFTDESK_EXPORT_CHUNK_SIZE=4)
+    async def test_asgi_streams_asynchronously(self):
+        await self.author.arefresh_from_db()
+        token = await sync_to_async(SoftDeskTokenObtainPairSerializer.get_token)(self.author)
+        response = await self.async_client.get(
+            f"/api/projects/{self.project.pk}/export/", headers={"Authorization": f"Bearer {token.access_token}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        # Itérateur asynchrone : envoyé par paquets, sans lecture préalable de tout l'export.
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        kinds = [json.loads(line)["record"] for line in b"".join(chunks).decode().splitlines()]
+        self.assertEqual(kinds, ["project"] + ["contributor"] * 2 + ["issue"] * 3 + ["comment"] * 6)
+
+    def test_unknown_format_and_outsider(self):
+        url = f"/api/projects/{self.project.pk}/export/"
+        self.assertEqual(self.client.get(url + "?output=xml").status_code, 400)
+        outsider = User.objects.create_user(username="eve", password="x")
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class ImportTests(SoftDeskTestCase):
+    """
+    Import NDJSON par lots (commande import_ndjson).
+    """
+
+    def setUp(self):
+        super().setUp()
+        for issue in self.create_issues(3):
+            self.create_comments(issue, 2)
+
+    def exported_lines(self):
+        response = self.client.get(f"/api/projects/{self.project.pk}/export/?output=ndjson")
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def test_round_trip_with_new_users(self):
+        lines = [
+            json.dumps({"record": "user", "username": "carol", "password": "pwd-carol-123"}),
+            json.dumps({"record": "user", "username": "dave", "password_hash": User.objects.get(username="bob").password}),
+        ] + self.exported_lines()
+        self.project.delete()
+        lines.append(json.dumps({"record": "contributor", "project": "SoftDesk", "user": "carol"}))
+
+        stats = NDJSONImporter(chunk_size=2, hash_workers=0).run(lines)
+
+        self.assertEqual(stats.skipped, 0, stats.errors)
+        self.assertEqual(stats.created["user"], 2)
+        project = Project.objects.get(name="SoftDesk")
+        self.assertEqual(project.author_id, self.author.pk)
+        self.assertEqual(set(project.contributors.values_list("user__username", flat=True)), {"alice", "bob", "carol"})
+        self.assertEqual(Issue.objects.filter(project=project).count(), 3)
+        self.assertEqual(Comment.objects.filter(issue__project=project).count(), 6)
+        self.assertTrue(User.objects.get(username="carol").check_password("pwd-carol-123"))
+        self.assertTrue(User.objects.get(username="dave").check_password("pwd-bob-123"))
+        self.assertTrue(membership.is_member(None, User.objects.get(username="carol").pk, project.pk))
+
+    def test_queries_do_not_grow_with_file_size(self):
+        def run(issue_count):
+            lines = [json.dumps({"record": "project", "name": f"Import {issue_count}", "type": "iOS", "author": "alice"})]
+            lines += [
+                json.dumps({"record": "issue", "id": i, "project": f"Import {issue_count}", "title": "T",
+                            "description": "...", "author": "alice", "assignee": "alice"})
+                for i in range(issue_count)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                NDJSONImporter(chunk_size=1000, hash_workers=0).run(lines)
+            return len(context.captured_queries)
+
+        self.assertEqual(run(5), run(50))
+
+    def test_invalid_records_are_reported_not_stored(self):
+        User.objects.create_user(username="carol", password="pwd-carol-123")
+        valid = {"record": "issue", "project": "SoftDesk", "title": "T", "description": "...",
+                 "tag": "BUG", "priority": "LOW", "status": "To Do", "author": "alice"}
+        lines = [json.dumps({**valid, "id": 100})] + [
+            json.dumps({**valid, "id": index, **change}) for index, change in enumerate([
+                {"tag": "BOGUS"}, {"priority": "???"}, {"status": "nope"}, {"title": "x" * 500},
+                {"assignee": "carol"}, {"assignee": "inconnu"},
+            ])
+        ] + [
+            json.dumps({"record": "project", "name": "Autre", "type": "Windows", "author": "alice"}),
+            json.dumps({"record": "comment", "issue": 100, "description": "x" * 3000, "author": "bob"}),
+        ]
+        before = Issue.objects.count()
+
+        stats = NDJSONImporter(hash_workers=0).run(lines)
+
+        self.assertEqual(stats.created["issue"], 1)
+        self.assertEqual(stats.skipped, 8, stats.errors)
+        self.assertEqual(Issue.objects.count(), before + 1)
+        self.assertFalse(Project.objects.filter(name="Autre").exists())
+        self.assertFalse(Comment.objects.filter(issue__title="T").exists())
+        self.assertTrue(any("tag" in error for error in stats.errors), stats.errors)
+        self.assertTrue(any("'carol' ne fait pas partie du projet" in error for error in stats.errors))
+
+    def test_users_follow_signup_rules(self):
+        lines = [json.dumps({"record": "user", "password": "pwd-123", **fields}) for fields in (
+            {"username": "carol", "email": "carol@EXAMPLE.COM", "birth_date": "01/02/2000"},
+            {"username": "ﬁona"},  # ligature normalisée (NFKC) comme par create_user
+            {"username": "enfant", "birth_date": date.today().isoformat()},
+            {"username": "mauvaise-date", "birth_date": "2000-13-45"},
+        )]
+
+        stats = NDJSONImporter(hash_workers=0).run(lines)
+
+        self.assertEqual(stats.created["user"], 2)
+        self.assertEqual(stats.skipped, 2, stats.errors)
+        carol = User.objects.get(username="carol")
+        self.assertEqual((carol.email, carol.birth_date), ("carol@example.com", date(2000, 2, 1)))
+        self.assertTrue(User.objects.filter(username="fiona").exists())
+        self.assertTrue(any("15 ans" in error for error in stats.errors), stats.errors)
+        self.assertFalse(User.objects.filter(username__in=["enfant", "mauvaise-date"]).exists())
+
+    def test_existing_contributors_are_not_recreated(self):
+        carol = User.objects.create_user(username="carol", password="pwd-carol-123")
+        version = get_membership_version(self.member.id)
+        lines = [
+            json.dumps({"record": "contributor", "project": "SoftDesk", "user": username})
+            for username in ("bob", "alice", "carol", "carol")
+        ]
+        signalled = []
+
+        def receiver(sender, instances, **kwargs):
+            signalled.extend(instances)
+
+        bulk_created.connect(receiver, sender=Contributor)
+        self.addCleanup(bulk_created.disconnect, receiver, sender=Contributor)
+        stats = NDJSONImporter(hash_workers=0).run(lines)
+
+        # Seul carol est créé : compteur, signal (avec un id) et versions d'appartenance exacts.
+        self.assertEqual(stats.created["contributor"], 1)
+        self.assertEqual([(c.user_id, c.pk is not None) for c in signalled], [(carol.pk, True)])
+        self.assertEqual(get_membership_version(self.member.id), version)
+        self.assertEqual(Contributor.objects.filter(project=self.project).count(), 3)
+
+    def test_command_reports_errors(self):
+        path = self.tmp_file([
+            json.dumps({"record": "issue", "id": 1, "project": "Inconnu", "title": "T", "author": "alice"}),
+            "pas du json",
+        ])
+        out, err = io.StringIO(), io.StringIO()
+        call_command("import_ndjson", path, "--json", "--hash-workers", "0", stdout=out, stderr=err)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["lines"], 2)
+        self.assertEqual(report["skipped"], 2)
+        self.assertIn("ligne 1", err.getvalue())
+
+    def tmp_file(self, lines):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False, encoding="utf-8")
+        with handle:
+            handle.write("\n".join(lines))
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+
+
+class ProjectStatsTests(SoftDeskTestCase):
+    """
+    Tableau de bord d'un projet, lu depuis des compteurs maintenus par les signaux.
+    """
+
+    def stats(self):
+        response = self.client.get(f"/api/projects/{self.project.pk}/stats/")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def assertMatchesRebuild(self):
+        live = self.stats()
+        stats.rebuild()
+        self.assertEqual(live, self.stats())
+
+    def test_counts_follow_issue_lifecycle(self):
+        issues = self.create_issues(3)
+        self.create_comments(issues[0], 2)
+        data = self.stats()
+        self.assertEqual((data["issues_total"], data["issues_open"], data["tag_bug"]), (3, 3, 3))
+        self.assertEqual(data["comments"], 2)
+        self.assertEqual(data["assignees"], [{
+            "assignee": "bob", "issues_open": 3, "issues_todo": 3, "issues_in_progress": 0, "issues_finished": 0,
+        }])
+
+        response = self.client.patch(f"/api/issues/{issues[1].pk}/", {"status": "Finished", "priority": "LOW"})
+        self.assertEqual(response.status_code, 200, response.content)
+        issues[0].delete()
+        data = self.stats()
+        self.assertEqual((data["issues_todo"], data["issues_finished"]), (1, 1))
+        self.assertEqual((data["priority_high"], data["priority_low"]), (1, 1))
+        self.assertEqual(data["comments"], 0)
+        self.assertMatchesRebuild()
+
+    def test_issue_moving_project_moves_its_comments(self):
+        other = Project.objects.create(name="Autre", type="iOS", author=self.author)
+        issue = self.create_issues(1)[0]
+        self.create_comments(issue, 2)
+        issue.project = other
+        issue.save()
+        self.assertEqual(self.stats()["comments"], 0)
+        self.assertEqual(ProjectStats.objects.get(project=other).comments, 2)
+        self.assertMatchesRebuild()
+
+    def test_bulk_operations_are_counted(self):
+        payload = [{"title": f"T{i}", "description": "D", "tag": "TASK", "priority": "LOW", "project": "SoftDesk"}
+                   for i in range(4)]
+        ids = self.client.post("/api/issues/bulk/", payload, format="json").data["ids"]
+        self.client.patch("/api/issues/bulk/", [{"id": ids[0], "status": "In Progress", "assignee": "bob"}], format="json")
+        self.client.post("/api/comments/bulk/", [{"description": "C", "issue": ids[1]}] * 3, format="json")
+        self.client.delete("/api/issues/bulk/", ids[3:], format="json")
+        data = self.stats()
+        self.assertEqual((data["issues_total"], data["issues_in_progress"], data["comments"]), (3, 1, 3))
+        self.assertEqual(data["assignees"][0]["issues_in_progress"], 1)
+        self.assertMatchesRebuild()
+
+    def test_read_does_not_depend_on_project_size(self):
+        self.create_issues(2)
+        small = self.count_queries(f"/api/projects/{self.project.pk}/stats/")
+        for issue in self.create_issues(20):
+            self.create_comments(issue, 2)
+        self.assertEqual(self.count_queries(f"/api/projects/{self.project.pk}/stats/"), small)
+
+    def test_rebuild_command_and_outsider(self):
+        ProjectStats.objects.all().delete()
+        self.create_issues(2)
+        call_command("rebuild_project_stats", "--project", str(self.project.pk), stdout=io.StringIO())
+        self.assertEqual(self.stats()["issues_total"], 2)
+        self.client.force_authenticate(User.objects.create_user(username="eve", password="x"))
+        self.assertEqual(self.client.get(f"/api/projects/{self.project.pk}/stats/").status_code, 404)
+
+
+class SearchTests(SoftDeskTestCase):
+    """
+    Recherche plein texte (index FTS5 maintenu par les signaux).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.issue = Issue.objects.create(
+            title="Connexion impossible", description="Le bouton de connexion plante sur iOS.",
+            tag="BUG", priority="HIGH", project=self.project, author=self.author,
+        )
+        self.comment = Comment.objects.create(
+            description="Reproduit aussi sur Android après connexion.", author=self.member, issue=self.issue,
+        )
+
+    def search(self, query, **params):
+        response = self.client.get("/api/search/", {"q": query, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_ranks_and_highlights_issues_and_comments(self):
+        results = self.search("connexion")["results"]
+        self.assertEqual([result["type"] for result in results], ["issue", "comment"])
+        self.assertEqual(results[0]["id"], self.issue.pk)
+        self.assertEqual(results[0]["title"], "<mark>Connexion</mark> impossible")
+        self.assertEqual(results[1]["id"], str(self.comment.uuid))
+        self.assertIn("<mark>connexion</mark>", results[1]["snippet"])
+        self.assertEqual([r["type"] for r in self.search("connexion", type="comment")["results"]], ["comment"])
+        # Préfixe et accents
+        self.assertEqual(len(self.search("apres conn*")["results"]), 1)
+
+    def test_highlights_are_escaped_html(self):
+        self.issue.title = "<script>alert('connexion')</script>"
+        self.issue.save()
+        result = self.search("connexion", type="issue")["results"][0]
+        self.assertEqual(result["title"], "&lt;script&gt;alert(&#x27;<mark>connexion</mark>&#x27;)&lt;/script&gt;")
+        self.assertNotIn("<script", result["snippet"])
+        self.assertEqual(
+            DatabaseSearchBackend.highlight("<b>conn</b>", ["conn*"]), "&lt;b&gt;<mark>conn</mark>&lt;/b&gt;"
+        )
+
+    def test_index_follows_updates_and_deletes(self):
+        self.issue.title = "Plantage au démarrage"
+        self.issue.save()
+        self.assertEqual(self.search("demarrage")["results"][0]["id"], self.issue.pk)
+        self.comment.delete()
+        self.assertEqual(self.search("android")["results"], [])
+        self.client.post("/api/comments/bulk/", [{"description": "Toujours sur Android", "issue": self.issue.pk}], format="json")
+        self.assertEqual(len(self.search("android")["results"]), 1)
+        self.issue.delete()
+        self.assertEqual(self.search("android plantage")["results"], [])
+
+    def test_scoped_to_member_projects(self):
+        outsider = User.objects.create_user(username="eve", password="x")
+        other = Project.objects.create(name="Autre", type="iOS", author=outsider)
+        Issue.objects.create(title="Connexion lente", description="...", tag="BUG", priority="LOW",
+                             project=other, author=outsider)
+        self.assertEqual(len(self.search("connexion")["results"]), 2)
+        self.assertEqual(self.search("connexion", project=other.pk)["results"], [])
+        self.client.force_authenticate(outsider)
+        self.assertEqual([r["project"] for r in self.search("connexion")["results"]], [other.pk])
+
+    def test_cursor_pagination(self):
+        self.create_comments(self.issue, 5)
+        seen, url = [], "/api/search/?q=commentaire&page_size=2"
+        while url:
+            page = self.client.get(url).data
+            seen += [result["id"] for result in page["results"]]
+            url = page["next"]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_rebuild_and_invalid_queries(self):
+        call_command("rebuild_search_index", stdout=io.StringIO())
+        self.assertEqual(len(self.search("connexion")["results"]), 2)
+        self.assertEqual(self.client.get("/api/search/").status_code, 400)
+        self.assertEqual(self.client.get("/api/search/", {"q": "x", "type": "user"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/search/", {"q": '"*'}).status_code, 400)
+        # Les opérateurs FTS5 sont cités comme des mots ordinaires.
+        self.assertEqual(self.search('connexion OR NEAR(')["results"], [])
+
+    @override_settings(SOFTDESK_SEARCH_BACKEND="projects.search.DatabaseSearchBackend")
+    def test_fallback_backend_without_index(self):
+        results = self.search("connexion")["results"]
+        self.assertEqual([result["type"] for result in results], ["issue", "comment"])
+        self.assertEqual(results[0]["title"], "<mark>Connexion</mark> impossible")
+
+
+class IssueFilterTests(SoftDeskTestCase):
+    """
+    Filtres et tri de la liste des issues, servis par les index composites de Issue.Meta.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.bug, self.feature, self.task = (
+            Issue.objects.create(title=title, description="...", tag=tag, priority=priority, status=status,
+                                 project=self.project, author=author, assignee=assignee)
+            for title, tag, priority, status, author, assignee in (
+                ("Bug", "BUG", "HIGH", "To Do", self.author, self.member),
+                ("Feature", "FEATURE", "LOW", "In Progress", self.member, self.author),
+                ("Task", "TASK", "MEDIUM", "Finished", self.author, None),
+            )
+        )
+
+    def titles(self, query):
+        response = self.client.get(f"/api/issues/?{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return [issue["title"] for issue in response.data["results"]]
+
+    def plan(self, **params):
+        """
+        Plan d'exécution (EXPLAIN) de la requête de liste filtrée, telle que la vue la construit.
+        """
+        request = Request(APIRequestFactory().get("/api/issues/", params))
+        request.user = self.author
+        queryset = IssueFilterBackend().filter_queryset(request, Issue.objects.for_member(self.author), None)
+        return queryset.explain()
+
+    def test_filters(self):
+        self.assertEqual(self.titles(f"project={self.project.pk}&status=To Do,In Progress"), ["Bug", "Feature"])
+        self.assertEqual(self.titles("project=SoftDesk&priority=HIGH&tag=BUG"), ["Bug"])
+        self.assertEqual(self.titles("assignee=me"), ["Feature"])
+        self.assertEqual(self.titles("assignee=bob&author=me"), ["Bug"])
+        self.assertEqual(self.titles("assignee=none"), ["Task"])
+        self.assertEqual(self.titles("created_after=2000-01-01&created_before=2999-01-01"), ["Bug", "Feature", "Task"])
+        self.assertEqual(self.titles("created_after=2999-01-01"), [])
+
+    def test_invalid_values_are_rejected(self):
+        response = self.client.get("/api/issues/?status=Done&created_after=hier")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {"status", "created_after"})
+
+    def test_ordering_uses_business_order(self):
+        self.assertEqual(self.titles("ordering=-priority"), ["Bug", "Task", "Feature"])
+        self.assertEqual(self.titles("ordering=status"), ["Bug", "Feature", "Task"])
+        self.assertEqual(self.titles("ordering=-title"), ["Task", "Feature", "Bug"])
+
+    def test_board_views_use_composite_indexes(self):
+        project = self.project.pk
+        self.assertIn("issue_project_status_idx", self.plan(project=project, status="To Do", priority="HIGH"))
+        self.assertIn("issue_project_assignee_idx", self.plan(project=project, assignee="me", status="To Do"))
+        self.assertIn("issue_project_tag_idx", self.plan(project=project, tag="BUG", status="To Do"))
+        self.assertIn("issue_assignee_status_idx", self.plan(assignee="me", status="In Progress"))
+        self.assertIn("issue_project_keyset_idx", self.plan(project=project, created_after="2024-01-01"))
+
+
+class NestedRoutesTests(SoftDeskTestCase):
+    """
+    Routes imbriquées : le projet (et l'issue) sont résolus une seule fois par requête.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.base = f"/api/projects/{self.project.pk}"
+        self.issue = self.create_issues(1)[0]
+
+    def request(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data, format="json")
+        return response, len(context.captured_queries)
+
+    def test_issue_crud_under_project(self):
+        response, _ = self.request("post", f"{self.base}/issues/", {
+            "title": "Nouvelle", "description": "...", "tag": "BUG", "priority": "LOW", "assignee": "bob",
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data["project"], "SoftDesk")
+        response, _ = self.request("get", f"{self.base}/issues/")
+        self.assertEqual([issue["project"] for issue in response.data["results"]], ["SoftDesk"] * 2)
+        response, _ = self.request("patch", f"{self.base}/issues/{self.issue.pk}/", {"status": "Finished"})
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_project_is_resolved_once(self):
+        # Création à plat : résolution du nom du projet + vérification d'appartenance de l'assigné.
+        payload = {"title": "T", "description": "D", "tag": "BUG", "priority": "LOW", "assignee": "bob"}
+        flat, flat_queries = self.request("post", "/api/issues/", dict(payload, project="SoftDesk"))
+        nested, nested_queries = self.request("post", f"{self.base}/issues/", payload)
+        self.assertEqual((flat.status_code, nested.status_code), (201, 201))
+        self.assertLess(nested_queries, flat_queries)
+
+        # Détail : projet + rôle (1 requête) puis l'issue, sans jointure vers le projet.
+        response, queries = self.request("get", f"{self.base}/issues/{self.issue.pk}/")
+        self.assertEqual(response.data["project"], "SoftDesk")
+        self.assertEqual(queries, 2)
+
+    def test_comments_under_issue(self):
+        url = f"{self.base}/issues/{self.issue.pk}/comments/"
+        response, _ = self.request("post", url, {"description": "Vu."})
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data["issue"], self.issue.pk)
+        response, _ = self.request("get", url)
+        self.assertEqual(response.data["count"], 1)
+        other = Project.objects.create(name="Autre", type="iOS", author=self.author)
+        foreign_issue = self.create_issues(1, project=other)[0]
+        response, _ = self.request("get", f"{self.base}/issues/{foreign_issue.pk}/comments/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_contributors_under_project(self):
+        carol = User.objects.create_user(username="carol", password="x")
+        response, _ = self.request("post", f"{self.base}/contributors/", {"user": "carol"})
+        self.assertEqual(response.status_code, 201, response.content)
+        response, _ = self.request("post", f"{self.base}/contributors/", {"user": "carol"})
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(self.member)
+        response, _ = self.request("post", f"{self.base}/contributors/", {"user": "alice"})
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Contributor.objects.filter(user=carol, project=self.project).exists())
+
+    def test_outsiders_and_bulk_are_not_nested(self):
+        self.client.force_authenticate(User.objects.create_user(username="eve", password="x"))
+        for url in (f"{self.base}/issues/", f"{self.base}/contributors/",
+                    f"{self.base}/issues/{self.issue.pk}/comments/"):
+            self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_authenticate(self.author)
+        # "bulk" n'est pas une action : l'URL est lue comme le détail d'une issue "bulk".
+        self.assertEqual(self.client.post(f"{self.base}/issues/bulk/", [], format="json").status_code, 405)
+
+
+class ConditionalGetTests(SoftDeskTestCase):
+    """
+    ETag / Last-Modified : un client à jour reçoit une 304 sans sérialisation.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.issue = self.create_issues(1)[0]
+        self.create_comments(self.issue, 2)
+
+    def revalidate(self, url, etag):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        return response, len(context.captured_queries)
+
+    def test_detail_not_modified(self):
+        for url in (f"/api/projects/{self.project.pk}/", f"/api/issues/{self.issue.pk}/",
+                    f"/api/comments/{self.issue.comments.first().pk}/"):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response["ETag"].startswith('W/"'))
+            self.assertIn("Last-Modified", response)
+            self.assertIn("private", response["Cache-Control"])
+            revalidated, queries = self.revalidate(url, response["ETag"])
+            self.assertEqual(revalidated.status_code, 304, url)
+            self.assertEqual(revalidated.content, b"")
+            self.assertEqual(revalidated["ETag"], response["ETag"])
+            # Une seule requête : le couple (id, updated_time) filtré par appartenance.
+            self.assertEqual(queries, 1, url)
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+            self.assertEqual(response.status_code, 304, url)
+
+    def test_detail_changes_after_update(self):
+        url = f"/api/issues/{self.issue.pk}/"
+        etag = self.client.get(url)["ETag"]
+        self.client.patch(url, {"status": "In Progress"}, format="json")
+        response, _ = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "In Progress")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_project_rename_changes_issue_validators(self):
+        url = f"/api/issues/{self.issue.pk}/"
+        etag = self.client.get(url)["ETag"]
+        self.client.patch(f"/api/projects/{self.project.pk}/", {"name": "SoftDesk 2"}, format="json")
+        response, _ = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["project"], "SoftDesk 2")
+
+    def test_list_not_modified_until_change(self):
+        url = f"/api/projects/{self.project.pk}/issues/{self.issue.pk}/comments/"
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertNotIn("Last-Modified", response)
+        response, queries = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 304)
+        # Projet (avec le rôle), issue parente, puis COUNT et (id, updated_time) de la page.
+        self.assertEqual(queries, 4)
+        # Les filtres et la page font partie du validateur.
+        response, _ = self.revalidate(f"{url}?page_size=1", etag)
+        self.assertEqual(response.status_code, 200)
+        # Une suppression change le total et les lignes de la page.
+        self.issue.comments.order_by("created_time").first().delete()
+        response, _ = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_keyset_list_validator_without_count(self):
+        for url in ("/api/issues/?pagination=keyset&count=false",
+                    "/api/comments/?pagination=keyset&count=false"):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            # Le validateur vient des lignes déjà lues : ni COUNT ni MAX, une seule requête.
+            self.assertEqual(len(context.captured_queries), 1, url)
+            self.assertNotIn("COUNT(", context.captured_queries[0]["sql"])
+            revalidated, queries = self.revalidate(url, response["ETag"])
+            self.assertEqual(revalidated.status_code, 304, url)
+            self.assertEqual(queries, 1, url)
+
+    def test_bulk_update_changes_validators(self):
+        url = "/api/issues/"
+        etag = self.client.get(url)["ETag"]
+        response = self.client.patch(
+            "/api/issues/bulk/", [{"id": self.issue.pk, "priority": "LOW"}], format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        response, _ = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(SOFTDESK_RESPONSE_CACHE_ALIAS="responses")
+class ResponseCacheTests(SoftDeskTestCase):
+    """
+    Cache des réponses rendues : succès sans requête SQL, invalidation ciblée par les écritures.
+    Les jetons d'invalidation sont remplacés au commit : les écritures passent par
+    captureOnCommitCallbacks (les tests s'exécutent dans une transaction jamais validée).
+    """
+
+    def setUp(self):
+        super().setUp()
+        caches["responses"].clear()
+        response_cache.reset_stats()
+        self.issue, self.other_issue = self.create_issues(2)
+        self.create_comments(self.issue, 2)
+        self.create_comments(self.other_issue, 1)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response, len(context.captured_queries)
+
+    def write(self, method, url, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(url, data, format="json")
+
+    def test_hit_served_without_queries(self):
+        for url in ("/api/projects/", f"/api/projects/{self.project.pk}/", "/api/issues/",
+                    f"/api/issues/{self.issue.pk}/", "/api/comments/", "/api/contributors/"):
+            first, _ = self.get(url)
+            self.assertEqual(first["X-Cache"], "MISS", url)
+            second, queries = self.get(url)
+            self.assertEqual(second["X-Cache"], "HIT", url)
+            self.assertEqual(second.content, first.content, url)
+            self.assertEqual(second.get("ETag"), first.get("ETag"), url)
+            self.assertEqual(queries, 0, url)
+        stats = response_cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["stores"]), (6, 6, 6))
+
+    def test_key_includes_user_and_params(self):
+        self.get("/api/issues/?status=To Do&priority=HIGH")
+        response, _ = self.get("/api/issues/?priority=HIGH&status=To Do")
+        self.assertEqual(response["X-Cache"], "HIT")
+        response, _ = self.get("/api/issues/?page=1&priority=HIGH&status=To Do")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.client.force_authenticate(self.member)
+        response, _ = self.get("/api/issues/?priority=HIGH&status=To Do")
+        self.assertEqual(response["X-Cache"], "MISS")
+        # Un non-membre n'obtient jamais une réponse mise en cache pour un membre.
+        self.client.force_authenticate(User.objects.create_user(username="eve", password="x"))
+        self.assertEqual(self.client.get(f"/api/issues/{self.issue.pk}/").status_code, 404)
+
+    def test_writes_expire_only_dependent_entries(self):
+        nested = f"/api/projects/{self.project.pk}/issues/{{}}/comments/"
+        urls = [f"/api/issues/{self.issue.pk}/", f"/api/issues/{self.other_issue.pk}/",
+                nested.format(self.issue.pk), nested.format(self.other_issue.pk), "/api/projects/"]
+        for url in urls:
+            self.get(url)
+
+        self.write("post", "/api/comments/", {"description": "Nouveau", "issue": self.issue.pk})
+        states = {url: self.get(url)[0]["X-Cache"] for url in urls}
+        self.assertEqual(states, {
+            urls[0]: "HIT", urls[1]: "HIT",  # le détail d'une issue n'affiche pas ses commentaires
+            urls[2]: "MISS", urls[3]: "HIT", urls[4]: "HIT",
+        })
+        self.assertEqual(json.loads(self.get(urls[2])[0].content)["count"], 3)
+
+        self.write("patch", f"/api/issues/{self.issue.pk}/", {"status": "Finished"})
+        response, _ = self.get(urls[0])
+        self.assertEqual((response["X-Cache"], response.data["status"]), ("MISS", "Finished"))
+        self.assertEqual(self.get(urls[1])[0]["X-Cache"], "HIT")
+
+        # Le nom du projet est affiché par le détail des issues.
+        self.write("patch", f"/api/projects/{self.project.pk}/", {"name": "SoftDesk 2"})
+        response, _ = self.get(urls[1])
+        self.assertEqual((response["X-Cache"], response.data["project"]), ("MISS", "SoftDesk 2"))
+
+        self.write("delete", f"/api/issues/{self.other_issue.pk}/")
+        self.assertEqual(self.client.get(urls[1]).status_code, 404)
+
+    def test_bulk_writes_expire_entries(self):
+        self.get("/api/issues/")
+        response = self.write("patch", "/api/issues/bulk/", [{"id": self.issue.pk, "priority": "LOW"}])
+        self.assertEqual(response.status_code, 200, response.content)
+        response, _ = self.get("/api/issues/")
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    def test_conditional_request_on_hit(self):
+        etag = self.get("/api/issues/")[0]["ETag"]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/issues/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response["X-Cache"]), (304, "HIT"))
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_stats_endpoint_is_admin_only(self):
+        self.assertEqual(self.client.get("/api/cache/stats/").status_code, 403)
+        self.get("/api/issues/")
+        self.get("/api/issues/")
+        self.client.force_authenticate(User.objects.create_user(username="admin", password="x", is_staff=True))
+        response = self.client.get("/api/cache/stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["hits"], response.data["misses"]), (1, 1))
+        self.assertGreaterEqual(response.data["entries"], 1)
+        self.assertIn("evictions", response.data)
+
+
+class CacheBackendTests(SimpleTestCase):
+    """
+    Backends LRU bornés en entrées et en octets (voir cache_backends.py).
+    """
+
+    def test_locmem_evicts_least_recently_used(self):
+        cache = LRULocMemCache("test-lru", {"OPTIONS": {"MAX_ENTRIES": 3, "MAX_BYTES": 10000}})
+        cache.clear()
+        cache.set_many({"a": 1, "b": 2, "c": 3})
+        cache.get("a")
+        cache.set("d", 4)
+        self.assertEqual(cache.get_many(["a", "b", "c", "d"]), {"a": 1, "c": 3, "d": 4})
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        cache.set("big", "x" * 6000)
+        cache.set("bigger", "y" * 6000)
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], 10000)
+        self.assertIsNone(cache.get("big"))
+        # Plus gros que le plafond : jamais stocké.
+        cache.set("huge", "z" * 20000)
+        self.assertIsNone(cache.get("huge"))
+        cache.delete("bigger")
+        self.assertEqual(cache.stats()["bytes"], sum(
+            len(pickle.dumps(value, cache.pickle_protocol)) for value in cache.get_many(["a", "c", "d"]).values()
+        ))
+
+    def test_file_cache_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LRUFileBasedCache(directory, {"OPTIONS": {"MAX_ENTRIES": 3, "MAX_BYTES": 100000}})
+            for age, key in enumerate(["a", "b", "c"]):
+                cache.set(key, key)
+                # Dates de dernier usage explicites : a, puis b, puis c.
+                os.utime(cache._key_to_file(key), (1000 + age, 1000 + age))
+            cache.get("a")
+            cache.set("d", "d")
+            self.assertEqual(cache.get_many(["a", "b", "c", "d"]), {"a": "a", "c": "c", "d": "d"})
+            self.assertGreaterEqual(cache.stats()["evictions"], 1)
+            self.assertEqual(cache.stats()["entries"], 3)
+
+
+# URLconf des tests des vues asynchrones : leurs routes en tête, comme sous ASGI (config/asgi.py).
+urlpatterns = [path("api/", include("projects.async_urls"))] + config_urls.urlpatterns
+
+
+class AsyncReadTests(SoftDeskTestCase):
+    """
+    Vues asynchrones des lectures (voir async_views.py) : même sortie que les ViewSets,
+    délégation au ViewSet pour tout le reste.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.issues = self.create_issues(12)
+        self.create_comments(self.issues[0], 3)
+        self.author.refresh_from_db()
+        self.token = str(SoftDeskTokenObtainPairSerializer.get_token(self.author).access_token)
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def get_both(self, url, **extra):
+        """
+        Renvoie (réponse du ViewSet, réponse de la vue asynchrone) pour la même requête.
+        """
+        sync_response = self.client.get(url, **extra)
+        with override_settings(ROOT_URLCONF=__name__):
+            async_response = self.client.get(url, **extra)
+            # resolver_match est évalué à la demande : on le résout tant que l'URLconf est active.
+            async_response.url_name = async_response.resolver_match.url_name
+        return sync_response, async_response
+
+    def test_same_output_as_viewsets(self):
+        for url in ("/api/projects/", f"/api/projects/{self.project.pk}/", "/api/issues/",
+                    "/api/issues/?page=2", "/api/issues/?status=To Do&ordering=-priority,title&page=2",
+                    "/api/comments/", "/api/issues/?compact=true&omit=priority",
+                    f"/api/projects/{self.project.pk}/?fields=name,author"):
+            sync_response, async_response = self.get_both(url)
+            self.assertTrue(async_response.url_name.startswith("async-"), url)
+            self.assertEqual(async_response.status_code, 200, url)
+            self.assertEqual(async_response.content, sync_response.content, url)
+            for header in ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Allow"):
+                self.assertEqual(async_response.get(header), sync_response.get(header), (url, header))
+            self.assertEqual(set(async_response["Vary"].split(", ")), set(sync_response["Vary"].split(", ")))
+
+    def test_other_requests_are_delegated(self):
+        other = Project.objects.create(name="Autre", type="iOS", author=self.member)
+        for url, extra in (
+            (f"/api/projects/{other.pk}/", {}),                       # non-membre : 404
+            ("/api/issues/?status=Oops", {}),                         # filtre invalide : 400
+            ("/api/issues/?page=9", {}),                              # page inexistante : 404
+            ("/api/issues/?pagination=keyset", {}),                   # pagination par curseur
+            ("/api/projects/", {"HTTP_AUTHORIZATION": "Bearer abc"}),  # token invalide : 401
+            ("/api/comments/?fields=secret", {}),                     # champ inconnu : 400
+            ("/api/projects/?format=api", {}),                        # API navigable
+        ):
+            sync_response, async_response = self.get_both(url, **extra)
+            self.assertEqual(async_response.status_code, sync_response.status_code, url)
+            if "format" not in url:
+                self.assertEqual(async_response.content, sync_response.content, url)
+        # API navigable : même page, au jeton CSRF près.
+        self.assertContains(async_response, "Project List")
+
+        with override_settings(ROOT_URLCONF=__name__):
+            response = self.client.post("/api/projects/", {"name": "Nouveau", "type": "iOS"}, format="json")
+            self.assertEqual(response.status_code, 201, response.content)
+            response = self.client.patch(f"/api/projects/{self.project.pk}/", {"description": "Maj"}, format="json")
+            self.assertEqual(response.status_code, 200, response.content)
+
+    def test_queries(self):
+        with override_settings(ROOT_URLCONF=__name__):
+            self.client.get(f"/api/projects/{self.project.pk}/")
+            for url, expected in (
+                # Agrégation (total + ETag), puis la page.
+                ("/api/issues/", 2),
+                ("/api/comments/", 2),
+                # Rôle lu dans le cache des appartenances : une seule requête (projet + auteur).
+                (f"/api/projects/{self.project.pk}/", 1),
+            ):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(context.captured_queries), expected, url)
+
+            etag = self.client.get("/api/issues/")["ETag"]
+            response = self.client.get("/api/issues/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+    @override_settings(SOFTDESK_RESPONSE_CACHE_ALIAS="responses")
+    def test_response_cache_shared_with_viewsets(self):
+        caches["responses"].clear()
+        self.assertEqual(self.client.get("/api/issues/")["X-Cache"], "MISS")
+        with override_settings(ROOT_URLCONF=__name__):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get("/api/issues/")
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(len(context.captured_queries), 0)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    async def test_asgi_request(self):
+        response = await self.async_client.get("/api/issues/", headers={"Authorization": f"Bearer {self.token}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["count"], 12)
+        # Mode de pagination inconnu : erreur 400 du ViewSet, pas de repli sur les pages.
+        response = await self.async_client.get(
+            "/api/issues/?pagination=bogus", headers={"Authorization": f"Bearer {self.token}"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    async def test_metrics_under_viewset_routes(self):
+        metrics.reset()
+        headers = {"Authorization": f"Bearer {self.token}"}
+        await self.async_client.get("/api/issues/", headers=headers)
+        await self.async_client.get(f"/api/projects/{self.project.pk}/", headers=headers)
+        endpoints = {endpoint["endpoint"]: endpoint for endpoint in metrics.summary()["endpoints"]}
+        issues, project = endpoints["IssueViewSet.list"], endpoints["ProjectViewSet.retrieve"]
+        self.assertEqual((issues["requests"], issues["statuses"]), (1, {"2xx": 1}))
+        self.assertEqual(issues["queries_per_request"], 2)
+        self.assertGreater(issues["serializer_ms_per_request"], 0)
+        self.assertGreater(project["serializer_ms_per_request"], 0)
+        self.assertGreater(project["permission_ms_per_request"], 0)
+
+
+class EventStreamTests(SoftDeskTestCase):
+    """
+    Flux d'événements d'un projet (Server-Sent Events, voir events.py).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = f"/api/projects/{self.project.pk}/events/"
+        self.broker = events.get_broker()
+
+    def headers(self, user):
+        user.refresh_from_db()
+        token = SoftDeskTokenObtainPairSerializer.get_token(user).access_token
+        return {"Authorization": f"Bearer {token}"}
+
+    async def open_stream(self, user):
+        response = await self.async_client.get(self.url, headers=await sync_to_async(self.headers)(user))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        return stream
+
+    def write(self, func):
+        """
+        Écriture exécutée comme dans une vue : les événements partent au commit.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            return func()
+
+    async def next_event(self, stream):
+        chunk = (await asyncio.wait_for(anext(stream), 1)).decode()
+        name, data = chunk.strip().split("\n")
+        return name.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+    async def test_issue_and_comment_events(self):
+        stream = await self.open_stream(self.author)
+        issue = await sync_to_async(self.write)(lambda: self.create_issues(1)[0])
+        self.assertEqual(
+            await self.next_event(stream),
+            ("issue.created", {"model": "issue", "action": "created", "id": issue.pk, "project": self.project.pk}),
+        )
+        comment = await sync_to_async(self.write)(lambda: self.create_comments(issue, 1)[0])
+        name, data = await self.next_event(stream)
+        self.assertEqual((name, data["id"], data["issue"]), ("comment.created", comment.pk, issue.pk))
+        await sync_to_async(self.write)(comment.delete)
+        self.assertEqual((await self.next_event(stream))[0], "comment.deleted")
+
+        # Rien n'est publié pour les autres projets.
+        other = await Project.objects.acreate(name="Autre", type="iOS", author=self.member)
+        await sync_to_async(self.write)(lambda: self.create_issues(1, project=other))
+        with override_settings(SOFTDESK_EVENTS_HEARTBEAT=0.01):
+            stream = await self.open_stream(self.author)
+            self.assertEqual(await anext(stream), b": ping\n\n")
+        await stream.aclose()
+
+    async def test_stream_ends_when_member_is_removed(self):
+        stream = await self.open_stream(self.member)
+        self.assertEqual(self.broker.subscriber_count(self.project.pk), 1)
+        await sync_to_async(self.write)(
+            lambda: Contributor.objects.get(project=self.project, user=self.member).delete()
+        )
+        self.assertEqual((await self.next_event(stream))[0], "contributor.deleted")
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertEqual(self.broker.subscriber_count(self.project.pk), 0)
+
+    async def test_slow_client_overflows(self):
+        subscription = self.broker.subscribe(self.project.pk, max_size=2)
+        try:
+            # Publication depuis un autre thread, comme après le commit d'une vue synchrone.
+            for pk in range(3):
+                await asyncio.to_thread(
+                    self.broker.publish, self.project.pk, events.make_event("issue", "created", pk, self.project.pk)
+                )
+            await asyncio.sleep(0)
+            self.assertIs(await subscription.get(), events.OVERFLOW)
+        finally:
+            self.broker.unsubscribe(subscription)
+
+    async def test_authentication_and_membership(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        outsider = await sync_to_async(User.objects.create_user)(username="carol", password="pwd-carol-123")
+        response = await self.async_client.get(self.url, headers=await sync_to_async(self.headers)(outsider))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_asgi_handler_serves_streams_without_threads(self):
+        handler = EventStreamASGIHandler()
+        headers = await sync_to_async(self.headers)(self.author)
+        closing = asyncio.Event()
+        chunks = []
+
+        def connection():
+            messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+            async def receive():
+                message = next(messages, None)
+                if message is None:
+                    await closing.wait()
+                    message = {"type": "http.disconnect"}
+                return message
+            return receive
+
+        async def send(message):
+            chunks.append(message)
+
+        scope = {
+            "type": "http", "method": "GET", "path": self.url, "query_string": b"", "root_path": "",
+            "headers": [(b"authorization", headers["Authorization"].encode())],
+        }
+        threads = threading.active_count()
+        tasks = [asyncio.create_task(handler(scope, connection(), send)) for _ in range(10)]
+        while self.broker.subscriber_count(self.project.pk) < 10:
+            await asyncio.sleep(0.01)
+        self.assertEqual(threading.active_count(), threads)
+        closing.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(self.broker.subscriber_count(self.project.pk), 0)
+        self.assertEqual(chunks[0]["status"], 200)
+
+
+class ChangeLogTests(SoftDeskTestCase):
+    """
+    Synchronisation incrémentale : GET /api/changes/?since=<seq> (voir changes.py).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.issues = self.create_issues(3)
+        self.comments = self.create_comments(self.issues[0], 2)
+
+    def sync(self, since=0, user=None, **params):
+        if user is not None:
+            self.client.force_authenticate(user)
+        response = self.client.get("/api/changes/", {"since": since, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_returns_only_changes_since(self):
+        data = self.sync()
+        self.assertEqual([issue["id"] for issue in data["issues"]], [issue.pk for issue in self.issues])
+        self.assertEqual(len(data["comments"]), 2)
+        self.assertFalse(data["has_more"])
+
+        since = data["last_seq"]
+        self.issues[1].status = "Finished"
+        self.issues[1].save()
+        self.issues[1].save()
+        self.comments[0].delete()
+        new_comment = self.create_comments(self.issues[2], 1)[0]
+        with CaptureQueriesContext(connection) as context:
+            data = self.sync(since)
+        self.assertEqual(len(context.captured_queries), 3)
+        self.assertEqual([(issue["id"], issue["status"]) for issue in data["issues"]], [(self.issues[1].pk, "Finished")])
+        self.assertEqual([comment["uuid"] for comment in data["comments"]], [str(new_comment.uuid)])
+        self.assertEqual(data["deleted"], {"issues": [], "comments": [str(self.comments[0].uuid)]})
+
+        # Rien de nouveau : réponse vide, même curseur.
+        self.assertEqual(self.sync(data["last_seq"])["last_seq"], data["last_seq"])
+
+    def test_scoped_to_member_projects_and_moves(self):
+        other = Project.objects.create(name="Autre", type="iOS", author=self.member)
+        self.create_issues(1, project=other)
+        self.assertEqual(len(self.sync()["issues"]), 3)
+        since = Change.objects.latest("seq").seq
+
+        # L'issue (et ses commentaires) passe dans un projet dont alice n'est pas membre.
+        moved = self.issues[0]
+        moved.project = other
+        moved.save()
+        data = self.sync(since)
+        self.assertEqual(data["deleted"]["issues"], [moved.pk])
+        self.assertEqual(set(data["deleted"]["comments"]), {str(comment.uuid) for comment in self.comments})
+        # bob est membre des deux projets : il garde l'issue et ses commentaires.
+        data = self.sync(since, user=self.member)
+        self.assertEqual([issue["id"] for issue in data["issues"]], [moved.pk])
+        self.assertEqual(len(data["comments"]), 2)
+        self.assertEqual(data["deleted"], {"issues": [], "comments": []})
+
+        # Un projet supprimé emporte son journal.
+        other.delete()
+        self.assertFalse(Change.objects.filter(project_id=other.pk).exists())
+
+    def test_pages_and_bulk_writes(self):
+        self.client.post(
+            "/api/issues/bulk/",
+            [{"title": f"Lot {i}", "description": "...", "tag": "TASK", "priority": "LOW", "project": "SoftDesk"}
+             for i in range(4)],
+            format="json",
+        )
+        seen, since, has_more = [], 0, True
+        while has_more:
+            data = self.sync(since, limit=3)
+            seen += [issue["title"] for issue in data["issues"]]
+            since, has_more = data["last_seq"], data["has_more"]
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(self.client.get("/api/changes/?since=abc").status_code, 400)
+
+    def test_query_uses_index(self):
+        plan = changes.member_changes(self.author, 10).explain()
+        self.assertIn("change_project_seq_idx", plan)
+
+
+class CommentProjectTests(SoftDeskTestCase):
+    """
+    Projet dénormalisé des commentaires (Comment.project), maintenu par les signaux.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.other = Project.objects.create(name="Autre", type="iOS", author=self.author)
+        self.issue = self.create_issues(1)[0]
+
+    def assertProjectsConsistent(self):
+        self.assertFalse(Comment.objects.exclude(project_id=F("issue__project_id")).exists())
+        counts = dict(ProjectStats.objects.values_list("project_id", "comments"))
+        stats.rebuild()
+        self.assertEqual(dict(ProjectStats.objects.values_list("project_id", "comments")), counts)
+
+    def test_project_follows_issue(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/comments/", {"description": "Vu", "issue": self.issue.pk})
+        self.assertEqual(response.status_code, 201, response.data)
+        comment = Comment.objects.get(uuid=response.data["uuid"])
+        self.assertEqual(comment.project_id, self.project.pk)
+        self.create_comments(self.issue, 2)
+
+        # Commentaire déplacé vers une issue d'un autre projet
+        other_issue = self.create_issues(1, project=self.other)[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f"/api/comments/{comment.pk}/", {"issue": other_issue.pk})
+        self.assertEqual(response.status_code, 200, response.data)
+        comment.refresh_from_db()
+        self.assertEqual(comment.project_id, self.other.pk)
+        self.assertProjectsConsistent()
+
+        # Issue déplacée, seule puis en masse : ses commentaires la suivent.
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f"/api/issues/{self.issue.pk}/", {"project": "Autre"})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Comment.objects.filter(project=self.other).count(), 3)
+        self.assertProjectsConsistent()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                "/api/issues/bulk/", [{"id": self.issue.pk, "project": "SoftDesk"}], format="json"
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Comment.objects.filter(project=self.project).count(), 2)
+        self.assertProjectsConsistent()
+
+    def test_bulk_comments(self):
+        other_issue = self.create_issues(1, project=self.other)[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/comments/bulk/", [{"description": "A", "issue": self.issue.pk}], format="json"
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        uuid = response.data["ids"][0]
+        self.assertEqual(Comment.objects.get(uuid=uuid).project_id, self.project.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                "/api/comments/bulk/", [{"uuid": uuid, "issue": other_issue.pk}], format="json"
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Comment.objects.get(uuid=uuid).project_id, self.other.pk)
+        self.assertProjectsConsistent()
+
+    def test_member_queries_skip_issue_join(self):
+        self.create_comments(self.issue, 3)
+        self.client.force_authenticate(self.member)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/comments/")
+        self.assertEqual(response.data["count"], 3)
+        self.assertFalse([query["sql"] for query in context.captured_queries if "projects_issue" in query["sql"]])
+        sql = str(Comment.objects.for_member(self.member).filter(project=self.project).query)
+        self.assertNotIn("projects_issue", sql)
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    """
+    Profils de base de données choisis par l'environnement (voir config/database.py).
+    """
+
+    databases = {"default"}
+
+    def test_profiles(self):
+        sqlite = database_settings(Path("/srv"), {"SOFTDESK_DB_BUSY_TIMEOUT": "5"})
+        self.assertEqual(sqlite["NAME"], Path("/srv/db.sqlite3"))
+        self.assertEqual(sqlite["OPTIONS"]["timeout"], 5)
+        self.assertEqual(sqlite["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertIn("PRAGMA journal_mode=WAL;", sqlite["OPTIONS"]["init_command"])
+        self.assertGreater(sqlite["CONN_MAX_AGE"], 0)
+
+        postgresql = database_settings(
+            Path("/srv"), {"SOFTDESK_DB_PROFILE": "postgresql", "SOFTDESK_DB_POOL_MAX": "8"}
+        )
+        self.assertEqual(postgresql["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(postgresql["OPTIONS"]["pool"]["max_size"], 8)
+        # Le pool gère la durée de vie des connexions : Django refuse CONN_MAX_AGE avec un pool.
+        self.assertEqual(postgresql["CONN_MAX_AGE"], 0)
+
+        with self.assertRaises(ValueError):
+            database_settings(Path("/srv"), {"SOFTDESK_DB_PROFILE": "oracle"})
+
+    def test_sqlite_connection_settings(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Profil SQLite uniquement")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], connection.settings_dict["OPTIONS"]["timeout"] * 1000)
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+@override_settings(SOFTDESK_READ_REPLICAS=["replica1"], SOFTDESK_REPLICA_PIN_CACHE_ALIAS="default")
+class ReplicaRoutingTests(SimpleTestCase):
+    """
+    Lectures des ViewSets sur réplica, épinglage sur la base principale (voir config/replicas.py).
+    """
+
+    def setUp(self):
+        caches["default"].clear()
+        self.factory = APIRequestFactory()
+
+    def route(self, method, view_func, authorization="Bearer alice", write=False, during=None):
+        """
+        Bases des lectures d'une requête traversant le middleware : avant et après une écriture.
+        """
+        aliases = []
+
+        def get_response(request):
+            middleware.process_view(request, view_func, (), {})
+            aliases.append(router.db_for_read(Issue))
+            if during:
+                during()
+            if write:
+                self.assertEqual(router.db_for_write(Issue), "default")
+                aliases.append(router.db_for_read(Issue))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(self.factory.generic(method, "/api/issues/", HTTP_AUTHORIZATION=authorization))
+        return aliases
+
+    def test_replica_databases(self):
+        replicas = replica_databases(Path("/srv"), {"SOFTDESK_DB_REPLICAS": "a.sqlite3, b.sqlite3"})
+        self.assertEqual(list(replicas), ["replica1", "replica2"])
+        self.assertEqual(replicas["replica2"]["NAME"], "b.sqlite3")
+        self.assertEqual(replicas["replica1"]["TEST"], {"MIRROR": "default"})
+        postgresql = replica_databases(
+            Path("/srv"), {"SOFTDESK_DB_PROFILE": "postgresql", "SOFTDESK_DB_REPLICAS": "pg-replica"}
+        )
+        self.assertEqual(postgresql["replica1"]["HOST"], "pg-replica")
+        self.assertEqual(replica_databases(Path("/srv"), {}), {})
+
+    def test_viewset_reads_use_replica(self):
+        issues = IssueViewSet.as_view({"get": "list", "post": "create"})
+        self.assertEqual(self.route("GET", issues), ["replica1"])
+        self.assertEqual(self.route("HEAD", UserViewSet.as_view({"get": "list"})), ["replica1"])
+        # Écriture dans une lecture : la suite de la requête lit la base principale.
+        self.assertEqual(self.route("GET", issues, write=True), ["replica1", "default"])
+        # Vues asynchrones des lectures (async_views.py) : routées comme le ViewSet qu'elles servent.
+        for view_class in (AsyncIssueListView, AsyncProjectDetailView):
+            self.assertEqual(self.route("GET", view_class.as_view(), authorization="Bearer dave"), ["replica1"])
+            self.assertEqual(self.route("POST", view_class.as_view(), authorization="Bearer dave"), ["default"])
+        # Autres vues, autres méthodes et hors requête : base principale.
+        self.assertEqual(self.route("GET", TokenObtainPairView.as_view()), ["default"])
+        self.assertEqual(self.route("POST", issues), ["default"])
+        self.assertEqual(router.db_for_read(Issue), "default")
+        self.assertTrue(router.allow_migrate("default", "projects"))
+        self.assertFalse(router.allow_migrate("replica1", "projects"))
+
+    def test_writes_pin_client_to_primary(self):
+        issues = IssueViewSet.as_view({"get": "list", "post": "create"})
+        self.route("POST", issues, write=True)
+        self.assertEqual(self.route("GET", issues), ["default"])
+        self.assertEqual(self.route("GET", issues, authorization="Bearer bob"), ["replica1"])
+        # Fin de la fenêtre d'épinglage
+        caches["default"].clear()
+        self.assertEqual(self.route("GET", issues), ["replica1"])
+        # Sans réplica, rien n'est mémorisé.
+        with override_settings(SOFTDESK_READ_REPLICAS=[]):
+            self.route("POST", issues, authorization="Bearer carol", write=True)
+        self.assertEqual(self.route("GET", issues, authorization="Bearer carol"), ["replica1"])
+
+    def test_recent_writes_not_cached_from_replica(self):
+        cache = caches["default"]
+        clock = response_cache.read_clock(cache)
+        issues = IssueViewSet.as_view({"get": "list"})
+
+        def store(key):
+            return lambda: response_cache.store(cache, key, clock, ["issues"], HttpResponse(b"[]"))
+
+        # Juste après une écriture, le réplica peut ne pas la contenir.
+        self.route("GET", issues, during=store("replica"))
+        self.route("POST", issues, authorization="Bearer bob", during=store("primary"))
+        self.assertIsNone(cache.get("replica"))
+        self.assertIsNotNone(cache.get("primary"))
+        with override_settings(SOFTDESK_REPLICA_STICKY_SECONDS=0):
+            self.route("GET", issues, during=store("replica"))
+        self.assertIsNotNone(cache.get("replica"))
+
+
+class MetricsTests(SoftDeskTestCase):
+    """
+    Mesures par point d'entrée : requêtes SQL, temps par étape, N+1 et expositions.
+    """
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.issue = self.create_issues(1)[0]
+        self.create_comments(self.issue, 3)
+
+    def endpoint(self, name):
+        return next(endpoint for endpoint in metrics.summary()["endpoints"] if endpoint["endpoint"] == name)
+
+    def test_records_per_endpoint(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get("/api/issues/")
+        queries = len(context.captured_queries)
+        self.client.get(f"/api/projects/{self.project.pk}/issues/{self.issue.pk}/comments/")
+        self.client.get("/api/issues/999999/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/comments/", {"description": "Nouveau", "issue": self.issue.pk}, format="json")
+
+        issues = self.endpoint("IssueViewSet.list")
+        self.assertEqual((issues["requests"], issues["statuses"]), (1, {"2xx": 1}))
+        self.assertEqual(issues["queries_per_request"], queries)
+        self.assertGreater(issues["db_ms_per_request"], 0)
+        self.assertGreater(issues["serializer_ms_per_request"], 0)
+        self.assertGreater(issues["permission_ms_per_request"], 0)
+        self.assertLessEqual(issues["p50_ms"], issues["p99_ms"])
+        self.assertEqual(self.endpoint("IssueCommentViewSet.list")["requests"], 1)
+        self.assertEqual(self.endpoint("IssueViewSet.retrieve")["statuses"], {"4xx": 1})
+        self.assertEqual(self.endpoint("CommentViewSet.create")["statuses"], {"2xx": 1})
+
+    def test_flags_repeated_queries(self):
+        def view(request):
+            for comment in Comment.objects.order_by("pk"):
+                comment.issue.title
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        middleware = metrics.MetricsMiddleware(
+            lambda request: middleware.process_view(request, view, (), {}) or view(request)
+        )
+        middleware(request)
+        endpoint = self.endpoint("view")
+        self.assertEqual(endpoint["queries_per_request"], 4)
+        self.assertEqual(endpoint["duplicate_query_requests"], 0)
+        with override_settings(SOFTDESK_METRICS_DUPLICATE_THRESHOLD=3):
+            middleware(request)
+        endpoint = self.endpoint("view")
+        self.assertEqual(endpoint["duplicate_query_requests"], 1)
+        (duplicate,) = endpoint["duplicate_queries"]
+        self.assertIn("projects_issue", duplicate["sql"])
+        self.assertEqual((duplicate["requests"], duplicate["max_repeats"]), (1, 3))
+
+    def test_bounded_endpoints(self):
+        with self.settings(SOFTDESK_METRICS_DUPLICATE_THRESHOLD=5):
+            for index in range(metrics.MAX_ENDPOINTS + 10):
+                request_metrics = metrics.RequestMetrics()
+                request_metrics.endpoint = f"view{index}"
+                metrics.record(request_metrics, 0.001, 200)
+        snapshot = metrics.snapshot()
+        self.assertEqual(len(snapshot), metrics.MAX_ENDPOINTS + 1)
+        self.assertEqual(snapshot[metrics.OTHER].count, 10)
+
+    def test_quantile(self):
+        buckets = [0] * (len(metrics.LATENCY_BUCKETS) + 1)
+        buckets[1] = buckets[2] = 50
+        self.assertAlmostEqual(metrics.quantile(0.5, metrics.LATENCY_BUCKETS, buckets), 0.01)
+        self.assertAlmostEqual(metrics.quantile(0.75, metrics.LATENCY_BUCKETS, buckets), 0.0175)
+        buckets[-1] = 100
+        self.assertEqual(metrics.quantile(0.99, metrics.LATENCY_BUCKETS, buckets), 10.0)
+
+    def test_prometheus_endpoint(self):
+        self.client.get("/api/issues/")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        text = response.content.decode()
+        self.assertIn('softdesk_requests_total{endpoint="IssueViewSet.list",status="2xx"} 1', text)
+        self.assertIn('softdesk_request_duration_seconds_bucket{endpoint="IssueViewSet.list",le="+Inf"} 1', text)
+        self.assertIn('softdesk_db_queries_count{endpoint="IssueViewSet.list"} 1', text)
+
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="10.0.0.1").status_code, 403)
+        with override_settings(SOFTDESK_METRICS_TOKEN="secret"):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+            response = self.client.get("/metrics", REMOTE_ADDR="10.0.0.1", HTTP_AUTHORIZATION="Bearer secret")
+            self.assertEqual(response.status_code, 200)
+
+    def test_summary_is_admin_only(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+        self.client.force_authenticate(User.objects.create_user(username="admin", password="x", is_staff=True))
+        response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["duplicate_threshold"], 5)
+        names = [endpoint["endpoint"] for endpoint in response.data["endpoints"]]
+        self.assertIn("MetricsSummaryView.get", names)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    SOFTDESK_RESPONSE_CACHE_ALIAS=None,
+    SOFTDESK_READ_REPLICAS=[],
+)
+class ReplayTrafficTests(TransactionTestCase):
+    """
+    Rejeu de trafic enregistré : les requêtes sont traitées par d'autres threads (autres
+    connexions), les données doivent donc être validées en base.
+    """
+
+    def setUp(self):
+        caches["membership"].clear()
+        self.author = User.objects.create_user(username="alice", password="pwd-alice-123")
+        self.member = User.objects.create_user(username="bob", password="pwd-bob-123")
+        self.project = Project.objects.create(name="SoftDesk", type="back-end", author=self.author)
+        Contributor.objects.create(user=self.author, project=self.project)
+        Contributor.objects.create(user=self.member, project=self.project)
+        self.issue = Issue.objects.create(
+            title="Issue", description="Description", tag="BUG", priority="HIGH",
+            project=self.project, author=self.author,
+        )
+
+    def replay(self, records, *options):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as file:
+            file.write("\n".join(json.dumps(record) for record in records))
+        self.addCleanup(os.remove, file.name)
+        out = io.StringIO()
+        call_command("replay_traffic", file.name, "--json", *options, stdout=out)
+        report = json.loads(out.getvalue())
+        return report, {endpoint["endpoint"]: endpoint for endpoint in report["endpoints"]}
+
+    def test_replay_per_endpoint(self):
+        records = [
+            *({"method": "GET", "path": "/api/projects/", "user": "alice"} for _ in range(3)),
+            {"method": "get", "path": f"/api/projects/{self.project.pk}/issues/?page=1", "user": "bob"},
+            {"method": "PATCH", "path": f"/api/projects/{self.project.pk}/", "body": {"name": "X"}, "user": "bob"},
+            {"method": "POST", "path": "/api/comments/", "body": {"issue": self.issue.pk, "description": "Vu"},
+             "user": "bob"},
+            {"method": "GET", "path": "/api/issues/"},
+            {"method": "GET", "path": "/nulle-part/", "user": "alice"},
+        ]
+        for mode in ("threads", "asyncio"):
+            with self.subTest(mode=mode):
+                report, endpoints = self.replay(records, "--mode", mode, "--concurrency", "2")
+                self.assertEqual((report["requests"], report["errors"]), (8, 3))
+                self.assertEqual(endpoints["ProjectViewSet.list"]["statuses"], {"200": 3})
+                self.assertEqual(endpoints["ProjectIssueViewSet.list"]["statuses"], {"200": 1})
+                self.assertEqual(endpoints["ProjectViewSet.partial_update"]["statuses"], {"403": 1})
+                self.assertEqual(endpoints["CommentViewSet.create"]["statuses"], {"201": 1})
+                self.assertEqual(endpoints["IssueViewSet.list"]["statuses"], {"401": 1})
+                self.assertEqual(endpoints["unmatched"]["statuses"], {"404": 1})
+        self.assertEqual(Comment.objects.filter(issue=self.issue).count(), 2)
+
+    def test_time_scaled_replay(self):
+        records = [
+            {"method": "GET", "path": "/api/projects/", "user": "alice", "timestamp": "2024-06-01T10:00:00"},
+            {"method": "GET", "path": "/api/projects/", "user": "alice", "timestamp": "2024-06-01T10:00:01"},
+            {"method": "GET", "path": "/api/issues/", "user": "bob", "timestamp": "2024-06-01T10:00:02"},
+        ]
+        started = time.perf_counter()
+        report, _ = self.replay(records, "--speed", "10")
+        # 2 s de trafic d'origine rejouées dix fois plus vite
+        self.assertGreaterEqual(time.perf_counter() - started, 0.2)
+        self.assertEqual((report["requests"], report["errors"]), (3, 0))
+        self.assertIn("start_delay", report)
+
+        with self.assertRaisesMessage(CommandError, "timestamp"):
+            self.replay([{"method": "GET", "path": "/api/projects/", "user": "alice"}], "--speed", "2")
+        with self.assertRaisesMessage(CommandError, "Utilisateurs inconnus : eve"):
+            self.replay([{"method": "GET", "path": "/api/projects/", "user": "eve"}])
+        with self.assertRaisesMessage(CommandError, "ligne 1"):
+            self.replay([{"path": "/api/projects/"}])
+
+
+class CompiledReadTests(SoftDeskTestCase):
+    """
+    Sérialiseurs précompilés (voir compiled.py) : mêmes octets que le rendu DRF.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.issues = self.create_issues(12)
+        # Assignée à personne, texte avec U+2028 (échappé par DRF) et caractères non ASCII
+        self.issues[0].assignee = None
+        self.issues[0].description = "Ligne 1\u2028ligne 2 — « été » \U0001F41B"
+        self.issues[0].save()
+        self.comments = self.create_comments(self.issues[0], 3)
+
+    def get_both(self, url):
+        """
+        Renvoie (réponse DRF, réponse précompilée) pour la même requête.
+        """
+        with override_settings(SOFTDESK_COMPILED_READS=False):
+            reference = self.client.get(url)
+        response = self.client.get(url)
+        return reference, response
+
+    def test_same_bytes_as_serializers(self):
+        for serializer_class in (ProjectListSerializer, ProjectRetrieveSerializer, ContributorSerializer,
+                                 IssueSerializer, CommentSerializer):
+            self.assertIsNotNone(get_compiled(serializer_class, {"request": None}), serializer_class)
+
+        issue, comment = self.issues[0], self.comments[0]
+        base = f"/api/projects/{self.project.pk}"
+        for url in (
+            "/api/projects/", f"{base}/",
+            "/api/contributors/", f"/api/contributors/{Contributor.objects.first().pk}/",
+            "/api/issues/", "/api/issues/?page=2", f"/api/issues/{issue.pk}/",
+            "/api/issues/?ordering=-priority,title&page_size=5", "/api/issues/?pagination=keyset",
+            "/api/comments/", f"/api/comments/{comment.pk}/",
+            f"{base}/contributors/", f"{base}/issues/", f"{base}/issues/{issue.pk}/",
+            f"{base}/issues/{issue.pk}/comments/",
+        ):
+            reference, response = self.get_both(url)
+            self.assertEqual(response.status_code, 200, (url, response.content))
+            self.assertEqual(response.content, reference.content, url)
+
+        # Pagination par curseur : le curseur suivant est lu sur les lignes de values().
+        next_link = self.client.get("/api/issues/?pagination=keyset").data["next"]
+        reference, response = self.get_both(next_link)
+        self.assertEqual(response.content, reference.content)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIn(b"\\u2028", self.client.get(f"/api/issues/{issue.pk}/").content)
+
+    def test_list_reads_only_serialized_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(f"/api/projects/{self.project.pk}/issues/")
+        page = context.captured_queries[-1]["sql"]
+        # Ni jointure vers le projet (affiché depuis l'URL), ni colonnes inutiles :
+        # updated_time est lue pour l'ETag de la page (voir conditional.py).
+        self.assertIn('"projects_issue"."updated_time"', page.split("FROM")[0])
+        self.assertNotIn('"projects_project"', page)
+
+    def test_writes_and_browsable_api_use_serializers(self):
+        response = self.client.post("/api/issues/", {
+            "title": "Nouvelle", "description": "...", "tag": "BUG", "priority": "LOW", "project": "SoftDesk",
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertContains(self.client.get("/api/issues/?format=api"), "Issue List")
+        self.assertContains(self.client.get("/api/issues/", HTTP_ACCEPT="application/json; indent=4"), '    "count"')
+
+
+class SparseFieldsetTests(SoftDeskTestCase):
+    """
+    Champs partiels (?fields= / ?omit=) et liste allégée des issues (voir sparse.py).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.issues = self.create_issues(3)
+        self.comments = self.create_comments(self.issues[0], 2)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response, context.captured_queries[-1]["sql"]
+
+    def test_fields_and_omit(self):
+        response, sql = self.get("/api/issues/?fields=id,title,status,priority,assignee")
+        # Ordre du sérialiseur, quel que soit celui de la requête
+        self.assertEqual(list(response.data["results"][0]), ["id", "title", "priority", "status", "assignee"])
+        self.assertNotIn("description", sql)
+        self.assertNotIn('"projects_project"."name"', sql)
+
+        response, sql = self.get("/api/comments/?omit=description,created_time")
+        self.assertEqual(list(response.data["results"][0]), ["uuid", "issue", "author"])
+        self.assertNotIn("description", sql)
+
+        response, _ = self.get(f"/api/projects/{self.project.pk}/?fields=name,author&omit=author")
+        self.assertEqual(response.data, {"name": "SoftDesk"})
+        response, _ = self.get(f"/api/projects/{self.project.pk}/issues/?fields=id,project")
+        self.assertEqual(response.data["results"][0], {"id": self.issues[0].pk, "project": "SoftDesk"})
+
+    def test_same_bytes_with_drf_rendering(self):
+        for url in ("/api/issues/?fields=title,assignee,created_time", "/api/issues/?compact=true",
+                    f"/api/issues/{self.issues[0].pk}/?omit=description", "/api/contributors/?fields=user"):
+            response, sql = self.get(url)
+            with override_settings(SOFTDESK_COMPILED_READS=False):
+                reference, reference_sql = self.get(url)
+            self.assertEqual(response.content, reference.content, url)
+            # Rendu DRF : la description de l'issue n'est pas lue non plus (defer).
+            self.assertNotIn('"projects_issue"."description"', reference_sql, url)
+
+    def test_compact_issue_list(self):
+        response, sql = self.get("/api/issues/?compact=true")
+        self.assertEqual(response.data["results"][0], {
+            "id": self.issues[0].pk, "title": "Issue 0", "status": "To Do", "priority": "HIGH", "assignee": "bob",
+        })
+        self.assertNotIn("description", sql)
+        response, _ = self.get("/api/issues/?compact=true&fields=id,title")
+        self.assertEqual(list(response.data["results"][0]), ["id", "title"])
+        # Détail : représentation complète.
+        response, _ = self.get(f"/api/issues/{self.issues[0].pk}/?compact=true")
+        self.assertIn("description", response.data)
+
+    def test_invalid_selection_and_writes(self):
+        response = self.client.get("/api/issues/?fields=id,secret")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("secret", response.data["fields"])
+        self.assertEqual(self.client.get("/api/issues/?omit=id,title,description,tag,priority,status,"
+                                         "project,author,assignee,created_time").status_code, 400)
+        self.assertEqual(self.client.get("/api/issues/?compact=true&fields=description").status_code, 400)
+
+        # Les écritures valident et renvoient tous les champs.
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/issues/?fields=id", {
+                "title": "Nouvelle", "description": "...", "tag": "BUG", "priority": "LOW", "project": "SoftDesk",
+            }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertIn("description", response.data)
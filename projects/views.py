@@ -1,13 +1,26 @@
+import hmac
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views import View
 from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from .models import Project, Contributor, Issue, Comment
+from .models import Project, Contributor, Issue, Comment, ProjectAssigneeStats
 from .serializers import (
     ProjectListSerializer,
     ProjectRetrieveSerializer,
     ContributorSerializer,
     IssueSerializer,
+    IssueListSerializer,
     CommentSerializer,
+    ProjectStatsSerializer,
+    SearchResultSerializer,
 )
 
 # Import des permissions personnalisées :
@@ -15,16 +28,52 @@ from .serializers import (
 # - IsProjectContributor : Il faut être membre du projet pour voir son contenu.
 # - IsProjectAuthor : Spécifique pour gérer (ajouter/supprimer) les contributeurs.
 from .permissions import IsAuthorOrReadOnly, IsProjectContributor, IsProjectAuthor
+from .compiled import CompiledReadMixin
+from .sparse import SparseFieldsetViewMixin
+from .conditional import ConditionalGetMixin
+from .response_cache import CachedResponseMixin
+from . import response_cache
+from .bulk import BulkActionsMixin, ContributorBulkHandler, IssueBulkHandler, CommentBulkHandler
+from .export import EXPORT_FORMATS, NDJSON, export_response
+from .filters import IssueFilterBackend, IssueOrderingFilter
+from .nested import ProjectScopedMixin, IssueScopedMixin
+from .metrics import InstrumentedViewMixin
+from .pagination import RankedPagination
+from . import changes, metrics, search, sparse
+from . import stats as project_stats
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(
+    InstrumentedViewMixin, CachedResponseMixin, ConditionalGetMixin, SparseFieldsetViewMixin, CompiledReadMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet pour la gestion des Projets (CRUD).
     Permet de lister, créer, récupérer, mettre à jour et supprimer des projets.
+    Les lectures portent un ETag / Last-Modified (voir conditional.py), sont servies depuis
+    le cache des réponses (voir response_cache.py) et rendues par un sérialiseur précompilé
+    (voir compiled.py).
     """
 
     queryset = Project.objects.all()
 
+    def get_queryset(self):
+        """
+        Construit un queryset optimisé selon l'action demandée.
+        """
+        queryset = super().get_queryset()
+
+        # La liste n'affiche que des colonnes du projet : aucune jointure nécessaire.
+        # Elle reste visible par tout utilisateur connecté (voir get_permissions).
+        if self.action == "list":
+            return queryset
+
+        # Le détail n'est accessible qu'aux membres : le filtrage par appartenance se fait
+        # directement dans la requête SQL (un non-membre obtient une 404).
+        # Le détail affiche 'author.username' : on joint l'auteur dans la même requête SQL
+        # pour éviter une requête supplémentaire (lazy loading) à la sérialisation.
+        return queryset.for_member(self.request.user).select_related("author")
+
     def get_serializer_class(self):
         """
         Définit le sérialiseur à utiliser selon l'action demandée.
@@ -59,16 +108,54 @@ class ProjectViewSet(viewsets.ModelViewSet):
         """
         Personnalise la sauvegarde lors de la création d'un projet.
         """
-        user = self.request.user
+        # On passe par les identifiants : request.user peut être un utilisateur léger
+        # reconstruit depuis le token JWT (voir authentication/authentication.py).
+        user_id = self.request.user.id
         
         # 1. On sauvegarde le projet en définissant l'utilisateur connecté comme auteur
-        project = serializer.save(author=user)
+        project = serializer.save(author_id=user_id)
         
         # 2. Logique métier : L'auteur est automatiquement ajouté comme contributeur
-        Contributor.objects.create(user=user, project=project)
+        Contributor.objects.create(user_id=user_id, project=project)
 
+    @action(detail=True, methods=["get"])
+    def export(self, request, pk=None):
+        """
+        Export complet du projet en flux continu (voir export.py) :
+        GET /api/projects/{id}/export/?output=ndjson|csv
+        """
+        export_format = request.query_params.get("output", NDJSON)
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({"output": f"Formats disponibles : {', '.join(EXPORT_FORMATS)}."})
 
-class ContributorViewSet(viewsets.ModelViewSet):
+        # get_object() applique le filtrage par appartenance et les permissions du détail.
+        return export_response(
+            self.get_object(), export_format, asynchronous=isinstance(request._request, ASGIRequest)
+        )
+
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        """
+        Tableau de bord du projet : GET /api/projects/{id}/stats/
+        Les compteurs sont maintenus par les signaux (voir stats.py) : aucun COUNT à la lecture.
+        """
+        project = self.get_object()
+        assignees = (
+            ProjectAssigneeStats.objects.filter(project_id=project.pk)
+            .exclude(issues_todo=0, issues_in_progress=0, issues_finished=0)
+            .select_related("assignee")
+            .order_by("assignee__username")
+        )
+        serializer = ProjectStatsSerializer(
+            project_stats.get_stats(project.pk), context={"request": request, "assignees": assignees}
+        )
+        return Response(serializer.data)
+
+
+class ContributorViewSet(
+    InstrumentedViewMixin, CachedResponseMixin, BulkActionsMixin, SparseFieldsetViewMixin, CompiledReadMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet pour la gestion des Contributeurs (membres d'un projet).
     Attention : La sécurité est critique ici pour empêcher les invitations non autorisées.
@@ -76,6 +163,19 @@ class ContributorViewSet(viewsets.ModelViewSet):
 
     queryset = Contributor.objects.all()
     serializer_class = ContributorSerializer
+    # Ajout / retrait en masse : /api/contributors/bulk/ (voir bulk.py)
+    bulk_handler_class = ContributorBulkHandler
+
+    def get_queryset(self):
+        """
+        Restreint aux projets de l'utilisateur et joint l'utilisateur et le projet
+        (affichés par leurs slugs) pour éviter le N+1.
+        """
+        return (
+            super().get_queryset()
+            .for_member(self.request.user)
+            .select_related("user", "project")
+        )
 
     # Permissions strictes :
     # - IsProjectContributor : Pour voir la liste des membres.
@@ -84,12 +184,40 @@ class ContributorViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsProjectContributor, IsProjectAuthor]
 
 
-class IssueViewSet(viewsets.ModelViewSet):
+class IssueViewSet(
+    InstrumentedViewMixin, CachedResponseMixin, ConditionalGetMixin, BulkActionsMixin,
+    SparseFieldsetViewMixin, CompiledReadMixin, viewsets.ModelViewSet,
+):
     """
     ViewSet pour la gestion des Problèmes (Issues).
     """
     queryset = Issue.objects.all()
     serializer_class = IssueSerializer
+    # Création / modification / suppression en masse : /api/issues/bulk/ (voir bulk.py)
+    bulk_handler_class = IssueBulkHandler
+    # Filtres (?project=, ?status=, ?assignee=me, ...) et tri (?ordering=) : voir filters.py
+    filter_backends = [IssueFilterBackend, IssueOrderingFilter]
+
+    def get_queryset(self):
+        """
+        Restreint aux projets de l'utilisateur et joint en une seule requête
+        tout ce que le sérialiseur et les permissions lisent :
+        - project / author / assignee : affichés par leur nom (SlugRelatedField / ReadOnlyField).
+        - project__author : utilisé par la validation de l'assignation.
+        """
+        return (
+            super().get_queryset()
+            .for_member(self.request.user)
+            .select_related("project__author", "author", "assignee")
+        )
+
+    def get_serializer_class(self):
+        """
+        Liste allégée (tableau de suivi) sur demande : ?compact=true (voir sparse.py).
+        """
+        if self.action == "list" and sparse.wants_compact(self.request.query_params):
+            return IssueListSerializer
+        return super().get_serializer_class()
     
     # Tout contributeur peut voir/créer, seul l'auteur de l'issue peut la modifier.
     permission_classes = [IsAuthenticated, IsProjectContributor, IsAuthorOrReadOnly]
@@ -98,15 +226,31 @@ class IssueViewSet(viewsets.ModelViewSet):
         """
         Lors de la création, l'auteur est automatiquement rempli avec l'utilisateur connecté.
         """
-        serializer.save(author=self.request.user)
+        serializer.save(author_id=self.request.user.id)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    InstrumentedViewMixin, CachedResponseMixin, ConditionalGetMixin, BulkActionsMixin,
+    SparseFieldsetViewMixin, CompiledReadMixin, viewsets.ModelViewSet,
+):
     """
     ViewSet pour la gestion des Commentaires liés aux Issues.
     """
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    # Création / modification / suppression en masse : /api/comments/bulk/ (voir bulk.py)
+    bulk_handler_class = CommentBulkHandler
+
+    def get_queryset(self):
+        """
+        Restreint aux projets de l'utilisateur (projet porté par le commentaire, sans jointure)
+        et joint l'auteur (affiché par son pseudo).
+        """
+        return (
+            super().get_queryset()
+            .for_member(self.request.user)
+            .select_related("author")
+        )
     
     # Tout contributeur peut voir/commenter, seul l'auteur du commentaire peut le modifier.
     permission_classes = [IsAuthenticated, IsProjectContributor, IsAuthorOrReadOnly]
@@ -115,4 +259,150 @@ class CommentViewSet(viewsets.ModelViewSet):
         """
         Lors de la création, l'auteur est automatiquement rempli avec l'utilisateur connecté.
         """
-        serializer.save(author=self.request.user)
\ No newline at end of file
+        serializer.save(author_id=self.request.user.id)
+
+
+# -- Routes imbriquées sous un projet (voir nested.py) --
+
+class ProjectContributorViewSet(ProjectScopedMixin, ContributorViewSet):
+    """
+    Contributeurs d'un projet : /api/projects/{project_pk}/contributors/
+    """
+
+    def get_queryset(self):
+        return self.scope_queryset(Contributor.objects.select_related("user"))
+
+    def perform_create(self, serializer):
+        serializer.save(project=self.get_project())
+
+
+class ProjectIssueViewSet(ProjectScopedMixin, IssueViewSet):
+    """
+    Issues d'un projet : /api/projects/{project_pk}/issues/
+    """
+
+    def get_queryset(self):
+        # Le projet est affiché depuis le contexte du sérialiseur : inutile de le joindre.
+        return self.scope_queryset(Issue.objects.select_related("author", "assignee"))
+
+    def perform_create(self, serializer):
+        serializer.save(author_id=self.request.user.id, project=self.get_project())
+
+
+class IssueCommentViewSet(IssueScopedMixin, CommentViewSet):
+    """
+    Commentaires d'une issue : /api/projects/{project_pk}/issues/{issue_pk}/comments/
+    """
+
+    def get_queryset(self):
+        return self.scope_queryset(Comment.objects.select_related("author"))
+
+    def perform_create(self, serializer):
+        serializer.save(author_id=self.request.user.id, issue=self.get_issue())
+
+
+class SearchViewSet(InstrumentedViewMixin, viewsets.ViewSet):
+    """
+    Recherche plein texte dans les issues et commentaires des projets de l'utilisateur :
+    GET /api/search/?q=connexion&type=issue|comment&project={id}
+    Résultats classés par pertinence, paginés par curseur (voir search.py et RankedPagination).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        terms = search.parse_terms(request.query_params.get("q"))
+        if not terms:
+            raise ValidationError({"q": "Ce paramètre est obligatoire."})
+
+        kind = request.query_params.get("type") or None
+        if kind is not None and kind not in search.KINDS:
+            raise ValidationError({"type": f"Types disponibles : {', '.join(search.KINDS)}."})
+
+        # Cloisonnement : seuls les projets dont l'utilisateur est membre sont interrogés.
+        projects = Project.objects.for_member(request.user)
+        project = request.query_params.get("project")
+        if project:
+            if not project.isdigit():
+                raise ValidationError({"project": "Identifiant de projet invalide."})
+            projects = projects.filter(pk=project)
+        project_ids = list(projects.values_list("pk", flat=True))
+
+        backend = search.get_backend()
+        paginator = RankedPagination()
+        hits = paginator.paginate_results(
+            lambda after, limit: backend.search(terms, project_ids, kind=kind, after=after, limit=limit),
+            request,
+        )
+        return paginator.get_paginated_response(SearchResultSerializer(hits, many=True).data)
+
+
+class ChangeViewSet(InstrumentedViewMixin, viewsets.ViewSet):
+    """
+    Synchronisation incrémentale des issues et commentaires des projets de l'utilisateur :
+    GET /api/changes/?since=<seq>&limit=<n> (voir changes.py).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        since = self.get_integer(request, "since", 0)
+        limit = min(self.get_integer(request, "limit", changes.DEFAULT_LIMIT), changes.MAX_LIMIT)
+        if limit == 0:
+            raise ValidationError({"limit": "Ce paramètre doit être strictement positif."})
+        return Response(changes.read(request.user, since, limit, {"request": request}))
+
+    @staticmethod
+    def get_integer(request, name, default):
+        value = request.query_params.get(name)
+        if value is None:
+            return default
+        if not value.isdigit():
+            raise ValidationError({name: "Entier positif attendu."})
+        return int(value)
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    Compteurs du cache des réponses (processus courant) : GET /api/cache/stats/
+    Réservé aux administrateurs.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.get_stats())
+
+
+class MetricsSummaryView(APIView):
+    """
+    Résumé des mesures par point d'entrée (processus courant) : GET /api/metrics/
+    Latences p50/p95/p99, requêtes SQL et requêtes répétées (N+1). Réservé aux administrateurs.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response(metrics.summary())
+
+
+class PrometheusMetricsView(View):
+    """
+    Mesures au format Prometheus : GET /metrics
+    Avec SOFTDESK_METRICS_TOKEN, le collecteur s'authentifie par "Authorization: Bearer <jeton>" ;
+    sans jeton configuré, seules les requêtes locales (127.0.0.1, ::1) sont servies.
+    """
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def get(self, request):
+        if not self.allowed(request):
+            return HttpResponseForbidden()
+        return HttpResponse(metrics.prometheus_text(), content_type=self.content_type)
+
+    @staticmethod
+    def allowed(request):
+        token = settings.SOFTDESK_METRICS_TOKEN
+        if token:
+            return hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+        return request.META.get("REMOTE_ADDR") in ("127.0.0.1", "::1")